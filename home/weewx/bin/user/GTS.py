@@ -304,6 +304,11 @@ class GTSType(weewx.xtypes.XType):
         self.gts_value=None     # last GTS value calculated
         self.gts_values={}      # calculated GTS values
         
+        # daily avg, min, max of closed days 
+        # key (obs_type, islmt) --> {(start, stop): (avg, min, max)}
+        self.day_stats_cache={}
+        self.day_stats_lock=threading.Lock()
+        
         # register the values with WeeWX
         # GTS
         weewx.units.obs_group_dict.setdefault('GTS','group_degree_day')
@@ -435,19 +440,19 @@ class GTSType(weewx.xtypes.XType):
         # calculate
         # This runs one loop for every day since New Year at program 
         # start and after that once a day one loop, only. After May 31st
-        # no loop is executed.
+        # no loop is executed. The daily averages of all the days are
+        # read at once.
+        _day_spans = list(genDaySpansWithoutDST(__ts,min(_sod_ts,_end_ts)))
+        _day_stats = self.get_day_stats('outTemp',_day_spans,db_manager,True)
+        _unit, _group = weewx.units.getStandardUnitType(db_manager.std_unit_system,'outTemp')
         _loop_ct=0
-        while __ts < _sod_ts and __ts < _end_ts:
-            # the day the average is calculated for
-            _today = TimeSpan(__ts,__ts+86400)
-            # calculate the average of the outside temperature
-            _result = weewx.xtypes.get_aggregate('outTemp',_today,'avg',db_manager)
+        for _today, (_dayavg, _, _) in zip(_day_spans,_day_stats):
+            __ts = _today.start
             # convert to centrigrade
-            if _result is not None:
-                _result = weewx.units.convert(_result,'degree_C')
+            if _dayavg is not None:
+                _dayavg = weewx.units.convert((_dayavg,_unit,_group),'degree_C')[0]
             # check condition and add to sum
-            if _result is not None and _result[0] is not None:
-                _dayavg = _result[0]
+            if _dayavg is not None:
                 if _dayavg > 0:
                     if __ts < _feb_ts:
                         _dayavg *= 0.5
@@ -459,13 +464,10 @@ class GTSType(weewx.xtypes.XType):
                         self.gts_date[soy_ts] = __ts
                 # save the value for subsequent calls
                 self.gts_values[soy_ts][dayOfGTSYear(__ts,_soy_ts)]=__gts
-            # logging
-            #__mday=_loop_ct+1 if __ts<_feb_ts else _loop_ct-30
-            #__vv=_result[0] if not None and _result[0] is not None else None
-            #loginf("loop no. %s, mday %2s, %.2f GTS so far %s" % (_loop_ct,__mday,__vv,__gts))
-            # next day
-            __ts+=86400
             _loop_ct+=1
+        # next day
+        if _day_spans:
+            __ts = _day_spans[-1].stop
 
         # loop is run at least once, so log and remember values
         # (This happens after the start of WeeWX and later on at
@@ -884,6 +886,95 @@ class GTSType(weewx.xtypes.XType):
         return None
 
 
+    def get_day_stats(self, obs_type, day_spans, db_manager, islmt):
+        """ get the daily average, minimum and maximum for each day span
+        
+            Values of days that are over are remembered, so only days 
+            not requested before and the current day are read from
+            the database. All of them are read at once.
+            
+            Returns a list of (avg, min, max) tuples in the unit system
+            of the database, one tuple for each day span.
+        """
+        __key = (obs_type,bool(islmt))
+        with self.day_stats_lock:
+            __cache = self.day_stats_cache.setdefault(__key,dict())
+            __missing = [span for span in day_spans if (span.start,span.stop) not in __cache]
+        __fetched = dict()
+        if __missing:
+            for span, stats in zip(__missing,self.fetch_day_stats(obs_type,__missing,db_manager,islmt)):
+                __fetched[(span.start,span.stop)] = stats
+            # Only closed days are remembered. A day is closed, if
+            # the archive record at the end of the day is saved.
+            __last_ts = db_manager.last_timestamp
+            with self.day_stats_lock:
+                for __span_key, stats in __fetched.items():
+                    if __last_ts is not None and __span_key[1]<=__last_ts:
+                        __cache[__span_key] = stats
+        with self.day_stats_lock:
+            return [__fetched[(span.start,span.stop)] if (span.start,span.stop) in __fetched 
+                    else __cache[(span.start,span.stop)] for span in day_spans]
+
+
+    def fetch_day_stats(self, obs_type, day_spans, db_manager, islmt):
+        """ read the daily average, minimum and maximum for each day span
+            
+            The values are the same as returned by weewx.xtypes.get_aggregate()
+            for each single day: Whole days of the local timezone are read
+            from the daily summaries, days in local mean time (LMT) from
+            the archive table. Instead of one query per day and aggregation
+            type, one query covers all the days. day_spans must be in 
+            ascending order.
+        """
+        if not day_spans: return []
+        __start_ts = day_spans[0].start
+        __stop_ts = day_spans[-1].stop
+        try:
+            if not islmt and obs_type in getattr(db_manager,'daykeys',()):
+                # daily summaries
+                __rows = dict()
+                for _row in db_manager.genSql(
+                        "SELECT dateTime,min,max,wsum,sumtime FROM %s_day_%s "
+                        "WHERE dateTime>=? AND dateTime<?"
+                        % (db_manager.table_name,obs_type),(__start_ts,__stop_ts)):
+                    __rows[_row[0]] = (_row[3]/_row[4] if _row[3] is not None and _row[4] else None,_row[1],_row[2])
+                return [__rows.get(span.start,(None,None,None)) for span in day_spans]
+            # archive table
+            __acc = [None]*len(day_spans)
+            __idx = 0
+            for _row in db_manager.genSql(
+                    "SELECT dateTime,`%s`,`interval` FROM %s "
+                    "WHERE dateTime>? AND dateTime<=? AND `%s` IS NOT NULL "
+                    "ORDER BY dateTime"
+                    % (obs_type,db_manager.table_name,obs_type),(__start_ts,__stop_ts)):
+                while _row[0]>day_spans[__idx].stop: __idx += 1
+                # skip records between the requested days
+                if _row[0]<=day_spans[__idx].start: continue
+                _a = __acc[__idx]
+                if _a is None:
+                    __acc[__idx] = [_row[1]*_row[2],_row[2],_row[1],_row[1]]
+                else:
+                    _a[0] += _row[1]*_row[2]
+                    _a[1] += _row[2]
+                    if _row[1]<_a[2]: _a[2] = _row[1]
+                    if _row[1]>_a[3]: _a[3] = _row[1]
+            return [(_a[0]/_a[1] if _a[1] else None,_a[2],_a[3]) if _a is not None else (None,None,None) for _a in __acc]
+        except weedb.DatabaseError as e:
+            # obs_type is not in the database, ask the other XTypes
+            logdbg("%s: day stats one day at a time: %s" % (obs_type,e))
+        __result = []
+        for span in day_spans:
+            __vals = []
+            for _agg in ('avg','min','max'):
+                try:
+                    _x = weewx.xtypes.get_aggregate(obs_type,span,_agg,db_manager)
+                    __vals.append(_x[0] if _x is not None else None)
+                except (weewx.UnknownType,weewx.UnknownAggregation,weewx.CannotCalculate):
+                    __vals.append(None)
+            __result.append(tuple(__vals))
+        return __result
+
+
     def __genDaySpans(self, withoutdst, start_ts, stop_ts):
         if withoutdst:
             # return day spans in Local Mean Time
@@ -900,31 +991,21 @@ class GTSType(weewx.xtypes.XType):
         if not stop_t: stop_t = 1000.0
         count = 0
         try:
-          for daySpan in self.__genDaySpans(islmt, timespan.start, timespan.stop):
+          daySpans = list(self.__genDaySpans(islmt, timespan.start, timespan.stop))
+          for daySpan, (Tavg, Tmin, Tmax) in zip(daySpans,self.get_day_stats(obs_type, daySpans, db_manager, islmt)):
             #loginf(daySpan)
             if method=='dayavg':
                 # method 'dayavg'
-                # Get avg temperature for the day as a value tuple
-                Tavg_t = weewx.xtypes.get_aggregate(obs_type, daySpan, 'avg', db_manager)
-                # Make sure it's valid before including it in the aggregation:
-                if Tavg_t is not None and Tavg_t[0] is not None:
-                    avg_t = Tavg_t[0]
-                else:
-                    avg_t = None
+                # avg temperature for the day
+                avg_t = Tavg
             else:
                 # method 'hiloavgA' and 'hiloavgB'
-                # Get min and max temperature for the day as a value tuple
-                #loginf("a")
-                Tmax_t = weewx.xtypes.get_aggregate(obs_type, daySpan, 'max', db_manager)
-                #loginf("b")
-                Tmin_t = weewx.xtypes.get_aggregate(obs_type, daySpan, 'min', db_manager)
-                #loginf("c")
-                # Make sure it's valid before including it in the aggregation:
-                if Tmax_t is not None and Tmax_t[0] is not None and Tmin_t is not None and Tmin_t[0] is not None:
-                    if method=='hiloavgB'  and Tmin_t[0]<base_t:
-                        Tmin_t = weewx.units.ValueTuple(base_t, Tmin_t[1], Tmin_t[2])
+                # min and max temperature for the day
+                if Tmax is not None and Tmin is not None:
+                    if method=='hiloavgB'  and Tmin<base_t:
+                        Tmin = base_t
                     # average of daily max and min temperature
-                    avg_t = (Tmax_t[0]+Tmin_t[0])/2
+                    avg_t = (Tmax+Tmin)/2
                 else:
                     avg_t = None
             if avg_t is not None:
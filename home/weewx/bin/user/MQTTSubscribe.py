@@ -491,6 +491,7 @@ import re
 import ssl
 import sys
 import syslog
+import threading
 import time
 import traceback
 from collections import deque
@@ -579,6 +580,14 @@ class AbstractLogger():
         self.info(f"Log console: {self.console}")
         self.info(f"Log file: {self.filename}")
 
+    def trace_enabled(self):
+        """ True if trace messages are logged, so that building them can be skipped. """
+        return True
+
+    def debug_enabled(self):
+        """ True if debug messages are logged, so that building them can be skipped. """
+        return True
+
     def trace(self, msg):
         """ Log trace messages. """
         raise NotImplementedError("Method 'trace' not implemented")
@@ -637,6 +646,16 @@ class Logger(AbstractLogger):
 
         return handlers
 
+    def trace_enabled(self):
+        """ True if trace messages are logged. """
+        if self.weewx_debug > 1:
+            return self._logmsg.isEnabledFor(logging.DEBUG)
+        return self._logmsg.isEnabledFor(self.trace_level)
+
+    def debug_enabled(self):
+        """ True if debug messages are logged. """
+        return self._logmsg.isEnabledFor(logging.DEBUG)
+
     def trace(self, msg):
         """ Log trace messages. """
         if self.weewx_debug > 1:
@@ -673,6 +692,14 @@ class Logger(AbstractLogger):
                 return open(filename, 'w', encoding='UTF-8')
             return None
 
+        def trace_enabled(self):
+            """ True if trace messages are logged. """
+            return self.level == self.trace_level or self.weewx_debug > 1
+
+        def debug_enabled(self):
+            """ True if debug messages are logged. """
+            return self.level <= 10
+
         def trace(self, msg):
             """ Log trace messages. """
             if self.level == self.trace_level or self.weewx_debug > 1:
@@ -795,6 +822,41 @@ class CollectData():
             self.data['dateTime'] = self.date_time
         return self.data
 
+class AccumulateData():
+    """ Keep a running accumulation of the data added to a queue. """
+    def __init__(self):
+        # The interval is not known until the data is retrieved, so accept any time.
+        self.accumulator = weewx.accum.Accum(weeutil.weeutil.TimeSpan(0, sys.maxsize))
+        self.first_ts = None
+        self.last_ts = None
+        self.valid = True
+
+    def add_data(self, data):
+        """ Add the data to the accumulation. """
+        if not self.valid:
+            return
+        try:
+            self.accumulator.addRecord(data)
+        except ValueError:
+            # For example mixed unit systems, leave it to the replay of the queue to report it.
+            self.valid = False
+            return
+        date_time = data['dateTime']
+        if self.first_ts is None or date_time < self.first_ts:
+            self.first_ts = date_time
+        if self.last_ts is None or date_time > self.last_ts:
+            self.last_ts = date_time
+
+    def covers(self, start_ts, end_ts):
+        """ Return True if all of the data is within the interval start_ts (exclusive) and end_ts (inclusive). """
+        return self.valid and self.first_ts is not None and self.first_ts > start_ts and self.last_ts <= end_ts
+
+    def get_record(self, end_ts):
+        """ Return the accumulated record, as it would be for the interval ending at end_ts. """
+        record = self.accumulator.getRecord()
+        record['dateTime'] = end_ts
+        return record
+
 class TopicManager():
     """ Manage the MQTT topic subscriptions. """
     # pylint: disable=too-many-instance-attributes
@@ -826,6 +888,8 @@ class TopicManager():
         self.subscribed_topics = {}
         self.cached_fields = {}
         self.queues = []
+        # Guards the queues against the running accumulation
+        self.accumulate_lock = threading.Lock()
 
         single_queue = to_bool(config.get('single_queue', False))
         self.logger.debug(f"TopicManager single_queue default is {single_queue}")
@@ -839,7 +903,8 @@ class TopicManager():
                  'adjust_start_time': topic_defaults['adjust_start_time'],
                  'adjust_end_time': topic_defaults['adjust_end_time'],
                  'max_size': topic_defaults['max_queue'],
-                 'data': deque()
+                 'data': deque(),
+                 'accumulated': None
                 }
             )
             self.queues.append(single_queue_obj)
@@ -919,8 +984,9 @@ class TopicManager():
                     'ignore_end_time': to_bool(topic_dict.get('ignore_end_time', topic_defaults['ignore_end_time'])),
                     'adjust_start_time': to_float(topic_dict.get('adjust_start_time', topic_defaults['adjust_start_time'])),
                     'adjust_end_time': to_float(topic_dict.get('adjust_end_time', topic_defaults['adjust_end_time'])),
-                    'max_size': topic_dict.get('max_queue', topic_defaults['max_queue']),
-                    'data': deque()
+                    'max_size': to_int(topic_dict.get('max_queue', topic_defaults['max_queue'])),
+                    'data': deque(),
+                    'accumulated': None
                 }
             )
             self.queues.append(queue)
@@ -1018,7 +1084,8 @@ class TopicManager():
              'adjust_start_time': topic_defaults['adjust_start_time'],
              'adjust_end_time': topic_defaults['adjust_end_time'],
              'max_size': topic_defaults['max_queue'],
-             'data': self.collected_queue
+             'data': self.collected_queue,
+             'accumulated': None
             }
         )
         self.subscribed_topics[topic]['queue'] = queue
@@ -1064,7 +1131,7 @@ class TopicManager():
         default['datetime_format'] = config.get('datetime_format', None)
         default['offset_format'] = config.get('offset_format', None)
 
-        default['max_queue'] = config.get('max_queue', sys.maxsize)
+        default['max_queue'] = to_int(config.get('max_queue', sys.maxsize))
         default['callback_config_name'] = config.get('callback_config_name', 'message')
 
         return default
@@ -1128,7 +1195,8 @@ class TopicManager():
 
     def append_data(self, topic, in_data, fieldname=None):
         """ Add the MQTT data to the queue. """
-        self.logger.debug(f"TopicManager data-> incoming {topic}: {to_sorted_string(in_data)}")
+        if self.logger.debug_enabled():
+            self.logger.debug(f"TopicManager data-> incoming {topic}: {to_sorted_string(in_data)}")
         data = dict(in_data)
         payload = {}
 
@@ -1148,20 +1216,27 @@ class TopicManager():
 
         if fieldname in self.collected_fields:
             self._queue_size_check(self.collected_queue, queue['max_size'])
-            self.logger.trace(
-                f"TopicManager Adding wind data {fieldname} {weeutil.weeutil.timestamp_to_string(data['dateTime'])}: {to_sorted_string(data)}")
+            if self.logger.trace_enabled():
+                self.logger.trace(
+                    f"TopicManager Adding wind data {fieldname} {weeutil.weeutil.timestamp_to_string(data['dateTime'])}: {to_sorted_string(data)}")
             payload['fieldname'] = fieldname
             self.collected_queue.append(payload)
         else:
-            self._queue_size_check(queue, queue['max_size'])
-            self.logger.trace(
-                (f"TopicManager Added to queue {topic} {self._lookup_topic(topic)} {weeutil.weeutil.timestamp_to_string(data['dateTime'])}: "
-                f"{to_sorted_string(data)}"))
-            queue['data'].append(payload,)
+            if self.logger.trace_enabled():
+                self.logger.trace(
+                    (f"TopicManager Added to queue {topic} {self._lookup_topic(topic)} {weeutil.weeutil.timestamp_to_string(data['dateTime'])}: "
+                    f"{to_sorted_string(data)}"))
+            with self.accumulate_lock:
+                if self._queue_size_check(queue['data'], queue['max_size']):
+                    queue['accumulated'] = None
+                queue['data'].append(payload,)
+                if queue['accumulated'] is not None:
+                    queue['accumulated'].add_data(data)
 
     def peek_datetime(self, queue):
         """ Return the date/time of the first element in the queue. """
-        self.logger.trace(f"TopicManager queue size is: {len(queue)}")
+        if self.logger.trace_enabled():
+            self.logger.trace(f"TopicManager queue size is: {len(queue)}")
         datetime_value = None
         if queue:
             datetime_value = queue[0]['data']['dateTime']
@@ -1170,7 +1245,8 @@ class TopicManager():
 
     def peek_last_datetime(self, queue):
         """ Return the date/time of the last element in the queue. """
-        self.logger.trace(f"TopicManager queue size is: {len(queue)}")
+        if self.logger.trace_enabled():
+            self.logger.trace(f"TopicManager queue size is: {len(queue)}")
         datetime_value = 0
         if queue:
             datetime_value = queue[-1]['data']['dateTime']
@@ -1185,7 +1261,10 @@ class TopicManager():
         """ Get data off the queue of MQTT data. """
         queue_name = queue['name']
         data_queue = queue['data']
-        self.logger.trace(f"TopicManager starting queue {queue_name} size is: {len(data_queue)}")
+        if self.logger.trace_enabled():
+            self.logger.trace(f"TopicManager starting queue {queue_name} size is: {len(data_queue)}")
+        # The running accumulation no longer matches the queue
+        queue['accumulated'] = None
         if self.collect_wind_across_loops:
             collector = self.collector
         else:
@@ -1201,13 +1280,15 @@ class TopicManager():
         if not self.collect_wind_across_loops:
             data = collector.get_data()
             if data:
-                self.logger.debug(f"TopicManager data-> outgoing wind {queue_name}: {to_sorted_string(data)}")
+                if self.logger.debug_enabled():
+                    self.logger.debug(f"TopicManager data-> outgoing wind {queue_name}: {to_sorted_string(data)}")
                 yield data
 
         if self.collect_observations:
             data = observation_collector.get_data()
             if data:
-                self.logger.debug(f"TopicManager data-> outgoing collected {queue_name}: {to_sorted_string(data)}")
+                if self.logger.debug_enabled():
+                    self.logger.debug(f"TopicManager data-> outgoing collected {queue_name}: {to_sorted_string(data)}")
                 yield data
 
     def _process_queue(self,end_ts, collector, observation_collector, queue):
@@ -1217,14 +1298,16 @@ class TopicManager():
 
         while data_queue:
             if data_queue[0]['data']['dateTime'] > end_ts:
-                self.logger.trace(f"TopicManager leaving queue: {queue_name} size: {len(data_queue)} content: {data_queue[0]}")
+                if self.logger.trace_enabled():
+                    self.logger.trace(f"TopicManager leaving queue: {queue_name} size: {len(data_queue)} content: {data_queue[0]}")
                 break
             payload = data_queue.popleft()
             if queue_type == 'collector':
                 fieldname = payload['fieldname']
-                self.logger.trace(
-                    (f"TopicManager processing wind data {fieldname} {weeutil.weeutil.timestamp_to_string(payload['data']['dateTime'])}: "
-                    f"{to_sorted_string(payload)}."))
+                if self.logger.trace_enabled():
+                    self.logger.trace(
+                        (f"TopicManager processing wind data {fieldname} {weeutil.weeutil.timestamp_to_string(payload['data']['dateTime'])}: "
+                        f"{to_sorted_string(payload)}."))
                 data = collector.add_data(fieldname, payload['data'])
             elif self.collect_observations:
                 data = observation_collector.add_dict(payload['data'])
@@ -1232,7 +1315,8 @@ class TopicManager():
                 data = payload['data']
 
             if data:
-                self.logger.debug(f"TopicManager data-> outgoing {queue_name}: {to_sorted_string(data)}")
+                if self.logger.debug_enabled():
+                    self.logger.debug(f"TopicManager data-> outgoing {queue_name}: {to_sorted_string(data)}")
                 yield data
 
     def get_accumulated_data(self, queue, start_time, end_time, units):
@@ -1260,29 +1344,57 @@ class TopicManager():
         else:
             end_ts = end_time + adjust_end_time
 
-        self.logger.trace(f"TopicManager processing interval: {start_ts:f} {end_ts:f}")
-        accumulator = weewx.accum.Accum(weeutil.weeutil.TimeSpan(start_ts, end_ts))
-
-        for data in self.get_data(queue, end_ts):
-            try:
-                self.logger.trace(
-                    (f"TopicManager input to accumulate {queue_name} {weeutil.weeutil.timestamp_to_string(data['dateTime'])}: "
-                    f"{to_sorted_string(data)}"))
-                accumulator.addRecord(data)
-            except weewx.accum.OutOfSpan:
-                self.logger.info(
-                    f"TopicManager ignoring record outside of interval {start_ts:f} {end_ts:f} {data['dateTime']:f} {to_sorted_string(data)}")
+        trace_enabled = self.logger.trace_enabled()
+        if trace_enabled:
+            self.logger.trace(f"TopicManager processing interval: {start_ts:f} {end_ts:f}")
+
+        # Only plain queues can be accumulated as the data arrives.
+        # With debug logging the queue is replayed, so that each record is logged.
+        incremental = queue['type'] == 'normal' and not self.collect_observations
+        aggregate_data = None
+        with self.accumulate_lock:
+            accumulated = queue['accumulated']
+            if incremental and accumulated is not None and accumulated.covers(start_ts, end_ts) and not self.logger.debug_enabled():
+                aggregate_data = accumulated.get_record(end_ts)
+                data_queue.clear()
+                queue['accumulated'] = AccumulateData()
+
+        if aggregate_data is None:
+            accumulator = weewx.accum.Accum(weeutil.weeutil.TimeSpan(start_ts, end_ts))
+
+            for data in self.get_data(queue, end_ts):
+                try:
+                    if trace_enabled:
+                        self.logger.trace(
+                            (f"TopicManager input to accumulate {queue_name} {weeutil.weeutil.timestamp_to_string(data['dateTime'])}: "
+                            f"{to_sorted_string(data)}"))
+                    accumulator.addRecord(data)
+                except weewx.accum.OutOfSpan:
+                    self.logger.info(
+                        f"TopicManager ignoring record outside of interval {start_ts:f} {end_ts:f} {data['dateTime']:f} {to_sorted_string(data)}")
+
+            if not accumulator.isEmpty:
+                aggregate_data = accumulator.getRecord()
+
+            if incremental:
+                # Start the running accumulation with the data left for the next interval.
+                with self.accumulate_lock:
+                    accumulated = AccumulateData()
+                    for payload in data_queue:
+                        accumulated.add_data(payload['data'])
+                    queue['accumulated'] = accumulated
 
         target_data = {}
-        if not accumulator.isEmpty:
-            aggregate_data = accumulator.getRecord()
-            self.logger.trace(
-                (f"TopicManager prior to conversion is {queue_name} {weeutil.weeutil.timestamp_to_string(aggregate_data['dateTime'])}: "
-                f"{to_sorted_string(aggregate_data)}"))
+        if aggregate_data is not None:
+            if trace_enabled:
+                self.logger.trace(
+                    (f"TopicManager prior to conversion is {queue_name} {weeutil.weeutil.timestamp_to_string(aggregate_data['dateTime'])}: "
+                    f"{to_sorted_string(aggregate_data)}"))
             target_data = weewx.units.to_std_system(aggregate_data, units)
-            self.logger.trace(
-                (f"TopicManager after conversion is {queue_name} {weeutil.weeutil.timestamp_to_string(target_data['dateTime'])}: "
-                f"{to_sorted_string(target_data)}"))
+            if trace_enabled:
+                self.logger.trace(
+                    (f"TopicManager after conversion is {queue_name} {weeutil.weeutil.timestamp_to_string(target_data['dateTime'])}: "
+                    f"{to_sorted_string(target_data)}"))
         else:
             self.logger.trace("TopicManager accumulator was empty")
 
@@ -1290,13 +1402,17 @@ class TopicManager():
         if ignore_end_time:
             target_data['dateTime'] = end_time
 
-        self.logger.debug(f"TopicManager data-> outgoing accumulated {queue_name}: {to_sorted_string(target_data)}")
+        if self.logger.debug_enabled():
+            self.logger.debug(f"TopicManager data-> outgoing accumulated {queue_name}: {to_sorted_string(target_data)}")
         return target_data
 
     def _queue_size_check(self, queue, max_queue):
+        removed = False
         while len(queue) >= max_queue:
             element = queue.popleft()
+            removed = True
             self.logger.error(f"TopicManager queue limit {int(max_queue)} reached. Removing: {element}")
+        return removed
 
     def get_fields(self, topic):
         """ Get the fields. """
@@ -1342,6 +1458,10 @@ class TopicManager():
         """ Get the ignore_msg_id_field value """
         return self._get_value('fields_ignoring_msg_id', topic)
 
+    def get_subscribed_topic(self, topic):
+        """ Get the subscribed topic that topic matches. """
+        return self._lookup_topic(topic)
+
     def _get_queue(self, topic):
         return self._get_value('queue', topic)
 
@@ -1361,8 +1481,9 @@ class TopicManager():
         raise ValueError(f"Did not find topic, {topic}.")
 
     def _to_epoch(self, datetime_input, datetime_format, offset_format=None):
-        self.logger.trace(
-            f"TopicManager datetime conversion datetime_input:{datetime_input} datetime_format:{datetime_format} offset_format:{offset_format}")
+        if self.logger.trace_enabled():
+            self.logger.trace(
+                f"TopicManager datetime conversion datetime_input:{datetime_input} datetime_format:{datetime_format} offset_format:{offset_format}")
         if offset_format:
             offset_start = len(datetime_input)-len(offset_format)
             offset = re.sub(r"\D", "", datetime_input[offset_start:]) #remove everything but the numbers from the UTC offset
@@ -1380,10 +1501,61 @@ class TopicManager():
             offset_delta = datetime.timedelta(hours=0, minutes=0)
 
         epoch = time.mktime((datetime.datetime.strptime(datetime_string, datetime_format) + offset_delta).timetuple())
-        self.logger.trace(f"TopicManager datetime conversion datetime_string:{datetime_string} epoch:{epoch}")
+        if self.logger.trace_enabled():
+            self.logger.trace(f"TopicManager datetime conversion datetime_string:{datetime_string} epoch:{epoch}")
 
         return epoch
 
+class FieldPlan(): # pylint: disable=too-few-public-methods
+    """ The processing of an incoming field, compiled from its configuration. """
+    # pylint: disable=too-many-instance-attributes
+    __slots__ = ('name', 'fieldname', 'ignore', 'conversion_func', 'conversion_error_to_none',
+                 'from_units', 'to_units', 'contains_total', 'total_wrap_around', 'subfields')
+
+    def __init__(self, name, field, ignore_default, default_field_conversion_func, unit_system):
+        # pylint: disable=too-many-arguments
+        if field is None:
+            field = {}
+        self.name = name
+        self.fieldname = field.get('name', name)
+        self.ignore = field.get('ignore', ignore_default)
+        self.conversion_func = field.get('conversion_func', default_field_conversion_func)
+        self.conversion_error_to_none = field.get('conversion_error_to_none', False)
+        self.from_units = field.get('units', None)
+        self.to_units = None
+        if self.from_units is not None:
+            (self.to_units, _) = weewx.units.getStandardUnitType(unit_system, self.fieldname)
+        self.contains_total = field.get('contains_total', False)
+        self.total_wrap_around = field.get('total_wrap_around', False)
+        self.subfields = field.get('subfields', None)
+
+class TopicPlan(): # pylint: disable=too-few-public-methods
+    """ The processing of the messages of a subscribed topic, compiled from its configuration. """
+    # pylint: disable=too-many-instance-attributes
+    def __init__(self, topic_manager, topic):
+        topic_dict = topic_manager.subscribed_topics[topic]
+        self.message_dict = topic_dict[topic_manager.message_config_name]
+        self.message_type = self.message_dict['type']
+        self.fields_config = topic_dict['fields']
+        self.ignore_default = topic_dict['ignore']
+        self.conversion_func = topic_dict['conversion_func']
+        self.unit_system = topic_dict['unit_system']
+        self.msg_id_field = topic_dict['msg_id_field']
+        self.fields_ignoring_msg_id = set(topic_dict['fields_ignoring_msg_id'])
+        self.filters = topic_dict['filters']
+        self.topic_tail_is_fieldname = topic_dict['topic_tail_is_fieldname']
+        self.fields = {}
+        for name, field in self.fields_config.items():
+            self.fields[name] = FieldPlan(name, field, self.ignore_default, self.conversion_func, self.unit_system)
+
+    def get_field(self, name):
+        """ Get the plan of a field, fields that are not configured get the topic defaults. """
+        field = self.fields.get(name)
+        if field is None:
+            field = FieldPlan(name, None, self.ignore_default, self.conversion_func, self.unit_system)
+            self.fields[name] = field
+        return field
+
 class AbstractMessageCallbackProvider(): # pylint: disable=too-few-public-methods
     """ The abstract MessageCallbackProvider. """
     def __init__(self, logger, topic_manager):
@@ -1412,25 +1584,50 @@ class AbstractMessageCallbackProvider(): # pylint: disable=too-few-public-method
 
         return fieldname, value
 
+    def _update_field(self, field, orig_value):
+        try:
+            value = field.conversion_func['compiled'](orig_value)
+        except ValueError as exception:
+            if not field.conversion_error_to_none:
+                raise ConversionError(
+                    (f"Failed converting field {field.name} with value {orig_value} "
+                    f"using '{field.conversion_func['source']}' with reason {exception}."))\
+                        from exception
+            value = None
+
+        if field.from_units is not None:
+            (value, _, _) = weewx.units.convert((value, field.from_units, None), field.to_units)
+
+        if field.contains_total:
+            current_value = value
+            value = self._calc_increment(field.name, current_value, self.previous_values.get(field.name), field.total_wrap_around)
+            self.previous_values[field.name] = current_value
+
+        return value
+
     def _calc_increment(self, observation, current_total, previous_total, wrap_around):
-        self.logger.trace(
-            (f"MessageCallbackProvider _calc_increment calculating increment for {observation} with current: "
-            f"{current_total:f} and previous {previous_total is None and 'None' or str(previous_total)} values."))
+        trace_enabled = self.logger.trace_enabled()
+        if trace_enabled:
+            self.logger.trace(
+                (f"MessageCallbackProvider _calc_increment calculating increment for {observation} with current: "
+                f"{current_total:f} and previous {previous_total is None and 'None' or str(previous_total)} values."))
 
         if current_total is not None and previous_total is not None:
             if current_total >= previous_total:
                 return current_total - previous_total
 
             if wrap_around and current_total < previous_total:
-                self.logger.trace(
-                    (f"MessageCallbackProvider _calc_increment wrap around detected for {observation} with current: "
-                    f"{current_total:f} and previous {previous_total:f} values."))
+                if trace_enabled:
+                    self.logger.trace(
+                        (f"MessageCallbackProvider _calc_increment wrap around detected for {observation} with current: "
+                        f"{current_total:f} and previous {previous_total:f} values."))
 
                 return current_total
 
-            self.logger.trace(
-                (f"MessageCallbackProvider _calc_increment skipping calculating increment for {observation} with current: "
-                f"{current_total:f} and previous {previous_total:f} values."))
+            if trace_enabled:
+                self.logger.trace(
+                    (f"MessageCallbackProvider _calc_increment skipping calculating increment for {observation} with current: "
+                    f"{current_total:f} and previous {previous_total:f} values."))
 
         return None
 
@@ -1452,6 +1649,11 @@ class MessageCallbackProvider(AbstractMessageCallbackProvider):
     def __init__(self, config, logger, topic_manager):
         super().__init__(logger, topic_manager)
 
+        # subscribed topic -> TopicPlan
+        self.topic_plans = {}
+        # message topic -> TopicPlan
+        self.plans = {}
+
         for topic in topic_manager.subscribed_topics:
             if topic_manager.subscribed_topics[topic]['queue']['type'] == 'collector':
                 continue
@@ -1472,6 +1674,7 @@ class MessageCallbackProvider(AbstractMessageCallbackProvider):
                 raise ValueError(f"Invalid type configured: {message_type}")
 
             self._set_flatten_delimiter(topic, topic_manager)
+            self.topic_plans[topic] = TopicPlan(topic_manager, topic)
 
     @staticmethod
     def _set_flatten_delimiter(topic, topic_manager):
@@ -1487,6 +1690,13 @@ class MessageCallbackProvider(AbstractMessageCallbackProvider):
         """ Get the MQTT callback. """
         return self.on_message_multi
 
+    def _get_plan(self, topic):
+        plan = self.plans.get(topic)
+        if plan is None:
+            plan = self.topic_plans[self.topic_manager.get_subscribed_topic(topic)]
+            self.plans[topic] = plan
+        return plan
+
     def _flatten(self, fields, fields_ignore_default, delim, prefix, new_dict, old_dict):
         # pylint: disable=too-many-arguments
         if isinstance(old_dict, dict):
@@ -1521,8 +1731,9 @@ class MessageCallbackProvider(AbstractMessageCallbackProvider):
             self.logger.error(f"Skipping {new_key} because data is an array and has no configured subfields. Array={value}")
 
     def _log_message(self, msg):
-        self.logger.debug(
-            f"MessageCallbackProvider data-> incoming topic: {msg.topic}, QOS: {int(msg.qos)}, retain: {msg.retain}, payload: {msg.payload}")
+        if self.logger.debug_enabled():
+            self.logger.debug(
+                f"MessageCallbackProvider data-> incoming topic: {msg.topic}, QOS: {int(msg.qos)}, retain: {msg.retain}, payload: {msg.payload}")
 
     def _log_exception(self, method, exception, msg):
         self.logger.error(f"MessageCallbackProvider {method} failed with {type(exception)} and reason {exception}.")
@@ -1530,20 +1741,16 @@ class MessageCallbackProvider(AbstractMessageCallbackProvider):
         self.logger.error(f"**** MessageCallbackProvider {traceback.format_exc()}")
 
     def _on_message_keyword(self, msg):
-        # pylint: disable= too-many-locals
         # Wrap all the processing in a try, so it doesn't crash and burn on any error
         try:
             self._log_message(msg)
-            message_dict = self.topic_manager.get_message_dict(msg.topic)
-            fields = self.topic_manager.get_fields(msg.topic)
-            fields_ignore_default = self.topic_manager.get_ignore_value(msg.topic)
-            fields_conversion_func = self.topic_manager.get_conversion_func(msg.topic)
+            plan = self._get_plan(msg.topic)
+            message_dict = plan.message_dict
 
             payload_str = msg.payload.decode('utf-8')
 
             fielddata = payload_str.split(message_dict['keyword_delimiter'])
             data = {}
-            unit_system = self.topic_manager.get_unit_system(msg.topic)
             for field in fielddata:
                 eq_index = field.find(message_dict['keyword_separator'])
                 # Ignore all fields that do not have the separator
@@ -1554,10 +1761,10 @@ class MessageCallbackProvider(AbstractMessageCallbackProvider):
                     continue
 
                 key = field[:eq_index].strip()
-                if not fields.get(key, {}).get('ignore', fields_ignore_default):
-                    (fieldname, value) = self._update_data(key, field[eq_index + 1:].strip(), fields, fields_conversion_func, unit_system)
-                    data[fieldname] = value
-                else:
+                field_plan = plan.get_field(key)
+                if not field_plan.ignore:
+                    data[field_plan.fieldname] = self._update_field(field_plan, field[eq_index + 1:].strip())
+                elif self.logger.trace_enabled():
                     self.logger.trace(f"MessageCallbackProvider on_message_keyword ignoring field: {key}")
 
             if data:
@@ -1570,20 +1777,24 @@ class MessageCallbackProvider(AbstractMessageCallbackProvider):
             self._log_exception('on_message_keyword', exception, msg)
 
     def _on_message_json(self, msg):
-        # pylint: disable=too-many-branches
         # Wrap all the processing in a try, so it doesn't crash and burn on any error
         try:
             self._log_message(msg)
-            message_dict = self.topic_manager.get_message_dict(msg.topic)
-            fields = self.topic_manager.get_fields(msg.topic)
-            fields_ignore_default = self.topic_manager.get_ignore_value(msg.topic)
+            plan = self._get_plan(msg.topic)
 
             payload_str = msg.payload.decode('utf-8')
 
-            data_flattened = {}
-            self._flatten(fields, fields_ignore_default, message_dict['flatten_delimiter'], '', data_flattened, json.loads(payload_str))
-
-            data_final = self._process_json_dict(msg, fields, fields_ignore_default, data_flattened)
+            if plan.msg_id_field:
+                # the lookup of every field depends on the message id, so the message is flattened first
+                data_flattened = {}
+                self._flatten(plan.fields_config, plan.ignore_default, plan.message_dict['flatten_delimiter'], '', data_flattened,
+                              json.loads(payload_str))
+                data_final = self._process_json_dict(msg, plan, data_flattened)
+            else:
+                # flatten and process the fields in a single walk
+                data_final = {}
+                if not self._process_json(msg, plan, '', json.loads(payload_str), data_final):
+                    data_final = None
 
             if data_final:
                 self.topic_manager.append_data(msg.topic, data_final)
@@ -1591,33 +1802,70 @@ class MessageCallbackProvider(AbstractMessageCallbackProvider):
         except Exception as exception: # (want to catch all) pylint: disable=broad-except
             self._log_exception('on_message_json', exception, msg)
 
-    def _process_json_dict(self, msg, fields, fields_ignore_default, data_flattened):
-        # pylint: disable= too-many-locals
-        msg_id_field = self.topic_manager.get_msg_id_field(msg.topic)
-        fields_ignoring_msg_id = self.topic_manager.get_fields_ignoring_msg_id(msg.topic)
-        unit_system = self.topic_manager.get_unit_system(msg.topic)
-        filters = self.topic_manager.get_filters(msg.topic)
-        fields_conversion_func = self.topic_manager.get_conversion_func(msg.topic)
+    def _process_json(self, msg, plan, prefix, old_dict, data_final):
+        # pylint: disable=too-many-arguments
+        # Returns False if the message is filtered out
+        if isinstance(old_dict, dict):
+            for key, value in old_dict.items():
+                new_key = prefix + key
+                if isinstance(value, dict):
+                    if not self._process_json(msg, plan, new_key + '_', value, data_final):
+                        return False
+                elif isinstance(value, list):
+                    if not self._process_json_list(msg, plan, prefix, new_key, value, data_final):
+                        return False
+                elif not self._process_json_value(msg, plan, new_key, value, data_final):
+                    return False
+            return True
+
+        return self._process_json_list(msg, plan, prefix, prefix[:-1], old_dict, data_final)
 
-        data_final = {}
-        if msg_id_field:
-            msg_id = data_flattened[msg_id_field]
+    def _process_json_list(self, msg, plan, prefix, new_key, value, data_final):
+        # pylint: disable=too-many-arguments
+        field = plan.fields.get(new_key)
+        if field is not None and field.subfields is not None:
+            if len(value) > len(field.subfields):
+                self.logger.error(f"Skipping {new_key} because array data too big. Array={value} subfields={field.subfields}")
+            elif len(value) < len(field.subfields):
+                self.logger.error(f"Skipping {new_key} because array data too small. Array={value} subfields={field.subfields}")
+            else:
+                for subfield, subvalue in zip(field.subfields, value):
+                    if isinstance(subvalue, (dict, list)):
+                        if not self._process_json(msg, plan, prefix + subfield + '_', subvalue, data_final):
+                            return False
+                    elif not self._process_json_value(msg, plan, prefix + subfield, subvalue, data_final):
+                        return False
+        else:
+            self.logger.error(f"Skipping {new_key} because data is an array and has no configured subfields. Array={value}")
+        return True
 
+    def _process_json_value(self, msg, plan, lookup_key, value, data_final):
+        # pylint: disable=too-many-arguments
+        # Returns False if the message is filtered out
+        filters = plan.filters
+        if lookup_key in filters and value in filters[lookup_key]:
+            self.logger.info(
+                (f"MessageCallbackProvider on_message_json filtered out {msg.topic} : "
+                f"{msg.payload} with {lookup_key}={filters[lookup_key]}"))
+            return False
+        field = plan.get_field(lookup_key)
+        if not field.ignore:
+            data_final[field.fieldname] = self._update_field(field, value)
+        elif self.logger.trace_enabled():
+            self.logger.trace(f"MessageCallbackProvider on_message_json ignoring field: {lookup_key}")
+        return True
+
+    def _process_json_dict(self, msg, plan, data_flattened):
+        msg_id = data_flattened[plan.msg_id_field]
+
+        data_final = {}
         for key, value in data_flattened.items():
-            if msg_id_field and key not in fields_ignoring_msg_id:
+            if key not in plan.fields_ignoring_msg_id:
                 lookup_key = key + "_" + str(msg_id) # todo - cleanup
             else:
                 lookup_key = key
-            if lookup_key in filters and value in filters[lookup_key]:
-                self.logger.info(
-                    (f"MessageCallbackProvider on_message_json filtered out {msg.topic} : "
-                    f"{msg.payload} with {lookup_key}={filters[lookup_key]}"))
+            if not self._process_json_value(msg, plan, lookup_key, value, data_final):
                 return None
-            if not fields.get(lookup_key, {}).get('ignore', fields_ignore_default):
-                (fieldname, value) = self._update_data(lookup_key, value, fields, fields_conversion_func, unit_system)
-                data_final[fieldname] = value
-            else:
-                self.logger.trace(f"MessageCallbackProvider on_message_json ignoring field: {lookup_key}")
 
         return data_final
 
@@ -1626,27 +1874,24 @@ class MessageCallbackProvider(AbstractMessageCallbackProvider):
         # Wrap all the processing in a try, so it doesn't crash and burn on any error
         try:
             self._log_message(msg)
-            fields = self.topic_manager.get_fields(msg.topic)
-            fields_ignore_default = self.topic_manager.get_ignore_value(msg.topic)
-            fields_conversion_func = self.topic_manager.get_conversion_func(msg.topic)
-            topic_tail_is_fieldname = self.topic_manager.get_topic_tail_is_fieldname(msg.topic)
+            plan = self._get_plan(msg.topic)
 
             payload_str = msg.payload
 
             key = msg.topic
-            if topic_tail_is_fieldname:
+            if plan.topic_tail_is_fieldname:
                 key = key.rpartition('/')[2]
 
             if msg.payload is not None:
                 payload_str = msg.payload.decode('utf-8')
 
-            unit_system = self.topic_manager.get_unit_system(msg.topic)
-            if not fields.get(key, {}).get('ignore', fields_ignore_default):
-                (fieldname, value) = self._update_data(key, payload_str, fields, fields_conversion_func, unit_system)
+            field = plan.get_field(key)
+            if not field.ignore:
+                value = self._update_field(field, payload_str)
                 data = {}
-                data[fieldname] = value
-                self.topic_manager.append_data(msg.topic, data, fieldname)
-            else:
+                data[field.fieldname] = value
+                self.topic_manager.append_data(msg.topic, data, field.fieldname)
+            elif self.logger.trace_enabled():
                 self.logger.trace(f"MessageCallbackProvider on_message_individual ignoring field: {key}")
 
         except Exception as exception: # (want to catch all) pylint: disable=broad-except
@@ -1656,8 +1901,7 @@ class MessageCallbackProvider(AbstractMessageCallbackProvider):
         ''' The on message call back.'''
         # Wrap all the processing in a try, so it doesn't crash and burn on any error
         try:
-            message_dict = self.topic_manager.get_message_dict(msg.topic)
-            message_type = message_dict['type']
+            message_type = self._get_plan(msg.topic).message_type
             # ToDo: eliminate if/elif?
             if message_type == 'individual':
                 self._on_message_individual(msg)
@@ -2209,50 +2453,62 @@ class MQTTSubscribeService(StdService):
         else:
             start_ts = self.end_ts
             self.end_ts = event.packet['dateTime']
+            trace_enabled = self.logger.trace_enabled()
 
             for queue in self.subscriber.queues: # topics might not be cached.. therefore use subscribed?
-                self.logger.trace(
-                    (f"Packet prior to update is: "
-                    f"{weeutil.weeutil.timestamp_to_string(event.packet['dateTime'])} {to_sorted_string(event.packet)}"))
+                if trace_enabled:
+                    self.logger.trace(
+                        (f"Packet prior to update is: "
+                        f"{weeutil.weeutil.timestamp_to_string(event.packet['dateTime'])} {to_sorted_string(event.packet)}"))
                 target_data = self.subscriber.get_accumulated_data(queue,
                                                                    start_ts, self.end_ts, event.packet['usUnits'])
-                self.logger.trace(f"Queue {queue['name']} has data: {target_data}")
+                if trace_enabled:
+                    self.logger.trace(f"Queue {queue['name']} has data: {target_data}")
                 event.packet.update(target_data)
-                self.logger.trace(
-                    f"Packet after update is: {weeutil.weeutil.timestamp_to_string(event.packet['dateTime'])} {to_sorted_string(event.packet)}")
+                if trace_enabled:
+                    self.logger.trace(
+                        f"Packet after update is: {weeutil.weeutil.timestamp_to_string(event.packet['dateTime'])} {to_sorted_string(event.packet)}")
 
-            self.logger.debug(
-                f"data-> final packet is {weeutil.weeutil.timestamp_to_string(event.packet['dateTime'])}: {to_sorted_string(event.packet)}")
+            if self.logger.debug_enabled():
+                self.logger.debug(
+                    f"data-> final packet is {weeutil.weeutil.timestamp_to_string(event.packet['dateTime'])}: {to_sorted_string(event.packet)}")
 
     # this works for hardware generation, but software generation does not 'quality control'
     # the archive record, so this data is not 'QC' in this case.
     # If this is important, bind to the loop packet.
     def new_archive_record(self, event):
         """ Handle the new archive record event. """
-        self.logger.debug(
-            f"data-> incoming record is {weeutil.weeutil.timestamp_to_string(event.record['dateTime'])}: {to_sorted_string(event.record)}")
+        trace_enabled = self.logger.trace_enabled()
+        debug_enabled = self.logger.debug_enabled()
+        if debug_enabled:
+            self.logger.debug(
+                f"data-> incoming record is {weeutil.weeutil.timestamp_to_string(event.record['dateTime'])}: {to_sorted_string(event.record)}")
         if self.binding == 'archive':
             end_ts = event.record['dateTime']
             start_ts = end_ts - event.record['interval'] * 60
 
             for queue in self.subscriber.queues:
-                self.logger.trace(
-                    (f"Record prior to update is: "
-                    f"{weeutil.weeutil.timestamp_to_string(event.record['dateTime'])} {to_sorted_string(event.record)}"))
+                if trace_enabled:
+                    self.logger.trace(
+                        (f"Record prior to update is: "
+                        f"{weeutil.weeutil.timestamp_to_string(event.record['dateTime'])} {to_sorted_string(event.record)}"))
                 target_data = self.subscriber.get_accumulated_data(queue, start_ts, end_ts, event.record['usUnits'])
-                self.logger.trace(f"Queue {queue['name']} has data: {target_data}")
+                if trace_enabled:
+                    self.logger.trace(f"Queue {queue['name']} has data: {target_data}")
                 event.record.update(target_data)
-                self.logger.trace(
-                    f"Record after update is: {weeutil.weeutil.timestamp_to_string(event.record['dateTime'])} {to_sorted_string(event.record)}")
+                if trace_enabled:
+                    self.logger.trace(
+                        f"Record after update is: {weeutil.weeutil.timestamp_to_string(event.record['dateTime'])} {to_sorted_string(event.record)}")
 
         if self.subscriber.cached_fields:
             target_data = {}
             for field in self.subscriber.cached_fields:
                 if field in event.record:
                     timestamp = time.time()
-                    self.logger.trace(
-                        (f"Update cache {event.record[field]} "
-                        f"to {field} with units of {int(event.record['usUnits'])} and timestamp of {int(timestamp)}"))
+                    if trace_enabled:
+                        self.logger.trace(
+                            (f"Update cache {event.record[field]} "
+                            f"to {field} with units of {int(event.record['usUnits'])} and timestamp of {int(timestamp)}"))
                     self.cache.update_value(field,
                                             event.record[field],
                                             event.record['usUnits'],
@@ -2261,12 +2517,14 @@ class MQTTSubscribeService(StdService):
                     target_data[field] = self.cache.get_value(field,
                                                             time.time(),
                                                             self.subscriber.cached_fields[field]['expires_after'])
-                    self.logger.trace(f"target_data after cache lookup is: {to_sorted_string(target_data)}")
+                    if trace_enabled:
+                        self.logger.trace(f"target_data after cache lookup is: {to_sorted_string(target_data)}")
 
             event.record.update(target_data)
 
-        self.logger.debug(
-            f"data-> final record is {weeutil.weeutil.timestamp_to_string(event.record['dateTime'])}: {to_sorted_string(event.record)}")
+        if debug_enabled:
+            self.logger.debug(
+                f"data-> final record is {weeutil.weeutil.timestamp_to_string(event.record['dateTime'])}: {to_sorted_string(event.record)}")
 
 def loader(config_dict, engine):
     """ Load and return the driver. """
@@ -2327,8 +2585,9 @@ class MQTTSubscribeDriver(weewx.drivers.AbstractDevice):
 
     def new_archive_record(self, event):
         """ Handle the new archive record event. """
-        self.logger.debug(
-            f"data-> final record is {weeutil.weeutil.timestamp_to_string(event.record['dateTime'])}: {to_sorted_string(event.record)}")
+        if self.logger.debug_enabled():
+            self.logger.debug(
+                f"data-> final record is {weeutil.weeutil.timestamp_to_string(event.record['dateTime'])}: {to_sorted_string(event.record)}")
 
     def genLoopPackets(self): # need to override parent - pylint: disable=invalid-name
         """ Called to generate loop packets. """
@@ -2359,9 +2618,10 @@ class MQTTSubscribeDriver(weewx.drivers.AbstractDevice):
                     else:
                         self.last_loop_packet_ts = data['dateTime']
                         self.prev_archive_start = archive_start
-                        self.logger.debug(
-                            (f"data-> final loop packet is {queue['name']} {weeutil.weeutil.timestamp_to_string(data['dateTime'])}: "
-                            f"{to_sorted_string(data)}"))
+                        if self.logger.debug_enabled():
+                            self.logger.debug(
+                                (f"data-> final loop packet is {queue['name']} {weeutil.weeutil.timestamp_to_string(data['dateTime'])}: "
+                                f"{to_sorted_string(data)}"))
                         yield data
 
     def _handle_empty_queue(self):
@@ -2376,8 +2636,9 @@ class MQTTSubscribeDriver(weewx.drivers.AbstractDevice):
                     data['MQTTSubscribe'] = None # WeeWX accumulator requires at least one observation
                     data['usUnits'] = 1
                     self.last_loop_packet_ts = data['dateTime']
-                    self.logger.trace(
-                        f"Creating empty loop packet {weeutil.weeutil.timestamp_to_string(data['dateTime'])}: {to_sorted_string(data)}")
+                    if self.logger.trace_enabled():
+                        self.logger.trace(
+                            f"Creating empty loop packet {weeutil.weeutil.timestamp_to_string(data['dateTime'])}: {to_sorted_string(data)}")
                     return data
 
                 self.start_loop_period_ts = start_loop_period_ts
@@ -2393,9 +2654,10 @@ class MQTTSubscribeDriver(weewx.drivers.AbstractDevice):
 
         for data in self.subscriber.get_data(self.queue):
             if data:
-                self.logger.debug(
-                    (f"data-> final archive record is {self.archive_topic} {weeutil.weeutil.timestamp_to_string(data['dateTime'])}: "
-                    f"{to_sorted_string(data)}"))
+                if self.logger.debug_enabled():
+                    self.logger.debug(
+                        (f"data-> final archive record is {self.archive_topic} {weeutil.weeutil.timestamp_to_string(data['dateTime'])}: "
+                        f"{to_sorted_string(data)}"))
                 if lastgood_ts is None  or data['dateTime'] > lastgood_ts:
                     yield data
             else:
@@ -0,0 +1,176 @@
+#!/usr/bin/python3
+"""
+MQTTSubscribe_test.py
+
+Checks the running accumulation of TopicManager (AccumulateData) against the
+replay of the queue.
+
+get_accumulated_data returns the running accumulation only when
+AccumulateData.covers() says it matches the interval, and it always
+replays the queue when debug logging is on. So every scenario is run twice
+over the same random message stream, once with debug logging off and once
+with it on. The sum, avg, last, min, max and vector results, the errors and
+the data left in the queues must be identical.
+
+The scenarios mix the queue options (single_queue, max_queue,
+collect_observations, ignore_start_time, ignore_end_time and the
+adjustments), messages out of order and outside of the interval, missing
+values, a change of unit system and queues drained by get_data.
+
+Run it with the python of weewx, from any directory:
+
+    python3 MQTTSubscribe_test.py [number of scenarios]
+"""
+
+import copy
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import configobj
+
+import weewx
+import weewx.accum
+import user.MQTTSubscribe as MQTTSubscribe
+
+ACCUMULATOR = {
+    'Accumulator': {
+        'lastT': {'extractor': 'last'},
+        'minT': {'extractor': 'min'},
+        'maxT': {'extractor': 'max'},
+        'sumT': {'extractor': 'sum'},
+        'rain': {'extractor': 'sum'},
+    }
+}
+
+# outTemp is averaged, windSpeed and windDir are vector observations
+FIELDS = ['outTemp', 'rain', 'lastT', 'minT', 'maxT', 'sumT', 'windSpeed', 'windDir']
+
+CONFIG = '''
+%s
+[a]
+    %s
+    [[message]]
+        type = json
+[b]
+    [[message]]
+        type = json
+    %s
+'''
+
+LOOP_INTERVAL = 2.5
+
+
+class Logger(object):
+    """ A logger that logs nothing, with debug logging on or off. """
+    def __init__(self, debug):
+        self.debug_on = debug
+        self.errors = []
+
+    def trace_enabled(self):
+        return False
+
+    def debug_enabled(self):
+        return self.debug_on
+
+    def trace(self, msg):
+        pass
+
+    def debug(self, msg):
+        pass
+
+    def info(self, msg):
+        pass
+
+    def error(self, msg):
+        self.errors.append(msg)
+
+
+def scenario(seed):
+    """ The configuration and the events of one random scenario. """
+    rnd = random.Random(seed)
+    top = rnd.choice(['', 'single_queue = true', 'max_queue = 7', 'collect_observations = true'])
+    a_options = rnd.choice(['', 'ignore_start_time = true', 'ignore_end_time = true',
+                            'ignore_start_time = true\n    adjust_start_time = 0'])
+    b_options = rnd.choice(['', 'ignore_end_time = true\n    adjust_end_time = 1'])
+    config = CONFIG % (top, a_options, b_options)
+
+    events = []
+    now = 1700000000.0
+    for _ in range(200):
+        for _ in range(rnd.randint(0, 12)):
+            # some messages are late, some belong to the next interval
+            data = {'dateTime': now + rnd.uniform(-4, 3.5)}
+            for field in rnd.sample(FIELDS, rnd.randint(1, 5)):
+                data[field] = None if rnd.random() < 0.1 else rnd.uniform(-10, 40)
+            if rnd.random() < 0.01:
+                data['usUnits'] = weewx.METRIC
+            events.append(('message', rnd.choice('ab'), data))
+        if rnd.random() < 0.03:
+            events.append(('get_data', rnd.choice('ab'), now - 1))
+        now += LOOP_INTERVAL
+        events.append(('loop', now))
+    return config, events
+
+
+def run(config, events, debug):
+    """ Feed the events to a TopicManager and return everything it returned. """
+    logger = Logger(debug)
+    topic_manager = MQTTSubscribe.TopicManager(None, configobj.ConfigObj(config.splitlines()), logger)
+    results = []
+    for event in events:
+        if event[0] == 'message':
+            topic_manager.append_data(event[1], event[2])
+        elif event[0] == 'get_data':
+            queue = topic_manager._get_queue(event[1])
+            results.append(('get_data', list(topic_manager.get_data(queue, event[2]))))
+        else:
+            for queue in topic_manager.queues:
+                try:
+                    results.append(topic_manager.get_accumulated_data(
+                        queue, event[1] - LOOP_INTERVAL, event[1], weewx.US))
+                except ValueError as exception:
+                    results.append(('error', str(exception)))
+                results.append([payload['data'] for payload in queue['data']])
+    results.append(('errors', logger.errors))
+    return results
+
+
+def main(count):
+    weewx.accum.initialize(configobj.ConfigObj(ACCUMULATOR))
+
+    # count the intervals answered by the running accumulation
+    get_record = MQTTSubscribe.AccumulateData.get_record
+    used = [0]
+
+    def counting_get_record(self, end_ts):
+        used[0] += 1
+        return get_record(self, end_ts)
+
+    MQTTSubscribe.AccumulateData.get_record = counting_get_record
+
+    total_used = 0
+    for seed in range(count):
+        config, events = scenario(seed)
+        used[0] = 0
+        incremental = run(config, copy.deepcopy(events), False)
+        used_incremental = used[0]
+        total_used += used_incremental
+        used[0] = 0
+        replayed = run(config, copy.deepcopy(events), True)
+        assert not used[0], "the running accumulation was used with debug logging"
+        assert incremental == replayed, "scenario %d differs:\n%s" % (seed, config)
+        print("scenario %d: identical, %d intervals from the running accumulation" % (
+            seed, used_incremental))
+
+    # some scenarios (collect_observations) always replay, but without the
+    # running accumulation nothing was checked
+    assert total_used >= count, "the running accumulation was used %d times" % total_used
+    print("all %d scenarios identical, %d intervals from the running accumulation" % (count, total_used))
+
+
+if __name__ == '__main__':
+
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 40)
@@ -2140,9 +2140,21 @@ class HighchartsJsonGenerator(weewx.reportengine.ReportGenerator):
                           data should be extracted
     """
 
+    # Closed buckets of the series of the last run, per skin:
+    # {skin: {(database, table, obs_type, start, aggregate_type, aggregate_interval): (cut_ts, start_vt, stop_vt, data_vt)}}
+    closed_series = {}
+
     def run(self):
         """Main entry point for file generation."""
 
+        # Series are memoized during this run. Closed buckets are remembered
+        # for the next run, series not used in this run are dropped.
+        self.series_cache = {}
+        self.closed_series_used = {}
+        self.closed_series_last = HighchartsJsonGenerator.closed_series.get(
+            self.skin_dict.get("skin", ""), {}
+        )
+
         chart_config_path = os.path.join(
             self.config_dict["WEEWX_ROOT"],
             self.skin_dict["SKIN_ROOT"],
@@ -2822,6 +2834,113 @@ class HighchartsJsonGenerator(weewx.reportengine.ReportGenerator):
             with open(chart_json_filename, mode="w") as cjf:
                 cjf.write(json.dumps(self.chart_dict, indent=4))
 
+        HighchartsJsonGenerator.closed_series[
+            self.skin_dict.get("skin", "")
+        ] = self.closed_series_used
+
+    def get_series(self, obs_type, timespan, db_manager, aggregate_type, aggregate_interval):
+        """
+        weewx.xtypes.get_series() with caching.
+
+        Identical requests within one run are answered from memory. Buckets
+        (or archive records, if not aggregated) that end at or before the
+        last archive record cannot change anymore. They are remembered for the
+        next run, which only queries the buckets from the first open one on,
+        as long as the series starts at the same time. Cumulative series are
+        not split as every value depends on all the buckets before.
+
+        The lists returned are copies, the caller may modify them.
+        """
+        run_key = (
+            db_manager.database_name,
+            db_manager.table_name,
+            obs_type,
+            timespan.start,
+            timespan.stop,
+            aggregate_type,
+            aggregate_interval,
+        )
+        if run_key not in self.series_cache:
+            self.series_cache[run_key] = self.get_series_closed(
+                obs_type, timespan, db_manager, aggregate_type, aggregate_interval
+            )
+        return tuple(
+            weewx.units.ValueTuple(list(vt[0]), vt[1], vt[2]) for vt in self.series_cache[run_key]
+        )
+
+    def get_series_closed(self, obs_type, timespan, db_manager, aggregate_type, aggregate_interval):
+        """Get the series, reusing the closed buckets of the last run."""
+        if aggregate_type == "cumulative":
+            return weewx.xtypes.get_series(
+                obs_type, timespan, db_manager, aggregate_type, aggregate_interval
+            )
+
+        closed_key = (
+            db_manager.database_name,
+            db_manager.table_name,
+            obs_type,
+            timespan.start,
+            aggregate_type,
+            aggregate_interval,
+        )
+        last_ts = db_manager.last_timestamp
+        closed = self.closed_series_used.get(closed_key) or self.closed_series_last.get(
+            closed_key
+        )
+
+        if closed is not None and timespan.start < closed[0] < timespan.stop:
+            cut_ts, start_vt, stop_vt, data_vt = closed
+            # Only query from the first open bucket on.
+            (tail_start_vt, tail_stop_vt, tail_data_vt) = weewx.xtypes.get_series(
+                obs_type,
+                TimeSpan(cut_ts, timespan.stop),
+                db_manager,
+                aggregate_type,
+                aggregate_interval,
+            )
+            if tail_data_vt[1] is not None and data_vt[1] is not None and (
+                tail_data_vt[1] != data_vt[1] or tail_data_vt[2] != data_vt[2]
+            ):
+                # The unit changed. Should not happen, start over.
+                logerr(
+                    "get_series: %s unit %s changed to %s"
+                    % (obs_type, data_vt[1], tail_data_vt[1])
+                )
+                closed = None
+            else:
+                start_vt = weewx.units.ValueTuple(start_vt[0] + tail_start_vt[0], start_vt[1], start_vt[2])
+                stop_vt = weewx.units.ValueTuple(stop_vt[0] + tail_stop_vt[0], stop_vt[1], stop_vt[2])
+                data_vt = weewx.units.ValueTuple(
+                    data_vt[0] + tail_data_vt[0],
+                    data_vt[1] if data_vt[1] is not None else tail_data_vt[1],
+                    data_vt[2] if data_vt[2] is not None else tail_data_vt[2],
+                )
+        else:
+            closed = None
+
+        if closed is None:
+            (start_vt, stop_vt, data_vt) = weewx.xtypes.get_series(
+                obs_type, timespan, db_manager, aggregate_type, aggregate_interval
+            )
+
+        # Remember the buckets that are closed. The last bucket might be cut
+        # off at timespan.stop, so it is never remembered.
+        count = 0
+        if last_ts is not None:
+            for stop_ts in stop_vt[0]:
+                if stop_ts > last_ts or stop_ts >= timespan.stop:
+                    break
+                count += 1
+        if count > 0:
+            self.closed_series_used[closed_key] = (
+                stop_vt[0][count - 1],
+                weewx.units.ValueTuple(start_vt[0][:count], start_vt[1], start_vt[2]),
+                weewx.units.ValueTuple(stop_vt[0][:count], stop_vt[1], stop_vt[2]),
+                weewx.units.ValueTuple(data_vt[0][:count], data_vt[1], data_vt[2]),
+            )
+
+        return (start_vt, stop_vt, data_vt)
+
     def get_observation_data(
         self,
         binding,
@@ -2860,7 +2979,7 @@ class HighchartsJsonGenerator(weewx.reportengine.ReportGenerator):
 
             # Get windDir observations.
             obs_lookup = "windDir"
-            (time_start_vt, time_stop_vt, windDir_vt) = weewx.xtypes.get_series(
+            (time_start_vt, time_stop_vt, windDir_vt) = self.get_series(
                 obs_lookup,
                 TimeSpan(start_ts, end_ts),
                 archive,
@@ -2875,7 +2994,7 @@ class HighchartsJsonGenerator(weewx.reportengine.ReportGenerator):
 
             # Get windSpeed observations.
             obs_lookup = "windSpeed"
-            (time_start_vt, time_stop_vt, windSpeed_vt) = weewx.xtypes.get_series(
+            (time_start_vt, time_stop_vt, windSpeed_vt) = self.get_series(
                 obs_lookup,
                 TimeSpan(start_ts, end_ts),
                 archive,
@@ -3249,7 +3368,7 @@ class HighchartsJsonGenerator(weewx.reportengine.ReportGenerator):
             # Get min values
             aggregate_type = "min"
             try:
-                (time_start_vt, time_stop_vt, obs_vt) = weewx.xtypes.get_series(
+                (time_start_vt, time_stop_vt, obs_vt) = self.get_series(
                     obs_lookup,
                     TimeSpan(start_ts, end_ts),
                     archive,
@@ -3269,7 +3388,7 @@ class HighchartsJsonGenerator(weewx.reportengine.ReportGenerator):
             # Get max values
             aggregate_type = "max"
             try:
-                (time_start_vt, time_stop_vt, obs_vt) = weewx.xtypes.get_series(
+                (time_start_vt, time_stop_vt, obs_vt) = self.get_series(
                     obs_lookup,
                     TimeSpan(start_ts, end_ts),
                     archive,
@@ -3289,7 +3408,7 @@ class HighchartsJsonGenerator(weewx.reportengine.ReportGenerator):
             # Get avg values
             aggregate_type = "avg"
             try:
-                (time_start_vt, time_stop_vt, obs_vt) = weewx.xtypes.get_series(
+                (time_start_vt, time_stop_vt, obs_vt) = self.get_series(
                     obs_lookup,
                     TimeSpan(start_ts, end_ts),
                     archive,
@@ -3346,7 +3465,7 @@ class HighchartsJsonGenerator(weewx.reportengine.ReportGenerator):
             # Get min values
             obs_lookup = "windSpeed"
             try:
-                (time_start_vt, time_stop_vt, obs_vt) = weewx.xtypes.get_series(
+                (time_start_vt, time_stop_vt, obs_vt) = self.get_series(
                     obs_lookup,
                     TimeSpan(start_ts, end_ts),
                     archive,
@@ -3366,7 +3485,7 @@ class HighchartsJsonGenerator(weewx.reportengine.ReportGenerator):
             # Get max values
             obs_lookup = "windGust"
             try:
-                (time_start_vt, time_stop_vt, obs_vt) = weewx.xtypes.get_series(
+                (time_start_vt, time_stop_vt, obs_vt) = self.get_series(
                     obs_lookup,
                     TimeSpan(start_ts, end_ts),
                     archive,
@@ -3724,7 +3843,7 @@ class HighchartsJsonGenerator(weewx.reportengine.ReportGenerator):
 
         # Begin standard observation lookups
         try:
-            (time_start_vt, time_stop_vt, obs_vt) = weewx.xtypes.get_series(
+            (time_start_vt, time_stop_vt, obs_vt) = self.get_series(
                 obs_lookup,
                 TimeSpan(start_ts, end_ts),
                 archive,
@@ -74,13 +74,11 @@ from a number of live Cumulus sites:
 
 # FIXME: implement the additional xml parameters for records and yesterday
 
-# FIXME: consider in-memory caching so that database queries are not
-#        necessary after the first invocation
-
 # FIXME: Presently, the code tries to calculate statistics internally. Let weewx do it.
 
 from __future__ import absolute_import
 import time
+from collections import deque
 from distutils.version import StrictVersion
 
 import weewx
@@ -211,127 +209,11 @@ def get_db_units(dbm):
     val = dbm.getSql("SELECT usUnits FROM %s LIMIT 1" % dbm.table_name)
     return val[0] if val is not None else None
 
-def calc_avg_windspeed(dbm, ts, interval=600):
-    sts = ts - interval
-    val = dbm.getSql("SELECT AVG(windSpeed) FROM %s "
-                     "WHERE dateTime>? AND dateTime<=?" % dbm.table_name,
-                     (sts, ts))
-    return val[0] if val is not None else None
-
-def calc_avg_winddir(dbm, ts, interval=600):
-    # FIXME: This calculates the scalar average, not the vector average, wind direction. Not what we want.
-    sts = ts - interval
-    val = dbm.getSql("SELECT AVG(windDir) FROM %s "
-                     "WHERE dateTime>? AND dateTime<=?" % dbm.table_name,
-                     (sts, ts))
-    return clamp_degrees(val[0]) if val is not None else None
-
-def calc_max_gust_10min(dbm, ts):
-    sts = ts - 600
-    val = dbm.getSql("SELECT MAX(windGust) FROM %s "
-                     "WHERE dateTime>? AND dateTime<=?" % dbm.table_name,
-                     (sts, ts))
-    return val[0] if val is not None else None
-
-def calc_avg_winddir_10min(dbm, ts):
-    sts = ts - 600
-    # FIXME: This calculates the scalar average, not the vector average, wind direction. Not what we want.
-    val = dbm.getSql("SELECT AVG(windDir) FROM %s "
-                     "WHERE dateTime>? AND dateTime<=?" % dbm.table_name,
-                     (sts, ts))
-    return clamp_degrees(val[0]) if val is not None else None
-
-def calc_windrun(dbm, ts, db_us):
-    """Calculate windrun since midnight.  returns a value in the distance units
-    of the database (thus the temporal normalization).
-    """
-    run = 0
-    sod_ts = weeutil.weeutil.startOfDay(ts)
-    for row in dbm.genSql("SELECT `interval`,windSpeed FROM %s "
-                          "WHERE dateTime>? AND dateTime<=?" % dbm.table_name,
-                          (sod_ts, ts)):
-        if row[1] is not None:
-            inc = row[1] * row[0]
-            if db_us == weewx.METRICWX:
-                inc *= 60.0
-            else:
-                inc /= 60.0
-            run += inc
-    return run
-
-def get_trend(label, dbm, ts, n=3):
-    """Calculate the trend over past n hours, default to 3 hour window."""
-    lastts = ts - n * 3600
-    old_val = dbm.getSql("SELECT %s FROM %s "
-                         "WHERE dateTime>? AND dateTime<=?" %
-                         (label, dbm.table_name), (lastts, ts))
-    if old_val is None or old_val[0] is None:
-        return None
-    return old_val[0]
-
 def calc_trend(newval, oldval):
     if newval is None or oldval is None:
         return None
     return newval - oldval
 
-def calc_rain_hour(dbm, ts):
-    sts = ts - 3600
-    val = dbm.getSql("SELECT SUM(rain) FROM %s "
-                     "WHERE dateTime>? AND dateTime<=?" % dbm.table_name,
-                     (sts, ts))
-    return val[0] if val is not None else None
-
-def calc_rain_month(dbm, ts):
-    span = weeutil.weeutil.archiveMonthSpan(ts)
-    val = dbm.getSql("SELECT SUM(rain) FROM %s "
-                     "WHERE dateTime>? AND dateTime<=?" % dbm.table_name,
-                     (span.start, ts))
-    return val[0] if val is not None else None
-
-def calc_rain_year(dbm, ts):
-    span = weeutil.weeutil.archiveYearSpan(ts)
-    val = dbm.getSql("SELECT SUM(rain) FROM %s "
-                     "WHERE dateTime>? AND dateTime<=?" % dbm.table_name,
-                     (span.start, ts))
-    return val[0] if val is not None else None
-
-def calc_rain_yesterday(dbm, ts):
-    ts = weeutil.weeutil.startOfDay(ts)
-    sts = ts - 3600 * 24
-    val = dbm.getSql("SELECT SUM(rain) FROM %s "
-                     "WHERE dateTime>? AND dateTime<=?" % dbm.table_name,
-                     (sts, ts))
-    return val[0] if val is not None else None
-
-def calc_rain_day(dbm, ts):
-    sts = weeutil.weeutil.startOfDay(ts)
-    val = dbm.getSql("SELECT SUM(rain) FROM %s "
-                     "WHERE dateTime>? AND dateTime<=?" % dbm.table_name, 
-                     (sts, ts))
-    return val[0] if val is not None else None
-
-def calc_ET_today(dbm, ts):
-    sts = weeutil.weeutil.startOfDay(ts)
-    val = dbm.getSql("SELECT SUM(ET) FROM %s "
-                     "WHERE dateTime>? AND dateTime<=?" % dbm.table_name,
-                     (sts, ts))
-    return val[0] if val is not None else None
-
-def calc_minmax(label, dbm, ts, minmax='MAX'):
-    sts = weeutil.weeutil.startOfDay(ts)
-    val = dbm.getSql("SELECT %s(%s) FROM %s "
-                     "WHERE dateTime>? AND dateTime<=?" %
-                     (minmax, label, dbm.table_name), (sts, ts))
-    if val is None:
-        return None, None
-    t = dbm.getSql("SELECT dateTime FROM %s "
-                   "WHERE dateTime>? AND dateTime<=? AND %s=?" %
-                   (dbm.table_name, label), (sts, ts, val[0]))
-    if t is None:
-        return None, None
-    tstr = time.strftime("%H:%M", time.localtime(t[0]))
-    return val[0], tstr
-
 def calc_is_daylight(alm):
     sunrise = alm.sunrise.raw
     sunset = alm.sunset.raw
@@ -408,6 +290,245 @@ def lost_sensor_contact(packet):
         return 1
     return 0
 
+def _add(a, b):
+    """Add like SQL SUM does: None only if there is nothing to add."""
+    if b is None:
+        return a
+    if a is None:
+        return b
+    return a + b
+
+class RealtimeStats(object):
+    """In-memory statistics that replace the per-packet database queries.
+
+    The state is seeded once from the daily summaries and the archive of the
+    current day, then kept up to date from each archive record.  LOOP packets
+    update the daily highs and lows, as the daily summaries do.  All values
+    are in the unit system of the database.
+    """
+
+    # observations kept for the rolling 10 minute to 3 hour windows
+    WINDOW_OBS = ['interval', 'rain', 'ET', 'windSpeed', 'windDir',
+                  'windGust', 'barometer', 'outTemp']
+    # observations with daily highs and lows
+    MINMAX_OBS = ['outTemp', 'barometer', 'windSpeed', 'windGust']
+    # longest rolling window (trend)
+    WINDOW_LENGTH = 3 * 3600
+
+    def __init__(self, dbm, db_us):
+        self.db_us = db_us
+        self.window = deque()
+        self.minmax = dict()
+        self.last_ts = dbm.lastGoodStamp()
+        ts = self.last_ts if self.last_ts is not None else int(time.time())
+        self.day_span = weeutil.weeutil.archiveDaySpan(ts)
+        self.month_span = weeutil.weeutil.archiveMonthSpan(ts)
+        self.year_span = weeutil.weeutil.archiveYearSpan(ts)
+
+        # rain of the days before today from the daily summaries
+        sod = self.day_span.start
+        self.rain_month = self._sum_days('rain', dbm, self.month_span.start,
+                                         sod)
+        self.rain_year = self._sum_days('rain', dbm, self.year_span.start,
+                                        sod)
+        self.rain_yesterday = self._sum_days(
+            'rain', dbm, weeutil.weeutil.archiveDaySpan(sod).start, sod)
+
+        # today and the window from the archive, once
+        self.rain_day = None
+        self.ET_day = None
+        self.windrun = 0
+        obs = [x for x in RealtimeStats.WINDOW_OBS if x in dbm.sqlkeys]
+        sts = min(sod, ts - RealtimeStats.WINDOW_LENGTH)
+        for row in dbm.genSql("SELECT dateTime,%s FROM %s "
+                              "WHERE dateTime>? AND dateTime<=? "
+                              "ORDER BY dateTime ASC" %
+                              (','.join(obs), dbm.table_name), (sts, ts)):
+            record = dict(zip(obs, row[1:]))
+            record['dateTime'] = row[0]
+            self._add_record(record, row[0] > sod)
+
+        # highs and lows of today, including the LOOP data
+        for label in RealtimeStats.MINMAX_OBS:
+            self.minmax[label] = self._get_minmax(label, dbm, ts)
+
+    @staticmethod
+    def _sum_days(label, dbm, start, stop):
+        """Sum of the days from start to stop (exclusive)."""
+        try:
+            val = dbm.getSql("SELECT SUM(`sum`) FROM %s_day_%s "
+                             "WHERE dateTime>=? AND dateTime<?" %
+                             (dbm.table_name, label), (start, stop))
+        except weedb.DatabaseError as e:
+            logdbg("no daily summary for %s: %s" % (label, e))
+            val = dbm.getSql("SELECT SUM(%s) FROM %s "
+                             "WHERE dateTime>? AND dateTime<=?" %
+                             (label, dbm.table_name), (start, stop))
+        return val[0] if val is not None else None
+
+    def _get_minmax(self, label, dbm, ts):
+        """Seed [min, mintime, max, maxtime] of today."""
+        try:
+            val = dbm.getSql("SELECT `min`,mintime,`max`,maxtime FROM %s_day_%s "
+                             "WHERE dateTime=?" % (dbm.table_name, label),
+                             (self.day_span.start,))
+            return list(val) if val is not None else [None, None, None, None]
+        except weedb.DatabaseError as e:
+            logdbg("no daily summary for %s: %s" % (label, e))
+        reply = [None, None, None, None]
+        if label in dbm.sqlkeys:
+            for minmax, idx in (('MIN', 0), ('MAX', 2)):
+                sts = self.day_span.start
+                val = dbm.getSql("SELECT %s(%s) FROM %s "
+                                 "WHERE dateTime>? AND dateTime<=?" %
+                                 (minmax, label, dbm.table_name), (sts, ts))
+                if val is None or val[0] is None:
+                    continue
+                t = dbm.getSql("SELECT dateTime FROM %s "
+                               "WHERE dateTime>? AND dateTime<=? AND %s=?" %
+                               (dbm.table_name, label), (sts, ts, val[0]))
+                if t is not None:
+                    reply[idx:idx + 2] = [val[0], t[0]]
+        return reply
+
+    def _to_db_units(self, packet):
+        if packet.get('usUnits') not in (None, self.db_us):
+            packet = weewx.units.to_std_system(packet, self.db_us)
+        return packet
+
+    def _new_day(self, ts):
+        """Start a new day if ts is past the current day."""
+        if ts <= self.day_span.stop:
+            return
+        day_span = weeutil.weeutil.archiveDaySpan(ts)
+        if day_span.start == self.day_span.stop:
+            self.rain_yesterday = self.rain_day
+        else:
+            self.rain_yesterday = None
+        self.day_span = day_span
+        if ts > self.month_span.stop:
+            self.month_span = weeutil.weeutil.archiveMonthSpan(ts)
+            self.rain_month = None
+        if ts > self.year_span.stop:
+            self.year_span = weeutil.weeutil.archiveYearSpan(ts)
+            self.rain_year = None
+        self.rain_day = None
+        self.ET_day = None
+        self.windrun = 0
+        for label in self.minmax:
+            self.minmax[label] = [None, None, None, None]
+
+    def _add_minmax(self, packet, ts):
+        for label in RealtimeStats.MINMAX_OBS:
+            val = packet.get(label)
+            if val is None:
+                continue
+            v = self.minmax[label]
+            if v[0] is None or val < v[0]:
+                v[0:2] = [val, ts]
+            if v[2] is None or val > v[2]:
+                v[2:4] = [val, ts]
+
+    def _add_record(self, record, today=True):
+        ts = record['dateTime']
+        self.window.append(
+            (ts, dict((x, record.get(x)) for x in RealtimeStats.WINDOW_OBS)))
+        self.last_ts = ts
+        self._expire(ts)
+        if not today:
+            # only needed for the rolling windows
+            return
+        rain = record.get('rain')
+        self.rain_day = _add(self.rain_day, rain)
+        self.rain_month = _add(self.rain_month, rain)
+        self.rain_year = _add(self.rain_year, rain)
+        self.ET_day = _add(self.ET_day, record.get('ET'))
+        if record.get('windSpeed') is not None and record.get('interval'):
+            self.windrun += record['windSpeed'] * record['interval']
+
+    def add_record(self, record):
+        """Add an archive record that is not yet included."""
+        ts = record.get('dateTime')
+        if ts is None or (self.last_ts is not None and ts <= self.last_ts):
+            return
+        record = self._to_db_units(record)
+        self._new_day(ts)
+        if ts <= self.day_span.start:
+            # The record of midnight arrives after the first LOOP packet of
+            # the new day, it belongs to the day before.
+            self._add_record(record, False)
+            self._add_previous_day(record, ts)
+            return
+        self._add_record(record)
+        self._add_minmax(record, ts)
+
+    def _add_previous_day(self, record, ts):
+        """Add the rain of a record of an earlier day to the totals it belongs to."""
+        rain = record.get('rain')
+        if ts > weeutil.weeutil.archiveDaySpan(self.day_span.start).start:
+            self.rain_yesterday = _add(self.rain_yesterday, rain)
+        # the previous month or year is not kept
+        if ts > self.month_span.start:
+            self.rain_month = _add(self.rain_month, rain)
+        if ts > self.year_span.start:
+            self.rain_year = _add(self.rain_year, rain)
+
+    def add_packet(self, packet):
+        """Add a LOOP packet to the highs and lows of today."""
+        ts = packet.get('dateTime')
+        if ts is None:
+            return
+        self._new_day(ts)
+        self._add_minmax(self._to_db_units(packet), ts)
+
+    def _expire(self, ts):
+        while self.window and self.window[0][0] <= ts - RealtimeStats.WINDOW_LENGTH:
+            self.window.popleft()
+
+    def _recent(self, ts, interval):
+        """Values of the records in the interval up to ts, newest first."""
+        for rec_ts, rec in reversed(self.window):
+            if rec_ts <= ts - interval:
+                break
+            if rec_ts <= ts:
+                yield rec
+
+    def window_avg(self, label, ts, interval=600):
+        vals = [x[label] for x in self._recent(ts, interval)
+                if x[label] is not None]
+        return sum(vals) / len(vals) if vals else None
+
+    def window_max(self, label, ts, interval=600):
+        vals = [x[label] for x in self._recent(ts, interval)
+                if x[label] is not None]
+        return max(vals) if vals else None
+
+    def window_sum(self, label, ts, interval=3600):
+        val = None
+        for x in self._recent(ts, interval):
+            val = _add(val, x[label])
+        return val
+
+    def trend_value(self, label, ts):
+        """Oldest value of the last WINDOW_LENGTH seconds, None if there is none."""
+        self._expire(ts)
+        if self.window and self.window[0][0] <= ts:
+            return self.window[0][1][label]
+        return None
+
+    def get_windrun(self):
+        """Windrun since midnight in distance units of the database."""
+        if self.db_us == weewx.METRICWX:
+            return self.windrun * 60.0
+        return self.windrun / 60.0
+
+    def get_minmax(self, label, minmax='MAX'):
+        v = self.minmax[label]
+        val, t = (v[2], v[3]) if minmax == 'MAX' else (v[0], v[1])
+        if val is None or t is None:
+            return None, None
+        return val, time.strftime("%H:%M", time.localtime(t))
+
 class ZambrettiForecast(object):
     DEFAULT_FORECAST_BINDING = 'forecast_binding'
     DEFAULT_BINDING_DICT = {
@@ -505,6 +626,8 @@ class CumulusRealTime(StdService):
 
         # source unit system is the database unit system
         self.db_us = None
+        # running statistics, seeded from the database at first use
+        self.stats = None
         # initialise packet unit system
         self.pkt_us = None
 
@@ -535,23 +658,27 @@ class CumulusRealTime(StdService):
         loginf("zambretti forecast: %s" % self.forecast.is_installed())
 
         # configure the binding
-        binding = d.get('binding', 'loop').lower()
-        loginf("binding is %s" % binding)
-        if binding == 'loop':
+        self.binding = d.get('binding', 'loop').lower()
+        loginf("binding is %s" % self.binding)
+        if self.binding == 'loop':
             self.bind(weewx.NEW_LOOP_PACKET, self.handle_new_loop)
-        else:
-            self.bind(weewx.NEW_ARCHIVE_RECORD, self.handle_new_archive)
+        # archive records always keep the statistics up to date
+        self.bind(weewx.NEW_ARCHIVE_RECORD, self.handle_new_archive)
 
     def handle_new_loop(self, event):
         self.handle_data(event.packet)
 
     def handle_new_archive(self, event):
-        self.handle_data(event.record)
+        if self.binding == 'loop':
+            if self.stats is not None:
+                self.stats.add_record(event.record)
+        else:
+            self.handle_data(event.record, True)
 
-    def handle_data(self, event_data):
+    def handle_data(self, event_data, is_record=False):
         try:
             dbm = self.engine.db_binder.get_manager('wx_binding')
-            data = self.calculate(event_data, dbm)
+            data = self.calculate(event_data, dbm, is_record)
             if self.realtime_txt:
                 self.write_data(self.realtime_txt,
                                 self.create_realtime_string(data))
@@ -611,7 +738,7 @@ class CumulusRealTime(StdService):
                            obs, 'group_altitude')
 
     # calculate the data elements that that weewx does not provide directly.
-    def calculate(self, packet, dbm):
+    def calculate(self, packet, dbm, is_record=False):
         ts = packet.get('dateTime')
 
         # the 'from' unit system is whatever the database is using.  get it
@@ -625,6 +752,20 @@ class CumulusRealTime(StdService):
                 logerr("cannot determine database units: %s" % e)
                 return dict()
 
+        # the statistics are read from the database once, then they are
+        # updated from the packets and records.
+        if self.stats is None:
+            try:
+                self.stats = RealtimeStats(dbm, self.db_us)
+            except weedb.DatabaseError as e:
+                logerr("cannot read statistics: %s" % e)
+                return dict()
+        if is_record:
+            self.stats.add_record(packet)
+        else:
+            self.stats.add_packet(packet)
+        stats = self.stats
+
         # the 'to' unit system defaults to the unit system of the packet
         # (typically the same unit system as the database, but it might not
         # be), but if a different unit system is specified, use that...
@@ -679,11 +820,11 @@ class CumulusRealTime(StdService):
         data['cumulus_windDir'] = clamp_degrees(packet.get('windDir'))
         data['windDir_compass'] = degree_to_compass(packet.get('windDir'))
         data['windSpeed_avg'] = self._cvt(
-            calc_avg_windspeed(dbm, ts), w_u, 'windSpeed', 'group_speed')
+            stats.window_avg('windSpeed', ts), w_u, 'windSpeed', 'group_speed')
         v = _convert_us(packet.get('windSpeed'), self.pkt_us, 'knot',
                         'windSpeed', 'group_speed')
         data['windSpeed_beaufort'] = weewx.wxformulas.beaufort(v)
-        wr = calc_windrun(dbm, ts, self.db_us)
+        wr = stats.get_windrun()
         data['windrun'] = self._cvt(wr, wr_u, 'windrun', 'group_distance')
         # weewx does not know of nautical miles so if wind speed units are knot
         # then we have a windrun in miles and we need to manually convert it to
@@ -692,58 +833,58 @@ class CumulusRealTime(StdService):
             data['windrun'] /= 1.15077945
         data['cloudbase'] = self._cvt_a('cloudbase', packet, cb_u)
         p1 = packet.get('barometer')
-        p2 = get_trend('barometer', dbm, ts)
+        p2 = stats.trend_value('barometer', ts)
         p2 = self._cvt_us(p2, self.pkt_us, 'barometer', 'group_pressure')
         data['pressure_trend'] = calc_trend(p1, p2)
         t1 = packet.get('outTemp')
-        t2 = get_trend('outTemp', dbm, ts)
+        t2 = stats.trend_value('outTemp', ts)
         t2 = self._cvt_us(t2, self.pkt_us, 'outTemp', 'group_temperature')
         data['temperature_trend'] = calc_trend(t1, t2)
 
         data['rain_month'] = self._cvt(
-            calc_rain_month(dbm, ts), r_u, 'rain', 'group_rain')
+            stats.rain_month, r_u, 'rain', 'group_rain')
         data['rain_year'] = self._cvt(
-            calc_rain_year(dbm, ts), r_u, 'rain', 'group_rain')
+            stats.rain_year, r_u, 'rain', 'group_rain')
         data['rain_yesterday'] = self._cvt(
-            calc_rain_yesterday(dbm, ts), r_u, 'rain', 'group_rain')
+            stats.rain_yesterday, r_u, 'rain', 'group_rain')
         data['dayRain'] = self._cvt(
-            calc_rain_day(dbm, ts), r_u, 'rain', 'group_rain')
+            stats.rain_day, r_u, 'rain', 'group_rain')
 
-        v, t = calc_minmax('outTemp', dbm, ts, 'MAX')
+        v, t = stats.get_minmax('outTemp', 'MAX')
         data['outTemp_max'] = self._cvt(
             v, t_u, 'outTemp', 'group_temperature')
         data['outTemp_max_time'] = t
-        v, t = calc_minmax('outTemp', dbm, ts, 'MIN')
+        v, t = stats.get_minmax('outTemp', 'MIN')
         data['outTemp_min'] = self._cvt(
             v, t_u, 'outTemp', 'group_temperature')
         data['outTemp_min_time'] = t
-        v, t = calc_minmax('barometer', dbm, ts, 'MAX')
+        v, t = stats.get_minmax('barometer', 'MAX')
         data['pressure_max'] = self._cvt(
             v, p_u, 'barometer', 'group_pressure')
         data['pressure_max_time'] = t
-        v, t = calc_minmax('barometer', dbm, ts, 'MIN')
+        v, t = stats.get_minmax('barometer', 'MIN')
         data['pressure_min'] = self._cvt(
             v, p_u, 'barometer', 'group_pressure')
         data['pressure_min_time'] = t
-        v, t = calc_minmax('windSpeed', dbm, ts, 'MAX')
+        v, t = stats.get_minmax('windSpeed', 'MAX')
         data['windSpeed_max'] = self._cvt(
             v, w_u, 'windSpeed', 'group_speed')
         data['windSpeed_max_time'] = t
-        v, t = calc_minmax('windGust', dbm, ts, 'MAX')
+        v, t = stats.get_minmax('windGust', 'MAX')
         data['windGust_max'] = self._cvt(
             v, w_u, 'windGust', 'group_speed')
         data['windGust_max_time'] = t
 
         data['10min_high_gust'] = self._cvt(
-            calc_max_gust_10min(dbm, ts), w_u, 'windSpeed', 'group_speed')
-        v = calc_avg_winddir_10min(dbm, ts)
+            stats.window_max('windGust', ts), w_u, 'windSpeed', 'group_speed')
+        v = clamp_degrees(stats.window_avg('windDir', ts))
         data['10min_avg_wind_bearing'] = v
         data['avg_wind_dir'] = degree_to_compass(v)
 
         data['rain_hour'] = self._cvt(
-            calc_rain_hour(dbm, ts), r_u, 'rain', 'group_rain')
+            stats.window_sum('rain', ts), r_u, 'rain', 'group_rain')
 
-        data['ET_today'] = calc_ET_today(dbm, ts)
+        data['ET_today'] = stats.ET_day
         data['lost_sensor_contact'] = lost_sensor_contact(packet)
 
         t_C = _convert_us(packet.get('outTemp'), self.pkt_us, 'degree_C',
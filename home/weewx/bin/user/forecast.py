@@ -520,6 +520,7 @@ $summary.obvis           array
 
 from __future__ import absolute_import
 from __future__ import print_function
+import bisect
 import calendar
 import configobj
 import datetime
@@ -1029,6 +1030,8 @@ class Forecast(StdService):
             if dbcol != memcol:
                 raise Exception('%s: schema mismatch: %s != %s' %
                                 (self.method_id, dbcol, memcol))
+            # databases created by earlier versions have no index
+            Forecast.create_index(dbm, self.method_id)
             # find out when the last forecast happened
             self.last_ts = Forecast.get_last_forecast_ts(dbm, self.method_id)
 
@@ -1222,6 +1225,24 @@ class Forecast(StdService):
         """get the forecast, return an array of forecast records."""
         return None
 
+    @staticmethod
+    def create_index(dbm, method_id):
+        """ensure the index used to find the latest forecast of each method,
+        as well as by prune_forecasts and get_saved_forecasts"""
+        name = '%s_method_ts' % dbm.table_name
+        sql = "create index %s on %s (method, dateTime, event_ts)" % (
+            name, dbm.table_name)
+        try:
+            # sqlite and mariadb
+            dbm.getSql(sql.replace('create index', 'create index if not exists'))
+        except weedb.DatabaseError:
+            # mysql has no 'if not exists' for indexes
+            try:
+                dbm.getSql(sql)
+                loginf('%s: created index %s' % (method_id, name))
+            except weedb.DatabaseError as e:
+                logdbg('%s: index %s not created: %s' % (method_id, name, e))
+
     @staticmethod
     def get_last_forecast_ts(dbm, method_id):
         sql = "select dateTime,issued_ts from %s where method = '%s' and dateTime = (select max(dateTime) from %s where method = '%s') limit 1" % (dbm.table_name, method_id, dbm.table_name, method_id)
@@ -4256,70 +4277,74 @@ class ForecastVariables(SearchList):
         self.db_max_tries = 3
         self.db_retry_wait = 5 # seconds
 
+        # latest forecast of each method, as (records, event_ts of records)
+        self.latest = {}
+
     def get_extension_list(self, timespan, db_lookup):
         return [{'forecast': self}]
 
     def _getTides(self, context, from_ts=None, max_events=1):
-        dbm_dict = weewx.manager.get_manager_dict_from_config(self.generator.config_dict, self.binding)
-        with weewx.manager.open_manager(dbm_dict) as dbm:
-            if from_ts is None:
-                from_ts = int(time.time())
-            sql = "select dateTime,issued_ts,event_ts,hilo,offset,usUnits,location from %s where method = 'XTide' and dateTime = (select max(dateTime) from %s where method = 'XTide') and event_ts >= %d order by event_ts asc" % (dbm.table_name, dbm.table_name, from_ts)
-            if max_events is not None:
-                sql += ' limit %d' % max_events
-            for count in range(self.db_max_tries):
-                try:
-                    records = []
-                    for rec in dbm.genSql(sql):
-                        r = {}
-                        r['dateTime'] = self._create_value(
-                            context, 'dateTime', rec[0], 'group_time')
-                        r['issued_ts'] = self._create_value(
-                            context, 'issued_ts', rec[1], 'group_time')
-                        r['event_ts'] = self._create_value(
-                            context, 'event_ts', rec[2], 'group_time')
-                        r['hilo'] = rec[3]
-                        r['offset'] = self._create_value(
-                            context, 'offset', rec[4], 'group_altitude',
-                            unit_system=rec[5])
-                        r['location'] = rec[6]
-                        records.append(r)
-                    return records
-                except (IndexError, weedb.DatabaseError) as e:
-                    logerr('get tides failed (attempt %d of %d): %s' %
-                           ((count + 1), self.db_max_tries, e))
-                    logdbg('waiting %d seconds before retry' %
-                           self.db_retry_wait)
-                    time.sleep(self.db_retry_wait)
-        return []
+        if from_ts is None:
+            from_ts = int(time.time())
+        records = []
+        for rec in self._getRecords('XTide', from_ts, None, max_events=max_events):
+            r = {}
+            r['dateTime'] = self._create_value(
+                context, 'dateTime', rec['dateTime'], 'group_time')
+            r['issued_ts'] = self._create_value(
+                context, 'issued_ts', rec['issued_ts'], 'group_time')
+            r['event_ts'] = self._create_value(
+                context, 'event_ts', rec['event_ts'], 'group_time')
+            r['hilo'] = rec['hilo']
+            r['offset'] = self._create_value(
+                context, 'offset', rec['offset'], 'group_altitude',
+                unit_system=rec['usUnits'])
+            r['location'] = rec['location']
+            records.append(r)
+        return records
 
-    def _getRecords(self, fid, from_ts, to_ts, max_events=1):
-        """get the latest requested forecast of indicated type for the
-        indicated period of time, limiting to max_events records"""
-        # NB: this query assumes that forecasting is deterministic, i.e., two
+    def _getLatest(self, fid):
+        """get all records of the latest forecast of indicated type that have
+        an event_ts, ordered by event_ts.  a report may ask for the forecast
+        hundreds of times, so the forecast is read only once per report
+        run."""
+        # NB: this assumes that forecasting is deterministic, i.e., two
         # queries to a single forecast will always return the same results.
+        if fid in self.latest:
+            return self.latest[fid]
         dbm_dict = weewx.manager.get_manager_dict_from_config(self.generator.config_dict, self.binding)
         with weewx.manager.open_manager(dbm_dict) as dbm:
-            sql = "select * from %s where method = '%s' and event_ts >= %d and event_ts <= %d and dateTime = (select max(dateTime) from %s where method = '%s') order by event_ts asc" % (dbm.table_name, fid, from_ts, to_ts, dbm.table_name, fid)
-            if max_events is not None:
-                sql += ' limit %d' % max_events
             for count in range(self.db_max_tries):
                 try:
                     records = []
-                    columns = dbm.connection.columnsOf(dbm.table_name)
-                    for rec in dbm.genSql(sql):
-                        r = {}
-                        for i, f in enumerate(columns):
-                            r[f] = rec[i]
-                        records.append(r)
-                    return records
+                    sql = "select max(dateTime) from %s where method = '%s'" % (dbm.table_name, fid)
+                    row = dbm.getSql(sql)
+                    if row is not None and row[0] is not None:
+                        columns = dbm.connection.columnsOf(dbm.table_name)
+                        sql = "select * from %s where method = '%s' and dateTime = %d and event_ts is not null order by event_ts asc" % (dbm.table_name, fid, row[0])
+                        for rec in dbm.genSql(sql):
+                            records.append(dict(zip(columns, rec)))
+                    self.latest[fid] = (records, [r['event_ts'] for r in records])
+                    return self.latest[fid]
                 except (IndexError, weedb.DatabaseError) as e:
                     logerr('get %s failed (attempt %d of %d): %s' %
                            (fid, (count + 1), self.db_max_tries, e))
                     logdbg('waiting %d seconds before retry' %
                            self.db_retry_wait)
                     time.sleep(self.db_retry_wait)
-        return []
+        return [], []
+
+    def _getRecords(self, fid, from_ts, to_ts, max_events=1):
+        """get the latest requested forecast of indicated type for the
+        indicated period of time, limiting to max_events records.  a to_ts
+        of None means no upper limit."""
+        records, event_ts = self._getLatest(fid)
+        first = bisect.bisect_left(event_ts, from_ts)
+        last = len(event_ts) if to_ts is None else bisect.bisect_right(event_ts, to_ts)
+        if max_events is not None:
+            last = min(last, first + max_events)
+        # the callers modify the records, so do not hand out the cached ones
+        return [dict(r) for r in records[first:last]]
 
     def _create_value(self, context, label, value_str, group,
                       fid='', units=None, unit_system=weewx.US):
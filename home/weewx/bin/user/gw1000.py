@@ -351,6 +351,12 @@ import threading
 import time
 from operator import itemgetter
 
+# Python 2 has no monotonic clock, fall back to the system clock
+try:
+    from time import monotonic
+except ImportError:
+    from time import time as monotonic
+
 # Python 2/3 compatibility shims
 import six
 from six.moves import StringIO
@@ -450,6 +456,9 @@ default_max_tries = 3
 default_max_age = 60
 # default device poll interval
 default_poll_interval = 20
+# default interval between refreshes of the sensor ID (battery state and
+# signal level) data
+default_sensor_state_interval = 60
 # default period between lost contact log entries during an extended period of
 # lost contact when run as a Service
 default_lost_contact_log_period = 21600
@@ -1086,6 +1095,10 @@ class Gateway(object):
         # how often (in seconds) we should poll the API, use a default
         self.poll_interval = int(gw_config.get('poll_interval',
                                                default_poll_interval))
+        # how often (in seconds) we should refresh the sensor battery state
+        # and signal level data, use a default
+        self.sensor_state_interval = int(gw_config.get('sensor_state_interval',
+                                                       default_sensor_state_interval))
         # Is a WH32 in use. WH32 TH sensor can override/provide outdoor TH data
         # to the gateway device. In terms of TH data the process is transparent
         # and we do not need to know if a WH32 or other sensor is providing
@@ -1130,6 +1143,7 @@ class Gateway(object):
         elif self.ip_address is None and self.port is None:
             loginf('     device IP address and port not specified, address and port will be obtained by discovery')
         loginf('     poll interval is %d seconds' % self.poll_interval)
+        loginf('     sensor state refresh interval is %d seconds' % self.sensor_state_interval)
         if self.debug.any or weewx.debug > 0:
             loginf('     max tries is %d, retry wait time is %d seconds' % (self.max_tries,
                                                                             self.retry_wait))
@@ -1163,6 +1177,7 @@ class Gateway(object):
                                           socket_timeout=self.socket_timeout,
                                           broadcast_timeout=self.broadcast_timeout,
                                           poll_interval=self.poll_interval,
+                                          sensor_state_interval=self.sensor_state_interval,
                                           max_tries=self.max_tries,
                                           retry_wait=self.retry_wait,
                                           use_wh32=use_wh32,
@@ -2771,6 +2786,7 @@ class GatewayCollector(Collector):
     def __init__(self, ip_address=None, port=None, broadcast_address=None,
                  broadcast_port=None, socket_timeout=None, broadcast_timeout=None,
                  poll_interval=default_poll_interval,
+                 sensor_state_interval=default_sensor_state_interval,
                  max_tries=default_max_tries, retry_wait=default_retry_wait,
                  use_wh32=True, ignore_wh40_batt=True, show_battery=False,
                  log_unknown_fields=False, fw_update_check_interval=86400,
@@ -2782,6 +2798,12 @@ class GatewayCollector(Collector):
 
         # interval between polls of the API, use a default
         self.poll_interval = poll_interval
+        # interval between refreshes of the sensor battery state and signal
+        # level data, use a default
+        self.sensor_state_interval = sensor_state_interval
+        # the most recent parsed sensor state data and when it was obtained
+        self.sensor_state_data = None
+        self.sensor_state_ts = None
         # how many times to poll the API before giving up, default is
         # default_max_tries
         self.max_tries = max_tries
@@ -2848,113 +2870,121 @@ class GatewayCollector(Collector):
     def collect(self):
         """Collect and queue sensor data.
 
-        Loop forever waking periodically to see if it is time to quit or
-        collect more data. A dictionary of data is placed in the queue on each
+        Loop forever polling the device every poll_interval seconds. Polls
+        are scheduled against a monotonic deadline, between polls we sleep
+        until the deadline but wake at least once a second to see if it is
+        time to quit. A dictionary of data is placed in the queue on each
         successful poll of the device. If an exception is raised when
         interacting with the device the exception is placed in the queue as a
         signal to our parent that there is a problem.
         """
 
-        # initialise ts of last time API was polled
-        last_poll = 0
+        # initialise the (monotonic) time of the next poll, we poll straight
+        # away
+        next_poll = monotonic()
         # initialise ts of last firmware check
         last_fw_check = 0
         # collect data continuously while we are told to collect data
         while self.collect_data:
+            # how long until the next poll is due
+            wait = next_poll - monotonic()
+            if wait > 0:
+                # it is not time to poll, sleep until the poll is due but no
+                # longer than a second so we notice if we are to quit
+                time.sleep(min(wait, 1.0))
+                continue
             # store the current time
             now = time.time()
-            # is it time to poll?
-            if now - last_poll > self.poll_interval:
-                # it is time to poll, wrap in a try..except in case we get a
-                # GWIOError exception
-                try:
-                    queue_data = self.get_current_data()
-                except GWIOError as e:
-                    # a GWIOError occurred, most likely because the Station
-                    # object could not contact the device
-                    # first up log the event, but only if we are logging
-                    # failures
-                    if self.log_failures:
-                        logerr('Unable to obtain live sensor data')
-                    # assign the GWIOError exception, so it will be sent in
-                    # the queue to our controlling object
-                    queue_data = e
-                # put the queue data in the queue
-                self.queue.put(queue_data)
-                # debug log when we will next poll the API
-                logdbg('Next update in %d seconds' % self.poll_interval)
-                # reset the last poll ts
-                last_poll = now
-                # do a firmware update check if required
-                if now - last_fw_check > self.fw_update_check_interval and self.log_fw_update_avail:
-                    if self.device.firmware_update_avail:
-                        _msg = "A firmware is available, "\
-                               "current %s firmware version is %s" % (self.device.model,
-                                                                      self.device.firmware_version)
-                        loginf(_msg)
-                        _msg = "    update at http://%s or via "\
-                               "the WSView Plus app" % (self.device.ip_address.decode(), )
-                        loginf(_msg)
-                        curr_msg = self.device.firmware_update_message
-                        if curr_msg is not None:
-                            loginf("    firmware update message: '%s'" % curr_msg)
-                        else:
-                            loginf("    no firmware update message found")
-                    last_fw_check = now
-            # sleep for a second and then see if it's time to poll again
-            time.sleep(1)
+            # it is time to poll, wrap in a try..except in case we get a
+            # GWIOError exception
+            try:
+                queue_data = self.get_current_data()
+            except GWIOError as e:
+                # a GWIOError occurred, most likely because the Station
+                # object could not contact the device
+                # first up log the event, but only if we are logging
+                # failures
+                if self.log_failures:
+                    logerr('Unable to obtain live sensor data')
+                # assign the GWIOError exception, so it will be sent in
+                # the queue to our controlling object
+                queue_data = e
+            # put the queue data in the queue
+            self.queue.put(queue_data)
+            # schedule the next poll relative to the deadline just met so
+            # the time taken by the poll does not accumulate, but if the
+            # poll overran (eg due to retries) start again from now
+            next_poll += self.poll_interval
+            now_mono = monotonic()
+            if next_poll <= now_mono:
+                next_poll = now_mono + self.poll_interval
+            # debug log when we will next poll the API
+            logdbg('Next update in %d seconds' % round(next_poll - now_mono))
+            # do a firmware update check if required
+            if now - last_fw_check > self.fw_update_check_interval and self.log_fw_update_avail:
+                if self.device.firmware_update_avail:
+                    _msg = "A firmware is available, "\
+                           "current %s firmware version is %s" % (self.device.model,
+                                                                  self.device.firmware_version)
+                    loginf(_msg)
+                    _msg = "    update at http://%s or via "\
+                           "the WSView Plus app" % (self.device.ip_address.decode(), )
+                    loginf(_msg)
+                    curr_msg = self.device.firmware_update_message
+                    if curr_msg is not None:
+                        loginf("    firmware update message: '%s'" % curr_msg)
+                    else:
+                        loginf("    no firmware update message found")
+                last_fw_check = now
 
     def get_current_data(self):
         """Get all current sensor data.
 
         Return current sensor data, battery state data and signal state data
         for each sensor. The current sensor data consists of sensor data
-        available through multiple API api_commands. Each API command response is
+        available through multiple API api_commands. The API commands are sent
+        to the device in a single exchange and each API command response is
         parsed and the results accumulated in a dictionary. Battery and signal
-        state for each sensor is added to this dictionary. The dictionary is
-        timestamped and the timestamped accumulated data is returned. If the
-        API does not return any data a suitable exception will have been
-        raised.
+        state for each sensor is added to this dictionary. The battery and
+        signal state data changes slowly, so it is only obtained from the
+        device every sensor_state_interval seconds, in between the most
+        recently obtained data is used. The dictionary is timestamped and the
+        timestamped accumulated data is returned. If the API does not return
+        any data a suitable exception will have been raised.
         """
 
         # get a timestamp to use in case our data does not come with one
         _timestamp = int(time.time())
-        # Now obtain the bulk of the current sensor data via the API. If the
-        # data cannot be obtained we will see a GWIOError exception which we
-        # just let bubble up. Otherwise, we are returned the parsed live data.
-        parsed_data = self.device.livedata
+        # is it time to refresh our sensor state data
+        refresh_state = self.sensor_state_data is None or \
+            _timestamp - self.sensor_state_ts >= self.sensor_state_interval
+        # Now obtain the parsed live data, the parsed rain data and, if
+        # required, the parsed sensor battery state and signal level data via
+        # the API. If the data cannot be obtained we will see a GWIOError
+        # exception which we just let bubble up. If the device cannot handle
+        # CMD_READ_RAIN (eg an old device) the parsed rain data will be None,
+        # in which case our only available rain data will already be in our
+        # livedata response.
+        parsed_data, parsed_rain_data, parsed_sensor_state_data = \
+            self.device.get_current_data(sensor_state=refresh_state)
         # add the timestamp to the data dict
         parsed_data['datetime'] = _timestamp
-        # Now get the parsed rain data via the API. If the data cannot be
-        # obtained we may see an GWIOError exception or an UnknownApiCommand
-        # exception. If we get the UnknownApiCommand exception it is likely due
-        # to an old device that cannot handle CMD_READ_RAIN in which case our
-        # only available rain data will already be in our livedata response. So
-        # just set the raindata response to None. If we get a GWIOError then
-        # let it bubble up.
-        try:
-            parsed_rain_data = self.device.rain
-        except UnknownApiCommand:
-            parsed_rain_data = None
-        except GWIOError:
-            raise
         # now update our parsed data with the parsed rain data if we have any
         if parsed_rain_data is not None:
             parsed_data.update(parsed_rain_data)
         # log the parsed data but only if debug>=3
         if weewx.debug >= 3:
             logdbg("Parsed data: %s" % parsed_data)
-        # The parsed data does not currently contain any sensor battery state
-        # or signal level data so obtain the parsed sensor battery state
-        # and signal level data from our GatewayDevice.
-        try:
-            parsed_sensor_state_data = self.device.sensor_state
-        except GWIOError:
-            raise
+        # The parsed data does not contain any sensor battery state or signal
+        # level data so use the sensor state data we just obtained or, if we
+        # did not refresh it, the most recent sensor state data we have.
+        if refresh_state:
+            self.sensor_state_data = parsed_sensor_state_data
+            self.sensor_state_ts = _timestamp
         # now update our parsed data with the parsed sensor state data if we
         # have any
-        if parsed_sensor_state_data is not None:
-            parsed_data.update(parsed_sensor_state_data)
+        if self.sensor_state_data is not None:
+            parsed_data.update(self.sensor_state_data)
         # log the processed parsed data but only if debug>=3
         if weewx.debug >= 3:
             logdbg("Processed parsed data: %s" % parsed_data)
@@ -2976,7 +3006,8 @@ class GatewayCollector(Collector):
     def shutdown(self):
         """Shut down the thread that collects data from the API.
 
-        Tell the thread to stop, then wait for it to finish.
+        Tell the thread to stop, then wait for it to finish. Finally, close
+        our connection to the device.
         """
 
         # we only need do something if a thread exists
@@ -2991,6 +3022,8 @@ class GatewayCollector(Collector):
             else:
                 loginf("GatewayCollector thread has been terminated")
         self.thread = None
+        # close the API connection to the device
+        self.device.api.disconnect()
 
     class CollectorThread(threading.Thread):
         """Class using a thread to collect data via the Ecowitt LAN/Wi-Fi
@@ -3188,12 +3221,76 @@ class ApiParser(object):
     # tuple of field codes for wind related fields in the device live data
     # so we can isolate these fields
     wind_field_codes = (b'\x0A', b'\x0B', b'\x0C', b'\x19')
+    # Fixed width decode functions that can be replaced by a precompiled
+    # struct.Struct unpacker when parsing addressed data. Dictionary is keyed
+    # by decode function name, alias' of these decode functions are
+    # recognised as well. Dictionary tuple format is:
+    #   (struct format, divisor)
+    # where:
+    #   struct format: the format used to unpack the field data
+    #   divisor:       the value the unpacked value is divided by, None if
+    #                  the unpacked value is used as is
+    fixed_width_decodes = {
+        'decode_temp': ('>h', 10.0),
+        'decode_humid': ('B', None),
+        'decode_press': ('>H', 10.0),
+        'decode_dir': ('>H', None),
+        'decode_big_rain': ('>L', 10.0),
+        'decode_count': ('>L', None),
+        'decode_gain_100': ('>H', 100.0)
+    }
 
     def __init__(self, log_unknown_fields=True):
         # do we log unknown fields at info or leave at debug
         self.log_unknown_fields = log_unknown_fields
+        # compile our addressed data structures into decode tables
+        self.live_data_table = self.compile_structure(self.live_data_struct)
+        self.rain_data_table = self.compile_structure(self.rain_data_struct)
 
-    def parse_addressed_data(self, payload, structure):
+    def compile_structure(self, structure):
+        """Compile an addressed data structure into a decode table.
+
+        The decode table is a list of 256 elements indexed by field address
+        (as an integer). Elements for unknown field addresses are None,
+        elements for known field addresses are a tuple in the format:
+            (unpack fn, divisor, size, field name, decode fn)
+        where:
+            unpack fn:  the unpack_from method of a precompiled struct.Struct
+                        object for fixed width fields or None if the decode
+                        function must be used
+            divisor:    the value the unpacked value is divided by or None
+            size:       the size of field data in bytes
+            field name: the name of the device field to be used for the
+                        decoded data
+            decode fn:  the (bound) decode function for the field
+
+        structure: dict keyed by data element address and containing the
+                   decode function name, field size and the field name to
+                   be used as the key against which the decoded data is to be
+                   stored in the result dict
+
+        Returns the decode table.
+        """
+
+        # map the fixed width decode functions to their unpackers, a decode
+        # function and its alias' are the same function object
+        unpackers = dict()
+        for decode_fn_str, (fmt, divisor) in six.iteritems(self.fixed_width_decodes):
+            unpackers[getattr(self, decode_fn_str)] = (struct.Struct(fmt), divisor)
+        table = [None] * 256
+        for address, (decode_fn_str, field_size, field) in six.iteritems(structure):
+            decode_fn = getattr(self, decode_fn_str)
+            unpacker, divisor = unpackers.get(decode_fn, (None, None))
+            # we can only use the unpacker if the field size is the size the
+            # decode function expects
+            if unpacker is not None and unpacker.size == field_size:
+                unpack_fn = unpacker.unpack_from
+            else:
+                unpack_fn, divisor = None, None
+            table[six.byte2int(address)] = (unpack_fn, divisor, field_size, field, decode_fn)
+        return table
+
+    def parse_addressed_data(self, payload, table):
         """Parse an address structure API response payload.
 
         Parses the data payload of an API response that uses an addressed
@@ -3204,61 +3301,65 @@ class ApiParser(object):
         Data elements may be in any order and the data portion of each data
         element may consist of one or mor bytes.
 
-        payload:   API response payload to be parsed, bytestring
-        structure: dict keyed by data element address and containing the
-                   decode function, field size and the field name to be
-                   used as the key against which the decoded data is to be
-                   stored in the result dict
+        Fixed width fields are unpacked in place using their precompiled
+        unpacker, all other fields (and any field truncated by the end of
+        the payload) are decoded by their decode function.
+
+        payload: API response payload to be parsed, bytestring
+        table:   decode table as returned by compile_structure()
 
         Returns a dict of decoded data keyed by destination field name
         """
 
         # initialise a dict to hold our parsed data
         data = dict()
-        # do we have any payload data to operate on
-        if len(payload) > 0:
-            # we have payload data
-            # set a counter to keep track of where we are in the payload
-            index = 0
-            # work through the payload until we reach the end
-            while index < len(payload) - 1:
-                # obtain the decode function, field size and field name for
-                # the current field, wrap in a try..except in case we
-                # encounter a field address we do not know about
-                try:
-                    decode_fn_str, field_size, field = structure[payload[index:index + 1]]
-                except KeyError:
-                    # We struck a field 'address' we do not know how to
-                    # process. We can't skip to the next field so all we
-                    # can really do is accept the data we have so far, log
-                    # the issue and ignore the remaining data.
-                    # are we logging as info or debug, get an appropriate log function
-                    if self.log_unknown_fields:
-                        log_fn = loginf
-                    else:
-                        log_fn = logdbg
-                    # now call it
-                    log_fn("Unknown field address '%s' detected. "
-                           "Remaining data '%s' ignored." % (bytes_to_hex(payload[index:index + 1]),
-                                                             bytes_to_hex(payload[index + 1:])))
-                    # and break, there is nothing more we can with this
-                    # data
-                    break
+        # get the payload as a bytearray, indexing a bytearray gives an
+        # integer under both Python 2 and Python 3
+        buf = bytearray(payload)
+        payload_len = len(buf)
+        # set a counter to keep track of where we are in the payload
+        index = 0
+        # work through the payload until we reach the end
+        while index < payload_len - 1:
+            # obtain the unpack function, divisor, field size, field name
+            # and decode function for the current field
+            entry = table[buf[index]]
+            if entry is None:
+                # We struck a field 'address' we do not know how to
+                # process. We can't skip to the next field so all we
+                # can really do is accept the data we have so far, log
+                # the issue and ignore the remaining data.
+                # are we logging as info or debug, get an appropriate log function
+                if self.log_unknown_fields:
+                    log_fn = loginf
                 else:
-                    _field_data = getattr(self, decode_fn_str)(payload[index + 1:index + 1 + field_size],
-                                                               field)
-                    # do we have any decoded data?
-                    if _field_data is not None:
-                        # we have decoded data so add the decoded data to
-                        # our data dict
-                        data.update(_field_data)
-                    else:
-                        # we received None from the decode function, this
-                        # usually indicates a field marked as 'reserved' in
-                        # the API documentation
-                        pass
-                    # we are finished with this field, move onto the next
-                    index += field_size + 1
+                    log_fn = logdbg
+                # now call it
+                log_fn("Unknown field address '%s' detected. "
+                       "Remaining data '%s' ignored." % (bytes_to_hex(payload[index:index + 1]),
+                                                         bytes_to_hex(payload[index + 1:])))
+                # and break, there is nothing more we can with this
+                # data
+                break
+            unpack_fn, divisor, field_size, field, decode_fn = entry
+            start = index + 1
+            index = start + field_size
+            if unpack_fn is not None and index <= payload_len:
+                # a fixed width field, unpack it in place
+                value = unpack_fn(buf, start)[0]
+                data[field] = value / divisor if divisor is not None else value
+            else:
+                _field_data = decode_fn(payload[start:index], field)
+                # do we have any decoded data?
+                if _field_data is not None:
+                    # we have decoded data so add the decoded data to our
+                    # data dict
+                    data.update(_field_data)
+                else:
+                    # we received None from the decode function, this
+                    # usually indicates a field marked as 'reserved' in
+                    # the API documentation
+                    pass
         return data
 
     def parse_livedata(self, response):
@@ -3295,7 +3396,7 @@ class ApiParser(object):
         payload = response[5:5 + payload_size - 4]
         # this is addressed data, so we can call parse_addressed_data() and
         # return the result
-        return self.parse_addressed_data(payload, self.live_data_struct)
+        return self.parse_addressed_data(payload, self.live_data_table)
 
     def parse_read_rain(self, response):
         """Parse data from a CMD_READ_RAIN API response.
@@ -3331,7 +3432,7 @@ class ApiParser(object):
         payload = response[5:5 + payload_size - 4]
         # this is addressed data, so we can call parse_addressed_data() and
         # return the result
-        return self.parse_addressed_data(payload, self.rain_data_struct)
+        return self.parse_addressed_data(payload, self.rain_data_table)
 
     def parse_read_raindata(self, response):
         """Parse data from a CMD_READ_RAINDATA API response.
@@ -4831,13 +4932,19 @@ class GatewayApi(object):
 
     A GatewayApi object knows how to:
     1.  discover a device via UDP broadcast
-    2.  send a command to the API
+    2.  send a command, or a group of api_commands, to the API
     3.  receive a response from the API
     4.  verify the response as valid
 
     A GatewayApi object needs an IP address and port as well as a network
     broadcast address and port.
 
+    The TCP connection to the device is kept open and reused for subsequent
+    api_commands. If the device has closed the connection it is re-opened. A
+    group of api_commands is sent to the device in one burst and the
+    responses read in turn, if the device does not answer such a burst the
+    api_commands are sent one after the other on the same connection.
+
     A GatewayApi object uses the following classes:
     - class ApiParser. Parses and decodes the validated gateway API response
                        data returning observational and parametric data.
@@ -4894,6 +5001,9 @@ class GatewayApi(object):
     }
     # header used in each API command and response packet
     header = b'\xff\xff'
+    # command codes of the API responses that use a two byte size field, all
+    # other responses use a one byte size field
+    long_size_cmds = (0x12, 0x27, 0x3C, 0x57, 0x59)
     # known device models
     known_models = ('GW1000', 'GW1100', 'GW2000',
                     'WH2650', 'WH2680', 'WN1900')
@@ -4909,6 +5019,19 @@ class GatewayApi(object):
         # get a parser object to parse any API data
         self.parser = ApiParser(log_unknown_fields=log_unknown_fields)
 
+        # our (persistent) TCP connection to the device, we connect on the
+        # first command sent
+        self.socket = None
+        # any received data not yet consumed as a response
+        self.recv_buffer = b''
+        # lock to serialise use of the connection
+        self.socket_lock = threading.RLock()
+        # whether the device accepts a group of api_commands sent in one burst
+        self.pipelining = True
+        # whether the device understands CMD_READ_RAIN, assume it does until
+        # we learn otherwise
+        self.read_rain_supported = True
+
         # network broadcast address
         self.broadcast_address = broadcast_address if broadcast_address is not None else default_broadcast_address
         # network broadcast port
@@ -5601,6 +5724,74 @@ class GatewayApi(object):
         # now return the parsed response
         return self.parser.parse_read_rain(response)
 
+    def get_current_data(self, sensor_state=True):
+        """Get parsed live data, rain data and sensor state data.
+
+        Sends the API api_commands to obtain live data, traditional gauge and
+        piezo gauge rain data and, if sensor_state is True, sensor ID data to
+        the device in a single exchange. If the device cannot be contacted
+        re-discovery is attempted. If rediscovery is successful the
+        api_commands are sent again otherwise a GWIOError exception is
+        raised. Any code that calls this method should be prepared to handle
+        this exception.
+
+        If the device does not understand CMD_READ_RAIN (eg an old or
+        outdated firmware version) the api_commands are sent again without
+        CMD_READ_RAIN and CMD_READ_RAIN is not used again.
+
+        Returns a 3-tuple of the parsed live data, the parsed rain data and
+        the parsed sensor state data. The parsed rain data is None if the
+        device does not understand CMD_READ_RAIN, the parsed sensor state data
+        is None if sensor_state is False.
+        """
+
+        while True:
+            # construct the list of api_commands to send
+            cmds = ['CMD_GW1000_LIVEDATA']
+            if self.read_rain_supported:
+                cmds.append('CMD_READ_RAIN')
+            if sensor_state:
+                cmds.append('CMD_READ_SENSOR_ID_NEW')
+            try:
+                try:
+                    # get the validated API responses
+                    responses = self.send_cmds_with_retries(cmds)
+                except GWIOError:
+                    # there was a problem contacting the device, it could be
+                    # it has changed IP address so attempt to rediscover
+                    if not self.rediscover():
+                        # we could not re-discover so raise the exception
+                        raise
+                    # we did rediscover successfully so try again, if it
+                    # fails we get another GWIOError exception which will be
+                    # raised
+                    responses = self.send_cmds_with_retries(cmds)
+            except UnknownApiCommand:
+                # If we sent CMD_READ_RAIN it is most likely the culprit, it
+                # is not understood by older devices. In that case try again
+                # without it, otherwise raise the exception.
+                if not self.read_rain_supported:
+                    raise
+                loginf("Device does not support CMD_READ_RAIN, "
+                       "rain data will be obtained from live data only")
+                self.read_rain_supported = False
+                continue
+            break
+        response = dict(zip(cmds, responses))
+        # parse the responses
+        parsed_livedata = self.parser.parse_livedata(response['CMD_GW1000_LIVEDATA'])
+        if 'CMD_READ_RAIN' in response:
+            parsed_rain = self.parser.parse_read_rain(response['CMD_READ_RAIN'])
+        else:
+            parsed_rain = None
+        if sensor_state:
+            # update our Sensors object with the current sensor ID data
+            self.sensors.set_sensor_id_data(response['CMD_READ_SENSOR_ID_NEW'])
+            parsed_sensor_state = self.sensors.battery_and_signal_data
+        else:
+            parsed_sensor_state = None
+        return parsed_livedata, parsed_rain, parsed_sensor_state
+
     def send_cmd_with_retries(self, cmd, payload=b''):
         """Send an API command to the device with retries and return
         the response.
@@ -5608,41 +5799,76 @@ class GatewayApi(object):
         Send a command to the device and obtain the response. If the
         response is valid return the response. If the response is invalid
         an appropriate exception is raised and the command resent up to
-        self.max_tries times after which the value None is returned.
+        self.max_tries times after which a GWIOError exception is raised.
 
         cmd: A string containing a valid API command,
              eg: 'CMD_READ_FIRMWARE_VERSION'
         payload: The data to be sent with the API command, byte string.
 
-        Returns the response as a byte string or the value None.
+        Returns the response as a byte string.
         """
 
-        # construct the message packet
-        packet = self.build_cmd_packet(cmd, payload)
-        response = None
+        return self.send_cmds_with_retries([cmd], [payload])[0]
+
+    def send_cmds_with_retries(self, cmds, payloads=None):
+        """Send a group of API commands to the device with retries and
+        return the responses.
+
+        Send a group of api_commands to the device in a single exchange and
+        obtain the responses. If all responses are valid return the
+        responses. If a response is invalid an appropriate exception is
+        raised and the group of api_commands resent up to self.max_tries
+        times after which a GWIOError exception is raised.
+
+        cmds:     A list of strings containing valid API api_commands,
+                    eg: ['CMD_GW1000_LIVEDATA', 'CMD_READ_RAIN']
+        payloads: A list of the data to be sent with each API command, byte
+                  strings. If None no data is sent with any command.
+
+        Returns a list of the responses as byte strings in the same order as
+        cmds.
+        """
+
+        if payloads is None:
+            payloads = [b''] * len(cmds)
+        # construct the message packets
+        packets = [self.build_cmd_packet(cmd, payload) for cmd, payload in zip(cmds, payloads)]
+        # a string describing the api_commands for use in log messages
+        cmd_str = "', '".join(cmds)
+        responses = None
         # attempt to send up to 'self.max_tries' times
         for attempt in range(self.max_tries):
             # wrap in  try..except so we can catch any errors
             try:
-                response = self.send_cmd(packet)
+                responses = self.send_cmds(packets)
             except socket.timeout as e:
                 # a socket timeout occurred, log it
                 if self.log_failures:
                     logdbg("Failed to obtain response to attempt %d "
-                           "to send command '%s': %s" % (attempt + 1, cmd, e))
+                           "to send command '%s': %s" % (attempt + 1, cmd_str, e))
+                # if the device did not answer a group of api_commands sent in
+                # one burst send the api_commands one at a time from now on
+                if len(packets) > 1 and self.pipelining:
+                    loginf("No response to a group of api_commands, "
+                           "api_commands will be sent one at a time")
+                    self.pipelining = False
             except Exception as e:
                 # an exception was encountered, log it
                 if self.log_failures:
-                    logdbg("Failed attempt %d to send command '%s': %s" % (attempt + 1, cmd, e))
+                    logdbg("Failed attempt %d to send command '%s': %s" % (attempt + 1, cmd_str, e))
             else:
-                # check the response is valid
+                # check the responses are valid
                 try:
-                    self.check_response(response, self.api_commands[cmd])
+                    for cmd, response in zip(cmds, responses):
+                        self.check_response(response, self.api_commands[cmd])
                 except InvalidChecksum as e:
                     # the response was not valid, log it and attempt again
                     # if we haven't had too many attempts already
                     logdbg("Invalid response to attempt %d "
                            "to send command '%s': %s" % (attempt + 1, cmd, e))
+                    # we may have lost track of where responses start, so
+                    # start afresh with a new connection
+                    self.disconnect()
                 except UnknownApiCommand:
                     # most likely we have encountered a device that does
                     # not understand the command, possibly due to an old or
@@ -5656,9 +5882,10 @@ class GatewayApi(object):
                     logerr("Unexpected exception occurred while checking response "
                            "to attempt %d to send command '%s': %s" % (attempt + 1, cmd, e))
                     log_traceback_error('    ****  ')
+                    self.disconnect()
                 else:
-                    # our response is valid so return it
-                    return response
+                    # our responses are valid so return them
+                    return responses
             # sleep before our next attempt, but skip the sleep if we
             # have just made our last attempt
             if attempt < self.max_tries - 1:
@@ -5666,8 +5893,8 @@ class GatewayApi(object):
         # if we made it here we failed after self.max_tries attempts
         # first log it
         _msg = ("Failed to obtain response to command '%s' "
-                "after %d attempts" % (cmd, self.max_tries))
-        if response is not None or self.log_failures:
+                "after %d attempts" % (cmd_str, self.max_tries))
+        if responses is not None or self.log_failures:
             logerr(_msg)
         # then finally, raise a GWIOError exception
         raise GWIOError(_msg)
@@ -5714,44 +5941,157 @@ class GatewayApi(object):
         errors are trapped and raised, code calling send_cmd should be
         prepared to handle such exceptions.
 
-        cmd: A valid API command
+        packet: A valid API command packet
+
+        Returns the response as a byte string.
+        """
+
+        return self.send_cmds([packet])[0]
+
+    def send_cmds(self, packets):
+        """Send a group of api_commands to the API and return the responses.
+
+        The api_commands are sent over our persistent connection to the
+        device, if we are not connected a connection is opened. If the device
+        has closed a connection we reused a new connection is opened and the
+        api_commands sent once more. Socket related errors are trapped and
+        raised, code calling send_cmds should be prepared to handle such
+        exceptions. On any error the connection is closed, so the next
+        exchange starts afresh.
+
+        packets: A list of valid API command packets
+
+        Returns a list of the responses as byte strings.
+        """
+
+        with self.socket_lock:
+            # are we reusing an already open connection
+            reused = self.socket is not None
+            try:
+                return self.exchange(packets)
+            except socket.timeout:
+                # the device did not answer, do not try again here
+                self.disconnect()
+                raise
+            except socket.error as e:
+                self.disconnect()
+                # if this was a fresh connection there is nothing more we can
+                # do so raise the exception
+                if not reused:
+                    raise
+                # the device most likely closed the connection since we last
+                # used it, so try once more with a fresh connection
+                if weewx.debug >= 2:
+                    logdbg("Connection to %s:%d lost (%s), reconnecting" % (self.ip_address.decode(),
+                                                                             self.port,
+                                                                             e))
+            except Exception:
+                self.disconnect()
+                raise
+            try:
+                return self.exchange(packets)
+            except Exception:
+                self.disconnect()
+                raise
+
+    def exchange(self, packets):
+        """Send a group of command packets and read the responses.
+
+        If our pipelining property is True the packets are sent in one burst
+        and the responses read afterwards, otherwise each packet is sent once
+        the response to the previous packet has been read.
+        """
+
+        # connect to the device if we are not already connected
+        if self.socket is None:
+            self.connect()
+        # if required log the packets we are sending
+        if weewx.debug >= 3:
+            for packet in packets:
+                logdbg("Sending packet '%s' to %s:%d" % (bytes_to_hex(packet),
+                                                         self.ip_address.decode(),
+                                                         self.port))
+        responses = []
+        if self.pipelining:
+            # send the packets in one burst then read the responses
+            self.socket.sendall(b''.join(packets))
+            for packet in packets:
+                responses.append(self.read_response())
+        else:
+            # send each packet and read its response in turn
+            for packet in packets:
+                self.socket.sendall(packet)
+                responses.append(self.read_response())
+        # if required log the responses
+        if weewx.debug >= 3:
+            for response in responses:
+                logdbg("Received response '%s'" % (bytes_to_hex(response),))
+        return responses
+
+    def read_response(self):
+        """Read a single API response from our connection.
+
+        An API response starts with the fixed header, the command code and
+        a one or two byte size field. The size field gives the number of
+        bytes following the header so we know when we have the complete
+        response. Any data received beyond the end of the response is kept
+        for the next response.
 
         Returns the response as a byte string.
         """
 
-        # create a socket object for sending api_commands and broadcasting to
-        # the network, would normally do this using a with statement but
-        # with statement support for socket.socket did not appear until
-        # python 3.
+        buf = self.recv_buffer
+        while True:
+            # do we have enough data to determine the response size
+            if len(buf) >= 5 or (len(buf) == 4 and six.indexbytes(buf, 2) not in self.long_size_cmds):
+                if buf[:2] != self.header:
+                    # we do not have the start of a response, we cannot
+                    # recover from this on this connection
+                    self.recv_buffer = b''
+                    raise socket.error("Invalid response header '%s'" % (bytes_to_hex(buf[:2]),))
+                if six.indexbytes(buf, 2) in self.long_size_cmds:
+                    size = struct.unpack(">H", buf[3:5])[0]
+                else:
+                    size = six.indexbytes(buf, 3)
+                # the size excludes the header
+                if len(buf) >= size + 2:
+                    self.recv_buffer = buf[size + 2:]
+                    return buf[:size + 2]
+            chunk = self.socket.recv(1024)
+            if not chunk:
+                # the device closed the connection
+                self.recv_buffer = b''
+                raise socket.error("Connection closed by device")
+            buf += chunk
+
+    def connect(self):
+        """Open a TCP connection to the device."""
+
+        # create a socket object for sending api_commands
         s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         # set the socket timeout
         s.settimeout(self.socket_timeout)
-        # wrap our connect in a try..except, so we can catch any socket
-        # related exceptions
         try:
             # connect to the device
             s.connect((self.ip_address, self.port))
-            # if required log the packet we are sending
-            if weewx.debug >= 3:
-                logdbg("Sending packet '%s' to %s:%d" % (bytes_to_hex(packet),
-                                                         self.ip_address.decode(),
-                                                         self.port))
-            # send the packet
-            s.sendall(packet)
-            # obtain the response, we assume here the response will be less
-            # than 1024 characters
-            response = s.recv(1024)
-            # if required log the response
-            if weewx.debug >= 3:
-                logdbg("Received response '%s'" % (bytes_to_hex(response),))
-            # return the response
-            return response
         except socket.error:
-            # we received a socket error, raise it
-            raise
-        finally:
-            # make sure we close our socket
+            # we could not connect, close the socket and raise the exception
             s.close()
+            raise
+        self.socket = s
+        self.recv_buffer = b''
+
+    def disconnect(self):
+        """Close the TCP connection to the device if it is open."""
+
+        with self.socket_lock:
+            if self.socket is not None:
+                try:
+                    self.socket.close()
+                except socket.error:
+                    pass
+                self.socket = None
+            self.recv_buffer = b''
 
     def check_response(self, response, cmd_code):
         """Check the validity of an API response.
@@ -5888,6 +6228,8 @@ class GatewayApi(object):
                             if self.mac == device['mac']:
                                 self.ip_address = device['ip_address'].encode()
                                 self.port = device['port']
+                                # close any connection to the old address
+                                self.disconnect()
                                 break
                         else:
                             # we have exhausted the device list without a
@@ -6405,6 +6747,12 @@ class GatewayDevice(object):
 
         return self.api.get_current_sensor_state()
 
+    def get_current_data(self, sensor_state=True):
+        """Gateway device live data, rain data and optionally sensor state
+        data obtained in a single exchange with the device."""
+
+        return self.api.get_current_data(sensor_state=sensor_state)
+
     @property
     def discovered_devices(self):
         """List of discovered gateway devices.
@@ -10,6 +10,7 @@ today's high, low, sum, average and weighted averages for each observation
 in the packet.
 """
 
+import collections
 import copy
 import configobj
 import itertools
@@ -23,12 +24,11 @@ import sys
 import tempfile
 import threading
 import time
-import paho.mqtt.publish as mqtt_publish
+import paho.mqtt.client as mqtt
 
 from dataclasses import dataclass
-from typing import Any, Dict, Generator, List, Optional, Set, Tuple, Union
+from typing import Any, Deque, Dict, Generator, List, Optional, Set, Tuple, Union
 from enum import Enum
-from sortedcontainers import SortedDict
 
 import weewx
 import weewx.defaults
@@ -48,6 +48,11 @@ from weeutil.weeutil import to_float
 from weeutil.weeutil import to_int
 from weewx.engine import StdService
 
+try:
+    from user.recentarchive import recent_archive
+except ImportError:
+    recent_archive = None
+
 # get a logger object
 log = logging.getLogger(__name__)
 
@@ -117,6 +122,7 @@ class Configuration:
     ssh_options              : str
     skip_if_older_than       : int
     timeout                  : int
+    persist_connection       : int
     time_delta               : int # Used for trend.
     week_start               : int
     rainyear_start           : int
@@ -133,6 +139,12 @@ class Configuration:
     mqtt_retain              : bool
     mqtt_clientid            : str
     mqtt_unit_system         : int
+    mqtt_max_queued          : int
+    mqtt_min_delay           : int
+    mqtt_max_delay           : int
+    mqtt_log_stats_interval  : int
+    snapshot_enable          : bool
+    snapshot_filename        : str
 
 # ===============================================================================
 #                             ContinuousScalarStats
@@ -140,6 +152,7 @@ class Configuration:
 
 @dataclass
 class ScalarDebit:
+    __slots__ = ['timestamp', 'expiration', 'value', 'weight']
     timestamp : int
     expiration: int
     value     : float
@@ -158,18 +171,13 @@ class ContinuousScalarStats(object):
     seconds.
 
     addSum(ts, val, weight)
-              |                          future_debits (List)
-              |                          --------------------
+              |                          future_debits (deque)
+              |                          ---------------------
               '------------------------> ts|expiration(ts+timelength)|value|weight
-              |
-              |
-              v
-        values_dict (Sorted Dict)
-        key         value
-        ----------- ------------------------
-        val         timestamp_list (List)
-                    --------------
-                    ts
+                                               ^              ^
+                                               |              |
+                                         min_debits      max_debits
+                                         (deque)         (deque)
 
     Every time an observation is added (with addSum), a future
     debit is created with the same information and an expiration of ts + timelength.
@@ -177,49 +185,43 @@ class ContinuousScalarStats(object):
     continuous stats instances, trimExpiredEntries(ts) is called on
     all continuous stats instances.
 
-    The list of future debits is stored in a List.  Each time trimExpiredEntries is
-    called, the top of the list is iterated on looking for any entries where
-    the expiration is <= the current dateTime.
-
-    In addition to the future debit list, a values_dict (SortedDict) is maintained where:
-    key  : the value specified in the call to addSum
-    value: timestamp_list, a list of timestamps (as specified in an addSum call)
-           for the particular value of the key
-    When addSum is called:
-    1. If the value does not already exist in values_dict, it is created as the key and an
-       empty timestamp_list is created for the value part of the key/value pair.
-    2. a new ts is added to the end of the time_stamp list.
-    When trimExpiredEntries is called,
-    1. The timestamp_list is retrieved in values_dict by looking up the value.
-    2. The creation timestamp is removed from the timestamp_list (it will be the first)
-    3. If the timestamp_list is now empty, the key/value pair is removed from values_dict.
-    As the values_dict is sorted by value, it is used to efficiently find the min and max
-    values when getStatsTuple is called.  For max, maxtime is the first entry in the
-    timestamp_list for that value.  As expected, for min, mintime is the first entry in the
-    timestamp_list for that value.
+    The future debits are stored in a deque, in the order they were added.  Each time
+    trimExpiredEntries is called, debits are popped from the left of the deque while
+    the expiration is <= the current dateTime.  Each pop is O(1).
+
+    min_debits and max_debits are monotonic deques holding references to (a subset of)
+    the debits in future_debits, in the same order:
+    - min_debits holds non-decreasing values.  When addSum is called, debits with a
+      value greater than the new value are popped from the right before the new debit
+      is appended; they can never become the minimum while the new value is in the window.
+    - max_debits holds non-increasing values; debits with a value less than the new
+      value are popped from the right.
+    Debits with equal values are kept, so the left entry is the earliest debit with
+    the min (max) value, i.e., mintime (maxtime) is the first time the min (max) was seen.
+    When a debit expires and it is the left entry of min_debits (max_debits), it is
+    popped from there too.  Every debit is appended and popped at most once, so addSum
+    and trimExpiredEntries are O(1) amortized, getStatsTuple is O(1) and memory is bounded
+    by the number of observations in the window.
     """
 
     def __init__(self, timelength: int):
         self.timelength: int = timelength
-        self.future_debits: List[ScalarDebit] = []
-        self.values_dict: SortedDict[float, List[int]] = SortedDict()
+        self.future_debits: Deque[ScalarDebit] = collections.deque()
+        self.min_debits: Deque[ScalarDebit] = collections.deque()
+        self.max_debits: Deque[ScalarDebit] = collections.deque()
         self.sum = 0.0
         self.count = 0
         self.wsum = 0.0
         self.sumtime = 0.0
 
     def getStatsTuple(self):
-        # min is key of first element in values_dict
-        # mintime is first element of the timestamp list contained in the value of the first element in values_dict
-        # max is key of last element in dict
-        # maxtime is first element of the timestamp list contained in the value of the last element in values_dict
-        min, timelist = self.values_dict.peekitem(0)
-        mintime: int = timelist[0]
-        max, timelist = self.values_dict.peekitem(-1)
-        maxtime: int = timelist[0]
+        # min/mintime is the left entry of min_debits
+        # max/maxtime is the left entry of max_debits
+        min_debit: ScalarDebit = self.min_debits[0]
+        max_debit: ScalarDebit = self.max_debits[0]
         sum = LoopData.massage_near_zero(self.sum)
         wsum = LoopData.massage_near_zero(self.wsum)
-        return (min, mintime, max, maxtime,
+        return (min_debit.value, min_debit.timestamp, max_debit.value, max_debit.timestamp,
                 sum, self.count, wsum, self.sumtime)
 
     def addSum(self, ts, val, weight=1):
@@ -239,11 +241,6 @@ class ContinuousScalarStats(object):
             self.count += 1
             self.wsum += val * weight
             self.sumtime += weight
-            # Add to values_dict
-            if not val in self.values_dict:
-                self.values_dict[val] = []
-            timestamp_list: List[int] = self.values_dict[val]
-            timestamp_list.append(ts)
             # Add future debit
             debit= ScalarDebit(
                 timestamp  = ts,
@@ -251,23 +248,33 @@ class ContinuousScalarStats(object):
                 value    = val,
                 weight   = weight)
             self.future_debits.append(debit)
+            # Maintain the monotonic min and max deques.
+            min_debits = self.min_debits
+            while min_debits and min_debits[-1].value > val:
+                min_debits.pop()
+            min_debits.append(debit)
+            max_debits = self.max_debits
+            while max_debits and max_debits[-1].value < val:
+                max_debits.pop()
+            max_debits.append(debit)
 
     def trimExpiredEntries(self, ts):
         # Remove any debits that may have matured.
-        while len(self.future_debits) > 0 and self.future_debits[0].expiration <= ts:
+        future_debits = self.future_debits
+        while future_debits and future_debits[0].expiration <= ts:
             # Apply this debit.
-            debit = self.future_debits.pop(0)
-            log.debug('Applying debit: %s value: %f, weight: %f' % (timestamp_to_string(debit.timestamp), debit.value, debit.weight))
+            debit = future_debits.popleft()
+            if weewx.debug:
+                log.debug('Applying debit: %s value: %f, weight: %f' % (timestamp_to_string(debit.timestamp), debit.value, debit.weight))
             self.sum -= debit.value
             self.count -= 1
             self.wsum -= debit.value * debit.weight
             self.sumtime -= debit.weight
-            # Remove the debit entry in the values_dict.
-            timestamp_list: List[int] = self.values_dict[debit.value]
-            first_timestamp = timestamp_list.pop(0)
-            assert first_timestamp == debit.timestamp
-            if len(timestamp_list) == 0:
-                self.values_dict.pop(debit.value)
+            # Remove the debit from the min and max deques.
+            if self.min_debits[0] is debit:
+                self.min_debits.popleft()
+            if self.max_debits[0] is debit:
+                self.max_debits.popleft()
 
     @property
     def avg(self):
@@ -307,6 +314,7 @@ class ContinuousScalarStats(object):
 
 @dataclass
 class VecDebit:
+    __slots__ = ['timestamp', 'expiration', 'speed', 'dirN', 'weight']
     timestamp : int
     expiration: int
     speed     : float
@@ -319,18 +327,13 @@ class ContinuousVecStats(object):
     seconds.
 
     addSum(ts, val(speed,dirN), weight)
-              |                          future_debits (List)
-              |                          --------------------
-              '------------------------> ts|expiration(ts+timelength)|value|weight
-              |
-              |
-              v
-        speed_dict (Sorted Dict)
-        key         value
-        ----------- ------------------------
-        speed       timestamp_dirn_list (List)
-                    -------------------------
-                    tuple(ts, dirN)
+              |                          future_debits (deque)
+              |                          ---------------------
+              '------------------------> ts|expiration(ts+timelength)|speed|dirN|weight
+                                               ^              ^
+                                               |              |
+                                         min_debits      max_debits
+                                         (deque)         (deque)
 
     Every time an observation is added (with addSum), a future
     debit is created with the same information and an expiration of ts + timelength.
@@ -338,33 +341,24 @@ class ContinuousVecStats(object):
     continuous stats instances, trimExpiredEntries(ts) is called on
     all continuous stats instances.
 
-    The list of future debits is stored in a List.  Each time trimExpiredEntries is
-    called, the top of the list is iterated on looking for any entries where
-    the expiration is <= the current dateTime.
-
-    In addition to the future debit list, a speed_dict (SortedDict) is maintained where:
-    key  : the value specified in the call to addSum
-    value: timestamp_dirn_list, a List of (ts, dirN) tuples
-    When addSum is called:
-    1. If the speed does not already exist in speed_dict, it is created as the key and an
-       empty timestamp_dirn_list is created for the value part of the key/value pair.
-    2. a new (ts, dirN) tuple is added to the timestamp_dirn_list.
-
-    When trimExpiredEntries is called,
-    1. The timestamp_dirn_list is retrieved in speed_dict by looking up the speed.
-    2. The timestamp, dirN tuple (which is the first) entry is removed from the timestamp_dirn_list.
-    3. If the timestamp_dirn_lisat is now empty, the speed entry is removed from speed_dict.
-    As the speed_dict is sorted by value, it is used to efficiently find the min and max
-    values when getStatsTuple is called.  For max, maxtime is the first entry in the
-    timestamp_dirn_list for that value (with dirN being the dirN that is paired with that
-    first timestamp.  As expected, for min, mintime is the first entry in the
-    timestamp_dirn_list with dirN being the value paired with the mintime.
+    The future debits are stored in a deque.  Each time trimExpiredEntries is
+    called, debits are popped from the left while the expiration is <= the current
+    dateTime.
+
+    As in ContinuousScalarStats, min_debits and max_debits are monotonic deques
+    (by speed) holding references to the debits in future_debits.
+    - min_debits keeps debits with equal speeds, so its left entry is the earliest
+      debit with the min speed (mintime).
+    - max_debits drops earlier debits with equal speeds, so its left entry is the
+      latest debit with the max speed (maxtime and maxdir are taken from it).
+    addSum and trimExpiredEntries are O(1) amortized, getStatsTuple is O(1).
     """
 
     def __init__(self, timelength: int):
         self.timelength: int = timelength
-        self.future_debits: List[VecDebit] = []
-        self.speed_dict: SortedDict[float, List[Tuple[int, float]]] = SortedDict()
+        self.future_debits: Deque[VecDebit] = collections.deque()
+        self.min_debits: Deque[VecDebit] = collections.deque()
+        self.max_debits: Deque[VecDebit] = collections.deque()
         self.sum = 0.0
         self.count = 0
         self.wsum = 0.0
@@ -376,18 +370,15 @@ class ContinuousVecStats(object):
         self.wsquaresum = 0.0
 
     def getStatsTuple(self):
-        # min is key of first key in speed_dict
-        # mintime is first entry of the timestamp_dirn_list contained in the value of the first element in speed_dict
-        # max is key of last key in speed_dict
-        # max is key of last element in speed_dict
-        # maxtime is first entry of the timestamp_dirn_list contained in the value of the last element in speed_dict
-        if len(self.speed_dict) != 0:
-            min, time_dirn_list_min = self.speed_dict.peekitem(0)
-            mintime, dummy = time_dirn_list_min[0]
-            max, time_dirn_list_max = self.speed_dict.peekitem(-1)
-            maxtime, maxdir = time_dirn_list_max[-1]
+        # min/mintime is the left entry of min_debits
+        # max/maxtime/maxdir is the left entry of max_debits
+        if len(self.future_debits) != 0:
+            min_debit: VecDebit = self.min_debits[0]
+            max_debit: VecDebit = self.max_debits[0]
+            min, mintime = min_debit.speed, min_debit.timestamp
+            max, maxtime, maxdir = max_debit.speed, max_debit.timestamp, max_debit.dirN
         else:
-            min, mintime, max, maxtime = None, None, None, None
+            min, mintime, max, maxtime, maxdir = None, None, None, None, None
 
         sum  = LoopData.massage_near_zero(self.sum)
         wsum = LoopData.massage_near_zero(self.wsum)
@@ -435,11 +426,6 @@ class ContinuousVecStats(object):
             # It's OK for direction to be None, provided speed is zero:
             if dirN is not None or speed == 0:
                 self.dirsumtime += weight
-            # Add to speed_dict
-            if not speed in self.speed_dict:
-                self.speed_dict[speed] = []
-            timestamp_dirn_list: List[Tuple[int, float]] = self.speed_dict[speed]
-            timestamp_dirn_list.append((ts, dirN))
             # Add future debit
             debit = VecDebit(
                 timestamp  = ts,
@@ -448,12 +434,23 @@ class ContinuousVecStats(object):
                 dirN       = dirN,
                 weight     = weight)
             self.future_debits.append(debit)
+            # Maintain the monotonic min and max deques.
+            min_debits = self.min_debits
+            while min_debits and min_debits[-1].speed > speed:
+                min_debits.pop()
+            min_debits.append(debit)
+            max_debits = self.max_debits
+            while max_debits and max_debits[-1].speed <= speed:
+                max_debits.pop()
+            max_debits.append(debit)
 
     def trimExpiredEntries(self, ts):
         # Remove any debits that may have matured.
-        while len(self.future_debits) > 0 and self.future_debits[0].expiration <= ts:
-            debit = self.future_debits.pop(0)
-            log.debug('Applying ContinuousVecStats debit: %s speed: %f, dirN: %r, weight: %f' % (timestamp_to_string(debit.timestamp), debit.speed, debit.dirN, debit.weight))
+        future_debits = self.future_debits
+        while future_debits and future_debits[0].expiration <= ts:
+            debit = future_debits.popleft()
+            if weewx.debug:
+                log.debug('Applying ContinuousVecStats debit: %s speed: %f, dirN: %r, weight: %f' % (timestamp_to_string(debit.timestamp), debit.speed, debit.dirN, debit.weight))
             # Apply this debit.
             self.sum -= debit.speed
             self.count -= 1
@@ -464,12 +461,11 @@ class ContinuousVecStats(object):
             if debit.dirN is not None:
                 self.xsum += debit.weight * debit.speed * math.cos(math.radians(90.0 - debit.dirN))
                 self.ysum += debit.weight * debit.speed * math.sin(math.radians(90.0 - debit.dirN))
-            # Remove the debit entry in the speed_dict.
-            timestamp_dirn_list: List[Tuple[int, float]] = self.speed_dict[debit.speed]
-            timestamp, dirN = timestamp_dirn_list.pop(0)
-            assert timestamp == debit.timestamp
-            if len(timestamp_dirn_list) == 0:
-                self.speed_dict.pop(debit.speed)
+            # Remove the debit from the min and max deques.
+            if self.min_debits[0] is debit:
+                self.min_debits.popleft()
+            if self.max_debits[0] is debit:
+                self.max_debits.popleft()
 
     @property
     def avg(self):
@@ -542,7 +538,7 @@ class ContinuousFirstLastAccum(object):
     addSum(ts, val, weight)
               |
               v
-        values_list (List)
+        values_list (deque)
         FirstLastEntry
         --------------
         dateTime|value
@@ -555,7 +551,7 @@ class ContinuousFirstLastAccum(object):
 
     When trimExpiredEntries is called,
     1. the values_list is iterated over while FirstLastEntry.dateTime <= ts
-    2.     the FirstLastEntry is deleted
+    2.     the FirstLastEntry is popped from the left (O(1))
 
     first/firsttime is the dateTime value and dateTime of the first entry in values_list
     last/lasttime is the dateTime value and dateTime of the last entry in values_list
@@ -563,7 +559,7 @@ class ContinuousFirstLastAccum(object):
 
     def __init__(self, timelength: int):
         self.timelength = timelength
-        self.values_list: List[FirstLastEntry] = []
+        self.values_list: Deque[FirstLastEntry] = collections.deque()
 
     def getStatsTuple(self):
         """Return a stats-tuple. That is, a tuple containing the gathered statistics."""
@@ -580,7 +576,7 @@ class ContinuousFirstLastAccum(object):
     def trimExpiredEntries(self, ts):
         # Remove any expired entries
         while len(self.values_list) > 0 and self.values_list[0].dateTime + self.timelength <= ts:
-            self.values_list.pop(0)
+            self.values_list.popleft()
 
 
 # ===============================================================================
@@ -814,6 +810,335 @@ class PeriodPacket:
     timestamp: int
     packet   : Dict[str, Any]
 
+# ===============================================================================
+#                             AccumulatorSnapshot
+# ===============================================================================
+
+STATS_TYPE_NAMES: Dict[Any, str] = {
+    weewx.accum.ScalarStats   : 'scalar',
+    weewx.accum.VecStats      : 'vector',
+    weewx.accum.FirstLastAccum: 'firstlast',
+}
+
+class AccumulatorSnapshot(object):
+    """Checkpoint of the day summary part of the period (alltime, rainyear, year,
+    month and week) accumulators.
+
+    Priming a period accumulator merges every archive_day_<obstype> row of the
+    period (for alltime, every row in the database).  Rows of days that are over
+    do not change anymore, so the merged stats of those days are saved in a
+    compact json file, together with the time up to which rows were merged
+    (through).  On startup, only rows newer than through need to be read.
+
+    entries (Dict)
+    key                    value
+    ---------------------- --------------------------------------------------
+    <period>.<obstype>     span_start|through|stats_type|stats (stats tuple)
+
+    An entry is only used if the start of the period (span_start), the stats type
+    and the unit system still match.  The snapshot is written after priming and
+    advanced (by merging the rows of the days that have ended since) on new
+    archive records and at shutdown.
+    """
+
+    VERSION = 1
+
+    def __init__(self, filename: str, unit_system: int):
+        self.filename: str = filename
+        self.unit_system: int = unit_system
+        self.checkpoint: int = 0
+        self.entries: Dict[str, Dict[str, Any]] = {}
+
+    @staticmethod
+    def load(filename: str, unit_system: int) -> 'AccumulatorSnapshot':
+        snapshot = AccumulatorSnapshot(filename, unit_system)
+        try:
+            with open(filename, 'r') as f:
+                contents = json.load(f)
+            if contents.get('version') != AccumulatorSnapshot.VERSION:
+                log.info('Ignoring snapshot %s: version %s' % (filename, contents.get('version')))
+            elif contents.get('unit_system') != unit_system:
+                log.info('Ignoring snapshot %s: unit_system %s' % (filename, contents.get('unit_system')))
+            else:
+                snapshot.checkpoint = to_int(contents['checkpoint'])
+                snapshot.entries = contents['entries']
+                log.info('Loaded snapshot %s (%d entries, checkpoint %s).' % (
+                    filename, len(snapshot.entries), timestamp_to_string(snapshot.checkpoint)))
+        except FileNotFoundError:
+            log.info('No snapshot %s, priming accumulators from the database.' % filename)
+        except Exception as e:
+            log.error('Ignoring snapshot %s: %s' % (filename, e))
+        return snapshot
+
+    def save(self) -> None:
+        tmpname = '%s.tmp' % self.filename
+        try:
+            with open(tmpname, 'w') as f:
+                json.dump({
+                    'version'    : AccumulatorSnapshot.VERSION,
+                    'unit_system': self.unit_system,
+                    'checkpoint' : self.checkpoint,
+                    'entries'    : self.entries }, f, separators=(',', ':'))
+            os.replace(tmpname, self.filename)
+            log.debug('Saved snapshot %s (%d entries, checkpoint %s).' % (
+                self.filename, len(self.entries), timestamp_to_string(self.checkpoint)))
+        except Exception as e:
+            log.error('Could not save snapshot %s: %s' % (self.filename, e))
+
+    def lookup(self, period: str, obstype: str, span_start: int, stats_type: Any) -> Tuple[Optional[Any], int]:
+        """Return the checkpointed stats (or None) and the time from which day summary rows must be read."""
+        entry = self.entries.get('%s.%s' % (period, obstype))
+        if entry is None or entry['span_start'] != span_start or entry['stats_type'] != STATS_TYPE_NAMES.get(stats_type):
+            return None, span_start
+        return stats_type(tuple(entry['stats'])), entry['through']
+
+    def store(self, period: str, obstype: str, span_start: int, through: int, stats: Any) -> None:
+        self.entries['%s.%s' % (period, obstype)] = {
+            'span_start': span_start,
+            'through'   : through,
+            'stats_type': STATS_TYPE_NAMES[type(stats)],
+            'stats'     : list(stats.getStatsTuple()) }
+
+    def advance(self, dbm, checkpoint: int) -> None:
+        """Merge the day summary rows older than checkpoint into the entries."""
+        stats_types = { name: stats_type for stats_type, name in STATS_TYPE_NAMES.items() }
+        for key, entry in self.entries.items():
+            if entry['through'] >= checkpoint:
+                continue
+            obstype = key.split('.', 1)[1]
+            stats = stats_types[entry['stats_type']](tuple(entry['stats']))
+            for record in LoopData.day_summary_records_generator(dbm, obstype, entry['through'], checkpoint):
+                LoopData.merge_day_summary_record(stats, record)
+            entry['through'] = checkpoint
+            entry['stats'] = list(stats.getStatsTuple())
+        self.checkpoint = checkpoint
+
+# ===============================================================================
+#                             MQTTPublisher
+# ===============================================================================
+
+@dataclass
+class MQTTStats:
+    published    : int   # packets acknowledged by the client library/broker
+    dropped      : int   # packets not accepted (queue full, no connection)
+    latency_sum  : float # seconds, sum over all published packets
+    latency_max  : float # seconds
+    latency_last : float # seconds
+
+class MQTTPublisher(object):
+    """Long-lived MQTT client, one per broker.
+
+    Instead of connecting to the broker for every loop packet (paho.mqtt.publish.single),
+    one client per broker is kept connected.  The network loop runs in a background
+    thread (loop_start) which also takes care of reconnecting.  The outbound queue of the
+    client is bounded (max_queued); packets which cannot be queued are dropped (they
+    would be stale by the time the broker is reachable again) and counted.
+
+    Publish latency is the time between handing the packet to the client and the
+    on_publish callback (i.e., sent for qos 0, PUBACK for qos 1, PUBCOMP for qos 2).
+    """
+
+    _publishers: Dict[Tuple[str, int, Optional[str], Optional[str]], 'MQTTPublisher'] = {}
+    _publishers_lock = threading.Lock()
+
+    @classmethod
+    def get_publisher(cls, broker: str, port: int, user: Optional[str], password: Optional[str],
+            keepalive: int, clientid: Optional[str], max_queued: int, min_delay: int, max_delay: int
+            ) -> 'MQTTPublisher':
+        key = (broker, port, user, clientid)
+        with cls._publishers_lock:
+            publisher = cls._publishers.get(key)
+            if publisher is None:
+                publisher = MQTTPublisher(broker, port, user, password, keepalive, clientid,
+                    max_queued, min_delay, max_delay)
+                cls._publishers[key] = publisher
+            return publisher
+
+    @classmethod
+    def close_all(cls) -> None:
+        with cls._publishers_lock:
+            for publisher in cls._publishers.values():
+                publisher.close()
+            cls._publishers = {}
+
+    def __init__(self, broker: str, port: int, user: Optional[str], password: Optional[str],
+            keepalive: int, clientid: Optional[str], max_queued: int, min_delay: int, max_delay: int):
+        self.broker: str = broker
+        self.port: int = port
+        self.max_queued: int = max_queued
+        self.connected: bool = False
+        self.stats: MQTTStats = MQTTStats(published=0, dropped=0,
+            latency_sum=0.0, latency_max=0.0, latency_last=0.0)
+        # mid -> time handed to the client
+        self.pending: Dict[int, float] = {}
+        # mid -> time of on_publish, for callbacks which beat publish() to registering the mid
+        self.unmatched: Dict[int, float] = {}
+        self.lock = threading.Lock()
+
+        if hasattr(mqtt, 'CallbackAPIVersion'):
+            # paho mqtt v2
+            self.client = mqtt.Client(callback_api_version=mqtt.CallbackAPIVersion.VERSION2, # pylint: disable=no-member
+                                      client_id=clientid)
+        else:
+            self.client = mqtt.Client(client_id=clientid)
+        self.client.on_connect = self.on_connect
+        self.client.on_disconnect = self.on_disconnect
+        self.client.on_publish = self.on_publish
+        if user is not None:
+            self.client.username_pw_set(user, password)
+        self.client.max_queued_messages_set(max_queued)
+        self.client.reconnect_delay_set(min_delay=min_delay, max_delay=max_delay)
+        # connect_async: the background loop connects (and reconnects) on its own.
+        self.client.connect_async(broker, port, keepalive)
+        self.client.loop_start()
+        log.info('MQTT: Started publisher for %s:%s' % (broker, port))
+
+    def on_connect(self, client, userdata, flags, rc, *args): # pylint: disable=unused-argument
+        # args: properties (paho mqtt v2)
+        if rc == 0:
+            log.info('MQTT: Connected to %s:%s' % (self.broker, self.port))
+            self.connected = True
+        else:
+            log.error('MQTT: Connect to %s:%s failed: %s' % (self.broker, self.port, rc))
+
+    def on_disconnect(self, client, userdata, *args): # pylint: disable=unused-argument
+        # args: rc (paho mqtt v1) or disconnect_flags, reason_code, properties (paho mqtt v2)
+        if self.connected:
+            log.info('MQTT: Disconnected from %s:%s, reconnecting' % (self.broker, self.port))
+        self.connected = False
+
+    def on_publish(self, client, userdata, mid, *args): # pylint: disable=unused-argument
+        # args: reason_code, properties (paho mqtt v2)
+        end = time.time()
+        with self.lock:
+            start = self.pending.pop(mid, None)
+            if start is None:
+                # publish() has not registered the mid yet.
+                self.unmatched[mid] = end
+                return
+            self.record_latency(end - start)
+
+    def record_latency(self, latency: float) -> None:
+        self.stats.published += 1
+        self.stats.latency_sum += latency
+        self.stats.latency_last = latency
+        if latency > self.stats.latency_max:
+            self.stats.latency_max = latency
+
+    def publish(self, topic: str, payload: str, qos: int, retain: bool) -> bool:
+        # Note: self.lock must not be held while calling into the client, the network
+        # thread holds the client's locks while invoking on_publish.
+        start = time.time()
+        msg_info = self.client.publish(topic, payload, qos=qos, retain=retain)
+        with self.lock:
+            if msg_info.rc != mqtt.MQTT_ERR_SUCCESS:
+                self.stats.dropped += 1
+                log.debug('MQTT: Dropped packet: %s' % mqtt.error_string(msg_info.rc))
+                return False
+            end = self.unmatched.pop(msg_info.mid, None)
+            if end is not None:
+                self.record_latency(end - start)
+                return True
+            self.pending[msg_info.mid] = start
+            # Messages lost on a disconnect never get an on_publish; keep pending bounded.
+            while len(self.pending) > 2 * self.max_queued + 10:
+                self.pending.pop(next(iter(self.pending)))
+                self.stats.dropped += 1
+            while len(self.unmatched) > 2 * self.max_queued + 10:
+                self.unmatched.pop(next(iter(self.unmatched)))
+            return True
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self.lock:
+            return {
+                'connected'   : self.connected,
+                'published'   : self.stats.published,
+                'dropped'     : self.stats.dropped,
+                'pending'     : len(self.pending),
+                'latency_avg' : self.stats.latency_sum / self.stats.published if self.stats.published else None,
+                'latency_max' : self.stats.latency_max,
+                'latency_last': self.stats.latency_last,
+            }
+
+    def close(self) -> None:
+        try:
+            self.client.disconnect()
+            self.client.loop_stop()
+        except Exception as e:
+            log.debug('MQTT: Error closing connection to %s:%s: %s' % (self.broker, self.port, e))
+
+# ===============================================================================
+#                             RsyncUploader
+# ===============================================================================
+
+class RsyncUploader(object):
+    """Upload the loop-data file in a background thread.
+
+    Running rsync in the LoopProcessor thread holds up the processing of loop
+    packets whenever the link is slow.  The uploader keeps just the latest
+    packet: if packets arrive faster than they can be uploaded, the ones in
+    between are coalesced (the file on disk always holds the latest packet).
+    Packets whose contents are byte identical to the last uploaded one are not
+    uploaded at all.
+
+    With persist_connection > 0, ssh connection multiplexing (ControlMaster) is
+    used, so every rsync reuses one ssh connection (kept open for
+    persist_connection seconds after the last upload) rather than doing a key
+    exchange and authentication for each packet.
+    """
+
+    def __init__(self, cfg: Configuration):
+        self.cfg = cfg
+        self.ssh_options: str = RsyncUploader.compose_ssh_options(cfg.ssh_options, cfg.persist_connection)
+        self.cond = threading.Condition()
+        self.pending: Optional[Tuple[int, str]] = None
+        self.last_payload: Optional[str] = None
+        t = threading.Thread(target=self.run, name='LoopDataRsync')
+        t.daemon = True
+        t.start()
+
+    @staticmethod
+    def compose_ssh_options(ssh_options: Optional[str], persist_connection: int) -> str:
+        ssh_options = ssh_options.strip() if ssh_options is not None else ''
+        if persist_connection <= 0:
+            return ssh_options
+        # %C is a hash of local host, remote host, port and user (keeps the socket path short).
+        control_path = os.path.join(tempfile.gettempdir(), 'loopdata-ssh-%C')
+        return ('%s -o ControlMaster=auto -o ControlPath=%s -o ControlPersist=%d' % (
+            ssh_options, control_path, persist_connection)).strip()
+
+    def upload(self, pkt_time: int, payload: str) -> None:
+        """Hand the contents just written to the loop-data file over to the upload thread."""
+        with self.cond:
+            if self.pending is not None:
+                log.debug('rsync_data(%d) coalesced, upload still in progress' % self.pending[0])
+            self.pending = (pkt_time, payload)
+            self.cond.notify()
+
+    def run(self) -> None:
+        while True:
+            with self.cond:
+                while self.pending is None:
+                    self.cond.wait()
+                pkt_time, payload = self.pending
+                self.pending = None
+            if payload == self.last_payload:
+                log.debug('rsync_data(%d) skipped, contents unchanged' % pkt_time)
+                continue
+            try:
+                uploaded = LoopProcessor.rsync_data(pkt_time,
+                    self.cfg.skip_if_older_than, self.cfg.loop_data_dir,
+                    self.cfg.filename, self.cfg.remote_dir,
+                    self.cfg.remote_server, self.cfg.remote_port,
+                    self.cfg.timeout, self.cfg.remote_user,
+                    self.ssh_options, self.cfg.compress,
+                    self.cfg.log_success)
+            except Exception:
+                weeutil.logger.log_traceback(log.error, "    ****  ")
+                uploaded = False
+            # On failure, don't rely on what is on the remote server.
+            self.last_payload = payload if uploaded else None
+
 class LoopData(StdService):
     def __init__(self, engine, config_dict):
         super(LoopData, self).__init__(engine, config_dict)
@@ -833,6 +1158,7 @@ class LoopData(StdService):
         loop_frequency_spec_dict = loop_config_dict.get('LoopFrequency', {})
         rsync_spec_dict          = loop_config_dict.get('RsyncSpec', {})
         mqtt_spec_dict           = loop_config_dict.get('MQTTSpec', {})
+        snapshot_spec_dict       = loop_config_dict.get('SnapshotSpec', {})
         include_spec_dict        = loop_config_dict.get('Include', {})
         baro_trend_trans_dict    = loop_config_dict.get('BarometerTrendDescriptions', {})
 
@@ -918,6 +1244,7 @@ class LoopData(StdService):
             ssh_options              = rsync_spec_dict.get('ssh_options', '-o ConnectTimeout     =1'),
             timeout                  = to_int(rsync_spec_dict.get('timeout', 1)),
             skip_if_older_than       = to_int(rsync_spec_dict.get('skip_if_older_than', 3)),
+            persist_connection       = to_int(rsync_spec_dict.get('persist_connection', 300)),
             time_delta               = time_delta,
             week_start               = week_start,
             rainyear_start           = rainyear_start,
@@ -933,7 +1260,14 @@ class LoopData(StdService):
             mqtt_keepalive           = to_int(mqtt_spec_dict.get('mqtt_keepalive', 60)),
             mqtt_retain              = to_bool(mqtt_spec_dict.get('mqtt_retain', False)),
             mqtt_clientid            = mqtt_spec_dict.get('mqtt_clientid'),
-            mqtt_unit_system         = to_int(weewx.units.unit_constants[target_report_dict.get('unit_system', 'US').upper()])
+            mqtt_unit_system         = to_int(weewx.units.unit_constants[target_report_dict.get('unit_system', 'US').upper()]),
+            mqtt_max_queued          = to_int(mqtt_spec_dict.get('mqtt_max_queued', 10)),
+            mqtt_min_delay           = to_int(mqtt_spec_dict.get('mqtt_min_delay', 1)),
+            mqtt_max_delay           = to_int(mqtt_spec_dict.get('mqtt_max_delay', 120)),
+            mqtt_log_stats_interval  = to_int(mqtt_spec_dict.get('mqtt_log_stats_interval', 3600)),
+            snapshot_enable          = to_bool(snapshot_spec_dict.get('enable', True)),
+            snapshot_filename        = os.path.join(str(config_dict.get('WEEWX_ROOT')),
+                                           snapshot_spec_dict.get('filename', 'archive/loopdata-snapshot.json'))
             )
 
         if not os.path.exists(self.cfg.loop_data_dir):
@@ -941,8 +1275,42 @@ class LoopData(StdService):
 
         log.info('LoopData file is: %s' % os.path.join(self.cfg.loop_data_dir, self.cfg.filename))
 
+        self.snapshot: Optional[AccumulatorSnapshot] = None
+
+        if recent_archive is not None:
+            # Start of day (up to 25 hours ago on DST change days), hour and continuous periods.
+            timelengths: Dict[str, int] = LoopData.get_continuous_timelengths(self.cfg)
+            recent_archive.subscribe(max([90000] + list(timelengths.values())))
+
         self.bind(weewx.PRE_LOOP, self.pre_loop)
         self.bind(weewx.NEW_LOOP_PACKET, self.new_loop)
+        self.bind(weewx.NEW_ARCHIVE_RECORD, self.new_archive_record)
+
+    def shutDown(self):
+        MQTTPublisher.close_all()
+        self.save_snapshot(time.time())
+
+    def snapshot_checkpoint(self, ts: float) -> int:
+        """Start of the latest day whose day summaries are final at ts."""
+        # The record at midnight still belongs to the previous day; allow for it to be written.
+        return to_int(weeutil.weeutil.startOfDay(ts - self.cfg.archive_interval - 300))
+
+    def new_archive_record(self, event):
+        if self.snapshot is not None and self.snapshot_checkpoint(event.record['dateTime']) > self.snapshot.checkpoint:
+            self.save_snapshot(event.record['dateTime'])
+
+    def save_snapshot(self, ts: float) -> None:
+        if self.snapshot is None:
+            return
+        try:
+            checkpoint = self.snapshot_checkpoint(ts)
+            if checkpoint > self.snapshot.checkpoint:
+                binding = self.config_dict.get('StdReport')['data_binding']
+                with weewx.manager.open_manager_with_config(self.config_dict, binding) as dbm:
+                    self.snapshot.advance(dbm, checkpoint)
+            self.snapshot.save()
+        except Exception as e:
+            log.error('Could not update snapshot: %s' % e)
 
     @staticmethod
     def massage_near_zero(val: float)-> float:
@@ -1168,8 +1536,7 @@ class LoopData(StdService):
 
             # Fetch the records.
             start = time.time()
-            archive_pkts: List[Dict[str, Any]] = LoopData.get_archive_packets(
-                dbm, self.archive_columns, start_of_day)
+            archive_pkts: List[Dict[str, Any]] = self.fetch_archive_packets(dbm, start_of_day)
 
             # Save packets as appropriate.
             pkt_count: int = 0
@@ -1196,19 +1563,66 @@ class LoopData(StdService):
             weeutil.logger.log_traceback(log.error, "    ****  ")
 
     @staticmethod
-    def day_summary_records_generator(dbm, obstype: str, earliest_time: int
+    def day_summary_records_generator(dbm, obstype: str, earliest_time: int, latest_time: Optional[int] = None
             ) -> Generator[Dict[str, Any], None, None]:
         table_name = 'archive_day_%s' % obstype
         cols: List[str] = dbm.connection.columnsOf(table_name)
+        where = 'dateTime >= %d' % earliest_time
+        if latest_time is not None:
+            where += ' AND dateTime < %d' % latest_time
         for row in dbm.genSql('SELECT * FROM %s' \
-                ' WHERE dateTime >= %d ORDER BY dateTime ASC' % (table_name, earliest_time)):
-            record: Dict[str, Any] = {}
-            for i in range(len(cols)):
-                record[cols[i]] = row[i]
-            log.debug('get_day_summary_records: record(%s): %s' % (
-                timestamp_to_string(record['dateTime']), record))
+                ' WHERE %s ORDER BY dateTime ASC' % (table_name, where)):
+            record: Dict[str, Any] = dict(zip(cols, row))
+            if weewx.debug:
+                log.debug('get_day_summary_records: record(%s): %s' % (
+                    timestamp_to_string(record['dateTime']), record))
             yield record
 
+    @staticmethod
+    def merge_day_summary_record(stats: Any, record: Dict[str, Any]) -> None:
+        if type(stats) == weewx.accum.ScalarStats:
+            sstat = weewx.accum.ScalarStats((record['min'], record['mintime'],
+                record['max'], record['maxtime'],
+                record['sum'], record['count'],
+                record['wsum'], record['sumtime']))
+            stats.mergeHiLo(sstat)
+            stats.mergeSum(sstat)
+        elif type(stats) == weewx.accum.VecStats:
+            vstat = weewx.accum.VecStats((record['min'], record['mintime'],
+                record['max'], record['maxtime'],
+                record['sum'], record['count'],
+                record['wsum'], record['sumtime'],
+                record['max_dir'], record['xsum'], record['ysum'],
+                record['dirsumtime'], record['squaresum'], record['wsquaresum']))
+            stats.mergeHiLo(vstat)
+            stats.mergeSum(vstat)
+        else:  # FirstLastAccum():
+            fstat = weewx.accum.FirstLastAccum((record['first'], record['firsttime'],
+                record['last'], record['lasttime']))
+            stats.mergeHiLo(fstat)
+            stats.mergeSum(fstat)
+
+    def fetch_archive_packets(self, dbm, earliest_time: int) -> List[Dict[str, Any]]:
+        """archive packets newer than earliest_time, from the shared RecentArchive store if possible"""
+        if recent_archive is not None:
+            archive_pkts: Optional[List[Dict[str, Any]]] = recent_archive.get_records(earliest_time)
+            if archive_pkts is not None:
+                return archive_pkts
+        return LoopData.get_archive_packets(dbm, self.archive_columns, earliest_time)
+
+    @staticmethod
+    def get_continuous_timelengths(cfg: Configuration) -> Dict[str, int]:
+        """number of seconds of each continuous period"""
+        timelengths: Dict[str, int] = {}
+        for per in cfg.obstypes.continuous:
+            if per == 'trend':
+                timelengths[per] = cfg.time_delta
+            elif LoopData.is_hour_period(per):
+                timelengths[per] = int(per[:-1])*3600
+            elif LoopData.is_minute_period(per):
+                timelengths[per] = int(per[:-1])*60
+        return timelengths
+
     @staticmethod
     def get_archive_packets(dbm, archive_columns: List[str],
             earliest_time: int) -> List[Dict[str, Any]]:
@@ -1253,32 +1667,42 @@ class LoopData(StdService):
                             continue
             self.day_packets = []
 
+            # Day summaries older than the checkpoint are taken from (and saved to) the snapshot.
+            checkpoint: int = self.snapshot_checkpoint(pkt_time)
+            if self.cfg.snapshot_enable:
+                self.snapshot = AccumulatorSnapshot.load(self.cfg.snapshot_filename, self.cfg.unit_system)
+
             # Create fixed accums
             alltime_accum, self.cfg.obstypes.alltime = LoopData.create_alltime_accum(
-                self.cfg.unit_system, self.cfg.archive_interval, self.cfg.obstypes.alltime, day_accum, dbm)
+                self.cfg.unit_system, self.cfg.archive_interval, self.cfg.obstypes.alltime, day_accum, dbm, self.snapshot, checkpoint)
             rainyear_accum, self.cfg.obstypes.rainyear = LoopData.create_rainyear_accum(
-                self.cfg.unit_system, self.cfg.archive_interval, self.cfg.obstypes.rainyear, pkt_time, self.cfg.rainyear_start, day_accum, dbm)
+                self.cfg.unit_system, self.cfg.archive_interval, self.cfg.obstypes.rainyear, pkt_time, self.cfg.rainyear_start, day_accum, dbm, self.snapshot, checkpoint)
             year_accum, self.cfg.obstypes.year = LoopData.create_year_accum(
-                self.cfg.unit_system, self.cfg.archive_interval, self.cfg.obstypes.year, pkt_time, day_accum, dbm)
+                self.cfg.unit_system, self.cfg.archive_interval, self.cfg.obstypes.year, pkt_time, day_accum, dbm, self.snapshot, checkpoint)
             month_accum, self.cfg.obstypes.month = LoopData.create_month_accum(
-                self.cfg.unit_system, self.cfg.archive_interval, self.cfg.obstypes.month, pkt_time, day_accum, dbm)
+                self.cfg.unit_system, self.cfg.archive_interval, self.cfg.obstypes.month, pkt_time, day_accum, dbm, self.snapshot, checkpoint)
             week_accum, self.cfg.obstypes.week = LoopData.create_week_accum(
-                self.cfg.unit_system, self.cfg.archive_interval, self.cfg.obstypes.week, pkt_time, self.cfg.week_start, day_accum, dbm)
+                self.cfg.unit_system, self.cfg.archive_interval, self.cfg.obstypes.week, pkt_time, self.cfg.week_start, day_accum, dbm, self.snapshot, checkpoint)
+            if self.snapshot is not None:
+                self.snapshot.checkpoint = checkpoint
+                self.snapshot.save()
+
+            # Fetch the archive packets for the hour and continuous accums just once,
+            # with the greatest time period.
+            timelengths: Dict[str, int] = LoopData.get_continuous_timelengths(self.cfg)
+            earliest_time = weeutil.weeutil.archiveHoursAgoSpan(pkt_time)[0]
+            if len(timelengths) > 0:
+                earliest_time = min(earliest_time, time.time() - max(timelengths.values()))
+            archive_pkts: List[Dict[str, Any]] = self.fetch_archive_packets(dbm, earliest_time)
+
             hour_accum, self.cfg.obstypes.hour = LoopData.create_hour_accum(
-                self.cfg.unit_system, self.cfg.archive_interval, self.cfg.obstypes.hour, pkt_time, day_accum, dbm)
+                self.cfg.unit_system, self.cfg.archive_interval, self.cfg.obstypes.hour, pkt_time, day_accum, dbm, archive_pkts)
 
             # Create continuous accums
             continuous_accums: Dict[str, ContinuousAccum] = {}
             for per, obstypes in self.cfg.obstypes.continuous.items():
-                if per == 'trend':
-                    timelength = self.cfg.time_delta
-                elif LoopData.is_hour_period(per):
-                    timelength = int(per[:-1])*3600
-                elif LoopData.is_minute_period(per):
-                    timelength = int(per[:-1])*60
-
                 continuous_accums[per], self.cfg.obstypes.continuous[per]  = LoopData.create_continuous_accum(
-                    per, self.cfg.unit_system, self.cfg.archive_interval, obstypes, timelength, day_accum, dbm)
+                    per, self.cfg.unit_system, self.cfg.archive_interval, obstypes, timelengths[per], day_accum, dbm, archive_pkts)
 
             self.cfg.queue.put(Accumulators(
                 alltime_accum  = alltime_accum,
@@ -1293,52 +1717,62 @@ class LoopData(StdService):
 
     @staticmethod
     def create_alltime_accum(unit_system: int, archive_interval: int, obstypes: Set[str], 
-            day_accum: weewx.accum.Accum, dbm) -> Tuple[Optional[weewx.accum.Accum], Set[str]]:
+            day_accum: weewx.accum.Accum, dbm, snapshot: Optional[AccumulatorSnapshot] = None, checkpoint: int = 0
+            ) -> Tuple[Optional[weewx.accum.Accum], Set[str]]:
         log.debug('Creating alltime_accum')
         # Pick a timespan such that all observations will be included
         # Span from Friday, January 2, 1970 12:00:00 AM UTC to January 1, 2525 12:00:00 AM UTC
         span = weeutil.weeutil.TimeSpan(86400, 17514144000)
-        return LoopData.create_period_accum('alltime', unit_system, archive_interval, obstypes, span, day_accum, dbm)
+        return LoopData.create_period_accum('alltime', unit_system, archive_interval, obstypes, span, day_accum, dbm, snapshot, checkpoint)
 
     @staticmethod
     def create_rainyear_accum(unit_system: int, archive_interval: int, obstypes: Set[str], pkt_time: int,
-            rainyear_start: int, day_accum: weewx.accum.Accum, dbm) -> Tuple[Optional[weewx.accum.Accum], Set[str]]:
+            rainyear_start: int, day_accum: weewx.accum.Accum, dbm, snapshot: Optional[AccumulatorSnapshot] = None, checkpoint: int = 0
+            ) -> Tuple[Optional[weewx.accum.Accum], Set[str]]:
         log.debug('Creating initial rainyear_accum')
         span = weeutil.weeutil.archiveRainYearSpan(pkt_time, rainyear_start)
-        return LoopData.create_period_accum('rainyear', unit_system, archive_interval, obstypes, span, day_accum, dbm)
+        return LoopData.create_period_accum('rainyear', unit_system, archive_interval, obstypes, span, day_accum, dbm, snapshot, checkpoint)
 
     @staticmethod
-    def create_year_accum(unit_system: int, archive_interval: int, obstypes: Set[str], pkt_time: int, day_accum: weewx.accum.Accum, dbm
-            ) -> Tuple[Optional[weewx.accum.Accum], Set[str]]:
+    def create_year_accum(unit_system: int, archive_interval: int, obstypes: Set[str], pkt_time: int, day_accum: weewx.accum.Accum, dbm,
+            snapshot: Optional[AccumulatorSnapshot] = None, checkpoint: int = 0) -> Tuple[Optional[weewx.accum.Accum], Set[str]]:
         log.debug('Creating initial year_accum')
         span = weeutil.weeutil.archiveYearSpan(pkt_time)
-        return LoopData.create_period_accum('year', unit_system, archive_interval, obstypes, span, day_accum, dbm)
+        return LoopData.create_period_accum('year', unit_system, archive_interval, obstypes, span, day_accum, dbm, snapshot, checkpoint)
 
     @staticmethod
-    def create_month_accum(unit_system: int, archive_interval: int, obstypes: Set[str], pkt_time: int, day_accum: weewx.accum.Accum, dbm
-            ) -> Tuple[Optional[weewx.accum.Accum], Set[str]]:
+    def create_month_accum(unit_system: int, archive_interval: int, obstypes: Set[str], pkt_time: int, day_accum: weewx.accum.Accum, dbm,
+            snapshot: Optional[AccumulatorSnapshot] = None, checkpoint: int = 0) -> Tuple[Optional[weewx.accum.Accum], Set[str]]:
         log.debug('Creating initial month_accum')
         span = weeutil.weeutil.archiveMonthSpan(pkt_time)
-        return LoopData.create_period_accum('month', unit_system, archive_interval, obstypes, span, day_accum, dbm)
+        return LoopData.create_period_accum('month', unit_system, archive_interval, obstypes, span, day_accum, dbm, snapshot, checkpoint)
 
     @staticmethod
     def create_week_accum(unit_system: int, archive_interval: int, obstypes: Set[str], pkt_time: int,
-            week_start: int, day_accum: weewx.accum.Accum, dbm) -> Tuple[Optional[weewx.accum.Accum], Set[str]]:
+            week_start: int, day_accum: weewx.accum.Accum, dbm, snapshot: Optional[AccumulatorSnapshot] = None, checkpoint: int = 0
+            ) -> Tuple[Optional[weewx.accum.Accum], Set[str]]:
         log.debug('Creating initial week_accum')
         span = weeutil.weeutil.archiveWeekSpan(pkt_time, week_start)
-        return LoopData.create_period_accum('week', unit_system, archive_interval, obstypes, span, day_accum, dbm)
+        return LoopData.create_period_accum('week', unit_system, archive_interval, obstypes, span, day_accum, dbm, snapshot, checkpoint)
 
     @staticmethod
-    def create_hour_accum(unit_system: int, archive_interval: int, obstypes: Set[str], pkt_time: int, day_accum: weewx.accum.Accum, dbm
-            ) -> Tuple[Optional[weewx.accum.Accum], Set[str]]:
+    def create_hour_accum(unit_system: int, archive_interval: int, obstypes: Set[str], pkt_time: int, day_accum: weewx.accum.Accum, dbm,
+            archive_pkts: Optional[List[Dict[str, Any]]] = None) -> Tuple[Optional[weewx.accum.Accum], Set[str]]:
         log.debug('Creating initial hour_accum')
         span = weeutil.weeutil.archiveHoursAgoSpan(pkt_time)
-        return LoopData.create_period_accum('hour', unit_system, archive_interval, obstypes, span, day_accum, dbm)
+        return LoopData.create_period_accum('hour', unit_system, archive_interval, obstypes, span, day_accum, dbm,
+            archive_pkts=archive_pkts)
 
     @staticmethod
     def create_period_accum(name: str, unit_system: int, archive_interval: int, obstypes: Set[str],
-            span: weeutil.weeutil.TimeSpan, day_accum: weewx.accum.Accum, dbm) -> Tuple[Optional[weewx.accum.Accum], Set[str]]:
-        """return period accumulator and (possibly trimmed) obstypes"""
+            span: weeutil.weeutil.TimeSpan, day_accum: weewx.accum.Accum, dbm,
+            snapshot: Optional[AccumulatorSnapshot] = None, checkpoint: int = 0,
+            archive_pkts: Optional[List[Dict[str, Any]]] = None) -> Tuple[Optional[weewx.accum.Accum], Set[str]]:
+        """return period accumulator and (possibly trimmed) obstypes
+
+        snapshot/checkpoint: day summaries older than checkpoint are taken from (and stored in) snapshot.
+        archive_pkts: archive packets (ascending) already fetched by the caller, used for the hour accumulator.
+        """
 
         if len(obstypes) == 0:
             return None, set()
@@ -1371,40 +1805,21 @@ class LoopData(StdService):
             # For periods > day, accumulate from day summary records.
             # hour accumulator is handled by reading archive records (see below).
             if  name != 'hour':
-                for record in LoopData.day_summary_records_generator(dbm, obstype, span.start):
+                # Start from the snapshot (if any), only newer day summaries need to be read.
+                through: int = span.start
+                if snapshot is not None:
+                    cached_stats, cached_through = snapshot.lookup(name, obstype, span.start, type(stats))
+                    if cached_stats is not None:
+                        stats, through = cached_stats, cached_through
+                stored: bool = snapshot is None or through > checkpoint
+                for record in LoopData.day_summary_records_generator(dbm, obstype, through):
+                    if not stored and record['dateTime'] >= checkpoint:
+                        snapshot.store(name, obstype, span.start, checkpoint, stats)
+                        stored = True
                     record_count += 1
-                    # TODO(jkline): From above, it appears that stats cannot be None.
-                    if stats is None:
-                        # Figure out the stats type
-                        if 'squaresum' in record:
-                            stats = weewx.accum.VecStats()
-                        elif 'wsum' in record:
-                            stats = weewx.accum.ScalarStats()
-                        elif 'last' in record:
-                            stats = weewx.accum.FirstLastAccum()
-                        else:
-                            return None, set()
-                    if type(stats) == weewx.accum.ScalarStats:
-                        sstat = weewx.accum.ScalarStats((record['min'], record['mintime'],
-                            record['max'], record['maxtime'],
-                            record['sum'], record['count'],
-                            record['wsum'], record['sumtime']))
-                        stats.mergeHiLo(sstat)
-                        stats.mergeSum(sstat)
-                    elif type(stats) == weewx.accum.VecStats:
-                        vstat = weewx.accum.VecStats((record['min'], record['mintime'],
-                            record['max'], record['maxtime'],
-                            record['sum'], record['count'],
-                            record['wsum'], record['sumtime'],
-                            record['max_dir'], record['xsum'], record['ysum'],
-                            record['dirsumtime'], record['squaresum'], record['wsquaresum']))
-                        stats.mergeHiLo(vstat)
-                        stats.mergeSum(vstat)
-                    else:  # FirstLastAccum():
-                        fstat = weewx.accum.FirstLastAccum((record['first'], record['firsttime'],
-                            record['last'], record['lasttime']))
-                        stats.mergeHiLo(fstat)
-                        stats.mergeSum(fstat)
+                    LoopData.merge_day_summary_record(stats, record)
+                if not stored:
+                    snapshot.store(name, obstype, span.start, checkpoint, stats)
                 # Add in today's stats
                 stats.mergeHiLo(day_accum[obstype])
                 stats.mergeSum(day_accum[obstype])
@@ -1415,10 +1830,12 @@ class LoopData(StdService):
             earliest_time = span[0]
             start = time.time()
             pkt_count: int = 0
-            archive_columns: List[str] = dbm.connection.columnsOf('archive')
-            archive_pkts: List[Dict[str, Any]] = LoopData.get_archive_packets(
-                dbm, archive_columns, earliest_time)
+            if archive_pkts is None:
+                archive_columns: List[str] = dbm.connection.columnsOf('archive')
+                archive_pkts = LoopData.get_archive_packets(dbm, archive_columns, earliest_time)
             for pkt in archive_pkts:
+                if pkt['dateTime'] <= earliest_time:
+                    continue
                 pkt['usUnits'] = unit_system
                 pruned_pkt = LoopProcessor.prune_period_packet(pkt, obstypes)
                 accum.addRecord(pruned_pkt, weight=archive_interval * 60)
@@ -1430,8 +1847,12 @@ class LoopData(StdService):
 
     @staticmethod
     def create_continuous_accum(name: str, unit_system: int, archive_interval: int, obstypes: Set[str],
-            timelength, day_accum: weewx.accum.Accum, dbm) -> Tuple[Optional[ContinuousAccum], Set[str]]:
-        """return continuously accumulator and (possibly trimmed) obstypes"""
+            timelength, day_accum: weewx.accum.Accum, dbm, archive_pkts: Optional[List[Dict[str, Any]]] = None
+            ) -> Tuple[Optional[ContinuousAccum], Set[str]]:
+        """return continuously accumulator and (possibly trimmed) obstypes
+
+        archive_pkts: archive packets (ascending) already fetched by the caller.
+        """
 
         if len(obstypes) == 0:
             return None, set()
@@ -1465,10 +1886,12 @@ class LoopData(StdService):
         start = time.time()
         earliest_time = start - timelength
         pkt_count: int = 0
-        archive_columns: List[str] = dbm.connection.columnsOf('archive')
-        archive_pkts: List[Dict[str, Any]] = LoopData.get_archive_packets(
-            dbm, archive_columns, earliest_time)
+        if archive_pkts is None:
+            archive_columns: List[str] = dbm.connection.columnsOf('archive')
+            archive_pkts = LoopData.get_archive_packets(dbm, archive_columns, earliest_time)
         for pkt in archive_pkts:
+            if pkt['dateTime'] <= earliest_time:
+                continue
             pkt['usUnits'] = unit_system
             pruned_pkt = LoopProcessor.prune_period_packet(pkt, obstypes)
             accum.addRecord(pruned_pkt, weight=archive_interval * 60)
@@ -1560,6 +1983,15 @@ class LoopProcessor:
     def __init__(self, cfg: Configuration):
         self.cfg = cfg
         self.archive_start: float = time.time()
+        self.mqtt_publisher: Optional[MQTTPublisher] = None
+        self.mqtt_stats_logged: float = time.time()
+        self.rsync_uploader: Optional[RsyncUploader] = None
+        if self.cfg.enable:
+            self.rsync_uploader = RsyncUploader(cfg)
+        if self.cfg.mqtt_enable:
+            self.mqtt_publisher = MQTTPublisher.get_publisher(cfg.mqtt_broker, cfg.mqtt_port,
+                cfg.mqtt_user, cfg.mqtt_pass, cfg.mqtt_keepalive, cfg.mqtt_clientid,
+                cfg.mqtt_max_queued, cfg.mqtt_min_delay, cfg.mqtt_max_delay)
 
     def process_queue(self) -> None:
         try:
@@ -1601,22 +2033,18 @@ class LoopProcessor:
                 # Process new packet.
                 loopdata_pkt = LoopProcessor.generate_loopdata_dictionary(pkt, self.cfg, self.accumulators)
                 # Write the loop-data.txt file.
-                LoopProcessor.write_packet_to_file(loopdata_pkt,
+                payload = LoopProcessor.write_packet_to_file(loopdata_pkt,
                     self.cfg.tmpname, self.cfg.loop_data_dir, self.cfg.filename)
-                if self.cfg.enable:
-                    # Rsync the loop-data.txt file.
-                    LoopProcessor.rsync_data(pkt_time,
-                        self.cfg.skip_if_older_than, self.cfg.loop_data_dir,
-                        self.cfg.filename, self.cfg.remote_dir,
-                        self.cfg.remote_server, self.cfg.remote_port,
-                        self.cfg.timeout, self.cfg.remote_user,
-                        self.cfg.ssh_options, self.cfg.compress,
-                        self.cfg.log_success)
+                if self.rsync_uploader is not None:
+                    # Rsync the loop-data.txt file (in the background).
+                    self.rsync_uploader.upload(pkt_time, payload)
                 # Publish the loop-data to MQTT broker.
-                if self.cfg.mqtt_enable:
-                    LoopProcessor.publish_packet_to_broker(loopdata_pkt, self.cfg.mqtt_broker, self.cfg.mqtt_port,
-                        self.cfg.mqtt_topic, self.cfg.mqtt_user, self.cfg.mqtt_pass,
-                        self.cfg.mqtt_qos, self.cfg.mqtt_retain, self.cfg.mqtt_keepalive, self.cfg.mqtt_clientid, self.cfg.mqtt_unit_system)
+                if self.mqtt_publisher is not None:
+                    LoopProcessor.publish_packet_to_broker(loopdata_pkt, self.mqtt_publisher,
+                        self.cfg.mqtt_topic, self.cfg.mqtt_qos, self.cfg.mqtt_retain, self.cfg.mqtt_unit_system)
+                    if self.cfg.mqtt_log_stats_interval > 0 and time.time() - self.mqtt_stats_logged >= self.cfg.mqtt_log_stats_interval:
+                        self.mqtt_stats_logged = time.time()
+                        log.info('MQTT: Publisher statistics: %s' % self.mqtt_publisher.get_stats())
         except Exception:
             weeutil.logger.log_traceback(log.critical, "    ****  ")
             raise
@@ -1951,21 +2379,23 @@ class LoopProcessor:
 
     @staticmethod
     def write_packet_to_file(selective_pkt: Dict[str, Any], tmpname: str,
-            loop_data_dir: str, filename: str) -> None:
+            loop_data_dir: str, filename: str) -> str:
         log.debug('Writing packet to %s' % tmpname)
+        payload = json.dumps(selective_pkt)
         with open(tmpname, "w") as f:
-            f.write(json.dumps(selective_pkt))
+            f.write(payload)
             f.flush()
             os.fsync(f.fileno())
         log.debug('Wrote to %s' % tmpname)
         # move it to filename
         shutil.move(tmpname, os.path.join(loop_data_dir, filename))
         log.debug('Moved to %s' % os.path.join(loop_data_dir, filename))
+        return payload
 
     @staticmethod
-    def publish_packet_to_broker(selective_pkt: Dict[str, Any], mqtt_broker: str, mqtt_port: int, mqtt_topic: str,
-            mqtt_user: str, mqtt_pass: str, mqtt_qos: int, mqtt_retain: bool, mqtt_keepalive: int, mqtt_clientid: str, mqtt_unit_system: int) -> None:
-        log.debug('MQTT: Publish packet to MQTT Broker: %s:%s topic: %s' % (mqtt_broker, mqtt_port, mqtt_topic))
+    def publish_packet_to_broker(selective_pkt: Dict[str, Any], mqtt_publisher: MQTTPublisher, mqtt_topic: str,
+            mqtt_qos: int, mqtt_retain: bool, mqtt_unit_system: int) -> bool:
+        log.debug('MQTT: Publish packet to MQTT Broker: %s:%s topic: %s' % (mqtt_publisher.broker, mqtt_publisher.port, mqtt_topic))
         # insert current timestamp
         selective_pkt['dateTime'] = int(time.time())
         # insert unit system from target report
@@ -1973,9 +2403,8 @@ class LoopProcessor:
         # Publish packet to MQTT broker
         mqtt_payload = json.dumps(selective_pkt)
         try:
-            mqtt_publish.single(mqtt_topic, mqtt_payload, hostname=mqtt_broker, port=mqtt_port,
-                auth={'username': mqtt_user, 'password': mqtt_pass}, keepalive=mqtt_keepalive,
-                qos=mqtt_qos, retain=mqtt_retain, client_id=mqtt_clientid)
+            if not mqtt_publisher.publish(mqtt_topic, mqtt_payload, mqtt_qos, mqtt_retain):
+                return False
             log.debug('MQTT: Published packet.')
         except Exception as e:
             log.error('MQTT: An error occurred: %s' % str(e))
@@ -2007,6 +2436,7 @@ class LoopProcessor:
         log.info('ssh_options             : %s' % cfg.ssh_options)
         log.info('timeout                 : %d' % cfg.timeout)
         log.info('skip_if_older_than      : %d' % cfg.skip_if_older_than)
+        log.info('persist_connection      : %d' % cfg.persist_connection)
         log.info('time_delta              : %d' % cfg.time_delta)
         log.info('week_start              : %d' % cfg.week_start)
         log.info('rainyear_start          : %d' % cfg.rainyear_start)
@@ -2031,19 +2461,25 @@ class LoopProcessor:
         log.info('mqtt_retain             : %s' % cfg.mqtt_retain)
         log.info('mqtt_clientid           : %s' % cfg.mqtt_clientid)
         log.info('mqtt_unit_system        : %s' % cfg.mqtt_unit_system)
+        log.info('mqtt_max_queued         : %r' % cfg.mqtt_max_queued)
+        log.info('mqtt_min_delay          : %r' % cfg.mqtt_min_delay)
+        log.info('mqtt_max_delay          : %r' % cfg.mqtt_max_delay)
+        log.info('mqtt_log_stats_interval : %r' % cfg.mqtt_log_stats_interval)
+        log.info('snapshot_enable         : %s' % cfg.snapshot_enable)
+        log.info('snapshot_filename       : %s' % cfg.snapshot_filename)
 
     @staticmethod
     def rsync_data(pktTime: int, skip_if_older_than: int, loop_data_dir: str,
             filename: str, remote_dir: str, remote_server: str,
             remote_port: int, timeout: int, remote_user: str, ssh_options: str,
-            compress: bool, log_success: bool) -> None:
+            compress: bool, log_success: bool) -> bool:
         log.debug('rsync_data(%d) start' % pktTime)
         # Don't upload if more than skip_if_older_than seconds behind.
         if skip_if_older_than != 0:
             age = time.time() - pktTime
             if age > skip_if_older_than:
                 log.info('skipping packet (%s) with age: %f' % (timestamp_to_string(pktTime), age))
-                return
+                return False
         rsync_upload = weeutil.rsyncupload.RsyncUpload(
             local_root= os.path.join(loop_data_dir, filename),
             remote_root = os.path.join(remote_dir, filename),
@@ -2057,9 +2493,11 @@ class LoopProcessor:
             timeout=timeout)
         try:
             rsync_upload.run()
+            return True
         except IOError as e:
             (cl, unused_ob, unused_tr) = sys.exc_info()
             log.error("rsync_data: Caught exception %s: %s" % (cl, e))
+            return False
 
     @staticmethod
     def get_barometer_trend(value, unit_type, group_type, time_delta: int) -> BarometerTrend:
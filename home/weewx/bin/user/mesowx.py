@@ -30,6 +30,7 @@ except ImportError:
     import Queue as queue
 import json
 import itertools
+import os
 import time
 import threading
 import urllib3
@@ -159,6 +160,321 @@ class AbortAndExit(Exception):
     """
 
 
+class RecordJournal(object):
+    """
+    Records that could not be sent to the remote server, oldest first.
+
+    The records are kept in memory and mirrored to a file, one JSON record
+    per line, so they survive a restart. The journal is bounded, when it is
+    full the oldest records are dropped.
+    """
+
+    def __init__(self, path, max_records):
+        self.path = path
+        self.max_records = max_records
+        self.records = []
+        if self.path and os.path.exists(self.path):
+            with open(self.path) as journal_file:
+                for line in journal_file:
+                    try:
+                        self.records.append(json.loads(line))
+                    except ValueError:
+                        logerr("journal: skipping corrupt line in %s" %
+                               self.path)
+            if self.records:
+                loginf("journal: %d unsent records in %s" %
+                       (len(self.records), self.path))
+            self._trim()
+
+    def __len__(self):
+        return len(self.records)
+
+    def append(self, records):
+        self.records.extend(records)
+        if self._trim():
+            self._write()
+        elif self.path:
+            try:
+                with open(self.path, 'a') as journal_file:
+                    for record in records:
+                        journal_file.write(json.dumps(record) + '\n')
+            except (IOError, OSError) as e:
+                logerr("journal: unable to write %s: %s" % (self.path, e))
+
+    def remove(self, count):
+        """Remove the count oldest records (they have been sent)."""
+        del self.records[:count]
+        self._write()
+
+    def _trim(self):
+        dropped = len(self.records) - self.max_records
+        if dropped <= 0:
+            return False
+        logerr("journal: %s is full, dropping the %d oldest records" %
+               (self.path, dropped))
+        del self.records[:dropped]
+        return True
+
+    def _write(self):
+        if not self.path:
+            return
+        if not self.records:
+            if os.path.exists(self.path):
+                try:
+                    os.remove(self.path)
+                except OSError as e:
+                    logerr("journal: unable to remove %s: %s" % (self.path, e))
+            return
+        tmp_path = self.path + '.tmp'
+        try:
+            with open(tmp_path, 'w') as journal_file:
+                for record in self.records:
+                    journal_file.write(json.dumps(record) + '\n')
+            os.rename(tmp_path, self.path)
+        except (IOError, OSError) as e:
+            logerr("journal: unable to write %s: %s" % (self.path, e))
+
+
+class ArchiveJournal(object):
+    """
+    Archive records that could not be sent to the remote server.
+
+    The records are in the weewx database already, so only the range of
+    unsent records is kept and the records are read back from the database
+    when they are sent. Nothing is dropped and nothing needs to survive a
+    restart, back_fill sends the records the remote server is missing.
+    """
+
+    def __init__(self, manager_dict):
+        self.manager_dict = manager_dict
+        # the unsent records are the ones from first to last (dateTime)
+        self.first = None
+        self.last = None
+        self.count = 0
+        # the records read by the last call of records
+        self.read = []
+
+    def __len__(self):
+        return self.count
+
+    def append(self, records):
+        if self.first is None:
+            self.first = records[0]['dateTime']
+        self.last = records[-1]['dateTime']
+        self.count += len(records)
+
+    @property
+    def records(self):
+        """The unsent records, read from the database."""
+        if self.first is None:
+            return []
+        # a new connection, the journal is used by more than one thread
+        with weewx.manager.open_manager(self.manager_dict) as dbm:
+            self.read = [dict(zip(dbm.sqlkeys, row)) for row in dbm.genSql(
+                "select * from %s where dateTime >= ? and dateTime <= ? "
+                "order by dateTime asc" % dbm.table_name,
+                (self.first, self.last))]
+        self.count = len(self.read)
+        if not self.read:
+            self.first = self.last = None
+        return self.read
+
+    def remove(self, count):
+        """Remove the count oldest records (they have been sent)."""
+        self.first = self.read[count - 1]['dateTime'] + 1
+        del self.read[:count]
+        self.count -= count
+        if self.count <= 0:
+            self.first = self.last = None
+            self.count = 0
+
+
+class RecordBatcher(object):
+    """
+    Sends records to an entity on the remote server, several records (one
+    JSON array) per request over the keep-alive connections of http_pool.
+
+    Failed requests are retried with an exponential backoff. If the remote
+    server stays unreachable the records are spilled to a journal; while
+    the journal has records new records are appended to it, so the records
+    always reach the server in the order they were given.
+    """
+
+    # the shortest time to wait in seconds before sending the journal again
+    min_journal_retry_interval = 5
+
+    def __init__(self, http_pool, update_url, entity_id, security_key,
+                 exit_event, name, journal, batch_size=200, max_tries=3,
+                 retry_interval=0, max_backoff=600):
+        self.http_pool = http_pool
+        self.update_url = update_url
+        self.entity_id = entity_id
+        self.security_key = security_key
+        self.exit_event = exit_event
+        self.name = name
+        self.batch_size = max(batch_size, 1)
+        self.max_tries = max_tries
+        self.retry_interval = retry_interval
+        self.max_backoff = max_backoff
+        # a RecordJournal or an ArchiveJournal
+        self.journal = journal
+        # the number of failed attempts to send the journal in a row
+        self.journal_failures = 0
+        # the time the journal may be sent again
+        self.journal_retry_time = 0
+        self.lock = threading.Lock()
+
+    def sync(self, records, max_tries=None, retry_interval=None):
+        """
+        Send records (oldest first), or journal them if the remote server
+        can't be reached.
+        """
+        with self.lock:
+            if len(self.journal):
+                self.journal.append(records)
+                self._send_journal()
+                return
+            sent = 0
+            try:
+                for batch in self.batches(records):
+                    if not self._post(batch, max_tries, retry_interval):
+                        break
+                    sent += len(batch)
+            finally:
+                # also keeps the records when aborted while retrying
+                if sent < len(records):
+                    loginf("%s: remote server unavailable, journaling %d "
+                           "records" % (self.name, len(records) - sent))
+                    self.journal.append(records[sent:])
+                    self._schedule_journal_retry()
+
+    def flush(self):
+        """Send the journal, if it is due."""
+        with self.lock:
+            if len(self.journal):
+                self._send_journal()
+
+    def retry_delay(self):
+        """
+        Seconds until the journal is due to be sent, None if it is empty.
+        """
+        if not len(self.journal):
+            return None
+        return max(self.journal_retry_time - time.time(), 0)
+
+    def batches(self, records):
+        """
+        Split records into batches of at most batch_size records. The
+        server takes the columns of a request from its first record, so a
+        batch holds only records with the same fields.
+        """
+        batch = []
+        fields = None
+        for record in records:
+            record_fields = tuple(record)
+            if batch and (len(batch) >= self.batch_size or
+                          record_fields != fields):
+                yield batch
+                batch = []
+            batch.append(record)
+            fields = record_fields
+        if batch:
+            yield batch
+
+    def _send_journal(self):
+        if time.time() < self.journal_retry_time:
+            return
+        for batch in self.batches(list(self.journal.records)):
+            if not self._post(batch, 1):
+                self._schedule_journal_retry()
+                return
+            self.journal.remove(len(batch))
+        loginf("%s: sent all journaled records" % self.name)
+        self.journal_failures = 0
+        self.journal_retry_time = 0
+
+    def _schedule_journal_retry(self):
+        delay = min(max(self.retry_interval, self.min_journal_retry_interval)
+                    * 2 ** self.journal_failures, self.max_backoff)
+        self.journal_failures += 1
+        self.journal_retry_time = time.time() + delay
+        logdbg("%s: %d journaled records, sending again in %s seconds" %
+               (self.name, len(self.journal), delay))
+
+    def _post(self, batch, max_tries=None, retry_interval=None):
+        """
+        Post one batch. Returns False if the server can't be reached, True
+        otherwise (including records the server rejected).
+        """
+        if max_tries is None:
+            max_tries = self.max_tries
+        if retry_interval is None:
+            retry_interval = self.retry_interval
+        postdata = {'entity_id': self.entity_id,
+                    'data': json.dumps(batch),
+                    'security_key': self.security_key}
+        for count in range(max_tries):
+            try:
+                response = self.http_pool.request('POST', self.update_url,
+                                                  fields=postdata)
+                logdbg("%s: http response %s %s %s" %
+                       (self.name, response.status, response.reason,
+                        response.data))
+                if response.status == 200:
+                    return True
+                logerr("%s: http request failed (%s %s): %s" %
+                       (self.name, response.status, response.reason,
+                        response.data))
+                if response.status >= 500:
+                    if response.data.find(b'Duplicate entry') < 0:
+                        retry = True
+                    elif len(batch) > 1:
+                        # the whole batch was rolled back, send the records
+                        # one at a time to skip only the duplicates
+                        logdbg("%s: sending the records of the batch one at "
+                               "a time" % self.name)
+                        for record in batch:
+                            if not self._post([record], max_tries,
+                                              retry_interval):
+                                return False
+                        return True
+                    else:
+                        # Don't retry if Duplicate entry error
+                        return True
+                else:
+                    message = ("%s: Request to %s failed, server returned "
+                               "%s status with reason '%s'." %
+                               (self.name, self.update_url, response.status,
+                                response.reason))
+                    # invalid credentials
+                    if response.status == 403:
+                        message += " Do your entity security keys match?"
+                    # page not found
+                    if response.status == 404:
+                        message += " Is the url correct?"
+                    # bad request (likely an invalid setup)
+                    if response.status == 400:
+                        message += " Check your entity configuration."
+                    loginf(message)
+                    # don't retry on these errors, the records are skipped
+                    return True
+            except urllib3.exceptions.HTTPError as e:
+                logerr("%s: failed http request attempt #%d to %s" %
+                       (self.name, count+1, self.update_url))
+                logdbg("   ****  Reason: %s" % (e,))
+                retry = True
+            if retry and count+1 < max_tries:
+                # wait a bit before retrying, ensuring that we exit if signaled
+                delay = min(retry_interval * 2 ** count, self.max_backoff)
+                logdbg("%s: retrying again in %s seconds" % (self.name, delay))
+                if self.exit_event.wait(delay):
+                    logdbg("%s: exit event signaled, aborting" % self.name)
+                    raise AbortAndExit
+        loginf("%s: failed to invoke %s after %d tries" %
+               (self.name, self.update_url, max_tries))
+        return False
+
+
 class SyncService(weewx.engine.StdService):
     """
     Important...
@@ -185,8 +501,8 @@ class SyncService(weewx.engine.StdService):
         data sent immediately from packet (not db)
         failures are tolerated (errors will skip)
       thread
-        watches queue and publishes data to remote server
-        IO failures are logged and skipped
+        watches queue and publishes data to remote server in batches
+        IO failures are logged and the records journaled
 
     error handling
       3 general categories of errors:
@@ -348,9 +664,19 @@ class SyncService(weewx.engine.StdService):
     over and archive and/or loop values will be available as weewx generates
     them.
 
-    If the data flow to the remote server is interrupted, those records will
-    be permanently dropped. Loop are gone forever, archive records will be
-    available from the weewx database.
+    Records are sent in batches, everything that is queued (up to
+    raw_batch_size / archive_batch_size records) goes out in one request.
+    Set raw_batch_max_delay / archive_batch_max_delay (seconds) to wait for
+    more records before sending.
+
+    If the data flow to the remote server is interrupted, the loop records
+    are spilled to a journal (mesowx_raw.journal in journal_dir, default the
+    SQLite directory) and sent, in order, once the server is back. The
+    journal is bounded (raw_journal_max_records, default 2000), beyond that
+    the oldest records are dropped and are gone forever. Archive records are
+    not journaled, the unsent ones are read back from the weewx database
+    and sent, in order, once the server is back (or by the backfill after a
+    restart).
     (Loop values are already restricted to a 24 hour period before they are
     deleted from the database although 24 hours can be overridden in the
     weewx.conf [[Raw]] section).
@@ -468,17 +794,31 @@ class SyncService(weewx.engine.StdService):
         last_datetime_synced = None
         # Open default database
         self.dbm = self.engine.db_binder.get_manager()
+        # loop packets that can't be sent are journaled in this directory
+        # (default: the SQLite directory)
+        sync_params = dict(self.sync_config)
+        sync_params.setdefault('journal_dir', os.path.join(
+            config_dict['WEEWX_ROOT'],
+            config_dict.get('DatabaseTypes', {}).get('SQLite', {}).get(
+                'SQLITE_ROOT', 'archive')))
+        self.archive_thread = None
+        self.raw_thread = None
 
         # if an archive_entity_id is configured, then back-fill missed records
         # and bind & create the thead to sync archive records
         if self.entity_id:
-            # back_fill missed records on webserver
-            self.back_fill()
-            self.bind(weewx.NEW_ARCHIVE_RECORD, self.new_archive_record)
+            manager_dict = weewx.manager.get_manager_dict_from_config(
+                config_dict, 'wx_binding')
             self.archive_thread = ArchiveSyncThread(self.archive_queue,
                                                     self.exit_event,
                                                     self.http_pool,
-                                                    **self.sync_config)
+                                                    manager_dict,
+                                                    **sync_params)
+            # back_fill shares the batcher (and journal) of the thread
+            self.archive_batcher = self.archive_thread.batcher
+            # back_fill missed records on webserver
+            self.back_fill()
+            self.bind(weewx.NEW_ARCHIVE_RECORD, self.new_archive_record)
             self.archive_thread.start()
             loginf("remote sync of archive records is enabled")
         else:
@@ -491,7 +831,7 @@ class SyncService(weewx.engine.StdService):
             self.raw_thread = RawSyncThread(self.raw_queue,
                                             self.exit_event,
                                             self.http_pool,
-                                            **self.sync_config)
+                                            **sync_params)
             self.raw_thread.start()
             loginf("remote sync of raw (loop) records is enabled")
         else:
@@ -592,7 +932,8 @@ class SyncService(weewx.engine.StdService):
                 datadict = dict(zip(self.dbm.sqlkeys, row))
                 batch.append(datadict)
             if len(batch) > 0:
-                self.post_records(batch)
+                self.archive_batcher.sync(batch, self.http_max_tries,
+                                          self.http_retry_interval)
                 total_sent += len(batch)
                 last_datetime_synced = batch[len(batch)-1]['dateTime']
                 # XXX add start/end datetime to log message
@@ -646,17 +987,11 @@ class SyncService(weewx.engine.StdService):
             datetime = response[0][0]
         return datetime
 
-    def post_records(self, records):
-        datajson = json.dumps(records)
-        postdata = {'entity_id': self.entity_id, 'data': datajson,
-                    'security_key': self.security_key}
-        self.backfill_http_request(self.update_url, postdata)
-
     def backfill_http_request(self, url, postdata):
         # data.php (backfilling)
         for count in range(self.http_max_tries):
             try:
-                response = self.http_pool.request('POST', url, postdata)
+                response = self.http_pool.request('POST', url, fields=postdata)
                 logdbg("backfill: archive http response.data %s" %
                        response.data)
                 if response.status == 200:
@@ -744,6 +1079,25 @@ class SyncThread(threading.Thread):
         self.http_retry_interval = 0
         # the url that will be used to update data to on the remote server
         self.update_url = self.remote_server_url + self.update_url_path
+        # the max number of records to send in a request and the time in
+        # seconds to wait for more records to fill it, set by sub-classes
+        self.batch_size = 1
+        self.batch_max_delay = 0
+        # the RecordBatcher, must be set by sub-classes
+        self.batcher = None
+
+    def make_batcher(self, prefix, journal, **sync_params):
+        """Create the batcher once the sub-class has set its parameters."""
+        return RecordBatcher(
+            self.http_pool, self.update_url, self.entity_id,
+            self.security_key, self.exit_event, "remote %s" % prefix,
+            journal,
+            batch_size=self.batch_size,
+            max_tries=self.http_max_tries,
+            retry_interval=self.http_retry_interval,
+            # the longest time to wait in seconds between retries
+            # (default: 10 minutes)
+            max_backoff=float(sync_params.get('http_max_backoff', 600)))
 
     def run(self):
         try:
@@ -764,68 +1118,38 @@ class SyncThread(threading.Thread):
     def _run(self):
         pass
 
-    def post_records(self, records):
-        datajson = json.dumps(records)
-        postdata = {'entity_id': self.entity_id, 'data': datajson,
-                    'security_key': self.security_key}
-        self.make_http_request(self.update_url, postdata)
-
-    def make_http_request(self, url, postdata):
-        # updatedata.php (loop, raw data, real time)
-        for count in range(self.http_max_tries):
+    def get_records(self):
+        """
+        Wait for a record, then take the records queued after it, up to
+        batch_size records or until batch_max_delay seconds have passed.
+        Returns the records and whether the exit signal was received. While
+        records are journaled the wait ends when the journal is due.
+        """
+        records = []
+        try:
+            record = self.queue.get(timeout=self.batcher.retry_delay())
+        except queue.Empty:
+            return records, False
+        deadline = time.time() + self.batch_max_delay
+        while True:
+            self.queue.task_done()
+            # a value of None is a signal to exit
+            if record is None:
+                return records, True
+            records.append(record)
+            if len(records) >= self.batch_size:
+                return records, False
             try:
-                response = self.http_pool.request('POST', url, postdata)
-                logdbg("loop: http response.data %s" % response.data)
-                logdbg("loop: http response.status %s" % response.status)
-                logdbg("loop: http response.reason %s" % response.reason)
-                if response.status == 200:
-                    return response
+                remaining = deadline - time.time()
+                if remaining > 0:
+                    record = self.queue.get(timeout=remaining)
                 else:
-                    # from here must either set retry=True or raise a
-                    # FatalSyncError
-                    logerr("loop: http request failed (%s %s): %s" %
-                           (response.status,
-                            response.reason,
-                            response.data))
-                    if response.status >= 500:
-                        # Don't retry if Duplicate entry error
-                        if response.data.find(b'Duplicate entry') >= 0:
-                            # continue
-                            return response
-                        else:
-                            retry = True
-                    else:
-                        message = ("loop: Request to %s failed, server "
-                                   "returned %s status with reason '%s'." %
-                                   (url, response.status, response.reason))
-                        # invalid credentials
-                        if response.status == 403:
-                            message += " Do your entity security keys match?"
-                        # page not found
-                        if response.status == 404:
-                            message += " Is the url correct?"
-                        # bad request (likely an invalid setup)
-                        if response.status == 400:
-                            message += " Check your entity configuration."
-                        loginf(message)
-                        retry = False
-            except (urllib3.exceptions.NewConnectionError) as e:
-                logerr("loop: failed to connect to %s" % url)
-                logdbg("   ****  Reason: %s" % (e,))
-                retry = True  # maybe only a temporary outage.
-            except (urllib3.exceptions.MaxRetryError) as e:
-                logerr("loop: failed http request attempt #%d to %s" % (
-                       count+1, url))
-                logdbg("   ****  Reason: %s" % (e,))
-                retry = True
-            if retry and count+1 < self.http_max_tries:
-                # wait a bit before retrying, ensuring that we exit if signaled
-                logdbg("loop: retrying again in %s seconds" % (
-                       self.http_retry_interval,))
-                self._wait(self.http_retry_interval)
-        else:
-            loginf("loop: Failed to invoke %s after %d tries" % (
-                   url, self.http_max_tries))
+                    record = self.queue.get_nowait()
+            except queue.Empty:
+                return records, False
+
+    def post_records(self, records):
+        self.batcher.sync(records)
 
     def _wait(self, duration):
         if duration is not None:
@@ -849,6 +1173,22 @@ class RawSyncThread(SyncThread):
                                    self.http_retry_interval))
         # number of times to retry http requests (default: 1)
         self.http_max_tries = int(sync_params.get('raw_http_max_tries', 1))
+        # the max number of records to send in a request (default: 50)
+        self.batch_size = int(sync_params.get('raw_batch_size', 50))
+        # the time in seconds to wait for more records before sending
+        # (default: 0, send what is queued right away)
+        self.batch_max_delay = float(sync_params.get('raw_batch_max_delay',
+                                                     0))
+        # loop packets are in no database, unsent ones are journaled to a
+        # file in journal_dir, at most raw_journal_max_records
+        # (default: 2000)
+        journal_path = None
+        if sync_params.get('journal_dir'):
+            journal_path = os.path.join(sync_params['journal_dir'],
+                                        'mesowx_raw.journal')
+        journal = RecordJournal(journal_path, int(sync_params.get(
+                                'raw_journal_max_records', 2000)))
+        self.batcher = self.make_batcher('raw', journal, **sync_params)
         self.debug_count = 0
         self.max_times_to_print = 5
 
@@ -858,32 +1198,29 @@ class RawSyncThread(SyncThread):
     def sync_queued_records(self):
         logdbg("sync raw: waiting for new records")
         while True:
+            raw_records, exit_signaled = self.get_records()
             try:
-                # XXX always empty the queue - send as a batch
-                # XXX option to always send in a batch, wait for X records
-                # before sending
-                raw_record = self.queue.get()
-                # a value of None is a signal to exit
-                if raw_record is None:
-                    logdbg("remote raw: exit event signaled, exiting "
-                           "queue loop")
-                    raise AbortAndExit
-                self.debug_count += 1
-                if self.debug_count <= self.max_times_to_print:
-                    logdbg("remote raw: send record %s" %
-                           (weeutil.weeutil.timestamp_to_string(
-                            raw_record['dateTime'])))
-                if self.debug_count == self.max_times_to_print:
-                    logdbg("remote raw: print message above only the "
-                           "first %s times" %
-                           self.max_times_to_print)
-                self.post_records(raw_record)
+                if raw_records:
+                    self.debug_count += 1
+                    if self.debug_count <= self.max_times_to_print:
+                        logdbg("remote raw: send %d records up to %s" %
+                               (len(raw_records),
+                                weeutil.weeutil.timestamp_to_string(
+                                 raw_records[-1]['dateTime'])))
+                    if self.debug_count == self.max_times_to_print:
+                        logdbg("remote raw: print message above only the "
+                               "first %s times" %
+                               self.max_times_to_print)
+                    self.post_records(raw_records)
+                elif not exit_signaled:
+                    self.batcher.flush()
             except SyncError as e:
-                logerr("remote raw: unable to sync record, skipping")
+                logerr("remote raw: unable to sync records, skipping")
                 logerr("   ****  Reason: %s" % (e,))
-            finally:
-                # mark the queue item as done whether it succeeded or not
-                self.queue.task_done()
+            if exit_signaled:
+                logdbg("remote raw: exit event signaled, exiting "
+                       "queue loop")
+                raise AbortAndExit
 
 
 class ArchiveSyncThread(SyncThread):
@@ -893,7 +1230,8 @@ class ArchiveSyncThread(SyncThread):
     #    query for latest remote date
     #    send data since that date
     #    then load data from queue
-    def __init__(self, queue, exit_event, http_pool, **sync_params):
+    def __init__(self, queue, exit_event, http_pool, manager_dict,
+                 **sync_params):
         SyncThread.__init__(self, queue, exit_event, http_pool,
                             "ArchiveSyncThread", **sync_params)
 
@@ -916,6 +1254,16 @@ class ArchiveSyncThread(SyncThread):
         # (default: 15 minutes)
         self.failure_retry_interval = float(sync_params.get(
                                       'archive_failure_retry_interval', 900))
+        # the max number of records to send in a request (default: 200)
+        self.batch_size = int(sync_params.get('archive_batch_size', 200))
+        # the time in seconds to wait for more records before sending
+        # (default: 0, send what is queued right away)
+        self.batch_max_delay = float(sync_params.get(
+                               'archive_batch_max_delay', 0))
+        # unsent archive records are read back from the weewx database
+        self.batcher = self.make_batcher('archive',
+                                         ArchiveJournal(manager_dict),
+                                         **sync_params)
         # the url that will be used to query for the latest dateTime on the
         # remote server
         self.latest_url = self.remote_server_url + self.server_data_path
@@ -939,13 +1287,9 @@ class ArchiveSyncThread(SyncThread):
         global last_datetime_synced
         logdbg("remote archive: waiting for new records")
         while True:
-            try:
-                archive_record = self.queue.get()
-                # a value of None is a signal to exit
-                if archive_record is None:
-                    logdbg("remote archive: exit event signaled, "
-                           "exiting queue loop")
-                    raise AbortAndExit
+            archive_records, exit_signaled = self.get_records()
+            to_send = []
+            for archive_record in archive_records:
                 logdbg("remote archive: get record %s; last synced %s" %
                        (weeutil.weeutil.timestamp_to_string(
                         archive_record['dateTime']),
@@ -960,10 +1304,15 @@ class ArchiveSyncThread(SyncThread):
                     logdbg("remote archive: send record %s" %
                            weeutil.weeutil.timestamp_to_string(
                             archive_record['dateTime']))
-                    self.post_records(archive_record)
-            finally:
-                # mark the queue item as done whether it succeeded or not
-                self.queue.task_done()
+                    to_send.append(archive_record)
+            if to_send:
+                self.post_records(to_send)
+            elif not exit_signaled:
+                self.batcher.flush()
+            if exit_signaled:
+                logdbg("remote archive: exit event signaled, "
+                       "exiting queue loop")
+                raise AbortAndExit
 
 ###############################
 # start of original raw.0.4.1-lh.py script
@@ -0,0 +1,295 @@
+#!/usr/bin/python3
+"""
+mesowx_test.py
+
+Tests of the remote sync of mesowx.py (RecordBatcher, RecordJournal,
+ArchiveJournal, RawSyncThread, ArchiveSyncThread and SyncService.back_fill)
+against a local HTTP stand-in for updateData.php and data.php.
+
+The stand-in counts the requests and the connections, refuses the requests
+while it is down, takes the insert columns from the first record of a
+request and rolls a whole request back on a duplicate entry, as the PHP
+server does.
+
+Run it with the python of weewx, from any directory:
+
+    python3 mesowx_test.py
+"""
+
+import email.parser
+import email.policy
+import http.server
+import json
+import logging
+import os
+import queue
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import configobj
+import urllib3
+
+import weewx
+import weewx.manager
+import user.mesowx as mesowx
+
+
+class StandIn(object):
+    """What the stand-in server has stored and seen."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            # entity_id -> [dateTime, ...] in the order of insertion
+            self.stored = {}
+            self.down = False
+            self.requests = 0
+            # the time of each update request
+            self.request_times = []
+            self.connections = set()
+
+
+stand_in = StandIn()
+
+
+class Handler(http.server.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def reply(self, status, body=b''):
+        self.send_response(status)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers['Content-Length']))
+        message = email.parser.BytesParser(policy=email.policy.default).parsebytes(
+            b'Content-Type: ' + self.headers['Content-Type'].encode() + b'\r\n\r\n' + body)
+        form = {part.get_param('name', header='content-disposition'): part.get_content()
+                for part in message.iter_parts()}
+        with stand_in.lock:
+            stand_in.requests += 1
+            stand_in.connections.add(self.client_address[1])
+            if stand_in.down:
+                stand_in.request_times.append(time.time())
+                return self.reply(503, b'down')
+            stored = stand_in.stored.setdefault(form['entity_id'], [])
+            if self.path.endswith('data.php'):
+                return self.reply(200, json.dumps([[max(stored)]] if stored else []).encode())
+            stand_in.request_times.append(time.time())
+            records = json.loads(form['data'])
+            if any(list(record) != list(records[0]) for record in records):
+                return self.reply(400, b'All records must have the same columns')
+            if any(record['dateTime'] in stored for record in records):
+                # the transaction of the request is rolled back
+                return self.reply(500, b"SQLSTATE[23000]: Duplicate entry")
+            stored.extend(record['dateTime'] for record in records)
+            return self.reply(200)
+
+
+def wait_for(condition, timeout=20):
+    end = time.time() + timeout
+    while not condition() and time.time() < end:
+        time.sleep(0.02)
+    return condition()
+
+
+def make_batcher(pool, url, journal, **kwargs):
+    return mesowx.RecordBatcher(pool, url + 'updateData.php', 'raw', 'key',
+                                threading.Event(), 'test', journal, **kwargs)
+
+
+def test_batching(pool, url, journal_dir):
+    """Queued loop packets go out in batches over one connection, in order."""
+    stand_in.reset()
+    params = dict(remote_server_url=url, raw_entity_id='raw', raw_security_key='key',
+                  journal_dir=journal_dir, raw_batch_size='50', raw_batch_max_delay='0.05')
+    sync_queue = queue.Queue()
+    thread = mesowx.RawSyncThread(sync_queue, threading.Event(), pool, **params)
+    thread.start()
+    sent = []
+    for i in range(1000):
+        record = {'dateTime': 1700000000 + i, 'usUnits': 1, 'outTemp': i * 0.1}
+        # a record with other fields starts a new batch
+        if i % 300 == 299:
+            record['extraTemp1'] = 1.0
+        sync_queue.put(record)
+        sent.append(record['dateTime'])
+    wait_for(lambda: stand_in.stored.get('raw') == sent)
+    sync_queue.put(None)
+    thread.join(10)
+    assert stand_in.stored.get('raw') == sent, "records lost or out of order"
+    assert stand_in.requests <= 1000 // 50 + 2 * 3 + 1, "%d requests" % stand_in.requests
+    assert len(stand_in.connections) == 1, "%d connections" % len(stand_in.connections)
+    print("batching: %d records in %d requests over %d connection" % (
+        len(sent), stand_in.requests, len(stand_in.connections)))
+
+
+def test_backoff(pool, url):
+    """A failed request is retried with a doubling delay, capped at max_backoff."""
+    stand_in.reset()
+    stand_in.down = True
+    batcher = make_batcher(pool, url, mesowx.RecordJournal(None, 100),
+                           max_tries=5, retry_interval=0.1, max_backoff=0.3)
+    batcher.sync([{'dateTime': 1, 'usUnits': 1}])
+    gaps = [b - a for a, b in zip(stand_in.request_times, stand_in.request_times[1:])]
+    assert len(gaps) == 4, gaps
+    for gap, delay in zip(gaps, [0.1, 0.2, 0.3, 0.3]):
+        assert delay <= gap < delay + 0.1, gaps
+    # the journal is sent again later, with a doubling delay as well
+    assert len(batcher.journal) == 1
+    first_delay = batcher.retry_delay()
+    batcher.journal_retry_time = 0
+    batcher.flush()
+    assert batcher.retry_delay() > first_delay * 1.5, (first_delay, batcher.retry_delay())
+    print("backoff: retries after %s seconds" % ", ".join("%.2f" % gap for gap in gaps))
+
+
+def test_journal_restart(pool, url, journal_dir):
+    """Records journaled while the server is down survive a restart and go first."""
+    stand_in.reset()
+    stand_in.down = True
+    params = dict(remote_server_url=url, raw_entity_id='raw', raw_security_key='key',
+                  journal_dir=journal_dir, raw_journal_max_records='80')
+    path = os.path.join(journal_dir, 'mesowx_raw.journal')
+    sync_queue = queue.Queue()
+    thread = mesowx.RawSyncThread(sync_queue, threading.Event(), pool, **params)
+    thread.start()
+    first = [{'dateTime': 1800000000 + i, 'usUnits': 1, 'outTemp': 1.0} for i in range(100)]
+    for record in first:
+        sync_queue.put(record)
+    wait_for(lambda: sync_queue.empty())
+    sync_queue.put(None)
+    thread.join(10)
+    # the journal is bounded, the oldest records are dropped
+    with open(path) as journal_file:
+        lines = journal_file.read().splitlines()
+    assert [json.loads(line)['dateTime'] for line in lines] == [r['dateTime'] for r in first[20:]]
+
+    stand_in.down = False
+    sync_queue = queue.Queue()
+    thread = mesowx.RawSyncThread(sync_queue, threading.Event(), pool, **params)
+    assert len(thread.batcher.journal) == 80
+    thread.start()
+    second = [{'dateTime': 1800000100 + i, 'usUnits': 1, 'outTemp': 2.0} for i in range(50)]
+    for record in second:
+        sync_queue.put(record)
+    expected = [r['dateTime'] for r in first[20:] + second]
+    wait_for(lambda: stand_in.stored.get('raw') == expected)
+    sync_queue.put(None)
+    thread.join(10)
+    assert stand_in.stored.get('raw') == expected, "records lost or out of order"
+    assert not os.path.exists(path), "journal not removed"
+    print("journal: 80 of 100 records kept, sent before the new records after the restart")
+
+
+def test_duplicate_entry(pool, url):
+    """A batch rolled back by a duplicate entry is sent again record by record."""
+    stand_in.reset()
+    stand_in.stored['raw'] = [1005]
+    batcher = make_batcher(pool, url, mesowx.RecordJournal(None, 100))
+    batcher.sync([{'dateTime': 1000 + i, 'usUnits': 1} for i in range(10)])
+    assert stand_in.stored['raw'] == [1005] + [1000 + i for i in range(10) if i != 5]
+    assert stand_in.requests == 1 + 10, "%d requests" % stand_in.requests
+    assert not len(batcher.journal)
+    print("duplicate entry: 9 of 10 records stored in %d requests" % stand_in.requests)
+
+
+class Binder(object):
+    def __init__(self, dbm):
+        self.dbm = dbm
+
+    def get_manager(self, *args, **kwargs):
+        return self.dbm
+
+
+class Engine(object):
+    def __init__(self, dbm):
+        self.db_binder = Binder(dbm)
+
+    def bind(self, event_type, callback):
+        pass
+
+
+def test_archive(url, root):
+    """back_fill and the archive thread send every archive record once, in
+    order, and after an outage the unsent records come from the database."""
+    stand_in.reset()
+    config_dict = configobj.ConfigObj({
+        'WEEWX_ROOT': root,
+        'DatabaseTypes': {'SQLite': {'driver': 'weedb.sqlite', 'SQLITE_ROOT': root}},
+        'Databases': {'archive_sqlite': {'database_name': 'weewx.sdb',
+                                         'database_type': 'SQLite'}},
+        'DataBindings': {'wx_binding': {'database': 'archive_sqlite',
+                                        'table_name': 'archive',
+                                        'manager': 'weewx.manager.Manager',
+                                        'schema': 'schemas.wview_extended.schema'}},
+        'Mesowx': {'RemoteSync': {'remote_server_url': url,
+                                  'archive_entity_id': 'archive',
+                                  'archive_security_key': 'key',
+                                  'archive_batch_size': '100',
+                                  'archive_batch_send_interval': '0',
+                                  'archive_http_max_tries': '2',
+                                  'archive_http_retry_interval': '0.01',
+                                  'http_max_backoff': '0.2'}}})
+    records = [{'dateTime': 1700000000 + 300 * i, 'usUnits': 1, 'interval': 5,
+                'outTemp': float(i)} for i in range(500)]
+    dbm = weewx.manager.open_manager_with_config(config_dict, 'wx_binding',
+                                                 initialize=True)
+    dbm.addRecord(records)
+    # the remote server has the first 200 records
+    stand_in.stored['archive'] = [r['dateTime'] for r in records[:200]]
+    service = mesowx.SyncService(Engine(dbm), config_dict)
+    assert stand_in.stored['archive'] == [r['dateTime'] for r in records]
+
+    # the server goes down, the new records are in the database only
+    stand_in.down = True
+    new = [{'dateTime': records[-1]['dateTime'] + 300 * (i + 1), 'usUnits': 1,
+            'interval': 5, 'outTemp': 5.0} for i in range(30)]
+    for i, record in enumerate(new):
+        if i == 20:
+            stand_in.down = False
+        dbm.addRecord(record)
+        service.new_archive_record(weewx.Event(weewx.NEW_ARCHIVE_RECORD, record=record))
+        time.sleep(0.02)
+    expected = [r['dateTime'] for r in records + new]
+    wait_for(lambda: stand_in.stored['archive'] == expected)
+    service.shutDown()
+    dbm.close()
+    assert stand_in.stored['archive'] == expected, "records lost or out of order"
+    assert not len(service.archive_batcher.journal)
+    assert not any(name.endswith('.journal') for name in os.listdir(root))
+    print("archive: 300 records back-filled, 30 new records sent after an outage")
+
+
+if __name__ == '__main__':
+
+    logging.basicConfig(level=logging.CRITICAL)
+    mesowx.RecordBatcher.min_journal_retry_interval = 0.05
+
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = 'http://127.0.0.1:%d/' % server.server_port
+    pool = urllib3.connectionpool.connection_from_url(url, maxsize=2)
+    root = tempfile.mkdtemp()
+    try:
+        test_batching(pool, url, root)
+        test_backoff(pool, url)
+        test_journal_restart(pool, url, root)
+        test_duplicate_entry(pool, url)
+        test_archive(url, root)
+    finally:
+        shutil.rmtree(root)
+        server.shutdown()
+    print("all tests passed")
@@ -50,6 +50,15 @@ Configuration:
         # Default is None.
         password = None
 
+        # The number of queued rows read and published per round trip.
+        # The rows are deleted once the broker acknowledged all of their messages.
+        # Default is 100.
+        batch_size = 100
+
+        # Seconds to wait for the broker to acknowledge a batch, before it is published again.
+        # Default is 30.
+        ack_timeout = 30
+
         [[[Topics]]]
             [[[[first/topic]]]]
             # Controls if the topic is published.
@@ -540,8 +549,9 @@ class MQTTPublish(object):
         """ Delete messages that have been published. """
         self.mqtt_dbm.getSql("delete from archive where pub_dateTime is not null;")
 
-    def publish_message(self, time_stamp, prev_mid, guarantee_delivery, qos, retain, topic, data):
-        """ Publish the message. """
+    def publish_message(self, time_stamp, prev_mid, guarantee_delivery, qos, retain, topic, data, loop=True):
+        """ Publish the message.
+            With loop False, running the network loop is left to the caller (see wait_for_published). """
         # pylint: disable=too-many-arguments
         if not self.connected:
             self._reconnect()
@@ -556,7 +566,26 @@ class MQTTPublish(object):
                 "INSERT INTO archive (dateTime, prevMid, proc_dateTime, mid, rc, qos, topic, data) VALUES (?, ?, ?, ?, ?, ?, ?, ?);",
                 [time_stamp, prev_mid, time.time(), mqtt_message_info.mid, mqtt_message_info.rc, qos, topic, data])
 
-        self.client.loop(timeout=0.1)
+        if loop:
+            self.client.loop(timeout=0.1)
+
+        return mqtt_message_info
+
+    def wait_for_published(self, message_infos, timeout):
+        """ Run the network loop until all messages are acknowledged (qos 1, 2) or written (qos 0).
+            Returns False if that did not happen within timeout seconds. """
+        end_time = time.time() + timeout
+        pending = message_infos
+        while True:
+            for message_info in pending:
+                if message_info.rc != mqtt.MQTT_ERR_SUCCESS:
+                    return False
+            pending = [message_info for message_info in pending if not message_info.is_published()]
+            if not pending:
+                return True
+            if time.time() > end_time:
+                return False
+            self.client.loop(timeout=0.1)
 
     def wait_for_inflight_messages(self):
         """ Wait for acknowledgement that messages have been published. """
@@ -949,40 +978,46 @@ class AbstractPublishThread(threading.Thread):
 
         return name, formatted_value
 
-    def publish_row(self, time_stamp, data, topics):
-        """ Publish the data. """
+    def publish_row(self, time_stamp, data, topics, loop=True):
+        """ Publish the data, returns the MQTTMessageInfo of the published messages. """
         record = data
+        message_infos = []
 
         for topic in topics:
             if topics[topic]['type'] == 'json':
                 updated_record = self.update_record(topics[topic], record)
-                self.mqtt_publish.publish_message(time_stamp,
-                                                  0,
-                                                  topics[topic]['guarantee_delivery'],
-                                                  topics[topic]['qos'],
-                                                  topics[topic]['retain'],
-                                                  topic,
-                                                  json.dumps(updated_record))
+                message_infos.append(self.mqtt_publish.publish_message(time_stamp,
+                                                                       0,
+                                                                       topics[topic]['guarantee_delivery'],
+                                                                       topics[topic]['qos'],
+                                                                       topics[topic]['retain'],
+                                                                       topic,
+                                                                       json.dumps(updated_record),
+                                                                       loop))
             if topics[topic]['type'] == 'keyword':
                 updated_record = self.update_record(topics[topic], record)
                 data_keyword = ', '.join("%s=%s" % (key, val) for (key, val) in updated_record.items())
-                self.mqtt_publish.publish_message(time_stamp,
-                                                  0,
-                                                  topics[topic]['guarantee_delivery'],
-                                                  topics[topic]['qos'],
-                                                  topics[topic]['retain'],
-                                                  topic,
-                                                  data_keyword)
+                message_infos.append(self.mqtt_publish.publish_message(time_stamp,
+                                                                       0,
+                                                                       topics[topic]['guarantee_delivery'],
+                                                                       topics[topic]['qos'],
+                                                                       topics[topic]['retain'],
+                                                                       topic,
+                                                                       data_keyword,
+                                                                       loop))
             if topics[topic]['type'] == 'individual':
                 updated_record = self.update_record(topics[topic], record)
                 for key in updated_record:
-                    self.mqtt_publish.publish_message(time_stamp,
-                                                      0,
-                                                      topics[topic]['guarantee_delivery'],
-                                                      topics[topic]['qos'],
-                                                      topics[topic]['retain'],
-                                                      topic + '/' + key,
-                                                      updated_record[key])
+                    message_infos.append(self.mqtt_publish.publish_message(time_stamp,
+                                                                           0,
+                                                                           topics[topic]['guarantee_delivery'],
+                                                                           topics[topic]['qos'],
+                                                                           topics[topic]['retain'],
+                                                                           topic + '/' + key,
+                                                                           updated_record[key],
+                                                                           loop))
+
+        return message_infos
 
 class PublishQueueThread(AbstractPublishThread):
     """ Publish to MQTT from an external/persistent queue. """
@@ -1000,7 +1035,8 @@ class PublishQueueThread(AbstractPublishThread):
         self.binding = self.service_dict.get('data_binding', 'ext_queue_binding')
         self.mqtt_binding = self.service_dict.get('mqtt_data_binding', 'mqtt_queue_binding')
 
-        self.catchup_count = int(self.service_dict.get('catchup_count', 10))
+        self.batch_size = to_int(self.service_dict.get('batch_size', 100))
+        self.ack_timeout = to_float(self.service_dict.get('ack_timeout', 30))
 
         self.keepalive = to_int(self.service_dict.get('keepalive', 60))
         self.wait_before_retry = float(self.service_dict.get('wait_before_retry', 2))
@@ -1012,6 +1048,8 @@ class PublishQueueThread(AbstractPublishThread):
         loginf(self.publish_type, "Wait before retry is %i" % self.wait_before_retry)
         loginf(self.publish_type, "Publish interval is %i" % self.publish_interval)
         loginf(self.publish_type, "Publish delay is %i" % self.publish_delay)
+        loginf(self.publish_type, "Batch size is %i" % self.batch_size)
+        loginf(self.publish_type, "Acknowledge timeout is %i" % self.ack_timeout)
 
         self.topics_loop, self.topics_archive = self.configure_topics(self.service_dict)
 
@@ -1023,6 +1061,10 @@ class PublishQueueThread(AbstractPublishThread):
         self.dbm = None
         self.mqtt_dbm = None
 
+        # Published rows whose delete failed, retried with the next batch.
+        # The queue is always read from its head, these rows are skipped.
+        self.pending_deletes = []
+
     def run(self):
         self.running = True
         logdbg(self.publish_type, "Threadid of PublishQueueThread: %s" % gettid())
@@ -1042,17 +1084,12 @@ class PublishQueueThread(AbstractPublishThread):
         self.catchup()
 
         while self.running:
-            row = self.dbm.getSql("SELECT dateTime, data, dataType FROM archive ORDER BY dateTime  ASC LIMIT 1;")
-            if row:
-                time_stamp, data, data_type = row
-                self.run_sql("Delete from archive where dateTime == ?", [time_stamp])
-                if data_type == 'loop':
-                    self.publish_row(time_stamp, json.loads(data), self.topics_loop)
-                elif data_type == 'archive':
-                    self.publish_row(time_stamp, json.loads(data), self.topics_archive)
-                else:
-                    logerr(self.publish_type, "Unknown data type, %s" % data_type)
-            else:
+            row_count = self.publish_batch()
+            if row_count is None:
+                # Not acknowledged, publish the batch again after a while.
+                self.threading_event.wait(self.wait_before_retry)
+                self.threading_event.clear()
+            elif row_count == 0:
                 if self.publish_interval:
                     archive_start = weeutil.weeutil.startOfInterval(time.time(), self.publish_interval)
                     archive_end = archive_start + self.publish_interval
@@ -1089,33 +1126,61 @@ class PublishQueueThread(AbstractPublishThread):
 
     def catchup(self):
         """ Catchup by processing the external queue. """
-        row_count, = self.dbm.getSql("SELECT COUNT(*) from archive;")
+        start_time = time.time()
+        total = 0
+        while self.running:
+            row_count = self.publish_batch()
+            if not row_count:
+                break
+            total += row_count
+            logdbg(self.publish_type, "catchup %i rows" % total)
+
+        if total:
+            loginf(self.publish_type, "catchup published %i rows in %.1f seconds" % (total, time.time() - start_time))
+
+    def publish_batch(self):
+        """ Publish the next batch_size rows of the external queue.
+            The rows are deleted, in one transaction, after the broker acknowledged all of their messages.
+            Returns the number of rows published, 0 if the queue is empty and None if the batch was not acknowledged. """
+        # Rows can be committed with a dateTime older than the ones already published,
+        # so no watermark is kept. Everything still in the table is unpublished except
+        # the pending deletes. dateTime is the primary key, so this is an index scan.
+        pending = set(self.pending_deletes)
+        rows = [row for row in self.dbm.genSql("SELECT dateTime, dataType, data FROM archive ORDER BY dateTime ASC LIMIT ?;",
+                                               [self.batch_size + len(pending)])
+                if row[0] not in pending][:self.batch_size]
+        if not rows:
+            return 0
+
+        message_infos = []
+        for time_stamp, data_type, data in rows:
+            if data_type == 'loop':
+                message_infos.extend(self.publish_row(time_stamp, json.loads(data), self.topics_loop, loop=False))
+            elif data_type == 'archive':
+                message_infos.extend(self.publish_row(time_stamp, json.loads(data), self.topics_archive, loop=False))
+            else:
+                logerr(self.publish_type, "Unknown data type, %s" % data_type)
 
-        while row_count > self.catchup_count:
-            rows = list(self.dbm.genSql("SELECT dateTime, dataType, data FROM archive ORDER BY dateTime  ASC;"))
+        if not self.mqtt_publish.wait_for_published(message_infos, self.ack_timeout):
+            logerr(self.publish_type, "Batch of %i rows starting at %s was not acknowledged" % (len(rows), rows[0][0]))
+            return None
 
-            i = 1
-            for row in rows:
-                time_stamp, data_type, data = row
-                self.run_sql("Delete from archive where dateTime == ?", [time_stamp])
-                if data_type == 'loop':
-                    self.publish_row(time_stamp, json.loads(data), self.topics_loop)
-                if data_type == 'archive':
-                    self.publish_row(time_stamp, json.loads(data), self.topics_archive)
-                i += 1
-                logdbg(self.publish_type, "catchup %i of %i" % (i, len(rows)))
+        self.pending_deletes.extend([row[0] for row in rows])
+        self.delete_rows()
+        return len(rows)
 
-            row_count, = self.dbm.getSql("SELECT COUNT(*) from archive;")
-
-    def run_sql(self, sql, variables):
-        """ Run the SQL and deal with locks. """
+    def delete_rows(self):
+        """ Delete the published rows in one transaction and deal with locks. """
         try:
-            self.dbm.getSql(sql, variables)
+            with weedb.Transaction(self.dbm.connection) as cursor:
+                for time_stamp in self.pending_deletes:
+                    cursor.execute("DELETE FROM archive WHERE dateTime = ?;", (time_stamp,))
+            self.pending_deletes = []
         except weedb.OperationalError as exception:
-            logerr(self.publish_type, exception)
             msg = str(exception).lower()
             if msg.startswith("database is locked"):
-                pass
+                # keep them, they are deleted with the next batch
+                logerr(self.publish_type, exception)
             else:
                 logerr(self.publish_type, exception)
                 raise exception
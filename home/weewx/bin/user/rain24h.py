@@ -15,7 +15,7 @@ import sys
 import time
 
 from dataclasses import dataclass
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
 import weewx
 import weewx.manager
@@ -28,6 +28,11 @@ from weeutil.weeutil import to_float
 from weeutil.weeutil import to_int
 from weewx.engine import StdService
 
+try:
+    from user.recentarchive import recent_archive
+except ImportError:
+    recent_archive = None
+
 # get a logger object
 log = logging.getLogger(__name__)
 
@@ -71,6 +76,9 @@ class Rain24h(StdService):
         self.debit_list : List[FutureDebit] = []
         self.initialized = False
 
+        if recent_archive is not None:
+            recent_archive.subscribe(86400)
+
         self.bind(weewx.PRE_LOOP, self.pre_loop)
         self.bind(weewx.NEW_LOOP_PACKET, self.new_loop)
 
@@ -80,29 +88,34 @@ class Rain24h(StdService):
         self.initialized = True
 
         try:
-            binder = weewx.manager.DBBinder(self.config_dict)
-            binding = self.config_dict.get('StdReport')['data_binding']
-            dbm = binder.get_manager(binding)
-            # Get the column names of the archive table.
-            archive_columns: List[str] = dbm.connection.columnsOf('archive')
-
             # Get archive records to prime 24h rainfall.
             earliest_time: int = to_int(time.time()) - 86400
             log.debug('Earliest time selected is %s' % timestamp_to_string(earliest_time))
 
-            # Fetch the records.
+            # Fetch the records, from the shared RecentArchive store if available.
             start = time.time()
-            archive_pkts: List[Dict[str, Any]] = Rain24h.get_archive_packets(
-                dbm, archive_columns, earliest_time)
+            columns: Optional[Dict[str, List[Any]]] = None
+            if recent_archive is not None:
+                columns = recent_archive.get_columns(earliest_time, ['dateTime', 'rain'])
+            if columns is None:
+                binder = weewx.manager.DBBinder(self.config_dict)
+                binding = self.config_dict.get('StdReport')['data_binding']
+                dbm = binder.get_manager(binding)
+                # Get the column names of the archive table.
+                archive_columns: List[str] = dbm.connection.columnsOf('archive')
+                archive_pkts: List[Dict[str, Any]] = Rain24h.get_archive_packets(
+                    dbm, archive_columns, earliest_time)
+                columns = {
+                    'dateTime': [pkt['dateTime'] for pkt in archive_pkts],
+                    'rain'    : [pkt.get('rain') for pkt in archive_pkts]}
 
             # Save packets as appropriate.
             pkt_count = 0
-            for pkt in archive_pkts:
-                pkt_time = pkt['dateTime']
+            for pkt_time, rain in zip(columns['dateTime'], columns['rain']):
                 one_day_later = pkt_time + 86400
-                if 'rain' in pkt and pkt['rain'] is not None and pkt['rain'] > 0.0:
-                    self.total_rain += pkt['rain']
-                    self.debit_list.append(FutureDebit(timestamp = one_day_later, amount = pkt['rain']))
+                if rain is not None and rain > 0.0:
+                    self.total_rain += rain
+                    self.debit_list.append(FutureDebit(timestamp = one_day_later, amount = rain))
                     pkt_count += 1
             log.debug('Collected %d archive packets containing rain in %f seconds.' % (pkt_count, time.time() - start))
         except Exception as e:
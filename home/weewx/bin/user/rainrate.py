@@ -45,6 +45,11 @@ from weeutil.weeutil import to_bool
 from weeutil.weeutil import to_int
 from weewx.engine import StdService
 
+try:
+    from user.recentarchive import recent_archive
+except ImportError:
+    recent_archive = None
+
 # get a logger object
 log = logging.getLogger(__name__)
 
@@ -109,6 +114,9 @@ class RainRate(StdService):
         # Flag used to gather up archive records in pre_loop only once (at startup).
         self.initialized = False
 
+        if recent_archive is not None:
+            recent_archive.subscribe(900)
+
         self.bind(weewx.PRE_LOOP, self.pre_loop)
         self.bind(weewx.NEW_LOOP_PACKET, self.new_loop)
         self.bind(weewx.NEW_ARCHIVE_RECORD, self.new_archive_record)
@@ -121,21 +129,27 @@ class RainRate(StdService):
         self.initialized = True
 
         try:
-            binder = weewx.manager.DBBinder(self.config_dict)
-            binding = self.config_dict.get('StdReport')['data_binding']
-            dbm = binder.get_manager(binding)
-            # Get the column names of the archive table.
-            archive_columns: List[str] = dbm.connection.columnsOf('archive')
-
             # Get last n seconds of archive records.
             earliest_time: int = to_int(time.time()) - 900
 
             log.debug('Earliest time selected is %s' % timestamp_to_string(earliest_time))
 
-            # Fetch the records.
+            # Fetch the records, from the shared RecentArchive store if available.
             start = time.time()
-            archive_recs: List[Dict[str, Any]] = RainRate.get_archive_records(
-                dbm, archive_columns, earliest_time)
+            archive_recs: Optional[List[Dict[str, Any]]] = None
+            if recent_archive is not None:
+                columns = recent_archive.get_columns(earliest_time, ['dateTime', 'rain'])
+                if columns is not None:
+                    archive_recs = [{'dateTime': ts, 'rain': rain}
+                                    for ts, rain in zip(columns['dateTime'], columns['rain'])]
+            if archive_recs is None:
+                binder = weewx.manager.DBBinder(self.config_dict)
+                binding = self.config_dict.get('StdReport')['data_binding']
+                dbm = binder.get_manager(binding)
+                # Get the column names of the archive table.
+                archive_columns: List[str] = dbm.connection.columnsOf('archive')
+                archive_recs = RainRate.get_archive_records(
+                    dbm, archive_columns, earliest_time)
 
             # Save rain events (if any).
             rec_count = 0
@@ -0,0 +1,213 @@
+"""
+recentarchive.py
+
+Distributed under the terms of the GNU Public License (GPLv3)
+
+RecentArchive is a WeeWX service that keeps the most recent hours of archive
+records in memory, so that services that prime themselves from the archive at
+startup (loopdata, rain24h, rainrate, rtgd) share a single table scan.
+
+The records are stored column wise (one list per archive column) rather than
+as one dict per record.  Dicts are only built on the fly for the consumers.
+The store is loaded on first use and then kept current from
+NEW_ARCHIVE_RECORD.
+
+Consumers subscribe for the number of seconds of history they need (in their
+__init__), and ask for records at PRE_LOOP (or later):
+
+    try:
+        from user.recentarchive import recent_archive
+    except ImportError:
+        recent_archive = None
+    ...
+    recent_archive.subscribe(86400)
+    ...
+    records = recent_archive.get_records(earliest_time)
+    if records is None:
+        # RecentArchive is not installed or does not reach back far enough.
+        records = <query the database>
+
+To install, add the service to archive_services, after StdArchive:
+
+[Engine]
+    [[Services]]
+        archive_services = weewx.engine.StdArchive, user.recentarchive.RecentArchive, ...
+
+[RecentArchive]
+    # Set to False to let every service query the archive itself.
+    enable = True
+    # Hours of archive records to keep at least.  Subscribers may extend it.
+    hours = 24
+    data_binding = wx_binding
+"""
+
+import bisect
+import logging
+import threading
+import time
+
+from typing import Any, Dict, Iterator, List, Optional
+
+import weewx
+import weewx.manager
+import weewx.units
+
+from weeutil.weeutil import timestamp_to_string
+from weeutil.weeutil import to_bool
+from weeutil.weeutil import to_int
+from weewx.engine import StdService
+
+# get a logger object
+log = logging.getLogger(__name__)
+
+RECENTARCHIVE_VERSION = '0.01'
+
+
+class RecentArchiveStore:
+    """The last max_age seconds of archive records, one list per column."""
+
+    # Extra seconds of history, so that a consumer that took its time.time()
+    # a little before (or after) the store did is still covered.
+    SLACK = 600
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.manager_dict: Optional[Dict[str, Any]] = None
+        self.max_age: int = 0
+        self.loaded = False
+        # records newer than start are complete
+        self.start: Optional[int] = None
+        self.unit_system: Optional[int] = None
+        self.columns: List[str] = []
+        self.data: Dict[str, List[Any]] = {}
+
+    def subscribe(self, seconds: int) -> None:
+        """Ask for (at least) seconds of history."""
+        with self.lock:
+            self.max_age = max(self.max_age, int(seconds))
+
+    def activate(self, manager_dict: Dict[str, Any], seconds: int) -> None:
+        """Called by the RecentArchive service, the store stays unused otherwise."""
+        with self.lock:
+            self.manager_dict = manager_dict
+            self.subscribe(seconds)
+
+    def is_active(self) -> bool:
+        return self.manager_dict is not None
+
+    def load(self) -> bool:
+        """Read the archive once (with our own connection, any thread may call this)."""
+        with self.lock:
+            if self.loaded:
+                return True
+            if self.manager_dict is None:
+                return False
+            start_time = time.time()
+            earliest_time = int(start_time) - self.max_age - self.SLACK
+            with weewx.manager.open_manager(self.manager_dict) as dbm:
+                self.columns = dbm.connection.columnsOf(dbm.table_name)
+                self.data = {col: [] for col in self.columns}
+                cols = [self.data[col] for col in self.columns]
+                for row in dbm.genSql('SELECT * FROM %s WHERE dateTime > ? ORDER BY dateTime ASC'
+                        % dbm.table_name, (earliest_time,)):
+                    for col, val in zip(cols, row):
+                        col.append(val)
+                    if self.unit_system is None:
+                        self.unit_system = row[self.columns.index('usUnits')]
+            self.start = earliest_time
+            self.loaded = True
+            log.info('Loaded %d archive records since %s in %f seconds.' % (
+                len(self.data['dateTime']), timestamp_to_string(earliest_time), time.time() - start_time))
+            return True
+
+    def add_record(self, record: Dict[str, Any]) -> None:
+        """Append a new archive record and drop records older than max_age."""
+        with self.lock:
+            if not self.loaded:
+                # Nothing to keep current yet, load() will read the record from the database.
+                return
+            timestamps = self.data['dateTime']
+            ts = record['dateTime']
+            if timestamps and ts <= timestamps[-1]:
+                return
+            if self.unit_system is None:
+                self.unit_system = record.get('usUnits')
+            elif record.get('usUnits') != self.unit_system:
+                record = weewx.units.to_std_system(record, self.unit_system)
+            for col in self.columns:
+                self.data[col].append(record.get(col))
+            # expire
+            earliest_time = ts - self.max_age - self.SLACK
+            n = bisect.bisect_right(timestamps, earliest_time)
+            if n > 0:
+                for col in self.columns:
+                    del self.data[col][:n]
+            self.start = max(self.start, earliest_time)
+
+    def covers(self, earliest_time: float) -> bool:
+        """True if all records newer than earliest_time are in the store."""
+        return self.load() and earliest_time >= self.start
+
+    def get_records(self, earliest_time: float) -> Optional[List[Dict[str, Any]]]:
+        """Records newer than earliest_time (ascending), or None if the store cannot tell."""
+        with self.lock:
+            if not self.covers(earliest_time):
+                return None
+            return list(self._records(earliest_time))
+
+    def _records(self, earliest_time: float) -> Iterator[Dict[str, Any]]:
+        cols = [self.data[col] for col in self.columns]
+        first = bisect.bisect_right(self.data['dateTime'], earliest_time)
+        for i in range(first, len(self.data['dateTime'])):
+            yield {col: vals[i] for col, vals in zip(self.columns, cols)}
+
+    def get_columns(self, earliest_time: float, columns: List[str]) -> Optional[Dict[str, List[Any]]]:
+        """Values of the given columns for the records newer than earliest_time."""
+        with self.lock:
+            if not self.covers(earliest_time):
+                return None
+            first = bisect.bisect_right(self.data['dateTime'], earliest_time)
+            return {col: self.data[col][first:] if col in self.data else [None] * (len(self.data['dateTime']) - first)
+                    for col in columns}
+
+    def last_record(self) -> Optional[Dict[str, Any]]:
+        """The newest record, or None."""
+        with self.lock:
+            if not self.load() or not self.data['dateTime']:
+                return None
+            return {col: self.data[col][-1] for col in self.columns}
+
+
+# The store shared by all services of this process.
+recent_archive = RecentArchiveStore()
+
+
+class RecentArchive(StdService):
+    def __init__(self, engine, config_dict):
+        super(RecentArchive, self).__init__(engine, config_dict)
+        log.info("Service version is %s." % RECENTARCHIVE_VERSION)
+
+        recentarchive_config_dict = config_dict.get('RecentArchive', {})
+        enable = to_bool(recentarchive_config_dict.get('enable', True))
+        if not enable:
+            log.info("RecentArchive is disabled. Enable it in the RecentArchive section of weewx.conf.")
+            return
+
+        binding = recentarchive_config_dict.get('data_binding', 'wx_binding')
+        hours = to_int(recentarchive_config_dict.get('hours', 24))
+        manager_dict = weewx.manager.get_manager_dict_from_config(config_dict, binding)
+        recent_archive.activate(manager_dict, hours * 3600)
+        log.info("RecentArchive keeps at least %d hours of %s." % (hours, binding))
+
+        self.bind(weewx.PRE_LOOP, self.pre_loop)
+        self.bind(weewx.NEW_ARCHIVE_RECORD, self.new_archive_record)
+
+    def pre_loop(self, event):
+        # Usually a subscriber has triggered the load already.
+        try:
+            recent_archive.load()
+        except Exception as e:
+            log.error('Error loading recent archive records: %s' % e)
+
+    def new_archive_record(self, event):
+        recent_archive.add_record(event.record)
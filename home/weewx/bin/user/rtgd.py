@@ -292,6 +292,7 @@ import os
 import os.path
 import socket
 import sys
+import tempfile
 import threading
 import time
 
@@ -315,6 +316,12 @@ from weewx.engine import StdService
 from weewx.units import ValueTuple, convert, getStandardUnitType, ListOfDicts, as_value_tuple
 from weeutil.weeutil import to_bool, to_int
 
+# the shared store of recent archive records is optional
+try:
+    from user.recentarchive import recent_archive
+except ImportError:
+    recent_archive = None
+
 # get a logger object
 log = logging.getLogger(__name__)
 
@@ -1122,6 +1129,13 @@ class RsyncExport(object):
 
     Once initialised data is rsynced by calling the objects export method and
     passing the data to be rsynced.
+
+    The rsync is performed by a separate thread so that a slow link does not
+    hold up the generation of gauge-data.txt. Only the latest data is kept for
+    upload, data generated while an upload is in progress is coalesced.
+    Uploads of data that is identical to the last uploaded data are skipped.
+    If rsync_persist_connection is non-zero ssh connection multiplexing is
+    used so that each rsync reuses the same ssh connection.
     """
 
     def __init__(self, rtgd_config_dict, rtgd_path_file):
@@ -1148,15 +1162,66 @@ class RsyncExport(object):
         self.rsync_timeout = rsync_config_dict.get('rsync_timeout')
         self.rsync_skip_if_older_than = to_int(rsync_config_dict.get('rsync_skip_if_older_than',
                                                                      4))
+        # how long (seconds) an idle ssh connection is kept open, 0 disables
+        # ssh connection multiplexing
+        self.rsync_persist_connection = to_int(rsync_config_dict.get('rsync_persist_connection',
+                                                                     300))
+        if self.rsync_persist_connection > 0:
+            # %C is a hash of the connection details, it keeps the socket path
+            # short
+            control_path = os.path.join(tempfile.gettempdir(), 'rtgd-ssh-%C')
+            self.rsync_ssh_options = ' '.join([self.rsync_ssh_options or '',
+                                               '-o ControlMaster=auto',
+                                               '-o ControlPath=%s' % control_path,
+                                               '-o ControlPersist=%d' % self.rsync_persist_connection]).strip()
+        # the latest data to be rsynced (packet time, payload), None if
+        # nothing is waiting
+        self.pending = None
+        # the last payload successfully rsynced
+        self.last_payload = None
+        self.pending_cond = threading.Condition()
+        self.rsync_thread = threading.Thread(target=self.run, name='RtgdRsyncThread')
+        self.rsync_thread.daemon = True
+        self.rsync_thread.start()
 
     def export(self, data, dateTime):
         """Rsync the data."""
 
         packet_time = datetime.datetime.fromtimestamp(dateTime)
-        self.rsync_data(packet_time)
+        # gauge-data.txt contents as written by RealtimeGaugeDataThread.write_data()
+        payload = json.dumps(data, separators=(',', ':'), sort_keys=True)
+        with self.pending_cond:
+            if self.pending is not None and weewx.debug >= 2:
+                log.debug("rsync of packet (%s) coalesced" % (self.pending[0],))
+            self.pending = (packet_time, payload)
+            self.pending_cond.notify()
+
+    def run(self):
+        """Rsync the latest data whenever there is some."""
+
+        while True:
+            with self.pending_cond:
+                while self.pending is None:
+                    self.pending_cond.wait()
+                packet_time, payload = self.pending
+                self.pending = None
+            if payload == self.last_payload:
+                if weewx.debug >= 2:
+                    log.debug("rsync of packet (%s) skipped, data unchanged" % (packet_time,))
+                continue
+            try:
+                uploaded = self.rsync_data(packet_time)
+            except Exception:
+                weeutil.logger.log_traceback(log.error, 'rtgdrsync: **** ')
+                uploaded = False
+            # if the rsync failed we don't know what is on the remote server
+            self.last_payload = payload if uploaded else None
 
     def rsync_data(self, packet_time):
-        """Perform the actual rsync."""
+        """Perform the actual rsync.
+
+        Returns True if gauge-data.txt was rsynced, otherwise False.
+        """
 
         # don't upload if more than rsync_skip_if_older_than seconds behind.
         if self.rsync_skip_if_older_than != 0:
@@ -1164,7 +1229,7 @@ class RsyncExport(object):
             age = now - packet_time
             if age.total_seconds() > self.rsync_skip_if_older_than:
                 log.info("skipping packet (%s) with age: %d" % (packet_time, age.total_seconds()))
-                return
+                return False
         rsync_upload = weeutil.rsyncupload.RsyncUpload(local_root=self.rtgd_path_file,
                                                        remote_root=self.rsync_dest_path_file,
                                                        server=self.rsync_server,
@@ -1180,6 +1245,8 @@ class RsyncExport(object):
         except IOError as e:
             (cl, unused_ob, unused_tr) = sys.exc_info()
             log.error("rtgd.rsync_data: Caught exception %s: %s" % (cl, e))
+            return False
+        return True
 
 
 # ============================================================================
@@ -1231,6 +1298,9 @@ class RealtimeGaugeDataThread(threading.Thread):
             self.wr_points = int(rtgd_config_dict.get('windrose_points', 16))
         except ValueError:
             self.wr_points = 16
+        # the windrose can be calculated from the shared recent archive records
+        if recent_archive is not None:
+            recent_archive.subscribe(self.wr_period)
 
         # Construct the group map to be used. The group map maps the unit to be
         # used for each unit group. It is based on the default group map with
@@ -1471,12 +1541,15 @@ class RealtimeGaugeDataThread(threading.Thread):
                 log.debug("windrose data calculated")
             elif weewx.debug >= 3:
                 log.debug("windrose data calculated: %s" % (self.rose,))
-            # set up our loop cache and set some starting wind values
-            _ts = self.db_manager.lastGoodStamp()
-            if _ts is not None:
-                _rec = self.db_manager.getRecord(_ts)
-            else:
-                _rec = {'usUnits': None}
+            # set up our loop cache and set some starting wind values, use
+            # the shared recent archive records if available
+            _rec = recent_archive.last_record() if recent_archive is not None else None
+            if _rec is None:
+                _ts = self.db_manager.lastGoodStamp()
+                if _ts is not None:
+                    _rec = self.db_manager.getRecord(_ts)
+                else:
+                    _rec = {'usUnits': None}
             # get a CachedPacket object as our loop packet cache and prime it with
             # values from the last good archive record if available
             self.packet_cache = CachedPacket(_rec)
@@ -2845,6 +2918,18 @@ def calc_windrose(now, db_manager, period, points):
     # determine the factor to be used to divide numerical windDir into
     # cardinal/ordinal compass points
     angle = 360.0/points
+    # if the shared recent archive records cover the period use them rather
+    # than querying the database
+    if recent_archive is not None:
+        _cols = recent_archive.get_columns(ts, ['windDir', 'windSpeed'])
+        if _cols is not None:
+            for _dir, _speed in zip(_cols['windDir'], _cols['windSpeed']):
+                if _dir is None or _speed is None:
+                    continue
+                # round half away from zero as SQL ROUND() does, the 'points'
+                # group is 'North' as well
+                rose[int(math.floor(_dir / angle + 0.5)) % points] += _speed
+            return [round(x, 1) for x in rose]
     # create an interpolation dict for our query
     inter_dict = {'table_name': db_manager.table_name,
                   'ts': ts,
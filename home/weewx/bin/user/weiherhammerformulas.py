@@ -24,14 +24,14 @@ import logging
 import cmath
 import math
 from math import sin,cos,pi,asin
-from datetime import datetime
 import time
+import numpy as np
 
 # WeeWX imports
 from weeutil.weeutil import to_int, to_float, to_bool
 import weewx.uwxutils
 import weewx.units
-from weewx.units import ValueTuple, CtoK, CtoF, FtoC, mph_to_knot, kph_to_knot, mps_to_knot
+from weewx.units import ValueTuple, CtoK, CtoF, FtoC, mph_to_knot, kph_to_knot, mps_to_knot, kph_to_mph
 from weewx.units import INHG_PER_MBAR, METER_PER_FOOT, METER_PER_MILE, MM_PER_INCH
 
 try:
@@ -197,32 +197,62 @@ def thswIndexF(t_F, RH, ws_mph, rahes):
     # return round(thsw_F, 1) if thsw_F is not None else None
     return thsw_F if thsw_F is not None else None
 
+# solar terms of the sunshine threshold per day of year
+_sunshine_day_terms = {}
+
+def sunshineDayTerms(dayofyear):
+    """ equation of time (minutes), declination (degree) and seasonal factor of dayofyear """
+    terms = _sunshine_day_terms.get(dayofyear)
+    if terms is None:
+        theta = 360 * dayofyear / 365
+        equatemps = 0.0172 + 0.4281 * cos((pi / 180) * theta) - 7.3515 * sin(
+            (pi / 180) * theta) - 3.3495 * cos(2 * (pi / 180) * theta) - 9.3619 * sin(
+            2 * (pi / 180) * theta)
+        declinaison = asin(0.006918 - 0.399912 * cos((pi / 180) * theta) + 0.070257 * sin(
+            (pi / 180) * theta) - 0.006758 * cos(2 * (pi / 180) * theta) + 0.000908 * sin(
+            2 * (pi / 180) * theta)) * (180 / pi)
+        seasonal = 0.73 + 0.06 * cos((pi / 180) * 360 * dayofyear / 365)
+        terms = (equatemps, declinaison, seasonal)
+        _sunshine_day_terms[dayofyear] = terms
+    return terms
+
 # calculate sunshine threshold for sunshine yes/no
 # https://github.com/Jterrettaz/sunduration
 def sunshineThreshold(mydatetime, lat, lon, coeff=1.0):
-    utcdate = datetime.utcfromtimestamp(mydatetime)
-    dayofyear = to_int(time.strftime("%j",time.gmtime(mydatetime)))
-    theta = 360 * dayofyear / 365
-    equatemps = 0.0172 + 0.4281 * cos((pi / 180) * theta) - 7.3515 * sin(
-        (pi / 180) * theta) - 3.3495 * cos(2 * (pi / 180) * theta) - 9.3619 * sin(
-        2 * (pi / 180) * theta)
+    utctime = time.gmtime(mydatetime)
+    equatemps, declinaison, seasonal = sunshineDayTerms(utctime.tm_yday)
     corrtemps = lon * 4
-    declinaison = asin(0.006918 - 0.399912 * cos((pi / 180) * theta) + 0.070257 * sin(
-        (pi / 180) * theta) - 0.006758 * cos(2 * (pi / 180) * theta) + 0.000908 * sin(
-        2 * (pi / 180) * theta)) * (180 / pi)
-    minutesjour = utcdate.hour * 60 + utcdate.minute
+    minutesjour = utctime.tm_hour * 60 + utctime.tm_min
     tempsolaire = (minutesjour + corrtemps + equatemps) / 60
     angle_horaire = (tempsolaire - 12) * 15
     hauteur_soleil = asin(sin((pi / 180) * lat) * sin((pi / 180) * declinaison) + cos(
         (pi / 180) * lat) * cos((pi / 180) * declinaison) * cos((pi / 180) * angle_horaire)) * (180 / pi)
     if hauteur_soleil > 3:
-        seuil = (0.73 + 0.06 * cos((pi / 180) * 360 * dayofyear / 365)) * 1080 * pow(
-            sin((pi / 180) * hauteur_soleil), 1.25) * coeff
+        seuil = seasonal * 1080 * pow(sin((pi / 180) * hauteur_soleil), 1.25) * coeff
     else:
         seuil = 0.0
 
     return seuil
 
+# sunshineThreshold for a whole array of timestamps
+# coeff is a scalar or an array with one coeff per timestamp
+def sunshineThresholds(timestamps, lat, lon, coeff=1.0):
+    timestamps = np.asarray(timestamps, dtype=np.int64)
+    # the solar terms are calculated once per (UTC) day
+    days, day_index = np.unique(timestamps // 86400, return_inverse=True)
+    day_terms = np.array([sunshineDayTerms(time.gmtime(int(day) * 86400).tm_yday) for day in days]).reshape(-1, 3)
+    equatemps = day_terms[day_index, 0]
+    declinaison = np.radians(day_terms[day_index, 1])
+    seasonal = day_terms[day_index, 2]
+    minutesjour = (timestamps % 86400) // 60
+    tempsolaire = (minutesjour + lon * 4 + equatemps) / 60
+    angle_horaire = np.radians((tempsolaire - 12) * 15)
+    lat_rad = math.radians(lat)
+    hauteur_soleil = np.degrees(np.arcsin(np.clip(sin(lat_rad) * np.sin(declinaison) + cos(
+        lat_rad) * np.cos(declinaison) * np.cos(angle_horaire), -1.0, 1.0)))
+    seuil = seasonal * 1080 * np.power(np.maximum(np.sin(np.radians(hauteur_soleil)), 0.0), 1.25) * coeff
+    return np.where(hauteur_soleil > 3, seuil, 0.0)
+
 # calculate battery values in percent
 def batt_to_percent(isBatt, minBatt, maxBatt):
     isBatt = round(isBatt, 1)
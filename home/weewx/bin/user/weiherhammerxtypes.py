@@ -16,12 +16,15 @@
 """
 # python imports
 import time
+import numpy as np
 
 # WeeWX imports
+import weedb
 import weewx
 import weewx.units
 import weewx.xtypes
 import weeutil.config
+import weeutil.weeutil
 from weewx.engine import StdService
 from weeutil.weeutil import to_int, to_float, to_bool
 from weewx.units import ValueTuple, CtoK, CtoF, FtoC, mph_to_knot, kph_to_knot, mps_to_knot
@@ -204,6 +207,34 @@ class WXXTypes(weewx.xtypes.XType):
         except AttributeError:
             raise weewx.UnknownType(obs_type)
 
+    def sunshine_coeffs(self, timestamps):
+        """The user configured coeff for the (UTC) month of each timestamp."""
+        days, day_index = np.unique(timestamps // 86400, return_inverse=True)
+        months = np.array([time.gmtime(int(day) * 86400).tm_mon for day in days], dtype=np.int64)
+        coeff_of_month = np.ones(13)
+        for monthofyear in np.unique(months):
+            coeff = to_float(self.sunshineThreshold_coeff_dict.get(str(monthofyear)))
+            if coeff is None:
+                logerr("sunshine, user configured coeff month=%d is not valid! Using default coeff=1.0 instead." % (monthofyear))
+            else:
+                coeff_of_month[monthofyear] = coeff
+        return coeff_of_month[months][day_index]
+
+    def array_sunshineThreshold(self, timestamps, source):
+        return user.weiherhammerformulas.sunshineThresholds(timestamps, self.lat, self.lon, self.sunshine_coeffs(timestamps))
+
+    def array_sunshine(self, timestamps, source):
+        radiation = source['radiation']
+        threshold = self.array_sunshineThreshold(timestamps, source)
+        if self.sunshine_evaluate_min == 'radiation':
+            evaluate = radiation >= self.sunshine_radiation_min
+        else:
+            evaluate = threshold >= self.sunshine_threshold_min
+        # comparisons with nan are False, so 0, then None for missing radiation
+        sunshine = (evaluate & (threshold > 0.0) & (radiation > threshold)).astype(float)
+        sunshine[np.isnan(radiation)] = np.nan
+        return sunshine
+
     @staticmethod
     def calc_wetBulb(key, data, db_manager=None):
         if 'outTemp' not in data or 'outHumidity' not in data or 'pressure' not in data:
@@ -584,6 +615,83 @@ class WXXTypes(weewx.xtypes.XType):
         val = user.weiherhammerformulas.possibly_snow(outTemp_C, data['outHumidity'], windSpeed_mps, barometer_hpa, cloudpercent)
         return ValueTuple(val, 'count', 'group_count')
 
+
+class WXXTypesSeries(weewx.xtypes.XType):
+    """Series of the WXXTypes types that are not stored in the archive.
+
+    Registered in front of ArchiveTable and XTypeTable, which would otherwise
+    answer every series. The values are calculated with array math from one
+    query for the timespan instead of record by record."""
+
+    # observation type: (source columns, unit, unit group)
+    series_types = {
+        'sunshineThreshold': (['dateTime'], 'watt_per_meter_squared', 'group_radiation'),
+    }
+
+    series_aggregates = {
+        'avg': np.nanmean,
+        'sum': np.nansum,
+        'min': np.nanmin,
+        'max': np.nanmax,
+        'count': lambda values: np.count_nonzero(~np.isnan(values)),
+    }
+
+    def __init__(self, wxxtypes):
+        self.wxxtypes = wxxtypes
+
+    def get_series(self, obs_type, timespan, db_manager, aggregate_type=None, aggregate_interval=None, **option_dict):
+        """aggregate_type avg, sum, min, max and count are supported."""
+        # stored columns are served by ArchiveTable
+        if obs_type not in self.series_types or obs_type in db_manager.sqlkeys:
+            raise weewx.UnknownType(obs_type)
+        if aggregate_type and aggregate_type not in self.series_aggregates:
+            raise weewx.UnknownAggregation(aggregate_type)
+        columns, unit, unit_group = self.series_types[obs_type]
+
+        sql = "SELECT dateTime, interval, %s FROM %s WHERE dateTime > ? AND dateTime <= ? ORDER BY dateTime" % (
+            ', '.join(columns), db_manager.table_name)
+        rows = list(db_manager.genSql(sql, (timespan.start, timespan.stop)))
+        # None becomes nan
+        data = np.array(rows, dtype=float).reshape(-1, len(columns) + 2)
+        source = dict(zip(columns, data[:, 2:].T))
+        timestamps = data[:, 0].astype(np.int64)
+        values = getattr(self.wxxtypes, 'array_%s' % obs_type)(timestamps, source)
+
+        if aggregate_type:
+            start_vec, stop_vec, data_vec = self.aggregate_array(
+                timestamps, values, timespan, aggregate_type, aggregate_interval)
+            if aggregate_type == 'count':
+                unit, unit_group = 'count', 'group_count'
+        else:
+            start_vec = (timestamps - data[:, 1].astype(np.int64) * 60).tolist()
+            stop_vec = timestamps.tolist()
+            data_vec = [None if np.isnan(x) else x for x in values.tolist()]
+
+        return (ValueTuple(start_vec, 'unix_epoch', 'group_time'),
+                ValueTuple(stop_vec, 'unix_epoch', 'group_time'),
+                ValueTuple(data_vec, unit, unit_group))
+
+    @staticmethod
+    def aggregate_array(timestamps, values, timespan, aggregate_type, aggregate_interval):
+        """Aggregate values (nan is None) of the records timestamps over aggregate_interval."""
+        start_vec, stop_vec, data_vec = [], [], []
+        func = WXXTypesSeries.series_aggregates[aggregate_type]
+        for span in weeutil.weeutil.intervalgen(timespan.start, timespan.stop, aggregate_interval):
+            first = np.searchsorted(timestamps, span.start, side='right')
+            last = np.searchsorted(timestamps, span.stop, side='right')
+            chunk = values[first:last]
+            if aggregate_type == 'count':
+                value = int(func(chunk))
+            elif chunk.size == 0 or np.isnan(chunk).all():
+                value = None
+            else:
+                value = float(func(chunk))
+            start_vec.append(span.start)
+            stop_vec.append(span.stop)
+            data_vec.append(value)
+        return start_vec, stop_vec, data_vec
+
+
 #
 # ######################## Class PressureCooker ##############################
 #
@@ -870,70 +978,80 @@ class PressureCooker(weewx.xtypes.XType):
 
 
 
-class WeiherhammerXTypes(StdService):
-    """Instantiate and register the Weiherhammer xtype extension WXXTypes."""
+def wxxtypes_from_config(config_dict, altitude, latitude, longitude):
+    """Create WXXTypes with the options of the WeiherhammerWXCalculate section."""
+    # Get any user-defined overrides
+    try:
+        override_dict = config_dict['WeiherhammerWXCalculate']['WXXTypes']
+    except KeyError:
+        override_dict = {}
+    # Get the default values, then merge the user overrides into it
+    option_dict = weeutil.config.deep_copy(defaults_dict['WeiherhammerWXCalculate']['WXXTypes'])
+    option_dict.merge(override_dict)
 
-    def __init__(self, engine, config_dict):
-        super(WeiherhammerXTypes, self).__init__(engine, config_dict)
-        loginf("Service version is %s" % VERSION)
+    # solar-heatindex-related options
+    solar_heatindex_algo = option_dict['solar_heatindex'].get('algorithm', 'new').lower()
 
-        altitude = engine.stn_info.altitude_vt
-        latitude = engine.stn_info.latitude_f
-        longitude = engine.stn_info.longitude_f
+    # sunshine threshold related options
+    sunshineThreshold_debug = to_int(option_dict['sunshineThreshold'].get('debug', 0))
+    sunshineThreshold_coeff_dict = option_dict['sunshineThreshold'].get('coeff', {})
 
-        # Get any user-defined overrides
-        try:
-            override_dict = config_dict['WeiherhammerWXCalculate']['WXXTypes']
-        except KeyError:
-            override_dict = {}
-        # Get the default values, then merge the user overrides into it
-        option_dict = weeutil.config.deep_copy(defaults_dict['WeiherhammerWXCalculate']['WXXTypes'])
-        option_dict.merge(override_dict)
+    # sunshine related options
+    sunshine_debug = to_int(option_dict['sunshine'].get('debug', 0))
+
+    sunshine_radiation_min = to_float(option_dict['sunshine'].get('radiation_min', 0.0))
+    if sunshine_radiation_min < 0.0:
+        logerr("Invalid value radiation_min %.2f, using default 0.0 instead!" % sunshine_radiation_min)
+        sunshine_radiation_min = 0.0
 
-        # solar-heatindex-related options
-        solar_heatindex_algo = option_dict['solar_heatindex'].get('algorithm', 'new').lower()
+    sunshine_threshold_min = to_float(option_dict['sunshine'].get('threshold_min', 0.0))
+    if sunshine_threshold_min < 0.0:
+        logerr("Invalid value threshold_min %.2f, using default 0.0 instead!" % sunshine_threshold_min)
+        sunshine_threshold_min = 0.0
 
-        # sunshine threshold related options
-        sunshineThreshold_debug = to_int(option_dict['sunshineThreshold'].get('debug', 0))
-        sunshineThreshold_coeff_dict = option_dict['sunshineThreshold'].get('coeff', {})
+    sunshine_evaluate_min = option_dict['sunshine'].get('evaluate_min', 'radiation').lower()
+    if sunshine_evaluate_min != 'radiation' and sunshine_evaluate_min != 'threshold':
+        logerr("Invalid value evaluate_min '%s', using default 'radiation' instead!" % sunshine_evaluate_min)
+        sunshine_evaluate_min = 'radiation'
 
-        # sunshine related options
-        sunshine_debug = to_int(option_dict['sunshine'].get('debug', 0))
+    cloudwatcher_corrfactor_dict = option_dict.get('cloudwatcher_corrfactor', {})
 
-        sunshine_radiation_min = to_float(option_dict['sunshine'].get('radiation_min', 0.0))
-        if sunshine_radiation_min < 0.0:
-            logerr("Invalid value radiation_min %.2f, using default 0.0 instead!" % sunshine_radiation_min)
-            sunshine_radiation_min = 0.0
+    return WXXTypes(altitude, latitude, longitude,
+                    sunshineThreshold_debug,
+                    sunshineThreshold_coeff_dict,
+                    sunshine_debug,
+                    sunshine_radiation_min,
+                    sunshine_threshold_min,
+                    sunshine_evaluate_min,
+                    solar_heatindex_algo,
+                    cloudwatcher_corrfactor_dict
+                    )
 
-        sunshine_threshold_min = to_float(option_dict['sunshine'].get('threshold_min', 0.0))
-        if sunshine_threshold_min < 0.0:
-            logerr("Invalid value threshold_min %.2f, using default 0.0 instead!" % sunshine_threshold_min)
-            sunshine_threshold_min = 0.0
 
-        sunshine_evaluate_min = option_dict['sunshine'].get('evaluate_min', 'radiation').lower()
-        if sunshine_evaluate_min != 'radiation' and sunshine_evaluate_min != 'threshold':
-            logerr("Invalid value evaluate_min '%s', using default 'radiation' instead!" % sunshine_evaluate_min)
-            sunshine_evaluate_min = 'radiation'
 
-        cloudwatcher_corrfactor_dict = option_dict.get('cloudwatcher_corrfactor', {})
+class WeiherhammerXTypes(StdService):
+    """Instantiate and register the Weiherhammer xtype extension WXXTypes."""
+
+    def __init__(self, engine, config_dict):
+        super(WeiherhammerXTypes, self).__init__(engine, config_dict)
+        loginf("Service version is %s" % VERSION)
+
+        altitude = engine.stn_info.altitude_vt
+        latitude = engine.stn_info.latitude_f
+        longitude = engine.stn_info.longitude_f
 
         # Instantiate an instance of WXXTypes:
-        self.wxxtypes = WXXTypes(altitude, latitude, longitude, 
-                                 sunshineThreshold_debug,
-                                 sunshineThreshold_coeff_dict,
-                                 sunshine_debug,
-                                 sunshine_radiation_min,
-                                 sunshine_threshold_min,
-                                 sunshine_evaluate_min,
-                                 solar_heatindex_algo,
-                                 cloudwatcher_corrfactor_dict
-                                 )
+        self.wxxtypes = wxxtypes_from_config(config_dict, altitude, latitude, longitude)
         # Register it:
         weewx.xtypes.xtypes.append(self.wxxtypes)
+        # The series go in front of ArchiveTable and XTypeTable
+        self.wxxtypes_series = WXXTypesSeries(self.wxxtypes)
+        weewx.xtypes.xtypes.insert(0, self.wxxtypes_series)
 
     def shutDown(self):
-        # Remove the registered instance:
+        # Remove the registered instances:
         weewx.xtypes.xtypes.remove(self.wxxtypes)
+        weewx.xtypes.xtypes.remove(self.wxxtypes_series)
 
 
 
@@ -967,3 +1085,90 @@ class WeiherhammerPressureCooker(weewx.engine.StdService):
         """Engine shutting down. """
         weewx.xtypes.xtypes.remove(self.pressure_cooker)
 
+
+
+def backfill_sunshine(wxxtypes, db_manager, start_ts, stop_ts, duration=False, dry_run=False):
+    """Recalculate the archive column 'sunshine' from 'radiation', one week per query and transaction.
+    With duration, missing 'sunshineDur' values are set to the archive interval if there was sunshine."""
+    total = changed = 0
+    for span in weeutil.weeutil.intervalgen(start_ts, stop_ts, 7 * 86400):
+        sql = "SELECT dateTime, interval, radiation, sunshine, sunshineDur FROM %s WHERE dateTime > ? AND dateTime <= ? ORDER BY dateTime" % db_manager.table_name
+        rows = list(db_manager.genSql(sql, (span.start, span.stop)))
+        if not rows:
+            continue
+        data = np.array(rows, dtype=float)
+        timestamps = data[:, 0].astype(np.int64)
+        sunshine = wxxtypes.array_sunshine(timestamps, {'radiation': data[:, 2]})
+        updates = []
+        for ts, interval, old_sunshine, old_duration, new_sunshine in zip(timestamps.tolist(), data[:, 1].tolist(), data[:, 3].tolist(), data[:, 4].tolist(), sunshine.tolist()):
+            new_sunshine = None if np.isnan(new_sunshine) else new_sunshine
+            old_sunshine = None if np.isnan(old_sunshine) else old_sunshine
+            if duration and np.isnan(old_duration) and new_sunshine is not None:
+                # sunshineDur is in seconds in all unit systems
+                updates.append(("UPDATE %s SET sunshine = ?, sunshineDur = ? WHERE dateTime = ?" % db_manager.table_name,
+                                (new_sunshine, new_sunshine * interval * 60, ts)))
+            elif new_sunshine != old_sunshine:
+                updates.append(("UPDATE %s SET sunshine = ? WHERE dateTime = ?" % db_manager.table_name,
+                                (new_sunshine, ts)))
+        total += len(rows)
+        changed += len(updates)
+        if updates and not dry_run:
+            with weedb.Transaction(db_manager.connection) as cursor:
+                for sql, args in updates:
+                    cursor.execute(sql, args)
+        loginf("backfill sunshine, %s: %d records, %d updated" % (
+            weeutil.weeutil.timestamp_to_string(span.stop), len(rows), len(updates)))
+    return total, changed
+
+
+# Recalculate historical sunshine values. Paths may vary.
+# PYTHONPATH=/home/weewx/bin python3 /home/weewx/bin/user/weiherhammerxtypes.py /home/weewx/weewx.conf --backfill-sunshine
+if __name__ == '__main__':
+    import argparse
+    import datetime
+    import configobj
+    import weewx.manager
+
+    def main():
+        parser = argparse.ArgumentParser(description="Recalculate the sunshine values of the archive.")
+        parser.add_argument("config_file")
+        parser.add_argument("--backfill-sunshine", action="store_true", dest="backfill_sunshine",
+                            help="Recalculate the column sunshine from radiation.")
+        parser.add_argument("--duration", action="store_true",
+                            help="Also set missing sunshineDur values from sunshine and the archive interval.")
+        parser.add_argument("--from", dest="date_from", metavar="YYYY-MM-DD",
+                            help="First day to recalculate. Default is the first record.")
+        parser.add_argument("--to", dest="date_to", metavar="YYYY-MM-DD",
+                            help="Last day to recalculate. Default is the last record.")
+        parser.add_argument("--binding", default="wx_binding",
+                            help="The data binding. Default is wx_binding.")
+        parser.add_argument("--dry-run", action="store_true", dest="dry_run",
+                            help="Calculate, but do not write to the database.")
+        options = parser.parse_args()
+
+        if not options.backfill_sunshine:
+            parser.error("nothing to do, use --backfill-sunshine")
+
+        config_dict = configobj.ConfigObj(options.config_file, file_error=True)
+        weeutil.logger.setup('weiherhammerxtypes', config_dict)
+        station_dict = config_dict.get('Station', {})
+        wxxtypes = wxxtypes_from_config(config_dict, None,
+                                        to_float(station_dict.get('latitude')),
+                                        to_float(station_dict.get('longitude')))
+
+        with weewx.manager.open_manager_with_config(config_dict, options.binding) as db_manager:
+            start_ts = db_manager.firstGoodStamp() - 1
+            stop_ts = db_manager.lastGoodStamp()
+            if options.date_from:
+                start_ts = int(time.mktime(datetime.datetime.strptime(options.date_from, "%Y-%m-%d").timetuple())) - 1
+            if options.date_to:
+                stop_ts = int(time.mktime(datetime.datetime.strptime(options.date_to, "%Y-%m-%d").timetuple())) + 86400
+            start_time = time.time()
+            total, changed = backfill_sunshine(wxxtypes, db_manager, start_ts, stop_ts,
+                                               duration=options.duration, dry_run=options.dry_run)
+        print("%d records, %d %s in %.1f seconds" % (
+            total, changed, "to update" if options.dry_run else "updated", time.time() - start_time))
+        if changed and not options.dry_run:
+            print("Rebuild the daily summaries of sunshine and sunshineDur, e.g. with 'wee_database --rebuild-daily'.")
+
+    main()
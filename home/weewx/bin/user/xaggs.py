@@ -13,7 +13,10 @@
 
     """
 
+import bisect
+import collections
 import datetime
+import threading
 
 import weedb
 import weewx.tags
@@ -30,55 +33,67 @@ weewx.units.agg_group['historical_mintime'] = 'group_time'
 weewx.units.agg_group['historical_maxtime'] = 'group_time'
 
 
+class XAggsCache(object):
+    """Small LRU cache for the rows read by the XAggs extensions.
+
+    An entry is only valid as long as no new archive record has been added, so the
+    last timestamp of the database is part of the key."""
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self.entries = collections.OrderedDict()
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def make_key(db_manager, *args):
+        return (db_manager.database_name, db_manager.table_name, db_manager.last_timestamp) + args
+
+    def get(self, key):
+        with self.lock:
+            try:
+                self.entries.move_to_end(key)
+                return self.entries[key]
+            except KeyError:
+                return None
+
+    def put(self, key, value):
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+
 class XAggsHistorical(weewx.xtypes.XType):
-    """XTypes extension to calculate historical statistics for days-of-the-year"""
+    """XTypes extension to calculate historical statistics for days-of-the-year
+
+    All the historical aggregations of an observation type for a day-of-the-year are
+    calculated from the same rows of the daily summary. So the rows are read with one
+    query, all the aggregations are calculated from them, and the results are cached."""
+
+    aggregate_types = ('historical_min', 'historical_mintime', 'historical_min_avg',
+                       'historical_max', 'historical_maxtime', 'historical_max_avg',
+                       'historical_avg')
 
     sql_stmts = {
-        'sqlite': {
-            'historical_min': "SELECT MIN(`min`) FROM {table}_day_{obs_type} "
-                              "WHERE STRFTIME('%m-%d', dateTime,'unixepoch','localtime') = '{month:02d}-{day:02d}';",
-            'historical_mintime': "SELECT `mintime` FROM {table}_day_{obs_type} "
-                                  "WHERE STRFTIME('%m-%d', dateTime,'unixepoch','localtime') = '{month:02d}-{day:02d}' "
-                                  "ORDER BY `min` ASC LIMIT 1;",
-            'historical_min_avg': "SELECT AVG(`min`) FROM {table}_day_{obs_type} "
-                                  "WHERE STRFTIME('%m-%d', dateTime,'unixepoch','localtime') = '{month:02d}-{day:02d}';",
-            'historical_max': "SELECT MAX(`max`) FROM {table}_day_{obs_type} "
-                              "WHERE STRFTIME('%m-%d', dateTime,'unixepoch','localtime') = '{month:02d}-{day:02d}';",
-            'historical_maxtime': "SELECT `maxtime` FROM {table}_day_{obs_type} "
-                                  "WHERE STRFTIME('%m-%d', dateTime,'unixepoch','localtime') = '{month:02d}-{day:02d}' "
-                                  "ORDER BY `max` DESC LIMIT 1;",
-            'historical_max_avg': "SELECT AVG(`max`) FROM {table}_day_{obs_type} "
-                                  "WHERE STRFTIME('%m-%d', dateTime,'unixepoch','localtime') = '{month:02d}-{day:02d}';",
-            'historical_avg': "SELECT SUM(`wsum`), SUM(`sumtime`) FROM {table}_day_{obs_type} "
-                              "WHERE STRFTIME('%m-%d', dateTime,'unixepoch','localtime') = '{month:02d}-{day:02d}';",
-        },
-        'mysql': {
-            'historical_min': "SELECT MIN(`min`) FROM {table}_day_{obs_type} "
-                              "WHERE FROM_UNIXTIME(dateTime, '%%m-%%d') = '{month:02d}-{day:02d}';",
-            'historical_mintime': "SELECT `mintime` FROM {table}_day_{obs_type} "
-                                  "WHERE FROM_UNIXTIME(dateTime, '%%m-%%d') = '{month:02d}-{day:02d}' "
-                                  "ORDER BY `min` ASC, dateTime ASC LIMIT 1;",
-            'historical_min_avg': "SELECT AVG(`min`) FROM {table}_day_{obs_type} "
-                                  "WHERE FROM_UNIXTIME(dateTime, '%%m-%%d') = '{month:02d}-{day:02d}';",
-            'historical_max': "SELECT MAX(`max`) FROM {table}_day_{obs_type} "
-                              "WHERE FROM_UNIXTIME(dateTime, '%%m-%%d') = '{month:02d}-{day:02d}';",
-            'historical_maxtime': "SELECT `maxtime` FROM {table}_day_{obs_type} "
-                                  "WHERE FROM_UNIXTIME(dateTime, '%%m-%%d') = '{month:02d}-{day:02d}' "
-                                  "ORDER BY `max` DESC, dateTime ASC LIMIT 1;",
-            'historical_max_avg': "SELECT AVG(`max`) FROM {table}_day_{obs_type} "
-                                  "WHERE FROM_UNIXTIME(dateTime, '%%m-%%d') = '{month:02d}-{day:02d}';",
-            'historical_avg': "SELECT SUM(`wsum`), SUM(`sumtime`) FROM {table}_day_{obs_type} "
-                              "WHERE FROM_UNIXTIME(dateTime, '%%m-%%d') = '{month:02d}-{day:02d}';",
-        },
+        'sqlite': "SELECT `min`, `mintime`, `max`, `maxtime`, `wsum`, `sumtime` FROM {table}_day_{obs_type} "
+                  "WHERE STRFTIME('%m-%d', dateTime,'unixepoch','localtime') = '{month:02d}-{day:02d}' "
+                  "ORDER BY dateTime ASC;",
+        'mysql': "SELECT `min`, `mintime`, `max`, `maxtime`, `wsum`, `sumtime` FROM {table}_day_{obs_type} "
+                 "WHERE FROM_UNIXTIME(dateTime, '%%m-%%d') = '{month:02d}-{day:02d}' "
+                 "ORDER BY dateTime ASC;",
     }
 
+    def __init__(self):
+        self.cache = XAggsCache()
+
     def get_aggregate(self, obs_type, timespan, aggregate_type, db_manager, **option_dict):
         """Calculate historical statistical aggregation for a date in the year"""
 
         dbtype = db_manager.connection.dbtype
 
         # Do we know how to calculate this kind of aggregation?
-        if aggregate_type not in XAggsHistorical.sql_stmts[dbtype]:
+        if aggregate_type not in XAggsHistorical.aggregate_types or dbtype not in XAggsHistorical.sql_stmts:
             raise weewx.UnknownAggregation(aggregate_type)
 
         # The time span must lie on midnight-to-midnight boundaries
@@ -96,55 +111,76 @@ class XAggsHistorical(weewx.xtypes.XType):
         if delta.days != 1:
             raise weewx.UnknownAggregation("%s of %s" % (aggregate_type, timespan))
 
+        key = XAggsCache.make_key(db_manager, obs_type, start_day.month, start_day.day)
+        values = self.cache.get(key)
+        if values is None:
+            values = self.calc_aggregates(obs_type, start_day, dbtype, db_manager)
+            self.cache.put(key, values)
+        value = values[aggregate_type]
+
+        # Look up the unit type and group of this combination of observation type and aggregation:
+        u, g = weewx.units.getStandardUnitType(db_manager.std_unit_system, obs_type,
+                                               aggregate_type)
+
+        # Form the ValueTuple and return it:
+        return weewx.units.ValueTuple(value, u, g)
+
+    @staticmethod
+    def calc_aggregates(obs_type, day, dbtype, db_manager):
+        """Calculate all the historical aggregations of obs_type for the day-of-the-year of day"""
+
         interp_dict = {
             'table': db_manager.table_name,
             'obs_type': obs_type,
-            'month': start_day.month,
-            'day': start_day.day
+            'month': day.month,
+            'day': day.day
         }
 
         # Get the correct sql statement, and format it with the interpolation dictionary.
-        sql_stmt = XAggsHistorical.sql_stmts[dbtype][aggregate_type].format(**interp_dict)
+        sql_stmt = XAggsHistorical.sql_stmts[dbtype].format(**interp_dict)
 
         try:
-            row = db_manager.getSql(sql_stmt)
+            rows = list(db_manager.genSql(sql_stmt))
         except weedb.NoColumnError:
-            raise weewx.UnknownType(aggregate_type)
+            raise weewx.UnknownType(obs_type)
 
-        # Given the result set, calculate the desired value
-        if not row or None in row:
-            value = None
-        elif aggregate_type == 'historical_avg':
-            value = row[0] / row[1] if row[1] else None
-        else:
-            value = row[0]
+        # Rows are in ascending order of time, so the earliest of equal values wins.
+        mins = [row for row in rows if row[0] is not None]
+        maxs = [row for row in rows if row[2] is not None]
+        lo = min(mins, key=lambda row: row[0]) if mins else None
+        hi = max(maxs, key=lambda row: row[2]) if maxs else None
+        wsum = [row[4] for row in rows if row[4] is not None]
+        sumtime = [row[5] for row in rows if row[5] is not None]
+
+        return {
+            'historical_min': lo[0] if lo else None,
+            'historical_mintime': lo[1] if lo else None,
+            'historical_min_avg': sum(row[0] for row in mins) / len(mins) if mins else None,
+            'historical_max': hi[2] if hi else None,
+            'historical_maxtime': hi[3] if hi else None,
+            'historical_max_avg': sum(row[2] for row in maxs) / len(maxs) if maxs else None,
+            'historical_avg': sum(wsum) / sum(sumtime) if wsum and sum(sumtime) else None,
+        }
 
-        # Look up the unit type and group of this combination of observation type and aggregation:
-        u, g = weewx.units.getStandardUnitType(db_manager.std_unit_system, obs_type,
-                                               aggregate_type)
 
-        # Form the ValueTuple and return it:
-        return weewx.units.ValueTuple(value, u, g)
+class XAggsAvg(weewx.xtypes.XType):
+    """XTypes extension to calculate days with an average above or below a certain value
 
+    The daily averages of a time span are read once and kept sorted, so the number of
+    days above or below any value can be looked up without another query."""
 
-class XAggsAvg(weewx.xtypes.XType):
-    """XTypes extension to calculate days with an average above or below a certain value"""
+    sql_stmt = "SELECT wsum/sumtime FROM {table}_day_{obs_type} " \
+               "WHERE dateTime >= {start} AND dateTime < {stop};"
 
-    sql_stmts = {
-        'avg_ge': "SELECT SUM(wsum/sumtime >= {val}) FROM {table}_day_{obs_type} "
-                  "WHERE dateTime >= {start} AND dateTime < {stop};",
-        'avg_gt': "SELECT SUM(wsum/sumtime > {val}) FROM {table}_day_{obs_type} "
-                  "WHERE dateTime >= {start} AND dateTime < {stop};",
-        'avg_le': "SELECT SUM(wsum/sumtime <= {val}) FROM {table}_day_{obs_type} "
-                  "WHERE dateTime >= {start} AND dateTime < {stop};",
-        'avg_lt': "SELECT SUM(wsum/sumtime < {val}) FROM {table}_day_{obs_type} "
-                  "WHERE dateTime >= {start} AND dateTime < {stop};",
-    }
+    aggregate_types = ('avg_ge', 'avg_gt', 'avg_le', 'avg_lt')
+
+    def __init__(self):
+        self.cache = XAggsCache()
 
     def get_aggregate(self, obs_type, timespan, aggregate_type, db_manager, **option_dict):
         """Calculate days with an average value above or below something"""
 
-        if aggregate_type not in XAggsAvg.sql_stmts:
+        if aggregate_type not in XAggsAvg.aggregate_types:
             raise weewx.UnknownAggregation(aggregate_type)
 
         if db_manager.std_unit_system is None:
@@ -156,31 +192,50 @@ class XAggsAvg(weewx.xtypes.XType):
         # Convert val to the same unit system used in the database
         val_std = weewx.units.convertStd(val, db_manager.std_unit_system)
 
+        key = XAggsCache.make_key(db_manager, obs_type, timespan.start, timespan.stop)
+        avgs = self.cache.get(key)
+        if avgs is None:
+            avgs = self.get_day_avgs(obs_type, timespan, db_manager)
+            self.cache.put(key, avgs)
+
+        # Count the days. As with SQL SUM(), days without an average do not count, and
+        # the result is None, if there is no day with an average at all.
+        if not avgs:
+            days = None
+        elif aggregate_type == 'avg_ge':
+            days = len(avgs) - bisect.bisect_left(avgs, val_std[0])
+        elif aggregate_type == 'avg_gt':
+            days = len(avgs) - bisect.bisect_right(avgs, val_std[0])
+        elif aggregate_type == 'avg_le':
+            days = bisect.bisect_right(avgs, val_std[0])
+        else:
+            days = bisect.bisect_left(avgs, val_std[0])
+
+        # Form a ValueTuple and return it
+        vt = weewx.units.ValueTuple(days, 'count', 'group_count')
+        return vt
+
+    @staticmethod
+    def get_day_avgs(obs_type, timespan, db_manager):
+        """Return the sorted daily averages of obs_type within timespan"""
+
         # Form the interpolation dictionary:
         interp_dict = {
             'table': db_manager.table_name,
             'obs_type': obs_type,
-            'val': val_std[0],
             'start': timespan.start,
             'stop': timespan.stop,
         }
 
-        # Get the correct sql statement, then format it with the interpolation dictionary.
-        sql_stmt = XAggsAvg.sql_stmts[aggregate_type].format(**interp_dict)
+        # Get the sql statement, then format it with the interpolation dictionary.
+        sql_stmt = XAggsAvg.sql_stmt.format(**interp_dict)
 
         # Hit the database:
         try:
-            row = db_manager.getSql(sql_stmt)
+            return sorted(row[0] for row in db_manager.genSql(sql_stmt) if row[0] is not None)
         except weedb.NoColumnError:
             raise weewx.UnknownType(obs_type)
 
-        # Get the value out of the result set
-        days = row[0] if row else None
-
-        # Form a ValueTuple and return it
-        vt = weewx.units.ValueTuple(days, 'count', 'group_count')
-        return vt
-
 
 class XAggsService(StdService):
     """WeeWX dummy service for initializing the XStats extensions.
@@ -50,7 +50,7 @@ import copy
 import shutil
 import pytz
 import math
-import paho.mqtt.publish as mqtt_publish
+import weiwx.mqttpublisher as mqttpublisher
 import paho.mqtt.subscribe as mqtt_subscribe
 import requests
 from requests.exceptions import Timeout
@@ -847,28 +847,26 @@ def publish_broker(thread_name, mqtt_options, packet, debug=0, log_success=False
                 logdbg("thread '%s': publish_broker json '%s:%s' topic '%s'" % (thread_name, mqtt_options['mqtt_broker'], str(mqtt_options['mqtt_port']), topic))
                 logdbg("thread '%s': publish_broker json value '%s'" % (thread_name, json.dumps(value)))
             try:
-                mqtt_publish.single(topic, value, hostname=mqtt_options['mqtt_broker'], port=mqtt_options['mqtt_port'],
-                    auth={'username': mqtt_options['mqtt_username'], 'password': mqtt_options['mqtt_password']}, keepalive=mqtt_options['mqtt_keepalive'],
-                    qos=mqtt_options['mqtt_qos'], retain=mqtt_options['mqtt_retain'], client_id=mqtt_options['mqtt_clientid'])
+                mqttpublisher.publish_multiple(mqtt_options, [(topic, value)])
             except Exception as e:
                 exception_output(thread_name, e)
                 return False
         if format == 'keyvalue':
             if debug > 2:
                 logdbg("thread '%s': publish_broker keyvalue '%s:%s' topic '%s'" % (thread_name, mqtt_options['mqtt_broker'], str(mqtt_options['mqtt_port']), mqtt_options['mqtt_topic']))
+            msgs = list()
             for key, value in packet.items():
-                try:
-                    if value is None:
-                        value = " " # TODO The publisher does not send NULL or "" values
-                    topic = mqtt_options['mqtt_topic'] + '/' + str(key)
-                    if debug > 2:
-                        logdbg("thread '%s': publish_broker keyvalue %s=%s" % (thread_name, topic, str(value)))
-                    mqtt_publish.single(topic, value, hostname=mqtt_options['mqtt_broker'], port=mqtt_options['mqtt_port'],
-                        auth={'username': mqtt_options['mqtt_username'], 'password': mqtt_options['mqtt_password']}, keepalive=mqtt_options['mqtt_keepalive'],
-                        qos=mqtt_options['mqtt_qos'], retain=mqtt_options['mqtt_retain'], client_id=mqtt_options['mqtt_clientid'])
-                except Exception as e:
-                    exception_output(thread_name, e, 'payload %s' % json.dumps(value))
-                    return False
+                topic = mqtt_options['mqtt_topic'] + '/' + str(key)
+                if debug > 2:
+                    logdbg("thread '%s': publish_broker keyvalue %s=%s" % (thread_name, topic, str(value)))
+                msgs.append((topic, value))
+            try:
+                count = mqttpublisher.publish_multiple(mqtt_options, msgs, changed_only=weeutil.weeutil.to_bool(mqtt_options.get('mqtt_changed_only', True)))
+                if debug > 0:
+                    logdbg("thread '%s': publish_broker keyvalue %d of %d topics published" % (thread_name, count, len(msgs)))
+            except Exception as e:
+                exception_output(thread_name, e)
+                return False
 
     if log_success or debug > 0:
         loginf("thread '%s': publish_broker message published" % (thread_name))
@@ -1265,6 +1263,7 @@ class AbstractThread(threading.Thread):
             mqtt_options['mqtt_retain'] = weeutil.weeutil.to_bool(mqttout_dict.get('retain', False))
             mqtt_options['mqtt_max_attempts'] = weeutil.weeutil.to_int(mqttout_dict.get('max_attempts', 1))
             mqtt_options['mqtt_formats'] = weeutil.weeutil.option_as_list(mqttout_dict.get('formats', list()))
+            mqtt_options['mqtt_changed_only'] = weeutil.weeutil.to_bool(mqttout_dict.get('changed_only', True))
             mqtt_options['mqtt_minimize'] = weeutil.weeutil.to_bool(mqttout_dict.get('minimize', False))
             mqtt_options['mqtt_topic_json_extension'] = mqttout_dict.get('topic_json_extension', 'loop')
             mqtt_options['timezone'] = self.timezone
@@ -1429,6 +1428,7 @@ class AbstractThread(threading.Thread):
         mqtt_options['mqtt_retain'] = weeutil.weeutil.to_bool(mqttout_dict.get('retain', False))
         mqtt_options['mqtt_max_attempts'] = weeutil.weeutil.to_int(mqttout_dict.get('max_attempts', 1))
         mqtt_options['mqtt_formats'] = ('json','keyvalue') # static
+        mqtt_options['mqtt_changed_only'] = weeutil.weeutil.to_bool(mqttout_dict.get('changed_only', True))
         mqtt_options['mqtt_minimize'] = False # static
         mqtt_options['mqtt_topic_json_extension'] = 'loop' # static
         mqtt_options['timezone'] = self.timezone
@@ -5594,6 +5594,7 @@ class CurrentWX(StdService):
                 self.threads['worker'][ii].shutDown()
             except Exception:
                 pass
+        mqttpublisher.MqttPublisher.close_all()
 
 
 
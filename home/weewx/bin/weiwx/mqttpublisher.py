@@ -0,0 +1,192 @@
+#!/usr/bin/python3
+# Copyright (C) 2023 Henry Ott
+"""
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+    Shared MQTT publisher for the weiwx services (currentwx, forecastwx,
+    currentaq, warnwx).
+
+    Instead of paho.mqtt.publish.single, which opens a new connection for
+    every single topic, one persistent client per broker and client id is
+    kept connected. A packet's topics are handed to the client in one burst
+    (publish.multiple semantics) and only topics whose payload changed since
+    the last cycle are sent. After a reconnect all topics are sent again.
+"""
+
+import threading
+import json
+import time
+import paho.mqtt.client as mqtt
+
+try:
+    # Test for new-style weewx logging by trying to import weeutil.logger
+    import weeutil.logger
+    import logging
+    log = logging.getLogger("weiwx.mqttpublisher")
+
+    def logdbg(msg):
+        log.debug(msg)
+
+    def loginf(msg):
+        log.info(msg)
+
+    def logerr(msg):
+        log.error(msg)
+
+except ImportError:
+    # Old-style weewx logging
+    import syslog
+
+    def logmsg(level, msg):
+        syslog.syslog(level, 'weiwx.mqttpublisher: %s' % msg)
+
+    def logdbg(msg):
+        logmsg(syslog.LOG_DEBUG, msg)
+
+    def loginf(msg):
+        logmsg(syslog.LOG_INFO, msg)
+
+    def logerr(msg):
+        logmsg(syslog.LOG_ERR, msg)
+
+
+class MqttPublisherError(Exception):
+    """ Raised if messages could not be handed over to the broker """
+
+
+class MqttPublisher(object):
+    """ persistent MQTT client for one broker and client id """
+
+    _publishers = dict()
+    _publishers_lock = threading.Lock()
+
+    @classmethod
+    def get_publisher(cls, mqtt_options):
+        """ get the (shared) publisher for the broker and client id in mqtt_options """
+        key = (mqtt_options['mqtt_broker'], mqtt_options['mqtt_port'], mqtt_options['mqtt_username'], mqtt_options['mqtt_clientid'])
+        with cls._publishers_lock:
+            publisher = cls._publishers.get(key)
+            if publisher is None:
+                publisher = cls(mqtt_options)
+                cls._publishers[key] = publisher
+            return publisher
+
+    @classmethod
+    def close_all(cls):
+        with cls._publishers_lock:
+            for publisher in cls._publishers.values():
+                publisher.close()
+            cls._publishers = dict()
+
+    def __init__(self, mqtt_options):
+        self.broker = mqtt_options['mqtt_broker']
+        self.port = mqtt_options['mqtt_port']
+        self.keepalive = mqtt_options['mqtt_keepalive']
+        self.timeout = mqtt_options.get('mqtt_timeout', 10)
+        self.connected = threading.Event()
+        # topic -> last published payload
+        self.last_payloads = dict()
+        self.lock = threading.Lock()
+
+        if hasattr(mqtt, 'CallbackAPIVersion'):
+            # paho mqtt v2
+            self.client = mqtt.Client(callback_api_version=mqtt.CallbackAPIVersion.VERSION2, client_id=mqtt_options['mqtt_clientid'])
+        else:
+            self.client = mqtt.Client(client_id=mqtt_options['mqtt_clientid'])
+        self.client.on_connect = self.on_connect
+        self.client.on_disconnect = self.on_disconnect
+        if mqtt_options.get('mqtt_username') is not None:
+            self.client.username_pw_set(mqtt_options['mqtt_username'], mqtt_options.get('mqtt_password'))
+        self.client.reconnect_delay_set(min_delay=1, max_delay=120)
+        # the network loop connects and reconnects in the background
+        self.client.connect_async(self.broker, self.port, self.keepalive)
+        self.client.loop_start()
+
+    def on_connect(self, client, userdata, flags, rc, *args):
+        # args: properties (paho mqtt v2)
+        if rc == 0:
+            loginf("publisher '%s:%s' connected" % (self.broker, str(self.port)))
+            self.connected.set()
+        else:
+            logerr("publisher '%s:%s' connect failed: %s" % (self.broker, str(self.port), str(rc)))
+
+    def on_disconnect(self, client, userdata, *args):
+        # args: rc (paho mqtt v1) or disconnect_flags, reason_code, properties (paho mqtt v2)
+        if self.connected.is_set():
+            loginf("publisher '%s:%s' disconnected" % (self.broker, str(self.port)))
+        self.connected.clear()
+        # retained values may be lost, send everything again after reconnect
+        with self.lock:
+            self.last_payloads = dict()
+
+    @staticmethod
+    def to_payload(value):
+        """ payload as paho would send it """
+        if value is None:
+            return " " # TODO The publisher does not send NULL or "" values
+        if isinstance(value, (dict, list)):
+            return json.dumps(value)
+        if isinstance(value, (bytes, bytearray, str)):
+            return value
+        return str(value)
+
+    def publish_multiple(self, msgs, qos=0, retain=False, changed_only=False):
+        """ publish a list of (topic, value) in one burst, returns the number of messages sent """
+        if not self.connected.wait(self.timeout):
+            raise MqttPublisherError("broker '%s:%s' not connected" % (self.broker, str(self.port)))
+
+        with self.lock:
+            pending = list()
+            for topic, value in msgs:
+                payload = self.to_payload(value)
+                if changed_only and self.last_payloads.get(topic) == payload:
+                    continue
+                pending.append((topic, payload))
+            # remember now, a concurrent cycle must not send the same values again
+            for topic, payload in pending:
+                self.last_payloads[topic] = payload
+
+        infos = list()
+        try:
+            for topic, payload in pending:
+                info = self.client.publish(topic, payload, qos=qos, retain=retain)
+                if info.rc != mqtt.MQTT_ERR_SUCCESS:
+                    raise MqttPublisherError("publish '%s' failed: %s" % (topic, mqtt.error_string(info.rc)))
+                infos.append(info)
+            # wait until the burst has been written (qos 0) or acknowledged (qos 1, 2)
+            deadline = time.time() + self.timeout
+            for info in infos:
+                info.wait_for_publish(max(0.0, deadline - time.time()))
+                if not info.is_published():
+                    raise MqttPublisherError("publish to '%s:%s' timed out" % (self.broker, str(self.port)))
+        except Exception:
+            # not sent, force a resend in the next cycle
+            with self.lock:
+                for topic, payload in pending:
+                    self.last_payloads.pop(topic, None)
+            raise
+        return len(pending)
+
+    def close(self):
+        try:
+            self.client.disconnect()
+            self.client.loop_stop()
+        except Exception as e:
+            logdbg("publisher '%s:%s' close: %s" % (self.broker, str(self.port), str(e)))
+
+
+def publish_multiple(mqtt_options, msgs, changed_only=False):
+    """ publish a list of (topic, value) with the shared publisher of the broker in mqtt_options """
+    publisher = MqttPublisher.get_publisher(mqtt_options)
+    return publisher.publish_multiple(msgs, qos=mqtt_options['mqtt_qos'], retain=mqtt_options['mqtt_retain'], changed_only=changed_only)
@@ -58,6 +58,14 @@ from __future__ import with_statement
             log tags while processing the XML data (for standalone
             usage only)
         
+    wwarns = CAPwarnings.get_warnings_multi(caps, lang='de', log_tags=False)
+    
+        like get_warnings() but for a list of CAPwarnings instances,
+        for example for several configurations and resolutions. 
+        Provider "DWD" downloads and parses every CAP zip file only 
+        once for all instances that use the same URL. Returns a list
+        of wwarn in the order of caps.
+        
     cap.write_html(wwarn, dry_run=False)
     
         write HTML and JSON file(s) out of the dict() wwarn
@@ -97,6 +105,10 @@ from __future__ import with_statement
     
     Invoking as `bbk-warnings` includes the option `--provider=BBK`
     
+    `--config` can be given more than once and `--resolution` accepts
+    a comma separated list like `county,city`. All combinations are
+    processed in one invocation, sharing the downloads.
+    
             
     Common Alerting Protocol (CAP)
     ==============================
@@ -118,11 +130,12 @@ import configobj
 import os.path
 import requests
 import csv
-import io
 import urllib.parse
 from email.utils import formatdate
 import html.parser
 import zipfile
+import tempfile
+import xml.sax.saxutils
 import sys
 
 invoke_fn = os.path.basename(sys.argv[0])
@@ -277,6 +290,9 @@ class CAP(object):
     def level_text(self, level, lang='de', isdwd=None):
         return None
 
+    # downloads bigger than this are spooled to disk
+    SPOOL_MAX_SIZE = 4*1024*1024
+
     CATEGORY = {
         'Geo':{'de':'geophysikalisch','en':'geophysical'},
         'Met':{'de':'meteorologisch','en':'meteorological'},
@@ -358,9 +374,39 @@ class CAP(object):
                 loginf('error downloading %s: %s %s' % (reply.url,reply.status_code,reply.reason))
             return None
 
-    def convert_xml(self, xmltext, log_tags=False):
-        """ convert XML to dict """
-        parser = CAPParser(log_tags)
+    def wget_file(self, url, success_msg='successfully downloaded %s'):
+        """ download from provider into a (temporary) file 
+        
+            The reply is streamed into a spooled temporary file, so that
+            big files are not held in memory. The file is positioned
+            at the beginning.
+        """
+        headers={'User-Agent':'weewx-DWD'}
+        with requests.get(url,headers=headers,stream=True) as reply:
+            if reply.status_code==200:
+                ff = tempfile.SpooledTemporaryFile(max_size=CAP.SPOOL_MAX_SIZE)
+                try:
+                    for chunk in reply.iter_content(chunk_size=65536):
+                        ff.write(chunk)
+                except Exception:
+                    ff.close()
+                    raise
+                ff.seek(0)
+                if self.log_success or self.verbose:
+                    loginf(success_msg % reply.url)
+                return ff
+            else:
+                if self.log_failure or self.verbose:
+                    loginf('error downloading %s: %s %s' % (reply.url,reply.status_code,reply.reason))
+                return None
+
+    def convert_xml(self, xmltext, log_tags=False, area_filter=None):
+        """ convert XML to dict 
+        
+            If area_filter is given, <area> sections for which it returns
+            False are dropped while parsing.
+        """
+        parser = CAPParser(log_tags,area_filter)
         try:
             parser.feed(xmltext)
             cap_dict = parser.cap
@@ -547,26 +593,37 @@ class CAP(object):
         """  """
         if self.verbose:
             print('-- get_warnings -------------------------------')
-        # initialize dict for all regions to collect warnings for
-        wwarn = {self.filter_area[i]:dict() for i in self.filter_area}
+        wwarn = self.new_wwarn()
         for cap in self.warnings(lang,log_tags):
-            alert = self.process_alert(cap,lang)
-            if alert:
-                areas = alert['areas']
-                #print('++++++++++')
-                #print(areas)
-                #print('++++++++++')
-                _areas = dict()
-                for ii in areas: _areas[ii[-1]] = True
-                _region = ', '.join([ii[0] for ii in areas])
-                for ii in _areas:
-                    if _region not in wwarn[ii]:
-                        wwarn[ii][_region] = []
-                    wwarn[ii][_region].append(alert)
-                    #print(json.dumps(alert,indent=4,ensure_ascii=False))
-        # The sub-dictionary for regions was include for the purpose
-        # of sorting, only. Now it is removed to get the the right
-        # data structure.
+            self.add_alert(wwarn,cap,lang)
+        return self.finish_wwarn(wwarn), lang
+        
+    def new_wwarn(self):
+        """ initialize dict for all regions to collect warnings for """
+        return {self.filter_area[i]:dict() for i in self.filter_area}
+        
+    def add_alert(self, wwarn, cap, lang='de'):
+        """ process the alert and add it to wwarn if it is of interest """
+        alert = self.process_alert(cap,lang)
+        if alert:
+            areas = alert['areas']
+            #print('++++++++++')
+            #print(areas)
+            #print('++++++++++')
+            _areas = dict()
+            for ii in areas: _areas[ii[-1]] = True
+            _region = ', '.join([ii[0] for ii in areas])
+            for ii in _areas:
+                if _region not in wwarn[ii]:
+                    wwarn[ii][_region] = []
+                wwarn[ii][_region].append(alert)
+                #print(json.dumps(alert,indent=4,ensure_ascii=False))
+        
+    def finish_wwarn(self, wwarn):
+        """ The sub-dictionary for regions was include for the purpose
+            of sorting, only. Now it is removed to get the the right
+            data structure.
+        """
         for __ww in wwarn:
             x = []
             for ii in wwarn[__ww]: x.extend(wwarn[__ww][ii])
@@ -575,7 +632,7 @@ class CAP(object):
         #if self.verbose:
         #    loginf('file %s processed' % filename)
         #print(json.dumps(wwarn,indent=4,ensure_ascii=False))
-        return wwarn, lang
+        return wwarn
 
     def write_html(self, wwarn, target_path, dryrun):
         """ prototype function """
@@ -808,6 +865,9 @@ class DWD(CAP):
         True: 'DIFF'
     }
 
+    # CAP zip files already downloaded in this invocation by URL
+    zip_cache = dict()
+
     @staticmethod
     def get_eventtype_from_cap(capevent,eventtypeii):
         """ get JSON event type from CAP event and ii """
@@ -858,12 +918,18 @@ class DWD(CAP):
         self.diff = False
 
 
+    def source_url(self, diff=None):
+        """ URL of the directory of the CAP zip files """
+        if diff is None:
+            diff = self.diff
+        if diff:
+            return self.dwd_diff_url
+        return self.dwd_status_url
+
+
     def dir(self, diff, lang='de'):
     
-        if diff:
-            url = self.dwd_diff_url
-        else:
-            url = self.dwd_status_url
+        url = self.source_url(diff)
    
         if self.verbose:
             loginf('about to download zip file list from %s' % url)
@@ -880,46 +946,109 @@ class DWD(CAP):
             
 
     def download_zip(self, diff, file_name):
-    
-        if diff:
-            url = self.dwd_diff_url
-        else:
-            url = self.dwd_status_url
+        """ download CAP zip file 
+        
+            The file is spooled to disk if it is big. It is downloaded 
+            only once per invocation, even if several instances (configs, 
+            resolutions) ask for it.
+        """
+        url = self.source_url(diff)+'/'+file_name
 
-        url = url+'/'+file_name
+        zz = DWD.zip_cache.get(url)
+        if zz:
+            if self.verbose:
+                loginf('%s already downloaded' % url)
+            return zz
 
         if self.verbose:
             loginf('about to download %s' % url)
             
-        reply = self.wget(url)
+        reply = self.wget_file(url)
         
         if reply:
-            return zipfile.ZipFile(io.BytesIO(reply),'r')
+            zz = zipfile.ZipFile(reply,'r')
+            DWD.zip_cache[url] = zz
+            return zz
         else:
             return None
 
 
-    def warnings(self, lang='de',log_tags=False):
-        """ DWD """
+    @staticmethod
+    def area_markers(area_names):
+        """ byte strings to search the raw XML for before parsing it 
+        
+            An alert can only be of interest if one of the area names 
+            appears as element content. Returns None if that cannot
+            be checked for one of the names.
+        """
+        markers = []
+        for name in area_names:
+            if xml.sax.saxutils.escape(name)!=name:
+                # name would be escaped in XML
+                return None
+            markers.append(('>'+name+'<').encode('utf-8'))
+        return markers
+
+
+    def warnings(self, lang='de', log_tags=False, filter_area=None):
+        """ DWD 
+        
+            The members of the zip file are processed one at a time.
+            Members that do not mention one of the areas of filter_area
+            (default self.filter_area) are skipped without parsing, and 
+            <area> sections of other regions are dropped while parsing.
+        """
+        if filter_area is None:
+            filter_area = self.filter_area
         diff = self.diff
         filename = self.dir(diff,lang)[-1]
         if self.verbose:
             loginf('processing file %s' % filename)
-        # initialize dict for all regions to collect warnings for
-        wwarn={self.filter_area[i]:dict() for i in self.filter_area}
         # download CAP file 
         zz = self.download_zip(diff,filename)
+        if not zz: return
         ti = time.time()
+        markers = None if log_tags else DWD.area_markers(filter_area)
+        area_filter = lambda area: area.get('areadesc') in filter_area
         # process alerts included in the CAP file
         for name in zz.namelist():
             # read file out of zip file and convert to dict
-            xmltext = zz.read(name).decode(encoding='utf-8')
-            cap_dict = self.convert_xml(xmltext,log_tags)
+            xmltext = zz.read(name)
+            if markers is not None and not any(marker in xmltext for marker in markers):
+                continue
+            xmltext = xmltext.decode(encoding='utf-8')
+            cap_dict = self.convert_xml(xmltext,log_tags,area_filter)
             for warn in cap_dict:
                 cap_dict[warn]['capwarnings-downloaded'] = ti
                 yield cap_dict[warn]
         
         
+    @staticmethod
+    def get_warnings_multi(caps, lang='de', log_tags=False):
+        """ get warnings for several DWD instances 
+        
+            Instances that use the same URL share one download and 
+            one parse of the CAP zip file. Returns a list of 
+            (wwarn, lang) in the order of caps.
+        """
+        groups = dict()
+        for cap in caps:
+            groups.setdefault(cap.source_url(),[]).append(cap)
+        wwarns = dict()
+        for url, group in groups.items():
+            # all the areas any of the instances is interested in
+            filter_area = set()
+            for cap in group:
+                filter_area.update(cap.filter_area)
+            ww = [cap.new_wwarn() for cap in group]
+            for alert_dict in group[0].warnings(lang,log_tags,filter_area):
+                for cap, wwarn in zip(group,ww):
+                    cap.add_alert(wwarn,alert_dict,lang)
+            for cap, wwarn in zip(group,ww):
+                wwarns[id(cap)] = cap.finish_wwarn(wwarn)
+        return [(wwarns[id(cap)],lang) for cap in caps]
+
+
     def _area_filter(self, info_dict):
         """ find out whether the given alert is valid for one of the areas 
             (cities, counties etc.) we are interested in
@@ -1678,9 +1807,11 @@ class CAPParser(html.parser.HTMLParser):
         'code':     (False,  True)}
         # default:   False   False
         
-    def __init__(self, log_tags=False):
+    def __init__(self, log_tags=False, area_filter=None):
         super(CAPParser,self).__init__()
         self.log_tags = log_tags
+        # function to decide whether to keep an <area> section
+        self.area_filter = area_filter
         self.lvl = 0
         self.tags = []
         self.cap = dict()
@@ -1715,6 +1846,9 @@ class CAPParser(html.parser.HTMLParser):
         del self.tags[-1]
         self.lvl-=1
         if self._is_dict(tag):
+            if tag=='area' and self.area_filter and not self.area_filter(self.ar[-1]):
+                # area of no interest, drop it
+                del self.ar[-2][tag][-1]
             del self.ar[-1]
         if self.log_tags:
             print(self.lvl,self.tags,'end',tag)
@@ -1814,6 +1948,20 @@ class CAPwarnings(object):
         return self.cap.get_warnings(lang,log_tags)
     
     
+    @staticmethod
+    def get_warnings_multi(caps, lang='de', log_tags=False):
+        """ get warnings for a list of CAPwarnings instances """
+        dwd = [cap.cap for cap in caps if isinstance(cap.cap,DWD)]
+        wwarns = {id(cc):ww for cc,ww in zip(dwd,DWD.get_warnings_multi(dwd,lang,log_tags))}
+        reply = []
+        for cap in caps:
+            if id(cap.cap) in wwarns:
+                reply.append(wwarns[id(cap.cap)])
+            else:
+                reply.append(cap.get_warnings(lang,log_tags))
+        return reply
+    
+    
     def write_html(self, wwarn, dryrun):
         self.cap.write_html(wwarn, self.target_path, dryrun)
         
@@ -1829,8 +1977,9 @@ if __name__ == "__main__" or invoke_fn in standalone:
     # options
     parser.add_option("--config", dest="config_path", type=str,
                       metavar="CONFIG_FILE",
+                      action="append",
                       default=None,
-                      help="Use configuration file CONFIG_FILE.")
+                      help="Use configuration file CONFIG_FILE. Can be given more than once.")
     parser.add_option("--weewx", action="store_true",
                       help="Read config from weewx.conf.")
     parser.add_option("--lang", dest="lang", type=str,
@@ -1847,7 +1996,7 @@ if __name__ == "__main__" or invoke_fn in standalone:
     group.add_option("--resolution", dest="resolution", type=str,
                       metavar="VALUE",
                       default=None,
-                      help="Overwrite configuration setting for resolution. Possible values are 'county' and 'city'.")
+                      help="Overwrite configuration setting for resolution. Possible values are 'county' and 'city' or a comma separated list of both.")
     group.add_option("--get-warncellids", dest="warncellids", action="store_true",
                       help="Download warn cell ids file.")
     group.add_option("--list-ii", dest="lsii", action="store_true",
@@ -1881,65 +2030,16 @@ if __name__ == "__main__" or invoke_fn in standalone:
     (options, args) = parser.parse_args()
 
     if options.weewx:
-        config_path = "/etc/weewx/weewx.conf"
+        config_paths = ["/etc/weewx/weewx.conf"]
+    elif options.config_path:
+        config_paths = options.config_path
     else:
-        config_path = options.config_path
-
-    if config_path:
-        print("Using configuration file %s" % config_path)
-        config = configobj.ConfigObj(config_path)
+        config_paths = [None]
+    if options.resolution:
+        resolutions = options.resolution.split(',')
     else:
-        # test only
-        print("Using test configuration")
-        # vom Benutzer anzupassen
-        states=['Sachsen','Thüringen']
-        counties={
-            'Kreis Mittelsachsen - Tiefland':'DL',
-            'Stadt Leipzig':'L',
-            'Stadt Jena':'J',
-            'Stadt Dresden':'DD'}
-        cities={
-            'Stadt Döbeln':'DL',
-            'Stadt Leipzig':'L',
-            'Stadt Jena':'J',
-            'Stadt Dresden':'DD'}
-        ICON_PTH="../dwd/warn_icons_50x50"
-        target_path='.'
-    
-        config = configobj.ConfigObj({
-            'log_success':True,
-            'log_failure':True,
-            'WeatherServices': {
-                'path':target_path,
-                'warning':{
-                    '1': {
-                        'provider':'MSC',
-                        'office':'CWHX',
-                        'county':'Upper Lake Melville',
-                        'file':'XX'
-                    }
-                }
-            },
-            'DeutscherWetterdienst': {
-                'warning': {
-                    #'dwd_status_url': get_cap_url('city','cell','neutral',False),
-                    #'dwd_diff_url': get_cap_url('city','cell','neutral',True),
-                    'icons': ICON_PTH,
-                    'states' : states,
-                    'counties': counties,
-                    'cities': cities },
-                'BBK': {
-                    'counties': {
-                         '145220080080':'DL',
-                         #'145220250250':'DL',
-                         '147130000000':'L',
-                         '145210440440':'Oberwiesenthal'}}}})
+        resolutions = [None]
 
-    if options.resolution:
-        config['DeutscherWetterdienst']['warning']['resolution'] = options.resolution
-    if options.target_path is not None:
-        config['WeatherServices']['path'] = options.target_path
-    
     # warnings provider
     if invoke_fn=='dwd-cap-warnings':
         # Deutscher Wetterdienst
@@ -1956,27 +2056,88 @@ if __name__ == "__main__" or invoke_fn in standalone:
             if options.warncellids:
                 provider = 'DWD'
 
-    # areas (cities, counties) to get alerts for
-    if len(args)>0:
-        if provider=='DWD':
-            arg_dict = {arg:arg for arg in args}
-            res = config['DeutscherWetterdienst']['warning']['resolution']
-            if res in ('county','counties'):
-                res = 'counties'
-            elif res in ('city','cities'):
-                res = 'cities'
-            config['DeutscherWetterdienst']['warning'][res] = arg_dict
-        else:
-            arg_dict = {arg:{'provider':provider} for arg in args}
-            config['WeatherServices']['warning'] = arg_dict
-            if 'warning' in config['DeutscherWetterdienst']:
-                del config['DeutscherWetterdienst']['warning']
-    
-    if options.include_dwd is not None:
-        if 'WeatherServices' in config and 'warning' in config['WeatherServices']:
-            config['WeatherServices']['warning']['bbk_include_dwd'] = options.include_dwd
+    def read_config(config_path, resolution):
+        """ read the configuration and apply the command line options """
+        if config_path:
+            print("Using configuration file %s" % config_path)
+            config = configobj.ConfigObj(config_path)
         else:
-            config['DeutscherWetterdienst']['BBK']['include_dwd'] = options.include_dwd
+            # test only
+            print("Using test configuration")
+            # vom Benutzer anzupassen
+            states=['Sachsen','Thüringen']
+            counties={
+                'Kreis Mittelsachsen - Tiefland':'DL',
+                'Stadt Leipzig':'L',
+                'Stadt Jena':'J',
+                'Stadt Dresden':'DD'}
+            cities={
+                'Stadt Döbeln':'DL',
+                'Stadt Leipzig':'L',
+                'Stadt Jena':'J',
+                'Stadt Dresden':'DD'}
+            ICON_PTH="../dwd/warn_icons_50x50"
+            target_path='.'
+
+            config = configobj.ConfigObj({
+                'log_success':True,
+                'log_failure':True,
+                'WeatherServices': {
+                    'path':target_path,
+                    'warning':{
+                        '1': {
+                            'provider':'MSC',
+                            'office':'CWHX',
+                            'county':'Upper Lake Melville',
+                            'file':'XX'
+                        }
+                    }
+                },
+                'DeutscherWetterdienst': {
+                    'warning': {
+                        #'dwd_status_url': get_cap_url('city','cell','neutral',False),
+                        #'dwd_diff_url': get_cap_url('city','cell','neutral',True),
+                        'icons': ICON_PTH,
+                        'states' : states,
+                        'counties': counties,
+                        'cities': cities },
+                    'BBK': {
+                        'counties': {
+                             '145220080080':'DL',
+                             #'145220250250':'DL',
+                             '147130000000':'L',
+                             '145210440440':'Oberwiesenthal'}}}})
+
+        if resolution:
+            config['DeutscherWetterdienst']['warning']['resolution'] = resolution
+        if options.target_path is not None:
+            config['WeatherServices']['path'] = options.target_path
+
+        # areas (cities, counties) to get alerts for
+        if len(args)>0:
+            if provider=='DWD':
+                arg_dict = {arg:arg for arg in args}
+                res = config['DeutscherWetterdienst']['warning']['resolution']
+                if res in ('county','counties'):
+                    res = 'counties'
+                elif res in ('city','cities'):
+                    res = 'cities'
+                config['DeutscherWetterdienst']['warning'][res] = arg_dict
+            else:
+                arg_dict = {arg:{'provider':provider} for arg in args}
+                config['WeatherServices']['warning'] = arg_dict
+                if 'warning' in config['DeutscherWetterdienst']:
+                    del config['DeutscherWetterdienst']['warning']
+
+        if options.include_dwd is not None:
+            if 'WeatherServices' in config and 'warning' in config['WeatherServices']:
+                config['WeatherServices']['warning']['bbk_include_dwd'] = options.include_dwd
+            else:
+                config['DeutscherWetterdienst']['BBK']['include_dwd'] = options.include_dwd
+        return config
+
+    # one configuration per config file and resolution
+    configs = [read_config(config_path,resolution) for config_path in config_paths for resolution in resolutions]
 
     if options.lsii:
         # list II weather codes
@@ -1990,7 +2151,8 @@ if __name__ == "__main__" or invoke_fn in standalone:
                 print("---:|-----:|--:|--------------------------------------------------------------")
             print("%3s | %4s | %1s | %s" % (ii[0],ii[1],ii[2],ii[3]))
     else:
-        cap = CAPwarnings(config,provider,options.verbose)
+        caps = [CAPwarnings(config,provider,options.verbose) for config in configs]
+        cap = caps[0]
 
         if options.warncellids:
             # DWD warncellids
@@ -2007,6 +2169,7 @@ if __name__ == "__main__" or invoke_fn in standalone:
             print(json.dumps(cap.cap.eventicons,indent=4,ensure_ascii=False))
         else:
             # output alerts to files in HTML and JSON
-            wwarn = cap.get_warnings(options.lang,options.log_tags)
-            cap.write_html(wwarn,options.dry_run)
+            wwarns = CAPwarnings.get_warnings_multi(caps,options.lang,options.log_tags)
+            for cap, wwarn in zip(caps,wwarns):
+                cap.write_html(wwarn,options.dry_run)
     
@@ -15,7 +15,8 @@
     You should have received a copy of the GNU General Public License
     along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
-    Parser for (possibly compressed) DWD MOSMIX KML XML files for a station into JSON.
+    Parser for (possibly compressed) DWD MOSMIX KML XML files for one or more stations into JSON.
+    All requested stations are extracted in one single pass, one JSON file is written per station.
 
     https://opendata.dwd.de/weather/local_forecasts/mos/MOSMIX_L/all_stations/kml/MOSMIX_L_LATEST.kmz
     https://opendata.dwd.de/weather/local_forecasts/mos/MOSMIX_S/all_stations/kml/MOSMIX_S_LATEST_240.kmz
@@ -34,7 +35,7 @@ from pathlib import Path
 from zipfile import ZipFile, BadZipFile
 
 from contextlib import contextmanager
-from typing import Optional, List, IO, Tuple, Dict, Generator, ClassVar, Set, Iterator, Any, Iterable, Union, Literal
+from typing import Optional, List, IO, Tuple, Dict, Generator, ClassVar, Set, Iterator, Any, Union, Literal
 
 try:
     from lxml.etree import iterparse, _Element as Element  # nosec
@@ -124,20 +125,8 @@ class DwdMosmixParser:
     def parse_product(self, fp: IO[bytes]) -> Iterator[Dict[str, Any]]:
         """Give product with the properties from ``ProductDefinition`` nodes."""
         for elem in self._iter_tag(fp, "dwd:ProductDefinition"):
-            issuer: Optional[Element] = elem.find("dwd:Issuer", self._ns)
-            if issuer is None or not issuer.text:
-                raise ValueError("No 'ProductDefinition.Issuer' found")
-            genProcess: Optional[Element] = elem.find("dwd:GeneratingProcess", self._ns)
-            if genProcess is None or not genProcess.text:
-                raise ValueError("No 'ProductDefinition.dwd:GeneratingProcess' found")
-            issueTime: Optional[Element] = elem.find("dwd:IssueTime", self._ns)
-            if issueTime is None or not issueTime.text:
-                raise ValueError("No 'ProductDefinition.IssueTime' found")
-            timestamp = self._parse_timestamp(issueTime.text)
-            timestampISO = dateISOfromTimstamp(timestamp)
+            yield self._parse_product(elem)
             break
-        product: Dict[str, Any] = {"provider": issuer.text, "generator": genProcess.text, "generated": timestamp, "generatedISO": timestampISO}
-        yield product
 
     @classmethod
     def _parse_timestamp(cls, value: Optional[str]) -> int:
@@ -230,6 +219,62 @@ class DwdMosmixParser:
             if stations is None or station in stations:
                 yield station, self._parse_forecast(elem)
 
+    def parse_stations(self, fp: IO[bytes], timezones: bool,
+                       stations: Set[str]) -> Tuple[Dict[str, Any], List[int], Dict[str, Dict[str, Any]]]:
+        """
+        Give product, timestamps as well as placemark and forecasts of the requested stations in one single pass.
+        Parsing stops as soon as all requested stations have been seen, i.e., the remainder of the (compressed)
+        stream is neither inflated nor parsed.
+        """
+
+        tag_product: str = f"{{{self._ns['dwd']}}}ProductDefinition"
+        tag_timesteps: str = f"{{{self._ns['dwd']}}}ForecastTimeSteps"
+        tag_placemark: str = f"{{{self._ns['kml']}}}Placemark"
+
+        tf: TimezoneFinder = TimezoneFinder.get_inst(timezones)
+        product: Optional[Dict[str, Any]] = None
+        timestamps: Optional[List[int]] = None
+        results: Dict[str, Dict[str, Any]] = {}
+
+        for _evt, elem in iterparse(fp, events=["end"]):  # type: str, Element
+            tag = elem.tag
+            if tag == tag_placemark:
+                station: str = self._parse_description(elem)
+                if station in stations and station not in results:
+                    placemark: Dict[str, Any] = self._parse_placemark(elem)
+                    placemark["timezone"] = tf.timezone_at(lng=placemark["longitude"], lat=placemark["latitude"])
+                    results[station] = {"station": placemark, "forecasts": self._parse_forecast(elem)}
+                elem.clear()
+                if len(results) == len(stations):
+                    break
+            elif tag == tag_timesteps:
+                timestamps = [self._parse_timestamp(_.text) for _ in elem.iterfind("dwd:TimeStep", self._ns)]
+                elem.clear()
+            elif tag == tag_product:
+                product = self._parse_product(elem)
+                elem.clear()
+
+        if product is None:
+            raise ValueError("No 'ProductDefinition' found")
+        if timestamps is None:
+            raise ValueError("No 'ForecastTimeSteps' found")
+        return product, timestamps, results
+
+    @classmethod
+    def _parse_product(cls, elem: Element) -> Dict[str, Any]:
+        issuer: Optional[Element] = elem.find("dwd:Issuer", cls._ns)
+        if issuer is None or not issuer.text:
+            raise ValueError("No 'ProductDefinition.Issuer' found")
+        genProcess: Optional[Element] = elem.find("dwd:GeneratingProcess", cls._ns)
+        if genProcess is None or not genProcess.text:
+            raise ValueError("No 'ProductDefinition.dwd:GeneratingProcess' found")
+        issueTime: Optional[Element] = elem.find("dwd:IssueTime", cls._ns)
+        if issueTime is None or not issueTime.text:
+            raise ValueError("No 'ProductDefinition.IssueTime' found")
+        timestamp = cls._parse_timestamp(issueTime.text)
+        return {"provider": issuer.text, "generator": genProcess.text, "generated": timestamp,
+                "generatedISO": dateISOfromTimstamp(timestamp)}
+
 
 @contextmanager
 def kmz_reader(fp: IO[bytes]) -> Generator[IO[bytes], None, None]:
@@ -272,29 +317,17 @@ class _JSONIterWriter:
                                                             allow_nan=False, check_circular=False)
 
     @classmethod
-    def writeJSON(cls, ifp: IO[str], ofp: IO[str], args, url) -> None:
-        setlocale(LC_ALL, "C")  # for strptime
-        mosmix_parser: DwdMosmixParser = DwdMosmixParser()
+    def writeJSON(cls, ofp: IO[str], source: str, url: str, product: Dict[str, Any], timestamps: List[int],
+                  result: Dict[str, Any]) -> None:
         data = dict()
-        data['source'] = args.in_file
+        data['source'] = source
         data['sourceUrl'] = url
         now = int(time.time())
         data['dateTime'] = now
         data['dateTimeISO'] = dateISOfromTimstamp(now)
+        data.update(product)
+        data['station'] = result['station']
 
-        # parse data
-        product: Iterable[Any] = mosmix_parser.parse_product(ifp)
-        for item in product:
-            data.update(item)
-
-        ifp.seek(0)
-        station: Iterable[Any] = mosmix_parser.parse_placemarks(ifp, args.timezones, args.station)
-        data['station'] = dict()
-        for item in station:
-            data['station'].update(item)
-
-        ifp.seek(0)
-        timestamps: Iterable[Any] = mosmix_parser.parse_timestamps(ifp)
         data['hourly'] = dict()
         data['hourly']['time'] = list()
         for item in timestamps:
@@ -302,19 +335,12 @@ class _JSONIterWriter:
                 item = CONVERT_DICT['timestamp'](int(item))
             data['hourly']['time'].append(item)
 
-        ifp.seek(0)
-        values: Iterable[Tuple[str, Any]] = mosmix_parser.parse_forecasts(ifp, args.station)
-        for key, item in values:
-            for obs in item:
-                if str(obs) in CONVERT_DICT:
-                    for i, val in enumerate(item[obs]):
-                        if val is not None:
-                            item[obs][i] = round(CONVERT_DICT[str(obs)](float(item[obs][i])), 5)
-                # else:
-                    # for i, val in enumerate(item[obs]):
-                        # if val is not None:
-                            # item[obs][i] = round(float(item[obs][i]), 5)
-                data['hourly'][str(obs)] = item[obs]
+        forecasts: Dict[str, List[Optional[float]]] = result['forecasts']
+        for obs, values in forecasts.items():
+            if obs in CONVERT_DICT:
+                convert = CONVERT_DICT[obs]
+                values = [round(convert(val), 5) if val is not None else None for val in values]
+            data['hourly'][obs] = values
         ofp.write(json.dumps(data, indent=4))
 
 
@@ -346,28 +372,56 @@ class _TempFile:
         return False  # passing through exceptions
 
 
+def station_out_file(out_file: Path, station: str, multiple: bool) -> Path:
+    """
+    Output file of a station. A ``{station}`` placeholder in the given filename is replaced by the lowercase
+    station name, otherwise the station name is appended to the filename stem when more than one station is requested.
+    """
+
+    name: str = station.lower().replace(" ", "_")
+    if "{station}" in str(out_file):
+        return Path(str(out_file).format(station=name))
+    if multiple:
+        return out_file.with_name(f"{out_file.stem}_{name}{out_file.suffix}")
+    return out_file
+
+
 def main() -> int:
     parser = argparse.ArgumentParser(description=__doc__.strip())
     parser.add_argument("--in-file", metavar="MOSMIX.KMZ", type=str, default='MOSMIX_S', required=True,
                         help="input MOSMIX_L/MOSMIX_S file to read")
     parser.add_argument("--out-file", metavar="FILE.JSON", type=Path, required=True,
-                        help="output json file to write")
+                        help="output json file to write, may contain a {station} placeholder")
     parser.add_argument("--timezones", action="store_const", const=True, default=False,
                         help="determine timezones from coordinates")
     parser.add_argument("--station", metavar="STATIONS", type=str, default="WEIDEN", required=True,
-                        help="For which station should the values be loaded")
+                        help="For which stations (comma separated) should the values be loaded")
 
     args = parser.parse_args()
 
+    stations: List[str] = [_.strip() for _ in args.station.split(",") if _.strip()]
+    if not stations:
+        parser.error("no station given")
+
     url = URL_DICT[args.in_file]
     in_file: Path = Path('/tmp/' + args.in_file + '.kmz')
     urllib.request.urlretrieve(url, in_file)
 
+    setlocale(LC_ALL, "C")  # for strptime
+    mosmix_parser: DwdMosmixParser = DwdMosmixParser()
     with kml_reader(in_file) as ifp:
-        with _TempFile(args.out_file) as ofp:
-            _JSONIterWriter.writeJSON(ifp, ofp, args, url)
-    return 0
+        product, timestamps, results = mosmix_parser.parse_stations(ifp, args.timezones, set(stations))
+
+    rc = 0
+    for station in stations:
+        if station not in results:
+            print("ERROR: station %s not found in %s" % (station, args.in_file))
+            rc = 1
+            continue
+        with _TempFile(station_out_file(args.out_file, station, len(stations) > 1)) as ofp:
+            _JSONIterWriter.writeJSON(ofp, args.in_file, url, product, timestamps, results[station])
+    return rc
 
 
 if __name__ == "__main__":
-    sys.exit(main())
\ No newline at end of file
+    sys.exit(main())
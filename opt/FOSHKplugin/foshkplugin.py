@@ -35,6 +35,7 @@ try:
   import signal
   import threading
   from threading import Timer
+  import queue
   import ftplib
   import io
   import paho.mqtt.publish as publish
@@ -72,6 +73,7 @@ udpTimeOut = 3                                   # Timeout in Sekunden fuer sock
 execTimeOut = 15                                 # Timeout in seconds for executing external scripts
 LOG_LEVEL = "ALL"                                # specify the default log level (ERROR, WARNING, INFO, ALL)
 FWD_WARNINT = 10                                 # global default for threshold of unsuccessful forward attempts for FWD_WARNING
+FWD_WORKERS = 0                                  # count of worker threads sending the forwards (0: one per forward, max. 8)
 DT_FORMAT = "%d.%m.%Y %H:%M:%S"                  # global default for date/time format
 
 cmd_discover     = "\xff\xff\x12\x00\x04\x16"
@@ -290,6 +292,70 @@ def pushSend(url, token, user, message):
   if okstr != "": logger.info(okstr + ret_str + " : " + ret + tries)
   return
 
+# forward engine: a fixed pool of worker threads sends the forwards
+# every forward has one slot for the packet waiting to be sent; a newer packet replaces a still waiting older one (coalesce)
+# so a slow target occupies at most one worker and never piles up packets
+fwdLock = threading.Lock()
+fwdReady = queue.Queue()                                       # index of the forwards with a packet waiting for a worker
+fwdPending = {}                                                # index of forward: (function, args, time of queueing)
+fwdBusy = set()                                                # index of the forwards currently being sent
+fwdStats = {}                                                  # index of forward: statistics for fwdstat
+fwdSessions = threading.local()                                # keep-alive sessions per thread and destination
+fwdWorkers = []
+
+def fwdSubmit(i, target, args):                                # queue packet for forward i, replaces a waiting packet
+  with fwdLock:
+    st = fwdStats.setdefault(i, {"sent": 0, "dropped": 0, "latency": 0.0, "avglatency": 0.0, "maxlatency": 0.0})
+    if i in fwdPending: st["dropped"] += 1                     # the waiting packet is stale - replace it
+    elif i not in fwdBusy: fwdReady.put(i)                     # a busy forward is requeued by its worker when done
+    fwdPending[i] = (target, args, time.time())
+
+def fwdWorker():
+  while True:
+    i = fwdReady.get()
+    with fwdLock:
+      job = fwdPending.pop(i, None)
+      if job is None: continue
+      fwdBusy.add(i)
+    target, args, queued = job
+    try:
+      target(*args)
+    except Exception as err:
+      logPrint("<ERROR> FWD-"+fwd_arr[i][11]+": unexpected error while forwarding: "+str(err))
+    finally:
+      with fwdLock:
+        fwdBusy.discard(i)
+        st = fwdStats[i]
+        st["latency"] = time.time()-queued                     # time from queueing until sent
+        st["avglatency"] = st["latency"] if st["sent"] == 0 else st["avglatency"]*0.9+st["latency"]*0.1
+        st["maxlatency"] = max(st["maxlatency"], st["latency"])
+        st["sent"] += 1
+        if i in fwdPending: fwdReady.put(i)                    # a newer packet arrived meanwhile
+
+def fwdStartWorkers(count):
+  for n in range(count):
+    t = threading.Thread(target=fwdWorker, name="fwdWorker-"+str(n))
+    t.daemon = True
+    t.start()
+    fwdWorkers.append(t)
+
+def fwdQueueState(i):                                          # packets in progress/waiting, dropped packets, latency
+  with fwdLock:
+    st = fwdStats.get(i, {"dropped": 0, "latency": 0.0, "avglatency": 0.0, "maxlatency": 0.0})
+    return (i in fwdBusy)+(i in fwdPending), st["dropped"], st["latency"], st["avglatency"], st["maxlatency"]
+
+def fwdSession(url):                                           # keep-alive session per thread and destination (scheme and host)
+  u = requests.utils.urlparse(url)                             # requests.Session is not thread-safe, so no session is shared
+  key = u.scheme+"://"+u.netloc
+  sessions = getattr(fwdSessions, "sessions", None)
+  if sessions is None:                                         # first forward of this thread
+    sessions = fwdSessions.sessions = {}
+  ses = sessions.get(key)
+  if ses is None:
+    ses = requests.Session()
+    sessions[key] = ses
+  return ses
+
 def fr(s,l,c=" "):                                       # fillRight
   add = ""
   for i in range(l-len(s)): add += c
@@ -1362,7 +1428,7 @@ def forwardDictToMeteoTemplate(url,d_in,fwd_sid,fwd_pwd,script,nr,ignoreKeys,rem
   v = 0
   while okstr[0:7] == "<ERROR>" and v < httpTries:
     try:
-      r = requests.get(url+outstr,timeout=httpTimeOut)
+      r = fwdSession(url).get(url+outstr,timeout=httpTimeOut)
       ret = str(r.status_code)
       okstr = "<ERROR> " if r.status_code not in range(200,203) else ""
       if r.status_code in range(400,500): v = 400
@@ -1544,7 +1610,7 @@ def forwardDictToWC(url,d_in,fwd_sid,fwd_pwd,script,nr,ignoreKeys,remapKeys):
       headers = {'Connection': 'Close','User-Agent': None}
       # strange problems if header contains Connection:Close - so disable for test
       #r = requests.get(url+outstr,headers=headers,timeout=httpTimeOut)
-      r = requests.get(url+outstr,timeout=httpTimeOut)
+      r = fwdSession(url).get(url+outstr,timeout=httpTimeOut)
       # WC responds status_code 200 in any case - real return code is in text
       # optimized
       ret = str(r.status_code) if r.status_code != 200 else r.text.strip()  # use text on 200
@@ -1888,7 +1954,7 @@ def forwardStringToWU(url,payload,fwd_sid,fwd_pwd,status,script,nr,ignoreKeys,re
   v = 0
   while okstr[0:7] == "<ERROR>" and v < httpTries:
     try:
-      r = requests.get(url+outstr,timeout=httpTimeOut)
+      r = fwdSession(url).get(url+outstr,timeout=httpTimeOut)
       ret = str(r.status_code)
       okstr = "<ERROR> " if r.status_code not in range(200,203) else ""
       if r.status_code in range(400,500): v = 400
@@ -2058,8 +2124,8 @@ def sendviaPost(url, outstr):
   v = 0
   while okstr[0:7] == "<ERROR>" and v < httpTries:
     try:
-      headers = {'Content-Type': 'application/x-www-form-urlencoded', 'Connection': 'Close','User-Agent': None}
-      r = requests.post(url,data=outstr,headers=headers,timeout=httpTimeOut)
+      headers = {'Content-Type': 'application/x-www-form-urlencoded','User-Agent': None}
+      r = fwdSession(url).post(url,data=outstr,headers=headers,timeout=httpTimeOut)
       ret = str(r.status_code)
       okstr = "<ERROR> " if r.status_code not in range(200,203) else ""
       if r.status_code in range(400,500): v = 400
@@ -2259,9 +2325,9 @@ def forwardStringToAMB(url,payload,fwd_sid,fwd_pwd,status,script,nr,ignoreKeys,r
   v = 0
   while okstr[0:7] == "<ERROR>" and v < httpTries:
     try:
-      headers = {'Content-Type': 'application/x-www-form-urlencoded', 'Connection': 'Close','User-Agent': None}
+      headers = {'Content-Type': 'application/x-www-form-urlencoded','User-Agent': None}
       # for now Ambient will sent via GET instead of POST
-      r = requests.get(url+outstr,headers=headers,timeout=httpTimeOut)
+      r = fwdSession(url).get(url+outstr,headers=headers,timeout=httpTimeOut)
       # Ambient responds 200 in any case - so additionally we have to check for OK
       ret = str(r.text) if r.status_code in range(200,203) else str(r.status_code)
       okstr = "<ERROR> " if r.status_code not in range(200,203) or ret != "OK" else ""
@@ -2310,7 +2376,7 @@ def forwardDictToHTTP(url,d_in,fwd_sid,fwd_pwd,status,script,nr,ignoreKeys,remap
   while okstr[0:7] == "<ERROR>" and v < httpTries:
     try:
       #r = requests.put(url,data=outstr) if ecowitt else requests.get(url+outstr,timeout=httpTimeOut)
-      r = requests.post(url,data=outstr,timeout=httpTimeOut) if ecowitt else requests.get(url+outstr,timeout=httpTimeOut)
+      r = fwdSession(url).post(url,data=outstr,timeout=httpTimeOut) if ecowitt else fwdSession(url).get(url+outstr,timeout=httpTimeOut)
       ret = str(r.status_code)
       okstr = "<ERROR> " if r.status_code not in range(200,203) else ""
       if r.status_code in range(400,500): v = 400
@@ -2777,11 +2843,11 @@ def forwardDictToAwekas(url,d_in,fwd_sid,fwd_pwd,script,nr,ignoreKeys,remapKeys)
   v = 0
   while okstr[0:7] == "<ERROR>" and v < httpTries:
     try:
-      headers = {'Content-Type': 'application/x-www-form-urlencoded', 'Connection': 'Close','User-Agent': None}
+      headers = {'Content-Type': 'application/x-www-form-urlencoded','User-Agent': None}
       # check URL and add needed ?
       if url[-1] != "?": url += "?"
       # Awekas is using http/GET
-      r = requests.post(url+outstr,headers=headers,timeout=httpTimeOut)
+      r = fwdSession(url).post(url+outstr,headers=headers,timeout=httpTimeOut)
       # Awekas responds 200 in any case - so additionally we have to check for OK
       ret = str(r.text) if r.status_code in range(200,203) else str(r.status_code)
       okstr = "<ERROR> " if r.status_code not in range(200,203) or "OK" not in ret else ""
@@ -2861,8 +2927,8 @@ def forwardDictToWetterSektor(url,d_in,fwd_sid,fwd_pwd,script,nr,ignoreKeys,rema
   v = 0
   while okstr[0:7] == "<ERROR>" and v < httpTries:
     try:
-      headers = {'Content-Type': 'application/x-www-form-urlencoded', 'Connection': 'Close','User-Agent': None}
-      r = requests.post(url+outstr,timeout=httpTimeOut)
+      headers = {'Content-Type': 'application/x-www-form-urlencoded','User-Agent': None}
+      r = fwdSession(url).post(url+outstr,timeout=httpTimeOut)
       ret = str(r.status_code)
       okstr = "<ERROR> " if r.status_code not in range(200,203) else ""
       if r.status_code in range(400,500): v = 400
@@ -2962,7 +3028,7 @@ def forwardDictToWetterCOM(url,d_in,fwd_sid,fwd_pwd,script,nr,ignoreKeys,remapKe
   v = 0
   while okstr[0:7] == "<ERROR>" and v < httpTries:
     try:
-      r = requests.get(url+outstr,timeout=httpTimeOut)
+      r = fwdSession(url).get(url+outstr,timeout=httpTimeOut)
       ret = str(r.status_code)
       okstr = "<ERROR> " if r.status_code not in range(200,203) else ""
       if r.status_code in range(400,500): v = 400
@@ -3111,8 +3177,8 @@ def forwardDictToWeather365(url,d_in,fwd_sid,fwd_pwd,script,nr,ignoreKeys,remapK
   v = 0
   while okstr[0:7] == "<ERROR>" and v < httpTries:
     try:
-      headers = {'Content-Type': 'application/x-www-form-urlencoded', 'Connection': 'Close','User-Agent': None}
-      r = requests.post(url,data=outstr,headers=headers,timeout=httpTimeOut)
+      headers = {'Content-Type': 'application/x-www-form-urlencoded','User-Agent': None}
+      r = fwdSession(url).post(url,data=outstr,headers=headers,timeout=httpTimeOut)
       ret = str(r.status_code)
       okstr = "<ERROR> " if r.status_code not in range(200,203) else ""
       if r.status_code in range(400,500): v = 400
@@ -3445,7 +3511,7 @@ def postFile(url, user, password, filename, append, fwd_type, content):
   while okstr[0:7] == "<ERROR>" and v < httpTries:
     try:
       if binary:
-        r = requests.post(url, data=({
+        r = fwdSession(url).post(url, data=({
             "user":user,
             "password":password,
             "filename":filename,
@@ -3455,7 +3521,7 @@ def postFile(url, user, password, filename, append, fwd_type, content):
             "prgver":prgver,
           }), files={'image': open(content, 'rb')}, timeout=httpTimeOut) # , headers={'Content-Type': 'application/octet-stream'}
       else:
-        r = requests.post(url, data=({
+        r = fwdSession(url).post(url, data=({
             "user":user,
             "password":password,
             "filename":filename,
@@ -4166,7 +4232,7 @@ def sendToMIYO(url):
   v = 0
   while okstr[0:7] == "<ERROR>" and v < httpTries:
     try:
-      r = requests.get(url,timeout=httpTimeOut)
+      r = fwdSession(url).get(url,timeout=httpTimeOut)
       ret = str(r.status_code)
       okstr = "<ERROR> " if r.status_code not in range(200,203) else ""
       if r.status_code in range(400,500): v = 400
@@ -4525,11 +4591,48 @@ def addSignalValues(adr):
   debugPrint("addSignalValues "+adr+" stop")
   return out
 
-def addDataToLine(line, what, newvalue, overwrite):
+def addDataToLine(line, what, newvalue, overwrite, d = None):
   # sucht what in line und ersetzt mit newvalue oder haengt an line an
+  # v0.10: d may be given if line is already parsed - it will be extended by the new fields
+  if d is None: d = stringToDict(line,"&")
+  newline = ""
+  if not what in d.keys():
+    newline = line + addDataToDict(d, what, newvalue)
+  elif overwrite:
+    # gibt es bereits - ueberschreiben?
+    for key, value in d.items():
+      if key != what:
+        newline += "&"+key+"="+value
+      elif newvalue == "removefield":
+        None
+      else:
+        newline += "&"+key+"="+str(newvalue)
+  else:
+    newline = line
+  if len(newline) > 0 and newline[0] == "&": newline = newline[1:]
+  return newline
+
+# v0.10: parse the incoming line only once and add all derived fields in one pass
+def addDerivedValues(line):
+  # returns the extended line and its dict (None if line could not be parsed)
   d = stringToDict(line,"&")
+  parsed = line == "" or d != {}
+  fields = ["dewptf","windchillf","feelslikef","heatindexf","pm25_AQI","windavg","brightness","cloudf"]
+  fields.append("sunhours")                                    # combined procedure - dependend on SUN_CALC and existence of lat/lon
+  fields.append("srsum")                                       # v0.10: daily sr sum
+  if HIDDEN_FEATURES:                                          # for testing: should be removed in next release
+    fields.append("osunhours")                                 # old procedure with fixes threshold of 120W/m²
+    fields.append("nsunhours")                                 # new procedure with dynamic threshold
+  outstr = ""
+  for what in fields: outstr += addDataToDict(d, what)
+  newline = line + outstr
+  if len(newline) > 0 and newline[0] == "&": newline = newline[1:]
+  return newline, d if parsed else None
+
+# v0.10: calculates the field(s) for what from the already parsed line d
+def addDataToDict(d, what, newvalue = None):
+  # new fields are added to d and returned as "&key=value" string to append to the line
   outstr = ""
-  newline = ""
   global min_max
   if not what in d.keys():
     # gibt es noch nicht
@@ -4863,20 +4966,9 @@ def addDataToLine(line, what, newvalue, overwrite):
         outstr += "&" + what + "=" + str(min_max[what])
     else:
       outstr += "&" + what + "=" + str(newvalue)
-    newline = line + outstr
-  elif overwrite:
-    # gibt es bereits - ueberschreiben?
-    for key, value in d.items():
-      if key != what:
-        newline += "&"+key+"="+value
-      elif newvalue == "removefield":
-        None
-      else:
-        newline += "&"+key+"="+str(newvalue)
-  else:
-    newline = line
-  if len(newline) > 0 and newline[0] == "&": newline = newline[1:]
-  return newline
+    # later fields depend on the new ones (cloudf needs dewptf)
+    if outstr != "": d.update(stringToDict(outstr[1:],"&"))
+  return outstr
 
 def forwardDictToLuftdaten(url,d_in,fwd_sid,fwd_pwd,script,nr,ignoreKeys,remapKeys):
   # 2do: Script-Integration
@@ -4898,7 +4990,7 @@ def forwardDictToLuftdaten(url,d_in,fwd_sid,fwd_pwd,script,nr,ignoreKeys,remapKe
   v = 0
   while okstr[0:7] == "<ERROR>" and v < httpTries:
     try:
-      r = requests.post(url,
+      r = fwdSession(url).post(url,
         json={
           "software_version": prgname + " " + prgver,
           "sensordatavalues": [
@@ -5179,21 +5271,11 @@ class RequestHandler(BaseHTTPRequestHandler):
       
       # hier ggf. um weitere Felder ergaenzen - etwa dewpt, windchill und feelslike
       #global EVAL_VALUES
+      d_e = None
       if EVAL_VALUES:
-        # erzeugt Wertepaar mit Namen "feld",Wert,Overwrite existent
-        instr = addDataToLine(instr,"dewptf",None,False)
-        instr = addDataToLine(instr,"windchillf",None,False)
-        instr = addDataToLine(instr,"feelslikef",None,False)
-        instr = addDataToLine(instr,"heatindexf",None,False)
-        instr = addDataToLine(instr,"pm25_AQI",None,False)
-        instr = addDataToLine(instr,"windavg",None,False)
-        instr = addDataToLine(instr,"brightness",None,False)
-        instr = addDataToLine(instr,"cloudf",None,False)
-        instr = addDataToLine(instr,"sunhours",None,False)     # combined procedure - dependend on SUN_CALC and existence of lat/lon
-        instr = addDataToLine(instr,"srsum",None,False)        # v0.10: daily sr sum
-        if HIDDEN_FEATURES:                                    # for testing: should be removed in next release
-          instr = addDataToLine(instr,"osunhours",None,False)  # old procedure with fixes threshold of 120W/m²
-          instr = addDataToLine(instr,"nsunhours",None,False)  # new procedure with dynamic threshold
+        # v0.10: parse instr once and add dewptf, windchillf, feelslikef, ... in one pass
+        instr, d_e = addDerivedValues(instr)
+        derived_instr = instr
       if FIX_LIGHTNING and last_lightning_time != 0:
         # set empty keys to last known values
         instr = fixEmptyValue(instr,"lightning_time",str(last_lightning_time))
@@ -5224,7 +5306,8 @@ class RequestHandler(BaseHTTPRequestHandler):
         debugPrint("after:  "+instr)
 
       # create dictionaries E = Imperial; M = Metric; R = RAW
-      d_e = stringToDict(instr,"&")
+      # v0.10: keep the dict of addDerivedValues as long as instr was not changed since
+      if d_e is None or instr != derived_instr: d_e = stringToDict(instr,"&")
       d_r = stringToDict(last_RAWstr,"&")
       d_m = convertDictToMetricDict(d_e,IGNORE_EMPTY,LOX_TIME)
 
@@ -5250,7 +5333,7 @@ class RequestHandler(BaseHTTPRequestHandler):
 
       # v0.08 add ptrend1, pchange1, ptrend3 & pchange3 - needs d_m and is for instr only
       if EVAL_VALUES:
-        instr = addDataToLine(instr,"ptrend",None,False)
+        instr = addDataToLine(instr,"ptrend",None,False,d_e.copy())
 
       # zerlegen
       UDPstr = "SID=" + defSID + " " + dictToString(d_m," ",True,UDP_IGNORE) if USE_METRIC else "SID=" + defSID + " " + dictToString(d_e," ",True,UDP_IGNORE)
@@ -5290,100 +5373,70 @@ class RequestHandler(BaseHTTPRequestHandler):
           if time.time() >= fwd_arr[i][3]+fwd_arr[i][2]:
             fwd_arr[i][3] = time.time()                        # save time of last attempt
             if fwd_arr[i][5] == "WU":                          # String nach WU wandeln und per get versenden
-              t = threading.Thread(target=forwardStringToWU, args=(fwd_arr[i][0],instr,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][8],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13]))
-              t.start()
+              fwdSubmit(i,forwardStringToWU,(fwd_arr[i][0],instr,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][8],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13]))
             elif fwd_arr[i][5] == "RAW":                       # RAW-Dict ohne Aenderung per get weitersenden
-              t = threading.Thread(target=forwardDictToHTTP, args=(fwd_arr[i][0],d_r,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][8],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13],False,True,False,"&"))
-              t.start()
+              fwdSubmit(i,forwardDictToHTTP,(fwd_arr[i][0],d_r,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][8],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13],False,True,False,"&"))
             elif fwd_arr[i][5] == "EW":                        # eingehenden, erweiterten String nach Ecowitt wandeln und per post versenden
-              t = threading.Thread(target=forwardStringToEW, args=(fwd_arr[i][0],instr,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][8],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13],fwd_arr[i][14]))
-              t.start()
+              fwdSubmit(i,forwardStringToEW,(fwd_arr[i][0],instr,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][8],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13],fwd_arr[i][14]))
             elif fwd_arr[i][5] in ("RAWEW","EWRAW"):           # eingehenden RAW-String nach Ecowitt wandeln und per post versenden
-              t = threading.Thread(target=forwardStringToEW, args=(fwd_arr[i][0],last_RAWstr,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][8],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13],fwd_arr[i][14]))
-              t.start()
+              fwdSubmit(i,forwardStringToEW,(fwd_arr[i][0],last_RAWstr,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][8],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13],fwd_arr[i][14]))
             elif fwd_arr[i][5] == "LD":                        # forward pm25 value only to luftdaten.info; args: url, fwd_sid, wert
-              t = threading.Thread(target=forwardDictToLuftdaten, args=(fwd_arr[i][0],d_m,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13],))
-              t.start()
+              fwdSubmit(i,forwardDictToLuftdaten,(fwd_arr[i][0],d_m,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13],))
             elif fwd_arr[i][5] == "UDP":                       # forward metr. or imp. dict per UDP (other target than Loxone)
               d_fwd = d_m if USE_METRIC else d_e
-              t = threading.Thread(target=forwardDictToUDP, args=(fwd_arr[i][0],d_fwd,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][8],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13]," "))
-              t.start()
+              fwdSubmit(i,forwardDictToUDP,(fwd_arr[i][0],d_fwd,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][8],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13]," "))
             elif fwd_arr[i][5] in ("RAWUDP","UDPRAW"):         # forward incoming string via UDP
-              t = threading.Thread(target=forwardStringToUDP, args=(fwd_arr[i][0],instr,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][8],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13]))
-              t.start()
+              fwdSubmit(i,forwardStringToUDP,(fwd_arr[i][0],instr,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][8],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13]))
             elif fwd_arr[i][5] in ("EWUDP","UDPEW"):           # forward imp. dict per UDP (convert to EW-format)
-              t = threading.Thread(target=forwardDictToUDP, args=(fwd_arr[i][0],d_e,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][8],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13],"&"))
-              t.start()
+              fwdSubmit(i,forwardDictToUDP,(fwd_arr[i][0],d_e,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][8],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13],"&"))
             elif fwd_arr[i][5] in ("RAWCSV","CSVRAW"):         # forward the raw values as CSV-string for e.g. Edomi
-              t = threading.Thread(target=forwardDictToHTTP, args=(fwd_arr[i][0],d_r,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][8],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13],True,True,False,";"))
-              t.start()
+              fwdSubmit(i,forwardDictToHTTP,(fwd_arr[i][0],d_r,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][8],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13],True,True,False,";"))
             elif fwd_arr[i][5] == "CSV":                       # forward as CSV-string for e.g. Edomi
               d_fwd = d_m if USE_METRIC else d_e
-              t = threading.Thread(target=forwardDictToHTTP, args=(fwd_arr[i][0],d_fwd,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][8],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13],True,True,False,";"))
-              t.start()
+              fwdSubmit(i,forwardDictToHTTP,(fwd_arr[i][0],d_fwd,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][8],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13],True,True,False,";"))
             elif fwd_arr[i][5] == "AMB":                       # convert incoming string to Ambient and send via GET
-              t = threading.Thread(target=forwardStringToAMB, args=(fwd_arr[i][0],instr,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][8],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13]))
-              t.start()
+              fwdSubmit(i,forwardStringToAMB,(fwd_arr[i][0],instr,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][8],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13]))
             elif fwd_arr[i][5] in ("RAWAMB","AMBRAW"):         # convert incoming RAW-string to Ambient and send via GET
-              t = threading.Thread(target=forwardStringToAMB, args=(fwd_arr[i][0],last_RAWstr,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][8],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13]))
-              t.start()
+              fwdSubmit(i,forwardStringToAMB,(fwd_arr[i][0],last_RAWstr,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][8],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13]))
             elif fwd_arr[i][5] == "MT":                        # convert metric dict to Meteotemplate and send via GET
-              t = threading.Thread(target=forwardDictToMeteoTemplate, args=(fwd_arr[i][0],d_m,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13]))
-              t.start()
+              fwdSubmit(i,forwardDictToMeteoTemplate,(fwd_arr[i][0],d_m,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13]))
             elif fwd_arr[i][5] == "WC":                        # convert metric dict to WeatherCloud and send via GET
-              t = threading.Thread(target=forwardDictToWC, args=(fwd_arr[i][0],d_m,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13]))
-              t.start()
+              fwdSubmit(i,forwardDictToWC,(fwd_arr[i][0],d_m,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13]))
             elif fwd_arr[i][5] == "AWEKAS":                    # convert metric dict to Awekas-API and send via GET
-              t = threading.Thread(target=forwardDictToAwekas, args=(fwd_arr[i][0],d_m,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13]))
-              t.start()
+              fwdSubmit(i,forwardDictToAwekas,(fwd_arr[i][0],d_m,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13]))
             elif fwd_arr[i][5] == "WETTERCOM":                 # convert metric dict to wetter.com-API and send via GET
-              t = threading.Thread(target=forwardDictToWetterCOM, args=(fwd_arr[i][0],d_m,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13]))
-              t.start()
+              fwdSubmit(i,forwardDictToWetterCOM,(fwd_arr[i][0],d_m,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13]))
             elif fwd_arr[i][5] == "WEATHER365":                # convert metric dict to Weather365-API and send via POST
-              t = threading.Thread(target=forwardDictToWeather365, args=(fwd_arr[i][0],d_m,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13]))
-              t.start()
+              fwdSubmit(i,forwardDictToWeather365,(fwd_arr[i][0],d_m,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13]))
             elif fwd_arr[i][5] == "WETTERSEKTOR":              # convert metric dict to Wettersektor-API via POST
-              t = threading.Thread(target=forwardDictToWetterSektor, args=(fwd_arr[i][0],d_m,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13]))
-              t.start()
+              fwdSubmit(i,forwardDictToWetterSektor,(fwd_arr[i][0],d_m,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13]))
             elif fwd_arr[i][5] == "MQTTMET":                   # send metric dict to MQTT server
-              t = threading.Thread(target=forwardDictToMQTT, args=(fwd_arr[i][0],d_m,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][8],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13],fwd_arr[i][12],fwd_arr[i][14],True))
-              t.start()
+              fwdSubmit(i,forwardDictToMQTT,(fwd_arr[i][0],d_m,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][8],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13],fwd_arr[i][12],fwd_arr[i][14],True))
             elif fwd_arr[i][5] == "MQTTIMP":                   # send imperial dict to MQTT server
-              t = threading.Thread(target=forwardDictToMQTT, args=(fwd_arr[i][0],d_e,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][8],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13],fwd_arr[i][12],fwd_arr[i][14],False))
-              t.start()
+              fwdSubmit(i,forwardDictToMQTT,(fwd_arr[i][0],d_e,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][8],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13],fwd_arr[i][12],fwd_arr[i][14],False))
             elif fwd_arr[i][5] == "INFLUXMET":                 # send metric dict to InfluxDB server
-              t = threading.Thread(target=forwardDictToInfluxDB, args=(fwd_arr[i][0],d_m,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][8],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13],True,1))
-              t.start()
+              fwdSubmit(i,forwardDictToInfluxDB,(fwd_arr[i][0],d_m,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][8],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13],True,1))
             elif fwd_arr[i][5] == "INFLUXIMP":                 # send imperial dict to InfluxDB server
-              t = threading.Thread(target=forwardDictToInfluxDB, args=(fwd_arr[i][0],d_e,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][8],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13],False,1))
-              t.start()
+              fwdSubmit(i,forwardDictToInfluxDB,(fwd_arr[i][0],d_e,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][8],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13],False,1))
             elif fwd_arr[i][5] == "INFLUX2MET":                # send metric dict to InfluxDB2 server
-              t = threading.Thread(target=forwardDictToInfluxDB, args=(fwd_arr[i][0],d_m,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][8],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13],True,2))
-              t.start()
+              fwdSubmit(i,forwardDictToInfluxDB,(fwd_arr[i][0],d_m,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][8],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13],True,2))
             elif fwd_arr[i][5] == "INFLUX2IMP":                # send imperial dict to InfluxDB2 server
-              t = threading.Thread(target=forwardDictToInfluxDB, args=(fwd_arr[i][0],d_e,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][8],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13],False,2))
-              t.start()
+              fwdSubmit(i,forwardDictToInfluxDB,(fwd_arr[i][0],d_e,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][8],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13],False,2))
             elif fwd_arr[i][5] in ("REALTIMETXT","CLIENTRAWTXT","CSVFILE","TXTFILE","TEXTFILE","RAWTEXT","WSWIN"):      # convert dict to file
               d_fwd = d_e if fwd_arr[i][5] == "RAWTEXT" else d_m                                                        # use imperial dict for RAWTEXT only
-              t = threading.Thread(target=forwardDictToFile, args=(fwd_arr[i][0],d_fwd,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][8],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13],fwd_arr[i][5]))
-              t.start()
+              fwdSubmit(i,forwardDictToFile,(fwd_arr[i][0],d_fwd,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][8],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13],fwd_arr[i][5]))
             elif fwd_arr[i][5] == "APRS":                      # convert imperial dict to APRS and send via TCP/IP
-              t = threading.Thread(target=forwardDictToAPRS, args=(fwd_arr[i][0],d_e,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13]))
-              t.start()
+              fwdSubmit(i,forwardDictToAPRS,(fwd_arr[i][0],d_e,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13]))
             elif fwd_arr[i][5] == "MIYO":                      # convert metric dict to MIYO-API and send via GET
               d_fwd = d_m if USE_METRIC else d_e
-              t = threading.Thread(target=forwardDictToMIYO, args=(fwd_arr[i][0],d_fwd,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13]))
-              t.start()
+              fwdSubmit(i,forwardDictToMIYO,(fwd_arr[i][0],d_fwd,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13]))
             elif fwd_arr[i][5] == "BANNER":                    # convert complete dict and export as banner image
-              t = threading.Thread(target=forwardDictToBanner, args=(fwd_arr[i][0],last_d_all,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13],fwd_arr[i][5],fwd_arr[i][14]))
-              t.start()
+              fwdSubmit(i,forwardDictToBanner,(fwd_arr[i][0],last_d_all,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13],fwd_arr[i][5],fwd_arr[i][14]))
             elif fwd_arr[i][5] == "TAGFILE":                   # convert complete dict and replace alle tags with values
-              t = threading.Thread(target=forwardDictToTagfile, args=(fwd_arr[i][0],last_d_all,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13],fwd_arr[i][5],fwd_arr[i][14]))
-              t.start()
+              fwdSubmit(i,forwardDictToTagfile,(fwd_arr[i][0],last_d_all,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13],fwd_arr[i][5],fwd_arr[i][14]))
             else:                                              # metr. oder imperiales dict wie UDP-String per get versenden
               d_fwd = d_m if USE_METRIC else d_e
-              t = threading.Thread(target=forwardDictToHTTP, args=(fwd_arr[i][0],d_fwd,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][8],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13],False,True,True,"&"))
-              t.start()
+              fwdSubmit(i,forwardDictToHTTP,(fwd_arr[i][0],d_fwd,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][8],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13],False,True,True,"&"))
       if CSVsave and time.time() >= last_csv_time + CSV_INTERVAL_num:
         if last_csv_time == 0:
           hname = "/tmp/"+prgname+"-"+LBH_PORT+".csvheader"
@@ -5777,7 +5830,7 @@ class RequestHandler(BaseHTTPRequestHandler):
           htmlout += "  <table id=\"fwdstats\">\n"
           #htmlout += "    <tr><th style=\"width:8%;\">forward</th><th style=\"width:12%;\">type</th><th style=\"width:48%;\">url</th><th style=\"width:8%;\">last attempt</th><th style=\"width:8%;\">last ok</th><th style=\"width:8%;\">last state</th><th style=\"width:8%;\">err count</th></tr>\n"
           #htmlout += "    <tr><th style=\"width:8%;\">forward</th><th style=\"width:12%;\">type</th><th style=\"width:38%;\">url</th><th style=\"width:12%;\">last attempt</th><th style=\"width:13%;\">last ok</th><th style=\"width:8%;\">last state</th><th style=\"width:8%;\">err count</th></tr>\n"
-          htmlout += "    <tr><th style=\"width:10%;\">forward</th><th style=\"width:12%;\">type</th><th style=\"width:25%;\">url</th><th style=\"width:14%;\">last attempt</th><th style=\"width:14%;\">last ok</th><th style=\"width:15%;\">last state</th><th style=\"width:10%;\">err count (int)</th></tr>\n"
+          htmlout += "    <tr><th style=\"width:7%;\">forward</th><th style=\"width:9%;\">type</th><th style=\"width:20%;\">url</th><th style=\"width:12%;\">last attempt</th><th style=\"width:12%;\">last ok</th><th style=\"width:12%;\">last state</th><th style=\"width:8%;\">err count (int)</th><th style=\"width:8%;\">queue (dropped)</th><th style=\"width:12%;\">latency s (avg/max)</th></tr>\n"
           for i in range(len(fwd_arr)):
             last = time.strftime(DT_FORMAT,time.localtime(fwd_arr[i][3])) if fwd_arr[i][3] > 0 else ""
             lastok = time.strftime(DT_FORMAT,time.localtime(fwd_arr[i][16])) if fwd_arr[i][16] > 0 else ""
@@ -5792,8 +5845,12 @@ class RequestHandler(BaseHTTPRequestHandler):
               if fwd_arr[i][3] > fwd_arr[i][16] and lasterr != "OK": linestyle = " style=\"color: orange;\"" if int(errcount) < int(warnint) else " style=\"color: red;\""
             except: pass
             #htmlout += "    <tr"+linestyle+">"+"<td>"+"FWD-"+fwd_arr[i][11]+"</td><td>"+fwd_arr[i][5]+"</td><td>"+url+"</td><td>"+last+"</td><td>"+lastok+"</td><td>"+lasterr+"</td><td>"+errcount+" ("+warnint+")</td></tr>\n"
-            htmlout += "    <tr"+linestyle+" title=\""+cmt+"\"><td>"+"FWD-"+fwd_arr[i][11]+"</td><td>"+fwd_arr[i][5]+"</td><td>"+url+"</td><td>"+last+"</td><td>"+lastok+"</td><td>"+lasterr+"</td><td>"+errcount+" ("+warnint+")</td></tr>\n"
+            qdepth, qdropped, latency, avglatency, maxlatency = fwdQueueState(i)
+            qstate = str(qdepth)+" ("+str(qdropped)+")"
+            lstate = "%.2f (%.2f/%.2f)" % (latency, avglatency, maxlatency)
+            htmlout += "    <tr"+linestyle+" title=\""+cmt+"\"><td>"+"FWD-"+fwd_arr[i][11]+"</td><td>"+fwd_arr[i][5]+"</td><td>"+url+"</td><td>"+last+"</td><td>"+lastok+"</td><td>"+lasterr+"</td><td>"+errcount+" ("+warnint+")</td><td>"+qstate+"</td><td>"+lstate+"</td></tr>\n"
           htmlout += "  </table>\n"
+          htmlout += "  <p>"+str(len(fwdWorkers))+" worker threads, "+str(fwdReady.qsize())+" forwards waiting for a worker</p>\n"
           htmlout += "<p>&nbsp;</p>"
           htmlout += "</div>"
           htmlout += "</body></html>"
@@ -6069,21 +6126,11 @@ class RequestHandler(BaseHTTPRequestHandler):
 
       # hier ggf. um weitere Felder ergaenzen - etwa dewpt, windchill und feelslike
       #global EVAL_VALUES
+      d_e = None
       if EVAL_VALUES:
-        # erzeugt Wertepaar mit Namen "feld",Wert,Overwrite existent
-        instr = addDataToLine(instr,"dewptf",None,False)
-        instr = addDataToLine(instr,"windchillf",None,False)
-        instr = addDataToLine(instr,"feelslikef",None,False)
-        instr = addDataToLine(instr,"heatindexf",None,False)
-        instr = addDataToLine(instr,"pm25_AQI",None,False)
-        instr = addDataToLine(instr,"windavg",None,False)
-        instr = addDataToLine(instr,"brightness",None,False)
-        instr = addDataToLine(instr,"cloudf",None,False)
-        instr = addDataToLine(instr,"sunhours",None,False)     # combined procedure - dependend on SUN_CALC and existence of lat/lon
-        instr = addDataToLine(instr,"srsum",None,False)        # v0.10: daily sr sum
-        if HIDDEN_FEATURES:                                    # for testing: should be removed in next release
-          instr = addDataToLine(instr,"osunhours",None,False)  # old procedure with fixes threshold of 120W/m²
-          instr = addDataToLine(instr,"nsunhours",None,False)  # new procedure with dynamic threshold
+        # v0.10: parse instr once and add dewptf, windchillf, feelslikef, ... in one pass
+        instr, d_e = addDerivedValues(instr)
+        derived_instr = instr
       if FIX_LIGHTNING and last_lightning_time != 0:
         # set empty keys to last known values
         instr = fixEmptyValue(instr,"lightning_time",str(last_lightning_time))
@@ -6110,7 +6157,8 @@ class RequestHandler(BaseHTTPRequestHandler):
         debugPrint("after:  "+instr)
 
       # create dictionaries E = Imperial; M = Metric; R = RAW
-      d_e = stringToDict(instr,"&")
+      # v0.10: keep the dict of addDerivedValues as long as instr was not changed since
+      if d_e is None or instr != derived_instr: d_e = stringToDict(instr,"&")
       d_r = stringToDict(last_RAWstr,"&")
       d_m = convertDictToMetricDict(d_e,IGNORE_EMPTY,LOX_TIME)
 
@@ -6138,7 +6186,7 @@ class RequestHandler(BaseHTTPRequestHandler):
 
       # v0.08 add ptrend1, pchange1, ptrend3 & pchange3 - needs d_m and is for instr only
       if EVAL_VALUES:
-        instr = addDataToLine(instr,"ptrend",None,False)
+        instr = addDataToLine(instr,"ptrend",None,False,d_e.copy())
 
       # zerlegen
       UDPstr = "SID=" + defSID + " " + dictToString(d_m," ",True,UDP_IGNORE) if USE_METRIC else "SID=" + defSID + " " + dictToString(d_e," ",True,UDP_IGNORE)
@@ -6177,100 +6225,70 @@ class RequestHandler(BaseHTTPRequestHandler):
           if time.time() >= fwd_arr[i][3]+fwd_arr[i][2]:
             fwd_arr[i][3] = time.time()                        # save time of last attempt
             if fwd_arr[i][5] == "WU":                          # String nach WU wandeln und per get versenden
-              t = threading.Thread(target=forwardStringToWU, args=(fwd_arr[i][0],instr,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][8],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13]))
-              t.start()
+              fwdSubmit(i,forwardStringToWU,(fwd_arr[i][0],instr,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][8],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13]))
             elif fwd_arr[i][5] == "RAW":                       # RAW-Dict ohne Aenderung per post weitersenden
-              t = threading.Thread(target=forwardDictToHTTP, args=(fwd_arr[i][0],d_r,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][8],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13],True,True,False,"&"))
-              t.start()
+              fwdSubmit(i,forwardDictToHTTP,(fwd_arr[i][0],d_r,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][8],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13],True,True,False,"&"))
             elif fwd_arr[i][5] == "EW":                        # eingehenden, erweiterten RAW-String nach Ecowitt wandeln und per post versenden
-              t = threading.Thread(target=forwardStringToEW, args=(fwd_arr[i][0],instr,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][8],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13],fwd_arr[i][14]))
-              t.start()
+              fwdSubmit(i,forwardStringToEW,(fwd_arr[i][0],instr,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][8],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13],fwd_arr[i][14]))
             elif fwd_arr[i][5] in ("RAWEW","EWRAW"):           # eingehenden RAW-String nach Ecowitt wandeln und per post versenden
-              t = threading.Thread(target=forwardStringToEW, args=(fwd_arr[i][0],last_RAWstr,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][8],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13],fwd_arr[i][14]))
-              t.start()
+              fwdSubmit(i,forwardStringToEW,(fwd_arr[i][0],last_RAWstr,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][8],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13],fwd_arr[i][14]))
             elif fwd_arr[i][5] == "LD":                        # forward pm25 value only to luftdaten.info; args: url, fwd_sid, wert
-              t = threading.Thread(target=forwardDictToLuftdaten, args=(fwd_arr[i][0],d_m,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13],))
-              t.start()
+              fwdSubmit(i,forwardDictToLuftdaten,(fwd_arr[i][0],d_m,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13],))
             elif fwd_arr[i][5] == "UDP":                       # forward metr. or imp. dict per UDP (other target than Loxone)
               d_fwd = d_m if USE_METRIC else d_e
-              t = threading.Thread(target=forwardDictToUDP, args=(fwd_arr[i][0],d_fwd,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][8],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13]," "))
-              t.start()
+              fwdSubmit(i,forwardDictToUDP,(fwd_arr[i][0],d_fwd,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][8],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13]," "))
             elif fwd_arr[i][5] in ("RAWUDP","UDPRAW"):         # forward incoming string via UDP
-              t = threading.Thread(target=forwardStringToUDP, args=(fwd_arr[i][0],instr,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][8],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13]))
-              t.start()
+              fwdSubmit(i,forwardStringToUDP,(fwd_arr[i][0],instr,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][8],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13]))
             elif fwd_arr[i][5] in ("EWUDP","UDPEW"):           # forward imp. dict per UDP (convert to EW-format)
-              t = threading.Thread(target=forwardDictToUDP, args=(fwd_arr[i][0],d_e,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][8],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13],"&"))
-              t.start()
+              fwdSubmit(i,forwardDictToUDP,(fwd_arr[i][0],d_e,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][8],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13],"&"))
             elif fwd_arr[i][5] in ("RAWCSV","CSVRAW"):         # forward the raw values as CSV-string for e.g. Edomi
-              t = threading.Thread(target=forwardDictToHTTP, args=(fwd_arr[i][0],d_r,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][8],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13],True,True,False,";"))
-              t.start()
+              fwdSubmit(i,forwardDictToHTTP,(fwd_arr[i][0],d_r,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][8],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13],True,True,False,";"))
             elif fwd_arr[i][5] == "CSV":                       # forward as CSV-string for e.g. Edomi
               d_fwd = d_m if USE_METRIC else d_e
-              t = threading.Thread(target=forwardDictToHTTP, args=(fwd_arr[i][0],d_fwd,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][8],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13],True,True,False,";"))
-              t.start()
+              fwdSubmit(i,forwardDictToHTTP,(fwd_arr[i][0],d_fwd,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][8],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13],True,True,False,";"))
             elif fwd_arr[i][5] == "AMB":                       # convert incoming string to Ambient and send via GET
-              t = threading.Thread(target=forwardStringToAMB, args=(fwd_arr[i][0],instr,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][8],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13]))
-              t.start()
+              fwdSubmit(i,forwardStringToAMB,(fwd_arr[i][0],instr,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][8],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13]))
             elif fwd_arr[i][5] in ("RAWAMB","AMBRAW"):         # convert incoming RAW-string to Ambient and send via GET
-              t = threading.Thread(target=forwardStringToAMB, args=(fwd_arr[i][0],last_RAWstr,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][8],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13]))
-              t.start()
+              fwdSubmit(i,forwardStringToAMB,(fwd_arr[i][0],last_RAWstr,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][8],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13]))
             elif fwd_arr[i][5] == "MT":                        # convert metric dict to Meteotemplate and send via GET
-              t = threading.Thread(target=forwardDictToMeteoTemplate, args=(fwd_arr[i][0],d_m,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13]))
-              t.start()
+              fwdSubmit(i,forwardDictToMeteoTemplate,(fwd_arr[i][0],d_m,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13]))
             elif fwd_arr[i][5] == "WC":                        # convert metric dict to WeatherCloud and send via GET
-              t = threading.Thread(target=forwardDictToWC, args=(fwd_arr[i][0],d_m,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13]))
-              t.start()
+              fwdSubmit(i,forwardDictToWC,(fwd_arr[i][0],d_m,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13]))
             elif fwd_arr[i][5] == "AWEKAS":                    # convert metric dict to Awekas-API and send via GET
-              t = threading.Thread(target=forwardDictToAwekas, args=(fwd_arr[i][0],d_m,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13]))
-              t.start()
+              fwdSubmit(i,forwardDictToAwekas,(fwd_arr[i][0],d_m,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13]))
             elif fwd_arr[i][5] == "WETTERCOM":                 # convert metric dict to wetter.com-API and send via GET
-              t = threading.Thread(target=forwardDictToWetterCOM, args=(fwd_arr[i][0],d_m,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13]))
-              t.start()
+              fwdSubmit(i,forwardDictToWetterCOM,(fwd_arr[i][0],d_m,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13]))
             elif fwd_arr[i][5] == "WEATHER365":                # convert metric dict to weather365-API and send via POST
-              t = threading.Thread(target=forwardDictToWeather365, args=(fwd_arr[i][0],d_m,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13]))
-              t.start()
+              fwdSubmit(i,forwardDictToWeather365,(fwd_arr[i][0],d_m,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13]))
             elif fwd_arr[i][5] == "WETTERSEKTOR":              # convert metric dict to Wettersektor-API via POST
-              t = threading.Thread(target=forwardDictToWetterSektor, args=(fwd_arr[i][0],d_m,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13]))
-              t.start()
+              fwdSubmit(i,forwardDictToWetterSektor,(fwd_arr[i][0],d_m,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13]))
             elif fwd_arr[i][5] == "MQTTMET":                   # send metric dict to MQTT server
-              t = threading.Thread(target=forwardDictToMQTT, args=(fwd_arr[i][0],d_m,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][8],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13],fwd_arr[i][12],fwd_arr[i][14],True))
-              t.start()
+              fwdSubmit(i,forwardDictToMQTT,(fwd_arr[i][0],d_m,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][8],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13],fwd_arr[i][12],fwd_arr[i][14],True))
             elif fwd_arr[i][5] == "MQTTIMP":                   # send imperial dict to MQTT server
-              t = threading.Thread(target=forwardDictToMQTT, args=(fwd_arr[i][0],d_e,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][8],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13],fwd_arr[i][12],fwd_arr[i][14],False))
-              t.start()
+              fwdSubmit(i,forwardDictToMQTT,(fwd_arr[i][0],d_e,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][8],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13],fwd_arr[i][12],fwd_arr[i][14],False))
             elif fwd_arr[i][5] == "INFLUXMET":                 # send metric dict to InfluxDB server
-              t = threading.Thread(target=forwardDictToInfluxDB, args=(fwd_arr[i][0],d_m,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][8],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13],True,1))
-              t.start()
+              fwdSubmit(i,forwardDictToInfluxDB,(fwd_arr[i][0],d_m,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][8],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13],True,1))
             elif fwd_arr[i][5] == "INFLUXIMP":                 # send imperial dict to InfluxDB server
-              t = threading.Thread(target=forwardDictToInfluxDB, args=(fwd_arr[i][0],d_e,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][8],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13],False,1))
-              t.start()
+              fwdSubmit(i,forwardDictToInfluxDB,(fwd_arr[i][0],d_e,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][8],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13],False,1))
             elif fwd_arr[i][5] == "INFLUX2MET":                # send metric dict to InfluxDB2 server
-              t = threading.Thread(target=forwardDictToInfluxDB, args=(fwd_arr[i][0],d_m,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][8],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13],True,2))
-              t.start()
+              fwdSubmit(i,forwardDictToInfluxDB,(fwd_arr[i][0],d_m,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][8],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13],True,2))
             elif fwd_arr[i][5] == "INFLUX2IMP":                # send imperial dict to InfluxDB2 server
-              t = threading.Thread(target=forwardDictToInfluxDB, args=(fwd_arr[i][0],d_e,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][8],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13],False,2))
-              t.start()
+              fwdSubmit(i,forwardDictToInfluxDB,(fwd_arr[i][0],d_e,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][8],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13],False,2))
             elif fwd_arr[i][5] in ("REALTIMETXT","CLIENTRAWTXT","CSVFILE","TXTFILE","TEXTFILE","RAWTEXT","WSWIN"):      # convert dict to file
               d_fwd = d_e if fwd_arr[i][5] == "RAWTEXT" else d_m                                                        # use imperial dict for RAWTEXT only
-              t = threading.Thread(target=forwardDictToFile, args=(fwd_arr[i][0],d_fwd,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][8],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13],fwd_arr[i][5]))
-              t.start()
+              fwdSubmit(i,forwardDictToFile,(fwd_arr[i][0],d_fwd,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][8],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13],fwd_arr[i][5]))
             elif fwd_arr[i][5] == "APRS":                      # convert imperial dict to APRS and send via TCP/IP
-              t = threading.Thread(target=forwardDictToAPRS, args=(fwd_arr[i][0],d_e,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13]))
-              t.start()
+              fwdSubmit(i,forwardDictToAPRS,(fwd_arr[i][0],d_e,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13]))
             elif fwd_arr[i][5] == "MIYO":                      # convert metric dict to MIYO-API and send via GET
               d_fwd = d_m if USE_METRIC else d_e
-              t = threading.Thread(target=forwardDictToMIYO, args=(fwd_arr[i][0],d_fwd,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13]))
-              t.start()
+              fwdSubmit(i,forwardDictToMIYO,(fwd_arr[i][0],d_fwd,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13]))
             elif fwd_arr[i][5] == "BANNER":                    # convert complete dict and export as banner image
-              t = threading.Thread(target=forwardDictToBanner, args=(fwd_arr[i][0],last_d_all,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13],fwd_arr[i][5],fwd_arr[i][14]))
-              t.start()
+              fwdSubmit(i,forwardDictToBanner,(fwd_arr[i][0],last_d_all,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13],fwd_arr[i][5],fwd_arr[i][14]))
             elif fwd_arr[i][5] == "TAGFILE":                   # convert complete dict and replace alle tags with values
-              t = threading.Thread(target=forwardDictToTagfile, args=(fwd_arr[i][0],last_d_all,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13],fwd_arr[i][5],fwd_arr[i][14]))
-              t.start()
+              fwdSubmit(i,forwardDictToTagfile,(fwd_arr[i][0],last_d_all,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13],fwd_arr[i][5],fwd_arr[i][14]))
             else:                                              # metr. oder imperiales dict wie UDP-String per get versenden
               d_fwd = d_m if USE_METRIC else d_e
-              t = threading.Thread(target=forwardDictToHTTP, args=(fwd_arr[i][0],d_fwd,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][8],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13],False,True,True,"&"))
-              t.start()
+              fwdSubmit(i,forwardDictToHTTP,(fwd_arr[i][0],d_fwd,fwd_arr[i][6],fwd_arr[i][7],fwd_arr[i][8],fwd_arr[i][10],fwd_arr[i][11],fwd_arr[i][4],fwd_arr[i][13],False,True,True,"&"))
       if CSVsave and time.time() >= last_csv_time + CSV_INTERVAL_num:
         if last_csv_time == 0:
           hname = "/tmp/"+prgname+"-"+LBH_PORT+".csvheader"
@@ -7113,8 +7131,8 @@ def sendviaHTTP(url, typ, outstr):
   v = 0
   while okstr[0:7] == "<ERROR>" and v < httpTries:
     try:
-      headers = {'Content-Type': 'application/x-www-form-urlencoded', 'Connection': 'Close','User-Agent': None}
-      r = requests.post(url,data=outstr,headers=headers,timeout=httpTimeOut) if typ == "POST" else requests.get(url+outstr,timeout=httpTimeOut)
+      headers = {'Content-Type': 'application/x-www-form-urlencoded','User-Agent': None}
+      r = fwdSession(url).post(url,data=outstr,headers=headers,timeout=httpTimeOut) if typ == "POST" else fwdSession(url).get(url+outstr,timeout=httpTimeOut)
       ret = str(r.status_code)
       okstr = "<ERROR> " if r.status_code not in range(200,203) else ""
       if r.status_code in range(400,500): v = 400
@@ -7993,6 +8011,7 @@ WSDOG_RESTART = config.get('Warning','WSDOG_RESTART',fallback='0')
 # v0.10 forward warning enable (push) and count of missed intervals - onetime warning!
 FWD_WARNING = mkBoolean(config.get('Warning','FWD_WARNING',fallback="True"))
 FWD_WARNINT = config.get('Warning','FWD_WARNINT',fallback=str(FWD_WARNINT))
+FWD_WORKERS = config.get('Config','FWD_WORKERS',fallback=str(FWD_WORKERS))
 STORM_WARNING = mkBoolean(config.get('Warning','STORM_WARNING',fallback="True"))
 STORM_WARNDIFF = config.get('Warning','STORM_WARNDIFF',fallback='1.75')
 STORM_WARNDIFF3H = config.get('Warning','STORM_WARNDIFF3H',fallback='3.75')
@@ -8120,6 +8139,7 @@ battex_arr = BATTERY_WARNEXCLUDE.split(",")
 UDP_STATRESEND = intFallback(UDP_STATRESEND,0)                 # default: no regular resend of status
 WSDOG_INTERVAL = intFallback(WSDOG_INTERVAL,3)                 # default: warn after 3 intervals
 FWD_WARNINT = intFallback(FWD_WARNINT,FWD_WARNINT)             # default: warn after CONST intervals
+FWD_WORKERS = intFallback(FWD_WORKERS,0)                       # default: one worker per forward, max. 8
 WSDOG_RESTART = intFallback(WSDOG_RESTART,0)                   # default: do not restart the plugin
 STORM_WARNDIFF = floatFallback(STORM_WARNDIFF,1.75)            # default: 1.75hPa
 STORM_WARNDIFF3H = floatFallback(STORM_WARNDIFF3H,3.75)        # default: 3.75hPa
@@ -8576,6 +8596,12 @@ if HIDDEN_FEATURES:
 if fwd_error != "":
   logPrint(fwd_error)                                          # output error in FWD_REMAP
 
+# start the worker threads for the forwards
+if forwardMode:
+  if FWD_WORKERS <= 0: FWD_WORKERS = min(len(fwd_arr),8)
+  fwdStartWorkers(FWD_WORKERS)
+  logPrint("<OK> "+str(FWD_WORKERS)+" worker threads for "+str(len(fwd_arr))+" forwards started - to change set Config\FWD_WORKERS in config")
+
 # v0.10: enable debug mode the other way
 if os.path.exists(CONFIG_DIR+"/debug.enable"):
   myDebug = True
@@ -1,7 +1,7 @@
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Request
 from fastapi.responses import JSONResponse
-import json
 import os.path
+from store import store, entry_response, combined_response
 
 PATH = '/home/weewx/public_html/data/json/'
 PROVIDERS = [
@@ -24,42 +24,28 @@ PROVIDERS = [
 router = APIRouter()
 
 @router.get("/")
-async def get_current(provider: str = Query(None), total: str = Query(None)):
+async def get_current(request: Request, provider: str = Query(None), total: str = Query(None)):
     if provider is None or provider.lower() == 'all':
         if total is None:
-            data_all = dict()
-            for prov in PROVIDERS:
-                data_all[prov] = dict()
-                fn = os.path.join(PATH, 'currentwx_%s.json' % prov)
-                if os.path.exists(fn):
-                    with open(fn) as file:
-                        data = json.load(file)
-                    data_all[prov] = data
-            return JSONResponse(content=data_all)
+            return await combined_response(request, {prov: os.path.join(PATH, 'currentwx_%s.json' % prov) for prov in PROVIDERS})
         else:
-            fn = os.path.join(PATH, 'currentwx_total.json')
-            data = dict()
-            if os.path.exists(fn):
-                with open(fn) as file:
-                    data = json.load(file)
-            return JSONResponse(content=data)
+            entry = await store.get(os.path.join(PATH, 'currentwx_total.json'))
+            if entry is None:
+                return JSONResponse(content=dict())
+            return entry_response(request, entry)
     elif provider.lower() in PROVIDERS:
-        data = dict()
-        data[provider] = dict()
         if total is None:
             fn = os.path.join(PATH, 'currentwx_%s.json' % provider.lower())
         else:
             fn = os.path.join(PATH, 'currentwx_total.json')
-        if os.path.exists(fn):
-            with open(fn) as file:
-                data = json.load(file)
-        else:
+        entry = await store.get(fn)
+        if entry is None:
             raise HTTPException(status_code=404, detail="Valid request. No results available based on your query parameters. (provider=%s)" % provider)
-        if total is not None and provider.lower() not in data:
+        if total is not None and provider.lower() not in entry.data:
             raise HTTPException(status_code=404, detail="Valid request. No results available based on your query parameters. (provider=%s)" % provider)
         if total is None:
-            return JSONResponse(content=data)
+            return entry_response(request, entry)
         else:
-            return JSONResponse(content=data[provider])
+            return entry_response(request, entry, provider)
     else:
         raise HTTPException(status_code=400, detail="Invalid request. Provider %s is not a valid provider!" % provider)
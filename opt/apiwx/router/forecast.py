@@ -1,7 +1,7 @@
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Request
 from fastapi.responses import JSONResponse
-import json
 import os.path
+from store import store, entry_response, combined_response
 
 PATH = '/home/weewx/public_html/data/json/'
 PROVIDERS = [
@@ -18,59 +18,46 @@ PROVIDERS = [
 router = APIRouter()
 
 @router.get("/")
-async def get_forecast(provider: str = Query(None), interval: str = Query(None), column: str = Query(None), total: str = Query(None)):
+async def get_forecast(request: Request, provider: str = Query(None), interval: str = Query(None), column: str = Query(None), total: str = Query(None)):
     if provider is None or provider.lower() == 'all':
         if total is None:
-            data_all = dict()
-            for prov in PROVIDERS:
-                data_all[prov] = dict()
-                fn = os.path.join(PATH, 'forecastwx_%s.json' % prov)
-                if os.path.exists(fn):
-                    with open(fn) as file:
-                        data = json.load(file)
-                    data_all[prov] = data
-            return JSONResponse(content=data_all)
+            return await combined_response(request, {prov: os.path.join(PATH, 'forecastwx_%s.json' % prov) for prov in PROVIDERS})
         else:
-            fn = os.path.join(PATH, 'forecastwx_total.json')
-            data = dict()
-            if os.path.exists(fn):
-                with open(fn) as file:
-                    data = json.load(file)
-            return JSONResponse(content=data)
+            entry = await store.get(os.path.join(PATH, 'forecastwx_total.json'))
+            if entry is None:
+                return JSONResponse(content=dict())
+            return entry_response(request, entry)
     elif provider.lower() in PROVIDERS:
-        data = dict()
-        data[provider] = dict()
         if total is None:
             fn = os.path.join(PATH, 'forecastwx_%s.json' % provider.lower())
         else:
             fn = os.path.join(PATH, 'forecastwx_total.json')
-        if os.path.exists(fn):
-            with open(fn) as file:
-                data = json.load(file)
-        else:
+        entry = await store.get(fn)
+        if entry is None:
             raise HTTPException(status_code=404, detail="Valid request. No results available based on your query parameters. (provider=%s)" % provider)
+        data = entry.data
         if total is not None and provider.lower() not in data:
             raise HTTPException(status_code=404, detail="Valid request. No results available based on your query parameters. (provider=%s)" % provider)
         if total is None:
             if interval is None:
-                return JSONResponse(content=data)
+                return entry_response(request, entry)
             elif interval.lower() in data:
                 if column is None:
-                    return JSONResponse(content=data[interval])
+                    return entry_response(request, entry, interval)
                 elif column in data[interval]:
-                    return JSONResponse(content=data[provider][interval][column])
+                    return entry_response(request, entry, interval, column)
                 else:
                     raise HTTPException(status_code=404, detail="Valid request. No results available based on your query parameters. (provider=%s, interval=%s, column=%s)" % (provider, interval, column))
             else:
                 raise HTTPException(status_code=404, detail="Valid request. No results available based on your query parameters. (provider=%s, interval=%s, column=%s)" % (provider, interval, column))
         else:
             if interval is None:
-                return JSONResponse(content=data[provider])
+                return entry_response(request, entry, provider)
             elif interval.lower() in data[provider]:
                 if column is None:
-                    return JSONResponse(content=data[provider][interval])
+                    return entry_response(request, entry, provider, interval)
                 elif column in data[provider][interval]:
-                    return JSONResponse(content=data[provider][interval][column])
+                    return entry_response(request, entry, provider, interval, column)
                 else:
                     raise HTTPException(status_code=404, detail="Valid request. No results available based on your query parameters. (provider=%s, interval=%s, column=%s)" % (provider, interval, column))
             else:
@@ -1,16 +1,22 @@
-from fastapi import APIRouter, HTTPException, Query
-import json
+from fastapi import APIRouter, HTTPException, Query, Request
+import os.path
+import re
+from store import store, entry_response
+
+PATH = '/home/weewx/public_html/data/json/'
 
 router = APIRouter()
 
 @router.get("/")
-async def get_currentaq(station: str = Query(None), type: str = Query(None)):
-    try:
-        if station is None:
-            station = 'weiden'
-        if type is None or type.lower() not in ('s', 'l'):
-            type = 's'
-        with open('/home/weewx/public_html/data/json/%s_mosmix_%s.json' % (station.lower(), type.lower()), 'r') as file:
-            return json.load(file)
-    except FileNotFoundError as e:
+async def get_currentaq(request: Request, station: str = Query(None), type: str = Query(None)):
+    if station is None:
+        station = 'weiden'
+    if type is None or type.lower() not in ('s', 'l'):
+        type = 's'
+    # only plain station names, every requested file is kept in memory
+    entry = None
+    if re.fullmatch(r'[\w-]+', station):
+        entry = await store.get(os.path.join(PATH, '%s_mosmix_%s.json' % (station.lower(), type.lower())))
+    if entry is None:
         raise HTTPException(status_code=500, detail="Internal Server Error. Data not found.")
+    return entry_response(request, entry)
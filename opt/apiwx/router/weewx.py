@@ -1,12 +1,14 @@
-from fastapi import APIRouter, HTTPException, Query
-import json
+from fastapi import APIRouter, HTTPException, Request
+import os.path
+from store import store, entry_response
+
+PATH = '/home/weewx/public_html/data/json/'
 
 router = APIRouter()
 
 @router.get("/")
-async def get_weewx():
-    try:
-        with open('/home/weewx/public_html/data/json/current_weewx.json', 'r') as file:
-            return json.load(file)
-    except FileNotFoundError:
+async def get_weewx(request: Request):
+    entry = await store.get(os.path.join(PATH, 'current_weewx.json'))
+    if entry is None:
         raise HTTPException(status_code=500, detail="Internal Server Error. Data not found.")
+    return entry_response(request, entry)
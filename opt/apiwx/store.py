@@ -0,0 +1,154 @@
+"""
+In memory store of the JSON files served by the routers.
+
+Every file is parsed and serialized once and kept in memory together with
+its mtime and size. A file is checked for changes at most every
+CHECK_INTERVAL seconds, stat and reading run in a worker thread, so the
+event loop does no file I/O. Responses carry ETag and Last-Modified and
+conditional requests are answered with 304.
+"""
+
+import asyncio
+import email.utils
+import hashlib
+import json
+import os
+import time
+
+from fastapi import Request
+from fastapi.responses import Response
+
+CHECK_INTERVAL = 1.0
+
+
+def dumps(content):
+    # same rendering as fastapi.responses.JSONResponse
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
+class Entry:
+    """ parsed content and response body of one file """
+
+    def __init__(self, data, body, mtime, size):
+        self.data = data
+        self.body = body
+        self.mtime = mtime
+        self.size = size
+        self.etag = '"%x-%x"' % (int(mtime * 1000000), size)
+        # keys -> (etag, body) of data[key][key]...
+        self.parts = dict()
+
+    def part(self, *keys):
+        part = self.parts.get(keys)
+        if part is None:
+            content = self.data
+            for key in keys:
+                content = content[key]
+            etag = '"%s"' % hashlib.md5(repr((self.etag, keys)).encode('utf-8')).hexdigest()
+            part = (etag, dumps(content))
+            self.parts[keys] = part
+        return part
+
+
+class JsonStore:
+
+    def __init__(self):
+        # path -> Entry of the files that exist, misses are not cached
+        self.entries = dict()
+        # path -> time of the last check
+        self.checked = dict()
+        # keys of a combined response -> (etag, body)
+        self.combined = dict()
+
+    def load(self, path):
+        """ reload path if it has changed (runs in a worker thread) """
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            # paths come from the request, so a miss is checked again every time
+            self.entries.pop(path, None)
+            self.checked.pop(path, None)
+            return
+        entry = self.entries.get(path)
+        if entry is None or entry.mtime != st.st_mtime or entry.size != st.st_size:
+            try:
+                with open(path, 'rb') as file:
+                    data = json.loads(file.read())
+                self.entries[path] = Entry(data, dumps(data), st.st_mtime, st.st_size)
+            except (OSError, ValueError):
+                # the file is being written, keep the old content and try again next time
+                if entry is None:
+                    return
+        self.checked[path] = time.monotonic()
+
+    def load_many(self, paths):
+        for path in paths:
+            self.load(path)
+
+    async def get_many(self, paths):
+        """ entries of paths, None for missing files """
+        now = time.monotonic()
+        stale = [path for path in paths if now - self.checked.get(path, 0.0) >= CHECK_INTERVAL]
+        if stale:
+            await asyncio.to_thread(self.load_many, stale)
+        return [self.entries.get(path) for path in paths]
+
+    async def get(self, path):
+        return (await self.get_many([path]))[0]
+
+    def combine(self, entries):
+        """ etag and body of {name: data, ...}, {} for missing files """
+        key = tuple((name, entry.etag if entry is not None else None) for name, entry in entries.items())
+        cached = self.combined.get(key)
+        if cached is None:
+            body = b'{' + b','.join(dumps(name) + b':' + (entry.body if entry is not None else b'{}')
+                                    for name, entry in entries.items()) + b'}'
+            etag = '"%s"' % hashlib.md5(repr(key).encode('utf-8')).hexdigest()
+            cached = (etag, body)
+            # only the latest version of a combination is needed
+            names = tuple(entries)
+            for old in [old for old in self.combined if tuple(name for name, etag in old) == names]:
+                del self.combined[old]
+            self.combined[key] = cached
+        return cached
+
+
+store = JsonStore()
+
+
+def not_modified(request, etag, mtime):
+    if_none_match = request.headers.get('if-none-match')
+    if if_none_match is not None:
+        return etag in [tag.strip() for tag in if_none_match.split(',')] or if_none_match.strip() == '*'
+    if_modified_since = request.headers.get('if-modified-since')
+    if if_modified_since is not None and mtime is not None:
+        try:
+            return int(mtime) <= email.utils.parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def response(request: Request, body, etag, mtime=None):
+    headers = {'ETag': etag}
+    if mtime is not None:
+        headers['Last-Modified'] = email.utils.formatdate(mtime, usegmt=True)
+    if not_modified(request, etag, mtime):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type='application/json', headers=headers)
+
+
+def entry_response(request: Request, entry, *keys):
+    """ response of entry.data[key][key]... """
+    if not keys:
+        return response(request, entry.body, entry.etag, entry.mtime)
+    etag, body = entry.part(*keys)
+    return response(request, body, etag, entry.mtime)
+
+
+async def combined_response(request: Request, paths):
+    """ response of {name: data of path, ...} """
+    entries = dict(zip(paths, await store.get_many(list(paths.values()))))
+    etag, body = store.combine(entries)
+    mtimes = [entry.mtime for entry in entries.values() if entry is not None]
+    return response(request, body, etag, max(mtimes) if mtimes else None)
@@ -4,8 +4,8 @@ from json import JSONDecodeError
 import time
 import os
 import sys
+import threading
 import systemd.daemon
-import fcntl
 
 MQTT_BROKER = "mqtt.fritz.box"
 MQTT_TOPIC = "weewx-mqtt/loop"
@@ -14,6 +14,13 @@ MQTT_PASSWORD = "weewx"
 MQTT_CLIENT_ID = "weewxloop"
 JSON_FILE_PATH = "/home/weewx/public_html/data/json/current_weewx.json"
 MAX_JSON_AGE = 600  # Max age of JSON file in seconds (10 minutes)
+WRITE_INTERVAL = 2.0  # Min seconds between two writes of the JSON file, messages in between are merged
+PRINT_MESSAGES = False  # Print every received message
+
+# merged loop data, written by write_json_to_file
+current_data = dict()
+data_lock = threading.Lock()
+data_changed = False
 
 def exit_with_error(message):
     print(message)
@@ -32,17 +39,24 @@ def on_connect(client, userdata, flags, rc):
         print("Connection to MQTT broker %s failed with status %s" % (MQTT_BROKER, str(rc)))
 
 def on_message(client, userdata, message):
+    global data_changed
     try:
-        print(f"Message received from [{message.topic}]: {message.payload}")
+        if PRINT_MESSAGES:
+            print(f"Message received from [{message.topic}]: {message.payload}")
         if message.payload is None:
             print("Error message is a None string.")
             return
-        data = str(message.payload.decode('utf-8', 'ignore'))
-        if validate_json(data):
-            data = json.loads(data)
-            write_json_to_file(data)
-        else:
+        try:
+            data = json.loads(message.payload.decode('utf-8', 'ignore'))
+        except JSONDecodeError:
             print("Error message is not a valid json string")
+            return
+        if not isinstance(data, dict):
+            print("Error message is not a json object")
+            return
+        with data_lock:
+            current_data.update(data)
+            data_changed = True
     except ValueError as e:
         #exit_with_error("Error processing MQTT message: %s" % str(e))
         print("Error processing MQTT message: %s" % str(e))
@@ -50,24 +64,25 @@ def on_message(client, userdata, message):
         #exit_with_error("Error processing MQTT message: %s" % str(e))
         print("Error processing MQTT message: %s" % str(e))
 
-def write_json_to_file(data):
+def write_json_to_file():
+    global data_changed
     try:
-        with open(JSON_FILE_PATH, "w") as json_file:
-            fcntl.flock(json_file, fcntl.LOCK_EX)  # Acquire an exclusive lock
-            json.dump(data, json_file, indent=4)   # Indent for better readability
-            fcntl.flock(json_file, fcntl.LOCK_UN)  # Release the lock
-        print("JSON data written to file.")
+        with data_lock:
+            if not data_changed:
+                return False
+            content = json.dumps(current_data, separators=(',', ':'))
+            data_changed = False
+        # Readers see the old or the new file, never a partially written one
+        tmp_path = JSON_FILE_PATH + ".tmp"
+        with open(tmp_path, "w") as json_file:
+            json_file.write(content)
+        os.replace(tmp_path, JSON_FILE_PATH)
+        if PRINT_MESSAGES:
+            print("JSON data written to file.")
         return True
     except Exception as e:
         exit_with_error("Error processing MQTT message: %s" % str(e))
 
-def validate_json(data):
-    try:
-        json.loads(str(data))
-        return True
-    except JSONDecodeError:
-        return False
-
 def check_json_age():
     if os.path.exists(JSON_FILE_PATH):
         file_age = time.time() - os.path.getmtime(JSON_FILE_PATH)
@@ -115,7 +130,10 @@ def main():
         print("Connection failed.")
         return
 
-    client.loop_forever()  # Der Client wird in einer Endlosschleife ausgeführt
+    client.loop_start()  # Der Client läuft im Hintergrund, Nachrichten werden in current_data gesammelt
+    while True:
+        time.sleep(WRITE_INTERVAL)
+        write_json_to_file()
 
 if __name__ == "__main__":
     main()